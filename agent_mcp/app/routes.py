@@ -1,23 +1,35 @@
 # Agent-MCP/mcp_template/mcp_server_src/app/routes.py
+import asyncio
 import os
 import json
 import datetime
 import sqlite3
 from pathlib import Path
-from typing import Callable, List, Dict, Any # Added List, Dict, Any
+from typing import Callable, List, Dict, Any, Optional, Tuple # Added List, Dict, Any
 
 from starlette.routing import Route, Mount
 from starlette.staticfiles import StaticFiles
-from starlette.responses import JSONResponse, Response, PlainTextResponse
+from starlette.responses import JSONResponse, Response, PlainTextResponse, StreamingResponse
 from starlette.requests import Request
 
 # Project-specific imports
-from ..core.config import logger
+from ..core.config import logger, TASK_NOTES_RECENT_LIMIT, MESSAGE_SSE_KEEPALIVE_SECONDS
 from ..core import globals as g
 from ..core.auth import verify_token, get_agent_id as auth_get_agent_id
 from ..utils.json_utils import get_sanitized_json_body
 from ..db.connection import get_db_connection
 from ..db.actions.agent_actions_db import log_agent_action_to_db
+from ..db.actions.task_health_db import get_task_health_history
+from ..db.actions.agent_messages_db import (
+    get_latest_message_seq,
+    get_messages_after,
+    get_unread_messages,
+)
+from ..db.actions.task_notes_db import (
+    append_task_note,
+    get_recent_task_notes,
+    get_recent_notes_for_tasks,
+)
 
 from ..features.dashboard.api import (
     fetch_graph_data_logic,
@@ -107,7 +119,9 @@ async def node_details_api_route(request: Request) -> JSONResponse:
         elif node_type_from_id == 'task':
             cursor.execute("SELECT * FROM tasks WHERE task_id = ?", (actual_id_from_node,))
             row = cursor.fetchone();
-            if row: details['data'] = dict(row)
+            if row:
+                details['data'] = dict(row)
+                details['data']['notes'] = json.dumps(get_recent_task_notes(cursor, actual_id_from_node, TASK_NOTES_RECENT_LIMIT))
             cursor.execute("SELECT timestamp, agent_id, action_type, details FROM agent_actions WHERE task_id = ? ORDER BY timestamp DESC LIMIT 10", (actual_id_from_node,))
             details['actions'] = [dict(r) for r in cursor.fetchall()]
         elif node_type_from_id == 'context':
@@ -166,6 +180,12 @@ async def tokens_api_route(request: Request) -> JSONResponse:
         logger.error(f"Error retrieving tokens for dashboard: {e}", exc_info=True)
         return JSONResponse({"error": f"Error retrieving tokens: {str(e)}"}, status_code=500)
 
+def _attach_recent_notes_json(cursor: sqlite3.Cursor, tasks_data: List[Dict[str, Any]]) -> None:
+    # The dashboard reads 'notes' as the JSON string the tasks column used to hold
+    recent_notes = get_recent_notes_for_tasks(cursor, None, TASK_NOTES_RECENT_LIMIT)
+    for task in tasks_data:
+        task['notes'] = json.dumps(recent_notes.get(task['task_id'], []))
+
 async def all_tasks_api_route(request: Request) -> JSONResponse:
     # // ... (implementation from previous response)
     conn = None
@@ -174,6 +194,7 @@ async def all_tasks_api_route(request: Request) -> JSONResponse:
         cursor = conn.cursor()
         cursor.execute("SELECT * FROM tasks ORDER BY created_at DESC")
         tasks_data = [dict(row) for row in cursor.fetchall()]
+        _attach_recent_notes_json(cursor, tasks_data)
         return JSONResponse(tasks_data)
     except Exception as e:
         logger.error(f"Error fetching all tasks: {e}", exc_info=True)
@@ -181,6 +202,96 @@ async def all_tasks_api_route(request: Request) -> JSONResponse:
     finally:
         if conn: conn.close()
 
+async def task_health_api_route(request: Request) -> JSONResponse:
+    # Current health comes from the in-memory aggregates; history from task_health_history
+    agent_id = request.query_params.get('agent_id')
+    since = request.query_params.get('since')
+    conn = None
+    try:
+        limit = int(request.query_params.get('limit', '168'))
+        conn = get_db_connection()
+        history = get_task_health_history(conn.cursor(), since=since, limit=limit)
+        return JSONResponse({
+            "current": g.task_health.snapshot(agent_id),
+            "history": history,
+        })
+    except ValueError:
+        return JSONResponse({"error": "limit must be an integer"}, status_code=400)
+    except Exception as e:
+        logger.error(f"Error fetching task health: {e}", exc_info=True)
+        return JSONResponse({"error": f"Failed to fetch task health: {str(e)}"}, status_code=500)
+    finally:
+        if conn: conn.close()
+
+def _read_inbox(
+    agent_id: str, after_seq: Optional[int], unread_until: Optional[int]
+) -> Tuple[List[Dict[str, Any]], int, Optional[int]]:
+    # Without a cursor, the stream first pages through the unread messages up to
+    # the newest one at connect time (unread_until); after that, everything newer.
+    # Returns the page, the new cursor and unread_until (None once the unread are sent)
+    conn = None
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        if after_seq is None:
+            after_seq, unread_until = 0, get_latest_message_seq(cursor, agent_id)
+        if unread_until is not None:
+            messages = get_unread_messages(
+                cursor, agent_id, 100, up_to_seq=unread_until, after_seq=after_seq
+            )
+            if len(messages) == 100:
+                return messages, messages[-1]["seq"], unread_until
+            return messages, unread_until, None
+        messages = get_messages_after(cursor, agent_id, after_seq, 100)
+        return messages, (messages[-1]["seq"] if messages else after_seq), None
+    finally:
+        if conn: conn.close()
+
+async def agent_message_stream_route(request: Request) -> Response:
+    # SSE stream of the agent's messages, woken by g.message_broker; the table is
+    # the source, so a reconnect with Last-Event-ID (the message seq) misses nothing
+    agent_id = auth_get_agent_id(request.query_params.get('token'))
+    if not agent_id:
+        return JSONResponse({"error": "Unauthorized: Valid token required"}, status_code=401)
+    last_event_id = request.headers.get('last-event-id') or request.query_params.get('after')
+    try:
+        after_seq: Optional[int] = int(last_event_id) if last_event_id else None
+    except ValueError:
+        return JSONResponse({"error": "Last-Event-ID must be a message seq"}, status_code=400)
+
+    async def events():
+        nonlocal after_seq
+        unread_until: Optional[int] = None
+        with g.message_broker.subscribe(agent_id) as wakeup:
+            yield f": inbox stream for {agent_id}\n\n"
+            while not await request.is_disconnected():
+                # Cleared before reading, so a message stored meanwhile still wakes us
+                wakeup.clear()
+                try:
+                    messages, after_seq, unread_until = _read_inbox(agent_id, after_seq, unread_until)
+                except sqlite3.Error as e:
+                    logger.error(f"Error reading messages for {agent_id} stream: {e}", exc_info=True)
+                    yield f"event: error\ndata: {json.dumps({'error': str(e)})}\n\n"
+                    return
+                for msg in messages:
+                    yield f"id: {msg['seq']}\nevent: message\ndata: {json.dumps(msg)}\n\n"
+                if len(messages) == 100:
+                    continue  # More to send before waiting
+                try:
+                    await asyncio.wait_for(wakeup.wait(), MESSAGE_SSE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no',
+            'Access-Control-Allow-Origin': '*',
+        },
+    )
+
 async def update_task_details_api_route(request: Request) -> JSONResponse:
     # // ... (implementation from previous response)
     if request.method != 'POST': return JSONResponse({"error": "Method not allowed"}, status_code=405)
@@ -192,9 +303,8 @@ async def update_task_details_api_route(request: Request) -> JSONResponse:
         if not verify_token(admin_auth_token, required_role='admin'): return JSONResponse({"error": "Invalid admin token"}, status_code=403)
         requesting_admin_id = auth_get_agent_id(admin_auth_token)
         conn = get_db_connection(); cursor = conn.cursor()
-        cursor.execute("SELECT notes FROM tasks WHERE task_id = ?", (task_id_to_update,)); task_row = cursor.fetchone()
+        cursor.execute("SELECT task_id FROM tasks WHERE task_id = ?", (task_id_to_update,)); task_row = cursor.fetchone()
         if not task_row: return JSONResponse({"error": "Task not found"}, status_code=404)
-        existing_notes_str = task_row["notes"]
         update_fields: List[str] = []; params: List[Any] = []; log_details: Dict[str, Any] = {"status_updated_to": new_status}
         update_fields.append("status = ?"); params.append(new_status)
         update_fields.append("updated_at = ?"); params.append(datetime.datetime.now().isoformat())
@@ -202,10 +312,7 @@ async def update_task_details_api_route(request: Request) -> JSONResponse:
         if 'description' in data and data['description'] is not None: update_fields.append("description = ?"); params.append(data['description']); log_details["description_changed"] = True
         if 'priority' in data and data['priority']: update_fields.append("priority = ?"); params.append(data['priority']); log_details["priority_changed"] = True
         if 'notes' in data and data['notes'] and isinstance(data['notes'], str) and data['notes'].strip():
-            try: current_notes_list = json.loads(existing_notes_str or "[]")
-            except json.JSONDecodeError: current_notes_list = []
-            new_note_entry = {"timestamp": datetime.datetime.now().isoformat(), "author": requesting_admin_id, "content": data['notes'].strip()}
-            current_notes_list.append(new_note_entry); update_fields.append("notes = ?"); params.append(json.dumps(current_notes_list)); log_details["notes_added"] = True
+            append_task_note(cursor, task_id_to_update, requesting_admin_id, data['notes'].strip()); log_details["notes_added"] = True
         params.append(task_id_to_update)
         if update_fields:
             placeholders = ', '.join(update_fields)
@@ -215,12 +322,10 @@ async def update_task_details_api_route(request: Request) -> JSONResponse:
         if task_id_to_update in g.tasks:
             cursor.execute("SELECT * FROM tasks WHERE task_id = ?", (task_id_to_update,)); updated_task_for_cache = cursor.fetchone()
             if updated_task_for_cache:
-                g.tasks[task_id_to_update] = dict(updated_task_for_cache)
-                for field_key in ["child_tasks", "depends_on_tasks", "notes"]:
-                    if isinstance(g.tasks[task_id_to_update].get(field_key), str):
-                        try: g.tasks[task_id_to_update][field_key] = json.loads(g.tasks[task_id_to_update][field_key] or "[]")
-                        except json.JSONDecodeError: g.tasks[task_id_to_update][field_key] = []
-            else: del g.tasks[task_id_to_update]
+                updated_task_for_cache = dict(updated_task_for_cache)
+                updated_task_for_cache["notes"] = get_recent_task_notes(cursor, task_id_to_update, TASK_NOTES_RECENT_LIMIT)
+                g.tasks.put(updated_task_for_cache)
+            else: g.tasks.remove(task_id_to_update)
         return JSONResponse({"success": True, "message": "Task updated successfully via dashboard."})
     except ValueError as e_val: return JSONResponse({"error": str(e_val)}, status_code=400)    
     except sqlite3.Error as e_sql:
@@ -376,6 +481,7 @@ async def all_data_api_route(request: Request) -> JSONResponse:
         # Get all tasks
         cursor.execute("SELECT * FROM tasks ORDER BY created_at DESC")
         tasks_data = [dict(row) for row in cursor.fetchall()]
+        _attach_recent_notes_json(cursor, tasks_data)
         
         # Get all context entries
         cursor.execute("SELECT * FROM project_context ORDER BY last_updated DESC")
@@ -475,7 +581,9 @@ routes = [
     Route('/api/tokens', endpoint=tokens_api_route, name="tokens_api", methods=['GET', 'OPTIONS']),
     Route('/api/tasks', endpoint=all_tasks_api_route, name="all_tasks_api", methods=['GET', 'OPTIONS']),
     Route('/api/tasks-all', endpoint=all_tasks_api_route, name="all_tasks_api_legacy", methods=['GET', 'OPTIONS']),
+    Route('/api/tasks/health', endpoint=task_health_api_route, name="task_health_api", methods=['GET', 'OPTIONS']),
     Route('/api/update-task-dashboard', endpoint=update_task_details_api_route, name="update_task_dashboard_api", methods=['POST', 'OPTIONS']),
+    Route('/api/agent-messages/stream', endpoint=agent_message_stream_route, name="agent_message_stream", methods=['GET', 'OPTIONS']),
     
     # Added back for 1-to-1 dashboard compatibility
     Route('/api/create-agent', endpoint=create_agent_dashboard_api_route, name="create_agent_dashboard_api", methods=['POST', 'OPTIONS']),
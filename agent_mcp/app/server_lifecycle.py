@@ -9,14 +9,18 @@ from typing import Optional
 from dotenv import load_dotenv
 
 # Project-specific imports
-from ..core.config import logger, get_project_dir
+from ..core.config import logger, get_project_dir, TMUX_CONTROL_ENABLED
 from ..core import globals as g
 from ..core.auth import generate_token  # For admin token generation
 from ..utils.project_utils import init_agent_directory
 from ..db.schema import init_database as initialize_database_schema
 from ..db.connection import get_db_connection, check_vss_loadability
+from ..db.actions.task_notes_db import load_recent_task_notes
 from ..external.openai_service import initialize_openai_client
 from ..features.rag.indexing import run_rag_indexing_periodically
+from ..features.task_health_history import run_task_health_snapshots_periodically
+from ..features.task_placement.async_validation import resume_pending_validations
+from ..utils.tmux_control import run_tmux_control, tmux_control
 
 from ..features.claude_session_monitor import run_claude_session_monitoring
 from ..utils.signal_utils import register_signal_handlers  # For graceful shutdown
@@ -221,24 +225,15 @@ async def application_startup(
             active_agents_count += 1
         logger.info(f"Loaded {active_agents_count} active agents from database.")
 
-        # Load All Tasks into g.tasks
-        task_count = 0
+        # Load All Tasks into g.tasks (the store parses JSON fields; g.task_graph follows it).
+        # Notes are not loaded here; a task's recent notes are read from task_notes on first use.
+        g.tasks.set_notes_loader(load_recent_task_notes)
         cursor.execute("SELECT * FROM tasks")  # Load all tasks
-        for row_dict in (dict(row) for row in cursor.fetchall()):
-            task_id_val = row_dict["task_id"]
-            # Ensure complex fields are Python lists/dicts in memory
-            for field_key in ["child_tasks", "depends_on_tasks", "notes"]:
-                if isinstance(row_dict.get(field_key), str):
-                    try:
-                        row_dict[field_key] = json.loads(row_dict[field_key] or "[]")
-                    except json.JSONDecodeError:
-                        logger.warning(
-                            f"Failed to parse JSON for field '{field_key}' in task '{task_id_val}'. Defaulting to empty list."
-                        )
-                        row_dict[field_key] = []
-            g.tasks[task_id_val] = row_dict
-            task_count += 1
-        logger.info(f"Loaded {task_count} tasks into memory cache.")
+        g.tasks.load(dict(row) for row in cursor.fetchall())
+        logger.info(
+            f"Loaded {len(g.tasks)} tasks into memory cache "
+            f"({len(g.task_graph.ready)} ready, {len(g.task_graph.blocked)} blocked)."
+        )
 
         # File map (g.file_map) and audit log (g.audit_log) are transient and start empty.
         g.file_map.clear()
@@ -320,6 +315,29 @@ async def start_background_tasks(task_group: anyio.abc.TaskGroup):
         f"Claude Code session monitor started with interval {claude_session_interval}s."
     )
 
+    # Start task health history recorder (snapshots g.task_health into buckets)
+    task_health_interval = int(
+        os.environ.get("MCP_TASK_HEALTH_SNAPSHOT_INTERVAL_SECONDS", "300")
+    )
+    g.task_health_task_scope = await task_group.start(
+        run_task_health_snapshots_periodically, task_health_interval
+    )
+    logger.info(
+        f"Task health history recorder started with interval {task_health_interval}s."
+    )
+
+    # Persistent tmux control connection; session checks become registry lookups
+    if TMUX_CONTROL_ENABLED:
+        g.tmux_control_task_scope = await task_group.start(run_tmux_control)
+        logger.info("tmux control connection task started.")
+
+    # Tasks still waiting for a background placement verdict (e.g. after a restart)
+    resumed_validations = resume_pending_validations()
+    if resumed_validations:
+        logger.info(
+            f"Re-queued placement validation for {resumed_validations} pending_validation tasks."
+        )
+
 
 async def application_shutdown():
     """Handles graceful shutdown of application resources and tasks."""
@@ -334,8 +352,17 @@ async def application_shutdown():
     if g.claude_session_task_scope and not g.claude_session_task_scope.cancel_called:
         logger.info("Attempting to cancel Claude session monitoring task...")
         g.claude_session_task_scope.cancel()
+
+    if g.task_health_task_scope and not g.task_health_task_scope.cancel_called:
+        logger.info("Attempting to cancel task health history task...")
+        g.task_health_task_scope.cancel()
         # Note: Actual waiting for task completion is usually handled by the AnyIO TaskGroup context manager.
 
+    if g.tmux_control_task_scope and not g.tmux_control_task_scope.cancel_called:
+        logger.info("Closing tmux control connection...")
+        await tmux_control.stop()
+        g.tmux_control_task_scope.cancel()
+
     # Stop database write queue
     write_queue = get_write_queue()
     await write_queue.stop()
@@ -0,0 +1 @@
+# Benchmarks for Agent-MCP storage, retrieval and task engines
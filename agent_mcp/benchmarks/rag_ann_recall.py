@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Recall benchmark for the IVF ANN index against exact vec0 KNN.
+
+Samples stored vectors as queries, runs the exact vec0 search and the IVF search
+for a range of nprobe values, and reports recall@k and mean latency so that
+RAG_ANN_NPROBE (and RAG_ANN_NLIST) can be tuned for a given project.
+Query vectors come from the table itself, so each query's own chunk is found
+by both searches; use a large enough k for the numbers to be meaningful.
+
+Usage:
+    python -m agent_mcp.benchmarks.rag_ann_recall --project-dir /path/to/project [--build]
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+# Add parent directories to path to import our modules
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+
+def run_benchmark(queries: int, k: int, nprobes: list, build: bool) -> None:
+    from agent_mcp.db.connection import get_db_connection, check_vss_loadability
+    from agent_mcp.features.rag.ann_index import build_ann_index, is_ann_index_ready, ann_search
+    from agent_mcp.features.rag.vectors import exact_nearest_chunks
+
+    if not check_vss_loadability():
+        print("sqlite-vec is not loadable; cannot benchmark vector search.")
+        return
+
+    conn = get_db_connection()
+    try:
+        cursor = conn.cursor()
+        if build or not is_ann_index_ready(cursor):
+            stats = build_ann_index(conn, force=True)
+            if not stats.get("built"):
+                print(f"Not enough vectors to build an index ({stats['vector_count']}).")
+                return
+            print(f"Built index: {stats}")
+
+        cursor.execute(
+            "SELECT rowid, embedding FROM rag_embeddings ORDER BY random() LIMIT ?",
+            (queries,),
+        )
+        query_vectors = [row[1] for row in cursor.fetchall()]
+        print(f"Running {len(query_vectors)} queries, k={k}")
+
+        exact_results = []
+        started = time.perf_counter()
+        for vector in query_vectors:
+            exact_results.append({cid for cid, _ in exact_nearest_chunks(cursor, vector, k)})
+        exact_ms = (time.perf_counter() - started) * 1000 / max(len(query_vectors), 1)
+        print(f"{'search':<14}{'recall@' + str(k):>12}{'ms/query':>12}")
+        print(f"{'exact vec0':<14}{1.0:>12.3f}{exact_ms:>12.2f}")
+
+        for nprobe in nprobes:
+            hits = 0
+            started = time.perf_counter()
+            for vector, expected in zip(query_vectors, exact_results):
+                found = {cid for cid, _ in ann_search(cursor, vector, k, nprobe=nprobe)}
+                hits += len(found & expected)
+            ann_ms = (time.perf_counter() - started) * 1000 / max(len(query_vectors), 1)
+            recall = hits / max(sum(len(e) for e in exact_results), 1)
+            print(f"{'ivf nprobe=' + str(nprobe):<14}{recall:>12.3f}{ann_ms:>12.2f}")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="IVF ANN recall benchmark")
+    parser.add_argument("--project-dir", default=".", help="Project containing .agent/mcp_state.db")
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--k", type=int, default=13)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument("--build", action="store_true", help="Rebuild the index before measuring")
+    args = parser.parse_args()
+
+    os.environ["MCP_PROJECT_DIR"] = str(Path(args.project_dir).resolve())
+    print("Agent-MCP IVF ANN Recall Benchmark")
+    print("==================================")
+    run_benchmark(args.queries, args.k, args.nprobe, args.build)
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Size / latency / recall benchmark for quantized embedding tiers.
+
+Builds temporary int8 and binary copies of rag_embeddings, then compares them
+against the float32 vec0 table created by db/schema.py:
+- on-disk size of each table (via dbstat when available) and bytes per vector
+- mean query latency (first pass + exact rescoring for the quantized tiers)
+- recall@k against exact float32 KNN
+
+Query vectors are sampled from the table itself. The temporary tables are
+dropped when the benchmark finishes.
+
+Usage:
+    python -m agent_mcp.benchmarks.rag_quantization --project-dir /path/to/project
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+# Add parent directories to path to import our modules
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+_VEC0_SHADOW_PREFIXES = ("chunks", "rowids", "info", "vector_chunks", "auxiliary", "metadata")
+
+
+def _table_size_bytes(cursor, table: str):
+    """Total page size of a vec0 table and its shadow tables, or None without dbstat."""
+    cursor.execute("SELECT name FROM sqlite_master WHERE name GLOB ?", (f"{table}_*",))
+    names = [
+        row[0]
+        for row in cursor.fetchall()
+        if row[0][len(table) + 1 :].startswith(_VEC0_SHADOW_PREFIXES)
+    ]
+    if not names:
+        return None
+    try:
+        placeholders = ",".join("?" * len(names))
+        cursor.execute(f"SELECT SUM(pgsize) FROM dbstat WHERE name IN ({placeholders})", names)
+        return cursor.fetchone()[0]
+    except Exception:
+        return None
+
+
+def run_benchmark(queries: int, k: int, oversample: int) -> None:
+    from agent_mcp.core.config import EMBEDDING_DIMENSION
+    from agent_mcp.db.connection import get_db_connection, check_vss_loadability
+    from agent_mcp.features.rag.quantization import (
+        create_quantized_table,
+        backfill_quantized_table,
+        quantized_search,
+    )
+    from agent_mcp.features.rag.vectors import exact_nearest_chunks
+
+    if not check_vss_loadability():
+        print("sqlite-vec is not loadable; cannot benchmark vector search.")
+        return
+
+    conn = get_db_connection()
+    bench_tables = {"int8": "rag_bench_quantized_int8", "binary": "rag_bench_quantized_binary"}
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT COUNT(*) FROM rag_embeddings")
+        vector_count = cursor.fetchone()[0]
+        if not vector_count:
+            print("rag_embeddings is empty; index some content first.")
+            return
+        print(f"{vector_count} vectors, {EMBEDDING_DIMENSION} dimensions")
+
+        for mode, table in bench_tables.items():
+            started = time.perf_counter()
+            create_quantized_table(cursor, mode, table=table)
+            conn.commit()
+            backfill_quantized_table(conn, mode, table=table)
+            print(f"Built {mode} copy in {time.perf_counter() - started:.1f}s")
+
+        cursor.execute(
+            "SELECT embedding FROM rag_embeddings ORDER BY random() LIMIT ?", (queries,)
+        )
+        query_vectors = [row[0] for row in cursor.fetchall()]
+
+        exact_results = []
+        started = time.perf_counter()
+        for vector in query_vectors:
+            exact_results.append({cid for cid, _ in exact_nearest_chunks(cursor, vector, k)})
+        exact_ms = (time.perf_counter() - started) * 1000 / len(query_vectors)
+
+        rows = [
+            (
+                "float32 (exact)",
+                _table_size_bytes(cursor, "rag_embeddings"),
+                EMBEDDING_DIMENSION * 4,
+                exact_ms,
+                1.0,
+            )
+        ]
+        for mode, table in bench_tables.items():
+            hits = 0
+            started = time.perf_counter()
+            for vector, expected in zip(query_vectors, exact_results):
+                found = quantized_search(
+                    cursor, vector, k, mode=mode, table=table, oversample=oversample
+                )
+                hits += len({cid for cid, _ in found} & expected)
+            latency_ms = (time.perf_counter() - started) * 1000 / len(query_vectors)
+            recall = hits / max(sum(len(e) for e in exact_results), 1)
+            bytes_per_vector = EMBEDDING_DIMENSION if mode == "int8" else EMBEDDING_DIMENSION // 8
+            rows.append(
+                (f"{mode} + rescore", _table_size_bytes(cursor, table), bytes_per_vector, latency_ms, recall)
+            )
+
+        print(f"\n{len(query_vectors)} queries, k={k}, oversample={oversample}")
+        print(f"{'tier':<18}{'table MB':>10}{'B/vector':>10}{'ms/query':>10}{'recall@' + str(k):>11}")
+        for name, size, per_vector, latency_ms, recall in rows:
+            size_text = f"{size / 1_048_576:.1f}" if size is not None else "n/a"
+            print(f"{name:<18}{size_text:>10}{per_vector:>10}{latency_ms:>10.2f}{recall:>11.3f}")
+    finally:
+        for table in bench_tables.values():
+            conn.execute(f"DROP TABLE IF EXISTS {table}")
+        conn.commit()
+        conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Quantized embedding tier benchmark")
+    parser.add_argument("--project-dir", default=".", help="Project containing .agent/mcp_state.db")
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--k", type=int, default=13)
+    parser.add_argument("--oversample", type=int, default=4)
+    args = parser.parse_args()
+
+    os.environ["MCP_PROJECT_DIR"] = str(Path(args.project_dir).resolve())
+    print("Agent-MCP Quantized Embedding Benchmark")
+    print("=======================================")
+    run_benchmark(args.queries, args.k, args.oversample)
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Memory benchmark for the in-memory task cache (g.tasks).
+
+Builds `--tasks` synthetic task rows in an in-memory SQLite table (so every
+string comes back from the database as its own object, as it does at server
+startup) and loads them into two representations:
+
+- dict:   one dict per task with parsed child/dependency lists and the recent
+          notes, the previous g.tasks layout
+- record: a TaskStore of slotted TaskRecords with interned status/priority/agent
+          strings and tuple list fields; notes are loaded lazily, so the second
+          measurement reads every task's notes to show the fully loaded cost
+
+For each it reports the memory allocated (tracemalloc) and the time to take a
+consistent copy of the whole cache (dict(...) vs TaskStore.snapshot()).
+
+Usage:
+    python -m agent_mcp.benchmarks.task_cache_memory [--tasks 20000 --notes 5]
+"""
+
+import argparse
+import datetime
+import gc
+import json
+import random
+import sqlite3
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+# Add parent directories to path to import our modules
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+STATUSES = ["pending", "in_progress", "completed", "cancelled", "failed"]
+PRIORITIES = ["low", "medium", "high"]
+
+
+def _build_rows(task_count: int, notes_per_task: int):
+    rng = random.Random(42)
+    now = datetime.datetime.now().isoformat()
+    conn = sqlite3.connect(":memory:")
+    conn.row_factory = sqlite3.Row
+    conn.execute(
+        """
+        CREATE TABLE tasks (task_id TEXT, title TEXT, description TEXT, assigned_to TEXT,
+                            created_by TEXT, status TEXT, priority TEXT, created_at TEXT,
+                            updated_at TEXT, parent_task TEXT, child_tasks TEXT,
+                            depends_on_tasks TEXT, notes TEXT)
+    """
+    )
+    rows = []
+    for i in range(task_count):
+        deps = [f"task_{rng.randrange(task_count):06d}" for _ in range(rng.randrange(3))]
+        rows.append(
+            (
+                f"task_{i:06d}",
+                f"Benchmark task {i}",
+                "Synthetic task description used to size the in-memory task cache. " * 2,
+                f"agent_{rng.randrange(20)}",
+                "admin",
+                rng.choice(STATUSES),
+                rng.choice(PRIORITIES),
+                now,
+                now,
+                f"task_{i // 10:06d}" if i >= 10 else None,
+                json.dumps([f"task_{i * 10 + c:06d}" for c in range(3)] if i < task_count // 10 else []),
+                json.dumps(deps),
+                "[]",
+            )
+        )
+    conn.executemany("INSERT INTO tasks VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+    task_rows = [dict(row) for row in conn.execute("SELECT * FROM tasks")]
+    conn.close()
+
+    def notes_for(task_id: str):
+        return [
+            {"timestamp": now, "author": "agent_1", "content": f"Progress note {n} on {task_id}"}
+            for n in range(notes_per_task)
+        ]
+
+    return task_rows, notes_for
+
+
+def _measure(build):
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    cache = build()
+    elapsed = time.perf_counter() - started
+    current, _peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return cache, current, elapsed
+
+
+def run_benchmark(task_count: int, notes_per_task: int, copies: int) -> None:
+    from agent_mcp.core.task_store import TaskStore
+
+    task_rows, notes_for = _build_rows(task_count, notes_per_task)
+    print(f"{task_count} tasks, {notes_per_task} recent notes each\n")
+
+    def build_dicts():
+        tasks = {}
+        for row in task_rows:
+            task = dict(row)
+            for field_key in ("child_tasks", "depends_on_tasks"):
+                task[field_key] = json.loads(task[field_key] or "[]")
+            task["notes"] = notes_for(task["task_id"])
+            tasks[task["task_id"]] = task
+        return tasks
+
+    def build_store():
+        store = TaskStore()
+        store.load(dict(row) for row in task_rows)
+        return store
+
+    dict_cache, dict_bytes, dict_seconds = _measure(build_dicts)
+    print(f"  dict:   {dict_bytes / 1e6:8.1f} MB  ({dict_bytes / task_count:6.0f} B/task)  built in {dict_seconds:.2f}s")
+
+    store, store_bytes, store_seconds = _measure(build_store)
+    print(f"  record: {store_bytes / 1e6:8.1f} MB  ({store_bytes / task_count:6.0f} B/task)  built in {store_seconds:.2f}s (notes not loaded)")
+
+    store.set_notes_loader(notes_for)
+    gc.collect()
+    tracemalloc.start()
+    for record in store.values():
+        record.notes
+    notes_bytes, _peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    store.set_notes_loader(None)
+    loaded_bytes = store_bytes + notes_bytes
+    print(f"  record: {loaded_bytes / 1e6:8.1f} MB  ({loaded_bytes / task_count:6.0f} B/task)  with every task's notes loaded")
+
+    started = time.perf_counter()
+    for _ in range(copies):
+        dict(dict_cache)
+    dict_copy_ms = (time.perf_counter() - started) / copies * 1000
+    started = time.perf_counter()
+    for _ in range(copies):
+        store.snapshot()
+    snapshot_ms = (time.perf_counter() - started) / copies * 1000
+    print(
+        f"\n  full-cache copy: dict(...) {dict_copy_ms:.3f} ms, "
+        f"TaskStore.snapshot() {snapshot_ms:.4f} ms (rebuilt only after a write)"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="In-memory task cache memory benchmark")
+    parser.add_argument("--tasks", type=int, default=20000)
+    parser.add_argument("--notes", type=int, default=5, help="Recent notes held per task")
+    parser.add_argument("--copies", type=int, default=20, help="Full-cache copies timed")
+    args = parser.parse_args()
+
+    run_benchmark(args.tasks, args.notes, args.copies)
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the task-analysis context of query_rag_system_with_model.
+
+Builds a synthetic task tree and project_context table in an in-memory SQLite
+database (with the indexes from db/schema.py) for each `--sizes` task count and
+times building the prompt context two ways:
+
+- full:     every project_context row plus every pending/in_progress task, the
+            previous behaviour
+- selected: select_task_context() (focus task hierarchy, similar tasks, recent
+            tasks and keys) rendered with render_task_context() within
+            TASK_CONTEXT_TOKEN_BUDGET
+
+The vector search is not part of this benchmark; the "similar" task IDs are
+drawn at random, as a vec0 KNN would return a fixed number of them.
+
+Usage:
+    python -m agent_mcp.benchmarks.task_context_selection [--sizes 1000,10000,50000]
+"""
+
+import argparse
+import datetime
+import json
+import random
+import sqlite3
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add parent directories to path to import our modules
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+STATUSES = ["pending", "in_progress", "completed", "cancelled"]
+
+
+def _build_database(task_count: int) -> sqlite3.Connection:
+    rng = random.Random(7)
+    conn = sqlite3.connect(":memory:")
+    conn.row_factory = sqlite3.Row
+    conn.executescript(
+        """
+        CREATE TABLE tasks (task_id TEXT PRIMARY KEY, title TEXT, description TEXT,
+                            assigned_to TEXT, created_by TEXT, status TEXT, priority TEXT,
+                            created_at TEXT, updated_at TEXT, parent_task TEXT,
+                            child_tasks TEXT, depends_on_tasks TEXT, notes TEXT);
+        CREATE INDEX idx_tasks_parent_task ON tasks (parent_task);
+        CREATE INDEX idx_tasks_status_updated ON tasks (status, updated_at);
+        CREATE INDEX idx_tasks_created_at ON tasks (created_at, task_id);
+        CREATE TABLE project_context (context_key TEXT PRIMARY KEY, value TEXT NOT NULL,
+                                      last_updated TEXT NOT NULL, updated_by TEXT NOT NULL,
+                                      description TEXT);
+        CREATE INDEX idx_project_context_last_updated ON project_context (last_updated);
+    """
+    )
+    start = datetime.datetime(2025, 1, 1)
+    rows = []
+    for i in range(task_count):
+        # Each task hangs under one of the earlier ones, so the tree gets deep and wide
+        parent = f"task_{rng.randrange(i):06d}" if i else None
+        stamp = (start + datetime.timedelta(minutes=i)).isoformat()
+        rows.append(
+            (
+                f"task_{i:06d}",
+                f"Benchmark task {i}",
+                "Synthetic task description for the context selection benchmark. " * 3,
+                f"agent_{rng.randrange(20)}",
+                "admin",
+                rng.choice(STATUSES),
+                "medium",
+                stamp,
+                stamp,
+                parent,
+                "[]",
+                json.dumps([f"task_{rng.randrange(i):06d}"] if i else []),
+                "[]",
+            )
+        )
+    conn.executemany("INSERT INTO tasks VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+    conn.executemany(
+        "INSERT INTO project_context VALUES (?, ?, ?, ?, ?)",
+        [
+            (
+                f"context.key_{i}",
+                json.dumps({"setting": i, "notes": "synthetic project context value"}),
+                (start + datetime.timedelta(minutes=i * 7)).isoformat(),
+                "admin",
+                f"Context entry {i}",
+            )
+            for i in range(max(10, task_count // 10))
+        ],
+    )
+    conn.commit()
+    return conn
+
+
+def _full_context(cursor: sqlite3.Cursor) -> int:
+    cursor.execute(
+        "SELECT context_key, value, description, last_updated FROM project_context ORDER BY last_updated DESC"
+    )
+    parts = [
+        f"Key: {row['context_key']}\nDescription: {row['description']}\nValue: {row['value']}\n"
+        for row in cursor.fetchall()
+    ]
+    cursor.execute(
+        """
+        SELECT task_id, title, description, status, created_by, assigned_to,
+               priority, parent_task, depends_on_tasks, created_at, updated_at
+        FROM tasks WHERE status IN ('pending', 'in_progress') ORDER BY updated_at DESC
+    """
+    )
+    parts.extend(
+        f"Task ID: {row['task_id']}\nTitle: {row['title']}\nDescription: {row['description']}\n"
+        f"Status: {row['status']}\nParent Task: {row['parent_task']}\nDependencies: {row['depends_on_tasks']}\n"
+        for row in cursor.fetchall()
+    )
+    return len("\n\n".join(parts).split())
+
+
+def run_benchmark(sizes, repeats: int) -> None:
+    from agent_mcp.core.config import TASK_CONTEXT_TOKEN_BUDGET, TASK_CONTEXT_SIMILAR_TASKS
+    from agent_mcp.features.rag.context_selection import (
+        render_task_context,
+        select_task_context,
+    )
+
+    print(f"Token budget {TASK_CONTEXT_TOKEN_BUDGET}, {repeats} runs per size (median)\n")
+    print(f"{'tasks':>8} | {'full ms':>9} {'full words':>11} | {'selected ms':>11} {'selected words':>14}")
+    for task_count in sizes:
+        conn = _build_database(task_count)
+        cursor = conn.cursor()
+        rng = random.Random(task_count)
+
+        full_times, selected_times = [], []
+        full_words = selected_words = 0
+        for _ in range(repeats):
+            started = time.perf_counter()
+            full_words = _full_context(cursor)
+            full_times.append(time.perf_counter() - started)
+
+            focus = [f"task_{rng.randrange(task_count):06d}"]
+            similar = [
+                f"task_{rng.randrange(task_count):06d}" for _ in range(TASK_CONTEXT_SIMILAR_TASKS)
+            ]
+            started = time.perf_counter()
+            tasks, context_entries = select_task_context(cursor, focus, similar)
+            parts, selected_words = render_task_context(
+                tasks, context_entries, TASK_CONTEXT_TOKEN_BUDGET
+            )
+            selected_times.append(time.perf_counter() - started)
+
+        print(
+            f"{task_count:>8} | {statistics.median(full_times) * 1000:>9.2f} {full_words:>11} | "
+            f"{statistics.median(selected_times) * 1000:>11.2f} {selected_words:>14}"
+        )
+        conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Task-analysis context selection benchmark")
+    parser.add_argument("--sizes", default="1000,10000,50000", help="Comma-separated task counts")
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    run_benchmark([int(size) for size in args.sizes.split(",")], args.repeats)
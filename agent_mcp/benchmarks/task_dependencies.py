@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Dependency auto-advance benchmark.
+
+Builds a synthetic project of `--chains` x `--depth` tasks (10k by default).
+Every task depends on the previous task of its own chain and of the next chain,
+giving long chains with some fan-in. The benchmark then completes the tasks
+level by level. After each level, pending dependents whose dependencies are
+now all completed are moved to in_progress, as update_task_status does with
+auto_update_dependencies. Three strategies are compared:
+
+- legacy: scan every task row, json.loads its dependencies, and query each
+          dependency's status (the previous implementation)
+- edges:  reverse lookup on the task_edges table per completed task, one UPDATE
+          per advanced task
+- graph:  TaskGraph counters plus one batched UPDATE per level (current)
+
+Each strategy runs inside a transaction that is rolled back, so all of them
+start from the same state. The legacy strategy is quadratic, so it only runs
+for the first `--legacy-steps` levels.
+
+Usage:
+    python -m agent_mcp.benchmarks.task_dependencies [--chains 100 --depth 100]
+"""
+
+import argparse
+import datetime
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add parent directories to path to import our modules
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+NOTE_TEXT = "Auto-advanced: all dependencies completed"
+
+
+def _task_id(chain: int, level: int) -> str:
+    return f"bench_{chain:04d}_{level:04d}"
+
+
+def _populate(conn, chains: int, depth: int) -> None:
+    now = datetime.datetime.now().isoformat()
+    rows = []
+    for chain in range(chains):
+        for level in range(depth):
+            deps = []
+            if level > 0:
+                deps = [_task_id(chain, level - 1), _task_id((chain + 1) % chains, level - 1)]
+            rows.append(
+                (
+                    _task_id(chain, level),
+                    f"Benchmark task {chain}/{level}",
+                    "admin",
+                    "in_progress" if level == 0 else "pending",
+                    "medium",
+                    now,
+                    now,
+                    json.dumps([]),
+                    json.dumps(list(dict.fromkeys(deps))),
+                    json.dumps([]),
+                )
+            )
+    conn.execute("DELETE FROM tasks WHERE task_id LIKE 'bench_%'")
+    conn.executemany(
+        """
+        INSERT INTO tasks (task_id, title, created_by, status, priority, created_at, updated_at,
+                           child_tasks, depends_on_tasks, notes)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """,
+        rows,
+    )
+    conn.commit()
+
+
+def _complete_level(cursor, chains: int, level: int):
+    ids = [_task_id(chain, level) for chain in range(chains)]
+    cursor.execute(
+        "UPDATE tasks SET status = 'completed' WHERE task_id IN (SELECT value FROM json_each(?))",
+        (json.dumps(ids),),
+    )
+    return ids
+
+
+def _advance_legacy(cursor, completed_ids):
+    advanced = 0
+    now = datetime.datetime.now().isoformat()
+    for completed_id in completed_ids:
+        cursor.execute("SELECT task_id, depends_on_tasks FROM tasks")
+        for task_row in cursor.fetchall():
+            task_deps = json.loads(task_row[1] or "[]")
+            if completed_id not in task_deps:
+                continue
+            all_deps_completed = True
+            for dep_id in task_deps:
+                if dep_id != completed_id:
+                    cursor.execute("SELECT status FROM tasks WHERE task_id = ?", (dep_id,))
+                    dep_row = cursor.fetchone()
+                    if not dep_row or dep_row[0] != "completed":
+                        all_deps_completed = False
+                        break
+            if all_deps_completed:
+                cursor.execute("SELECT status FROM tasks WHERE task_id = ?", (task_row[0],))
+                if cursor.fetchone()[0] == "pending":
+                    cursor.execute(
+                        "UPDATE tasks SET status = 'in_progress', updated_at = ? WHERE task_id = ?",
+                        (now, task_row[0]),
+                    )
+                    advanced += 1
+    return advanced
+
+
+def _advance_edges(cursor, completed_ids):
+    from agent_mcp.db.actions.task_edges_db import get_unblocked_dependent_task_ids
+
+    advanced = 0
+    now = datetime.datetime.now().isoformat()
+    for completed_id in completed_ids:
+        for dependent_id in get_unblocked_dependent_task_ids(cursor, completed_id):
+            cursor.execute(
+                "UPDATE tasks SET status = 'in_progress', updated_at = ? WHERE task_id = ?",
+                (now, dependent_id),
+            )
+            advanced += 1
+    return advanced
+
+
+def _advance_graph(cursor, graph, tasks, completed_ids):
+    from agent_mcp.db.actions.task_db import advance_tasks_status
+
+    for completed_id in completed_ids:
+        tasks[completed_id]["status"] = "completed"
+        graph.sync_task(completed_id, tasks[completed_id])
+    candidates = {
+        dependent_id
+        for completed_id in completed_ids
+        for dependent_id in graph.get_dependents(completed_id)
+        if graph.is_ready(dependent_id)
+    }
+    note = {
+        "timestamp": datetime.datetime.now().isoformat(),
+        "author": "benchmark",
+        "content": NOTE_TEXT,
+    }
+    advanced_ids = advance_tasks_status(cursor, sorted(candidates), "pending", "in_progress", note)
+    for task_id in advanced_ids:
+        tasks[task_id]["status"] = "in_progress"
+        graph.sync_task(task_id, tasks[task_id])
+    return len(advanced_ids)
+
+
+def run_benchmark(chains: int, depth: int, legacy_steps: int) -> None:
+    from agent_mcp.core.task_graph import TaskGraph
+    from agent_mcp.db.connection import get_db_connection
+    from agent_mcp.db.schema import init_database
+
+    init_database()
+    conn = get_db_connection()
+    try:
+        started = time.perf_counter()
+        _populate(conn, chains, depth)
+        print(
+            f"Inserted {chains * depth} tasks ({chains} chains x {depth} levels) "
+            f"in {time.perf_counter() - started:.2f}s"
+        )
+        cursor = conn.cursor()
+        steps = depth - 1
+
+        for strategy in ("legacy", "edges", "graph"):
+            strategy_steps = min(steps, legacy_steps) if strategy == "legacy" else steps
+            graph, tasks = None, None
+            setup_seconds = 0.0
+            if strategy == "graph":
+                started = time.perf_counter()
+                cursor.execute(
+                    "SELECT task_id, status, depends_on_tasks FROM tasks WHERE task_id LIKE 'bench_%'"
+                )
+                tasks = {
+                    row[0]: {"status": row[1], "depends_on_tasks": row[2]}
+                    for row in cursor.fetchall()
+                }
+                graph = TaskGraph()
+                graph.rebuild(tasks)
+                setup_seconds = time.perf_counter() - started
+
+            total_advanced = 0
+            started = time.perf_counter()
+            for level in range(strategy_steps):
+                completed_ids = _complete_level(cursor, chains, level)
+                if strategy == "legacy":
+                    total_advanced += _advance_legacy(cursor, completed_ids)
+                elif strategy == "edges":
+                    total_advanced += _advance_edges(cursor, completed_ids)
+                else:
+                    total_advanced += _advance_graph(cursor, graph, tasks, completed_ids)
+            elapsed = time.perf_counter() - started
+            conn.rollback()
+
+            per_step_ms = elapsed / max(strategy_steps, 1) * 1000
+            line = (
+                f"{strategy:>6}: {strategy_steps} levels, {total_advanced} tasks advanced, "
+                f"{per_step_ms:.2f} ms per level"
+            )
+            if strategy == "graph":
+                line += f" (+{setup_seconds * 1000:.0f} ms one-off graph build)"
+            print(line)
+    finally:
+        conn.execute("DELETE FROM tasks WHERE task_id LIKE 'bench_%'")
+        conn.commit()
+        conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Task dependency auto-advance benchmark")
+    parser.add_argument(
+        "--project-dir",
+        default=None,
+        help="Project whose .agent/mcp_state.db is used (default: a temporary directory)",
+    )
+    parser.add_argument("--chains", type=int, default=100)
+    parser.add_argument("--depth", type=int, default=100)
+    parser.add_argument("--legacy-steps", type=int, default=3)
+    args = parser.parse_args()
+
+    os.environ["MCP_PROJECT_DIR"] = os.path.abspath(args.project_dir or tempfile.mkdtemp(prefix="agent_mcp_bench_"))
+    run_benchmark(args.chains, args.depth, args.legacy_steps)
@@ -253,6 +253,133 @@ ALLOW_RAG_OVERRIDE: bool = os.getenv("ALLOW_RAG_OVERRIDE", "true").lower() == "t
 TASK_PLACEMENT_RAG_TIMEOUT: int = int(
     os.getenv("TASK_PLACEMENT_RAG_TIMEOUT", "5")
 )  # seconds
+# Local pre-check: hierarchy rules plus nearest indexed tasks by embedding.
+# Placements whose closest task scores below TASK_PRECHECK_APPROVE_BELOW are
+# approved locally, at or above TASK_DUPLICATION_THRESHOLD flagged as duplicates;
+# only scores in between are escalated to the LLM validator.
+TASK_PRECHECK_ENABLED: bool = (
+    os.getenv("TASK_PRECHECK_ENABLED", "true").lower() == "true"
+)
+TASK_PRECHECK_APPROVE_BELOW: float = float(
+    os.getenv("TASK_PRECHECK_APPROVE_BELOW", "0.55")
+)
+TASK_PRECHECK_CANDIDATES: int = int(os.getenv("TASK_PRECHECK_CANDIDATES", "5"))
+# Background validation: tasks are created as 'pending_validation' and the
+# verdict arrives as a task note (features/task_placement/async_validation.py).
+TASK_PLACEMENT_ASYNC: bool = os.getenv("TASK_PLACEMENT_ASYNC", "false").lower() == "true"
+TASK_PLACEMENT_WORKERS: int = int(os.getenv("TASK_PLACEMENT_WORKERS", "2"))
+TASK_PLACEMENT_CACHE_SIZE: int = int(os.getenv("TASK_PLACEMENT_CACHE_SIZE", "256"))
+
+# Context for the task-analysis LLM (features/rag/context_selection.py): a
+# bounded selection of related, similar and recent tasks and context keys.
+TASK_CONTEXT_TOKEN_BUDGET: int = int(os.getenv("TASK_CONTEXT_TOKEN_BUDGET", "16000"))
+TASK_CONTEXT_SIMILAR_TASKS: int = int(os.getenv("TASK_CONTEXT_SIMILAR_TASKS", "10"))
+TASK_CONTEXT_RECENT_TASKS: int = int(os.getenv("TASK_CONTEXT_RECENT_TASKS", "20"))
+TASK_CONTEXT_RECENT_KEYS: int = int(os.getenv("TASK_CONTEXT_RECENT_KEYS", "20"))
+TASK_CONTEXT_ANCESTOR_DEPTH: int = int(os.getenv("TASK_CONTEXT_ANCESTOR_DEPTH", "10"))
+TASK_CONTEXT_SUBTREE_DEPTH: int = int(os.getenv("TASK_CONTEXT_SUBTREE_DEPTH", "2"))
+TASK_CONTEXT_SUBTREE_LIMIT: int = int(os.getenv("TASK_CONTEXT_SUBTREE_LIMIT", "40"))
+
+# --- RAG Retrieval Configuration ---
+# Optional re-ranking stage: over-fetch candidates from vec0 and the chunk FTS index,
+# score them locally on the CPU, and only send the best few to the LLM.
+RAG_RERANK_ENABLED: bool = os.getenv("RAG_RERANK_ENABLED", "false").lower() == "true"
+RAG_RERANK_CANDIDATES: int = int(
+    os.getenv("RAG_RERANK_CANDIDATES", "50")
+)  # candidates fetched per source before re-ranking
+RAG_RERANK_TOP_K: int = int(
+    os.getenv("RAG_RERANK_TOP_K", "8")
+)  # chunks kept for the prompt after re-ranking
+
+# Optional IVF (inverted file) approximate nearest neighbor index over rag_embeddings.
+# Exact vec0 KNN is a brute-force scan; the IVF index only scans the closest lists.
+RAG_ANN_ENABLED: bool = os.getenv("RAG_ANN_ENABLED", "false").lower() == "true"
+RAG_ANN_MIN_VECTORS: int = int(
+    os.getenv("RAG_ANN_MIN_VECTORS", "20000")
+)  # below this, exact search is fast enough and no index is built
+RAG_ANN_NLIST: int = int(
+    os.getenv("RAG_ANN_NLIST", "0")
+)  # number of IVF lists; 0 = sqrt(vector count)
+RAG_ANN_NPROBE: int = int(
+    os.getenv("RAG_ANN_NPROBE", "8")
+)  # lists scanned per query (tune with agent_mcp.benchmarks.rag_ann_recall)
+RAG_ANN_TRAINING_ITERATIONS: int = int(
+    os.getenv("RAG_ANN_TRAINING_ITERATIONS", "2")
+)  # k-means refinement passes over the training sample
+RAG_ANN_REBUILD_GROWTH: float = float(
+    os.getenv("RAG_ANN_REBUILD_GROWTH", "2.0")
+)  # retrain centroids once the table has grown (or shrunk) by this factor
+
+# Optional quantized first-pass tier: "none", "int8" or "binary". Full float32
+# vectors are kept in rag_embeddings for exact rescoring of the candidates.
+RAG_QUANTIZATION: str = os.getenv("RAG_QUANTIZATION", "none").lower()
+RAG_QUANTIZATION_OVERSAMPLE: int = int(
+    os.getenv("RAG_QUANTIZATION_OVERSAMPLE", "4")
+)  # first-pass candidates = k * oversample
+
+# Optional Matryoshka prefix tier: the first N dimensions of each embedding,
+# re-normalized, searched first; the full vectors rerank the candidates.
+# 0 disables the tier. Must be smaller than EMBEDDING_DIMENSION.
+RAG_MATRYOSHKA_DIMENSION: int = int(os.getenv("RAG_MATRYOSHKA_DIMENSION", "0"))
+RAG_MATRYOSHKA_OVERSAMPLE: int = int(
+    os.getenv("RAG_MATRYOSHKA_OVERSAMPLE", "4")
+)  # first-pass candidates = k * oversample
+
+# --- Task Notes Configuration ---
+# Notes are stored one row per note in the task_notes table. Only the most recent
+# ones are kept in g.tasks and shown by task views; older notes stay in the DB.
+TASK_NOTES_RECENT_LIMIT: int = int(os.getenv("TASK_NOTES_RECENT_LIMIT", "5"))
+
+# --- Task Health Configuration ---
+# Health aggregates are kept up to date by core/task_health.py on every task
+# change; a snapshot is written to task_health_history once per bucket.
+TASK_HEALTH_STALE_DAYS: int = int(os.getenv("TASK_HEALTH_STALE_DAYS", "7"))
+TASK_HEALTH_BUCKET_SECONDS: int = int(os.getenv("TASK_HEALTH_BUCKET_SECONDS", "3600"))
+TASK_HEALTH_HISTORY_RETENTION_DAYS: int = int(
+    os.getenv("TASK_HEALTH_HISTORY_RETENTION_DAYS", "90")
+)
+
+# --- tmux Control Mode Configuration ---
+# One long-lived `tmux -C` client (utils/tmux_control.py) keeps a registry of
+# sessions from tmux's change notifications, so session checks need no fork.
+# It attaches to a session of its own, TMUX_CONTROL_SESSION.
+TMUX_CONTROL_ENABLED: bool = os.getenv("TMUX_CONTROL_ENABLED", "true").lower() == "true"
+TMUX_CONTROL_SESSION: str = os.getenv("TMUX_CONTROL_SESSION", "mcp-control")
+TMUX_CONTROL_RECONNECT_SECONDS: float = float(
+    os.getenv("TMUX_CONTROL_RECONNECT_SECONDS", "5")
+)
+
+# --- Agent Launch Configuration ---
+# Agent launches (utils/agent_launch.py) advance on what the tmux pane shows
+# instead of fixed sleeps: each setup command is followed by a completion marker,
+# and the prompt is sent once Claude's input box (AGENT_READY_PATTERN) appears.
+# An empty AGENT_READY_PATTERN falls back to the caller's fixed prompt delay.
+TMUX_PANE_POLL_INTERVAL: float = float(os.getenv("TMUX_PANE_POLL_INTERVAL", "0.2"))
+AGENT_LAUNCH_STEP_TIMEOUT: float = float(os.getenv("AGENT_LAUNCH_STEP_TIMEOUT", "30"))
+AGENT_READY_PATTERN: str = os.getenv(
+    "AGENT_READY_PATTERN", r"\? for shortcuts|bypass permissions on"
+)
+AGENT_READY_TIMEOUT: float = float(os.getenv("AGENT_READY_TIMEOUT", "60"))
+# Shown by Claude when an Escape stopped it; ends the stop-command Escape loop early
+AGENT_INTERRUPTED_PATTERN: str = os.getenv(
+    "AGENT_INTERRUPTED_PATTERN", r"Interrupted by user"
+)
+
+# --- Prompt Delivery Configuration ---
+# Prompts typed into agent sessions go through one bounded executor
+# (utils/tmux_delivery.py): up to TMUX_DELIVERY_WORKERS sessions are written to
+# at once, each session's prompts in order. A session with more than
+# TMUX_DELIVERY_MAX_BACKLOG undelivered prompts rejects new ones.
+TMUX_DELIVERY_WORKERS: int = int(os.getenv("TMUX_DELIVERY_WORKERS", "8"))
+TMUX_DELIVERY_MAX_BACKLOG: int = int(os.getenv("TMUX_DELIVERY_MAX_BACKLOG", "100"))
+
+# --- Agent Message Inbox Configuration ---
+# Stored agent messages wake the recipient's waiters (core/message_broker.py):
+# the wait_for_messages tool blocks for at most MESSAGE_WAIT_MAX_SECONDS, and
+# the /api/agent-messages/stream SSE connection sends a keepalive comment every
+# MESSAGE_SSE_KEEPALIVE_SECONDS while idle.
+MESSAGE_WAIT_MAX_SECONDS: float = float(os.getenv("MESSAGE_WAIT_MAX_SECONDS", "300"))
+MESSAGE_SSE_KEEPALIVE_SECONDS: float = float(os.getenv("MESSAGE_SSE_KEEPALIVE_SECONDS", "15"))
 
 # Log that configuration is loaded (optional)
 logger.info("Core configuration loaded (with colorful logging setup).")
@@ -8,6 +8,11 @@ g.admin_token = "new_token"
 import anyio  # For rag_index_task type hint
 from typing import Dict, List, Optional, Any
 
+from .task_graph import TaskGraph
+from .task_store import TaskStore
+from .task_health import TaskHealthTracker
+from .message_broker import MessageBroker
+
 # --- Core Server State ---
 # From main.py:147
 # Client ID -> Connection data (Note: original usage of 'connections' might be simplified
@@ -22,8 +27,24 @@ active_agents: Dict[str, Dict[str, Any]] = {}  # Agent Token -> Agent data
 # Initialization logic (generate/load) will be handled during server startup.
 admin_token: Optional[str] = None
 
+# Dependency graph mirroring `tasks` (see core/task_graph.py), kept in step
+# through the task store's change notifications.
+task_graph: TaskGraph = TaskGraph()
+
 # From main.py:150
-tasks: Dict[str, Dict[str, Any]] = {}  # Task ID -> Task data (in-memory cache of tasks)
+# Task ID -> Task record (in-memory cache of tasks, see core/task_store.py).
+# Read it like a dict; change it only through put/patch/add_notes/remove.
+tasks: TaskStore = TaskStore()
+tasks.subscribe(task_graph.sync_task)
+
+# Task health aggregates (see core/task_health.py), also kept in step through
+# the task store's change notifications.
+task_health: TaskHealthTracker = TaskHealthTracker()
+tasks.subscribe(task_health.sync_task)
+
+# Wakes readers waiting for an agent's messages (see core/message_broker.py);
+# the messages themselves are in the agent_messages table.
+message_broker: MessageBroker = MessageBroker()
 
 # --- File and Directory State ---
 # From main.py:153
@@ -82,6 +103,12 @@ rag_index_task_scope: Optional[anyio.abc.CancelScope] = None
 # Handle for the Claude Code session monitoring background task
 claude_session_task_scope: Optional[anyio.abc.CancelScope] = None
 
+# Handle for the task health history snapshot background task
+task_health_task_scope: Optional[anyio.abc.CancelScope] = None
+
+# Handle for the tmux control-mode connection (utils/tmux_control.py)
+tmux_control_task_scope: Optional[anyio.abc.CancelScope] = None
+
 # Note: The original `main.py` also had `openai_client = None` at line 185.
 # I've named it `openai_client_instance` here to avoid confusion with the module name
 # if we later have `import openai_client from ...`.
@@ -0,0 +1,58 @@
+# Agent-MCP/agent_mcp/core/message_broker.py
+"""
+In-process wake-up broker for agent messages (g.message_broker).
+
+Messages stay in the agent_messages table; the broker carries no payloads. A
+reader waiting for an agent's messages (the wait_for_messages tool, an SSE
+stream) subscribes under that agent's ID and gets an asyncio.Event. Writers
+publish the recipient IDs of messages they committed, which sets only those
+recipients' events; each woken reader then reads the table. Nothing is lost if
+a reader is not waiting at the time, because the message is already stored.
+"""
+import asyncio
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, Set
+
+
+class MessageBroker:
+    """asyncio.Event per waiting reader, keyed by recipient agent ID."""
+
+    def __init__(self) -> None:
+        self._waiters: Dict[str, Set[asyncio.Event]] = {}
+        self.stats = {"published": 0, "wakeups": 0}
+
+    @contextmanager
+    def subscribe(self, recipient_id: str) -> Iterator[asyncio.Event]:
+        """
+        Registers a waiter for `recipient_id` for the duration of the block.
+        Clear the event before reading the table, then wait on it, so a message
+        committed in between still wakes the reader.
+        """
+        event = asyncio.Event()
+        self._waiters.setdefault(recipient_id, set()).add(event)
+        try:
+            yield event
+        finally:
+            waiters = self._waiters.get(recipient_id)
+            if waiters is not None:
+                waiters.discard(event)
+                if not waiters:
+                    del self._waiters[recipient_id]
+
+    def publish(self, recipient_ids: Iterable[str]) -> int:
+        """
+        Wakes the waiters of each recipient; call after the messages are
+        committed. Returns the number of waiters woken.
+        """
+        woken = 0
+        for recipient_id in set(recipient_ids):
+            self.stats["published"] += 1
+            for event in self._waiters.get(recipient_id, ()):
+                event.set()
+                woken += 1
+        self.stats["wakeups"] += woken
+        return woken
+
+    def waiting(self, recipient_id: str) -> int:
+        """Number of readers currently waiting for `recipient_id`."""
+        return len(self._waiters.get(recipient_id, ()))
@@ -0,0 +1,262 @@
+# Agent-MCP/agent_mcp/core/task_graph.py
+"""
+In-memory task dependency graph.
+
+Mirrors the dependency structure of g.tasks (depends_on_tasks) with forward and
+reverse adjacency plus per-task counters, so dependency questions no longer need
+a scan over every task:
+
+- unfinished[t]: dependencies of t that are not completed (missing ones count)
+- broken[t]:     dependencies of t that are failed, cancelled or missing
+- ready:         pending tasks whose dependencies are all completed
+- waiting:       pending tasks with at least one dependency not completed
+- blocked:       tasks with at least one broken dependency
+
+g.task_graph subscribes to the task store (core/task_store.py), which calls
+`sync_task(task_id, record)` after every change. It applies only the difference
+to the previous state, so a status change costs O(number of dependents).
+"""
+import json
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from .config import logger
+
+COMPLETED_STATUS = "completed"
+BROKEN_STATUSES = frozenset({"failed", "cancelled"})
+ACTIVE_STATUSES = frozenset({"pending", "in_progress"})
+
+
+def _parse_dependencies(raw: Any) -> List[str]:
+    if isinstance(raw, str):
+        try:
+            raw = json.loads(raw or "[]")
+        except json.JSONDecodeError:
+            return []
+    if not isinstance(raw, (list, tuple)):
+        return []
+    # Keep order, drop duplicates and non-string entries
+    return list(dict.fromkeys(dep for dep in raw if isinstance(dep, str)))
+
+
+def _dependency_weight(status: Optional[str]) -> Tuple[int, int]:
+    """(unfinished, broken) contribution of a dependency in `status` (None = missing)."""
+    if status == COMPLETED_STATUS:
+        return 0, 0
+    if status is None or status in BROKEN_STATUSES:
+        return 1, 1
+    return 1, 0
+
+
+class TaskGraph:
+    """Dependency graph over task IDs with incrementally maintained ready/blocked sets."""
+
+    def __init__(self) -> None:
+        self.status: Dict[str, str] = {}
+        self.depends_on: Dict[str, List[str]] = {}  # task -> its dependencies
+        self.dependents: Dict[str, Set[str]] = {}  # task -> tasks depending on it
+        self.unfinished: Dict[str, int] = {}
+        self.broken: Dict[str, int] = {}
+        self.ready: Set[str] = set()
+        self.waiting: Set[str] = set()
+        self.blocked: Set[str] = set()
+        # Bumped when a task is added or removed or its status or dependencies
+        # change; lets callers cache results derived from the graph
+        self.version: int = 0
+
+    # --- Mutation ---
+
+    def rebuild(self, tasks: Dict[str, Dict[str, Any]]) -> None:
+        """Replace the graph with the contents of a task_id -> task dict mapping."""
+        version = self.version
+        self.__init__()
+        # Keep versions increasing so results cached before the rebuild go stale
+        self.version = version + 1
+        for task_id, task in tasks.items():
+            self.sync_task(task_id, task)
+        logger.info(
+            f"Task graph built: {len(self.status)} tasks, {len(self.ready)} ready, {len(self.blocked)} blocked"
+        )
+
+    def sync_task(self, task_id: str, task: Optional[Dict[str, Any]]) -> None:
+        """
+        Bring one task in line with its current data (None when the task was deleted).
+        Safe to call when nothing changed.
+        """
+        if task is None:
+            if task_id not in self.status:
+                return
+            self._set_dependencies(task_id, [])
+            self._set_status(task_id, None)
+            self.depends_on.pop(task_id, None)
+            self.unfinished.pop(task_id, None)
+            self.broken.pop(task_id, None)
+            self.ready.discard(task_id)
+            self.waiting.discard(task_id)
+            self.blocked.discard(task_id)
+            if not self.dependents.get(task_id):
+                self.dependents.pop(task_id, None)
+            self.version += 1
+            return
+
+        status = task.get("status") or "pending"
+        dependencies = _parse_dependencies(task.get("depends_on_tasks"))
+        if self.status.get(task_id, None) == status and self.depends_on.get(task_id) == dependencies:
+            # e.g. a note or title change; nothing the graph tracks
+            return
+        self._set_status(task_id, status)
+        self._set_dependencies(task_id, dependencies)
+        self._refresh_membership(task_id)
+        self.version += 1
+
+    def _set_status(self, task_id: str, new_status: Optional[str]) -> None:
+        old_status = self.status.get(task_id)
+        if task_id in self.status and old_status == new_status:
+            return
+        old_weight = _dependency_weight(old_status)
+        new_weight = _dependency_weight(new_status)
+        if new_status is None:
+            self.status.pop(task_id, None)
+        else:
+            self.status[task_id] = new_status
+        if old_weight == new_weight:
+            return
+        for dependent_id in self.dependents.get(task_id, ()):
+            self.unfinished[dependent_id] += new_weight[0] - old_weight[0]
+            self.broken[dependent_id] += new_weight[1] - old_weight[1]
+            self._refresh_membership(dependent_id)
+
+    def _set_dependencies(self, task_id: str, new_deps: List[str]) -> None:
+        old_deps = self.depends_on.get(task_id, [])
+        if old_deps == new_deps and task_id in self.unfinished:
+            return
+        unfinished = self.unfinished.get(task_id, 0)
+        broken = self.broken.get(task_id, 0)
+        old_set, new_set = set(old_deps), set(new_deps)
+        for dep_id in old_set - new_set:
+            weight = _dependency_weight(self.status.get(dep_id))
+            unfinished -= weight[0]
+            broken -= weight[1]
+            dependents = self.dependents.get(dep_id)
+            if dependents is not None:
+                dependents.discard(task_id)
+                if not dependents and dep_id not in self.status:
+                    del self.dependents[dep_id]
+        for dep_id in new_set - old_set:
+            weight = _dependency_weight(self.status.get(dep_id))
+            unfinished += weight[0]
+            broken += weight[1]
+            self.dependents.setdefault(dep_id, set()).add(task_id)
+        self.depends_on[task_id] = new_deps
+        self.unfinished[task_id] = unfinished
+        self.broken[task_id] = broken
+
+    def _refresh_membership(self, task_id: str) -> None:
+        if task_id not in self.status:
+            return
+        is_pending = self.status[task_id] == "pending"
+        if is_pending and self.unfinished.get(task_id, 0) == 0:
+            self.ready.add(task_id)
+            self.waiting.discard(task_id)
+        elif is_pending:
+            self.ready.discard(task_id)
+            self.waiting.add(task_id)
+        else:
+            self.ready.discard(task_id)
+            self.waiting.discard(task_id)
+        if self.broken.get(task_id, 0) > 0:
+            self.blocked.add(task_id)
+        else:
+            self.blocked.discard(task_id)
+
+    # --- Queries ---
+
+    def is_ready(self, task_id: str) -> bool:
+        return task_id in self.ready
+
+    def is_blocked(self, task_id: str) -> bool:
+        return task_id in self.blocked
+
+    def is_waiting(self, task_id: str) -> bool:
+        """Pending task that cannot start yet (some dependency not completed)."""
+        return task_id in self.waiting
+
+    def get_dependents(self, task_id: str) -> List[str]:
+        return sorted(self.dependents.get(task_id, ()))
+
+    def analyze(self, task_id: str) -> Dict[str, Any]:
+        """
+        Dependency analysis of one task in O(degree).
+        Same shape as the per-task analysis shown by view_tasks.
+        """
+        status = self.status.get(task_id)
+        analysis = {
+            "is_blocked": False,
+            "blocking_dependencies": [],
+            "completed_dependencies": [],
+            "missing_dependencies": [],
+            "can_start": True,
+            "blocks_tasks": self.get_dependents(task_id),
+            "dependency_health": "healthy",
+        }
+        for dep_id in self.depends_on.get(task_id, []):
+            dep_status = self.status.get(dep_id)
+            if dep_status is None:
+                analysis["missing_dependencies"].append(dep_id)
+                analysis["is_blocked"] = True
+                analysis["can_start"] = False
+            elif dep_status == COMPLETED_STATUS:
+                analysis["completed_dependencies"].append(dep_id)
+            elif dep_status in BROKEN_STATUSES:
+                analysis["blocking_dependencies"].append(dep_id)
+                analysis["is_blocked"] = True
+                analysis["can_start"] = False
+            elif dep_status in ACTIVE_STATUSES:
+                analysis["blocking_dependencies"].append(dep_id)
+                if status == "pending":
+                    analysis["can_start"] = False
+
+        if analysis["missing_dependencies"]:
+            analysis["dependency_health"] = "critical"
+        elif analysis["is_blocked"] and status == "in_progress":
+            analysis["dependency_health"] = "warning"
+        elif not analysis["can_start"] and status == "pending":
+            analysis["dependency_health"] = "waiting"
+        return analysis
+
+    def critical_path(self, task_ids: Optional[Iterable[str]] = None) -> List[str]:
+        """
+        Longest dependency chain among unfinished tasks, from the first task
+        that has to be done to the last. Linear in tasks + edges; tasks on a
+        dependency cycle are ignored.
+        """
+        nodes = {
+            t
+            for t in (self.status if task_ids is None else task_ids)
+            if t in self.status and self.status[t] in ACTIVE_STATUSES
+        }
+        # Kahn's algorithm over the unfinished subgraph (edges dependency -> dependent)
+        pending_deps = {
+            t: sum(1 for d in set(self.depends_on.get(t, [])) if d in nodes) for t in nodes
+        }
+        queue = [t for t, count in pending_deps.items() if count == 0]
+        length: Dict[str, int] = {t: 1 for t in queue}
+        previous: Dict[str, Optional[str]] = {t: None for t in queue}
+        while queue:
+            current = queue.pop()
+            for dependent_id in self.dependents.get(current, ()):
+                if dependent_id not in nodes:
+                    continue
+                if length[current] + 1 > length.get(dependent_id, 0):
+                    length[dependent_id] = length[current] + 1
+                    previous[dependent_id] = current
+                pending_deps[dependent_id] -= 1
+                if pending_deps[dependent_id] == 0:
+                    queue.append(dependent_id)
+        if not length:
+            return []
+        end = max(length, key=lambda t: (length[t], t))
+        path = []
+        while end is not None:
+            path.append(end)
+            end = previous[end]
+        return path[::-1]
@@ -0,0 +1,196 @@
+# Agent-MCP/agent_mcp/core/task_health.py
+"""
+Incrementally maintained task health aggregates.
+
+g.task_health subscribes to the task store (core/task_store.py) like the
+dependency graph does. Each change moves one task between counters instead of
+re-reading every task, so a health snapshot costs O(log n) however many tasks
+there are:
+
+- status / priority distributions
+- blocked: pending tasks that have dependencies
+- stale:   pending or in_progress tasks not updated for TASK_HEALTH_STALE_DAYS;
+           the update times of active tasks are kept sorted, so counting the
+           stale ones is a bisect against the current cutoff
+
+Aggregates are kept for all tasks and per assignee, the two scopes view_tasks
+reports on. summarize_task_health() turns counts into the health report, for
+the tracker and for ad-hoc task lists alike.
+"""
+import bisect
+import datetime
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from .config import TASK_HEALTH_STALE_DAYS
+from .task_graph import ACTIVE_STATUSES
+
+# (assigned_to, status, priority, blocked, updated_at) of one task
+_TaskEntry = Tuple[Optional[str], str, str, bool, Optional[datetime.datetime]]
+
+
+def parse_task_timestamp(value: Any) -> Optional[datetime.datetime]:
+    """Naive datetime of a stored ISO timestamp; None when missing or unparseable."""
+    if not isinstance(value, str) or not value:
+        return None
+    try:
+        parsed = datetime.datetime.fromisoformat(
+            value.replace("Z", "+00:00").replace("+00:00", "")
+        )
+    except ValueError:
+        return None
+    # Other UTC offsets: compare in local time like the naive timestamps
+    return parsed.astimezone().replace(tzinfo=None) if parsed.tzinfo else parsed
+
+
+def stale_cutoff(now: Optional[datetime.datetime] = None) -> datetime.datetime:
+    """Active tasks last updated at or before this time count as stale."""
+    now = now or datetime.datetime.now()
+    # Stale means more than TASK_HEALTH_STALE_DAYS whole days since the update
+    return now - datetime.timedelta(days=TASK_HEALTH_STALE_DAYS + 1)
+
+
+def summarize_task_health(
+    total: int,
+    status_counts: Mapping[str, int],
+    priority_counts: Mapping[str, int],
+    blocked_count: int,
+    stale_count: int,
+) -> Dict[str, Any]:
+    """Health report (score 0-100 and its band) from task counts."""
+    if not total:
+        return {"total": 0, "status": "no_data"}
+
+    completed_ratio = status_counts.get("completed", 0) / total
+    active_ratio = (
+        status_counts.get("in_progress", 0) + status_counts.get("pending", 0)
+    ) / total
+    blocked_ratio = blocked_count / total
+    stale_ratio = stale_count / total
+
+    health_score = max(
+        0,
+        min(
+            100,
+            completed_ratio * 30  # 30% weight for completion
+            + active_ratio * 40  # 40% weight for active work
+            + (1 - blocked_ratio) * 20  # 20% penalty for blocked tasks
+            + (1 - stale_ratio) * 10,  # 10% penalty for stale tasks
+        ),
+    )
+
+    return {
+        "total": total,
+        "status_distribution": dict(status_counts),
+        "priority_distribution": dict(priority_counts),
+        "blocked_tasks": blocked_count,
+        "stale_tasks": stale_count,
+        "health_score": round(health_score, 1),
+        "health_status": (
+            "excellent"
+            if health_score >= 80
+            else (
+                "good"
+                if health_score >= 60
+                else "needs_attention" if health_score >= 40 else "critical"
+            )
+        ),
+    }
+
+
+def _task_entry(task: Mapping[str, Any]) -> _TaskEntry:
+    status = task.get("status") or "unknown"
+    # Store records hold depends_on_tasks as an already parsed tuple
+    blocked = status == "pending" and bool(task.get("depends_on_tasks"))
+    return (
+        task.get("assigned_to"),
+        status,
+        task.get("priority") or "medium",
+        blocked,
+        parse_task_timestamp(task.get("updated_at")),
+    )
+
+
+class _HealthCounts:
+    """Counters for one scope (all tasks, or one assignee's tasks)."""
+
+    __slots__ = ("total", "status", "priority", "blocked", "active_updated")
+
+    def __init__(self) -> None:
+        self.total = 0
+        self.status: Dict[str, int] = {}
+        self.priority: Dict[str, int] = {}
+        self.blocked = 0
+        # Sorted update times of pending/in_progress tasks
+        self.active_updated: List[datetime.datetime] = []
+
+    def apply(self, entry: _TaskEntry, delta: int) -> None:
+        _assignee, status, priority, blocked, updated = entry
+        self.total += delta
+        self.status[status] = self.status.get(status, 0) + delta
+        if not self.status[status]:
+            del self.status[status]
+        self.priority[priority] = self.priority.get(priority, 0) + delta
+        if not self.priority[priority]:
+            del self.priority[priority]
+        if blocked:
+            self.blocked += delta
+        if updated is not None and status in ACTIVE_STATUSES:
+            if delta > 0:
+                bisect.insort(self.active_updated, updated)
+            else:
+                index = bisect.bisect_left(self.active_updated, updated)
+                del self.active_updated[index]
+
+    def stale(self, cutoff: datetime.datetime) -> int:
+        return bisect.bisect_right(self.active_updated, cutoff)
+
+
+class TaskHealthTracker:
+    """Task health counters kept in step with the task store."""
+
+    def __init__(self) -> None:
+        self._entries: Dict[str, _TaskEntry] = {}
+        self._all = _HealthCounts()
+        self._by_agent: Dict[str, _HealthCounts] = {}
+
+    def sync_task(self, task_id: str, task: Optional[Mapping[str, Any]]) -> None:
+        """Task store listener: moves one task from its old counters to its new ones."""
+        entry = _task_entry(task) if task is not None else None
+        previous = self._entries.get(task_id)
+        if entry == previous:
+            return
+        if previous is not None:
+            self._apply(previous, -1)
+        if entry is None:
+            self._entries.pop(task_id, None)
+        else:
+            self._entries[task_id] = entry
+            self._apply(entry, 1)
+
+    def _apply(self, entry: _TaskEntry, delta: int) -> None:
+        self._all.apply(entry, delta)
+        assignee = entry[0]
+        if assignee:
+            counts = self._by_agent.get(assignee)
+            if counts is None:
+                counts = self._by_agent[assignee] = _HealthCounts()
+            counts.apply(entry, delta)
+            if not counts.total:
+                del self._by_agent[assignee]
+
+    def snapshot(
+        self,
+        assigned_to: Optional[str] = None,
+        now: Optional[datetime.datetime] = None,
+    ) -> Dict[str, Any]:
+        """Health report for all tasks, or for the tasks assigned to `assigned_to`."""
+        counts = self._by_agent.get(assigned_to) if assigned_to else self._all
+        if counts is None:
+            return summarize_task_health(0, {}, {}, 0, 0)
+        return summarize_task_health(
+            counts.total,
+            counts.status,
+            counts.priority,
+            counts.blocked,
+            counts.stale(stale_cutoff(now)),
+        )
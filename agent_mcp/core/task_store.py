@@ -0,0 +1,275 @@
+# Agent-MCP/agent_mcp/core/task_store.py
+"""
+In-memory task cache (g.tasks).
+
+Holds one canonical record per task, a slotted, immutable TaskRecord that reads
+like a dict. child_tasks and depends_on_tasks are parsed once into tuples, the
+short categorical strings (status, priority, agent IDs) are interned, and notes
+are not held at all until first read, when the most recent
+TASK_NOTES_RECENT_LIMIT are fetched through the store's notes loader.
+
+Records are copy-on-write. Writers go through put/patch/add_notes/remove after
+committing the matching database change, which replaces the record, bumps its
+version and notifies subscribers (g.task_graph is one). A record obtained
+earlier is never changed under the reader, and snapshot() gives a consistent
+view of all tasks that stays cheap to take until the next write.
+"""
+import json
+import sys
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+from .config import logger, TASK_NOTES_RECENT_LIMIT
+
+# Columns of the tasks table held by TaskRecord (notes are handled separately)
+TASK_FIELDS = (
+    "task_id",
+    "title",
+    "description",
+    "assigned_to",
+    "created_by",
+    "status",
+    "priority",
+    "created_at",
+    "updated_at",
+    "parent_task",
+    "child_tasks",
+    "depends_on_tasks",
+)
+LIST_FIELDS = ("child_tasks", "depends_on_tasks")
+# Few distinct values shared by many tasks; interning stores each value once
+INTERNED_FIELDS = ("status", "priority", "assigned_to", "created_by")
+
+# listener(task_id, record) with record None when the task was removed
+TaskListener = Callable[[str, Optional["TaskRecord"]], None]
+# loader(task_id) -> most recent notes of the task, oldest first
+NotesLoader = Callable[[str], List[Dict[str, Any]]]
+
+
+def _parse_list_field(task_id: Any, field_key: str, value: Any) -> Tuple[Any, ...]:
+    if isinstance(value, str):
+        try:
+            value = json.loads(value or "[]")
+        except json.JSONDecodeError:
+            logger.warning(
+                f"Failed to parse JSON for field '{field_key}' in task '{task_id}'. Defaulting to empty list."
+            )
+            return ()
+    return tuple(value) if isinstance(value, (list, tuple)) else ()
+
+
+class TaskRecord(Mapping[str, Any]):
+    """
+    Immutable task record with one slot per tasks column. Supports the read
+    side of a dict (record["status"], record.get("notes"), dict(record));
+    copy() returns a plain dict with lists for use outside the cache.
+    """
+
+    __slots__ = TASK_FIELDS + ("_notes", "_extra")
+
+    # Set by TaskStore.set_notes_loader; used the first time a record's notes are read
+    notes_loader: Optional[NotesLoader] = None
+
+    def __init__(self, values: Mapping[str, Any]) -> None:
+        task_id = values.get("task_id")
+        for field_key in TASK_FIELDS:
+            value = values.get(field_key)
+            if field_key in LIST_FIELDS:
+                value = _parse_list_field(task_id, field_key, value)
+            elif field_key in INTERNED_FIELDS and isinstance(value, str):
+                value = sys.intern(value)
+            object.__setattr__(self, field_key, value)
+        notes = values.get("notes")
+        # A JSON string is the legacy tasks.notes column, not the notes themselves
+        if isinstance(notes, (list, tuple)):
+            notes = tuple(notes[-TASK_NOTES_RECENT_LIMIT:])
+        else:
+            notes = None
+        object.__setattr__(self, "_notes", notes)
+        extra = {
+            key: value for key, value in values.items() if key not in TASK_FIELDS and key != "notes"
+        }
+        object.__setattr__(self, "_extra", extra or None)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError("TaskRecord is immutable; use TaskStore.patch()")
+
+    @property
+    def notes(self) -> Tuple[Dict[str, Any], ...]:
+        if self._notes is None:
+            loader = TaskRecord.notes_loader
+            notes = tuple(loader(self.task_id)) if loader else ()
+            # Memoized on first read; the record is otherwise immutable
+            object.__setattr__(self, "_notes", notes)
+        return self._notes
+
+    def __getitem__(self, key: str) -> Any:
+        if key in TASK_FIELDS:
+            return getattr(self, key)
+        if key == "notes":
+            return self.notes
+        if self._extra and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        yield from TASK_FIELDS
+        yield "notes"
+        if self._extra:
+            yield from self._extra
+
+    def __len__(self) -> int:
+        return len(TASK_FIELDS) + 1 + len(self._extra or ())
+
+    def copy(self) -> Dict[str, Any]:
+        """Plain, mutable dict (list fields as lists)."""
+        task = {key: self[key] for key in self}
+        for field_key in LIST_FIELDS + ("notes",):
+            task[field_key] = list(task[field_key])
+        return task
+
+    def replace(self, changes: Mapping[str, Any]) -> "TaskRecord":
+        """New record with `changes` applied; unloaded notes stay unloaded."""
+        values = {field_key: getattr(self, field_key) for field_key in TASK_FIELDS}
+        if self._extra:
+            values.update(self._extra)
+        values["notes"] = self._notes
+        values.update(changes)
+        return TaskRecord(values)
+
+    def __repr__(self) -> str:
+        return f"TaskRecord(task_id={self.task_id!r}, status={self.status!r})"
+
+
+def normalize_task(task: Mapping[str, Any]) -> TaskRecord:
+    """Canonical in-memory form of a task row or dict."""
+    return task if isinstance(task, TaskRecord) else TaskRecord(task)
+
+
+class TaskStore(Mapping[str, TaskRecord]):
+    """Versioned task_id -> TaskRecord cache with change notifications."""
+
+    def __init__(self) -> None:
+        self._records: Dict[str, TaskRecord] = {}
+        self._versions: Dict[str, int] = {}
+        self._listeners: List[TaskListener] = []
+        self._snapshot: Optional[Mapping[str, TaskRecord]] = None
+        # Bumped on every write; also the source of per-record versions
+        self.version: int = 0
+
+    # --- Reads (Mapping interface) ---
+
+    def __getitem__(self, task_id: str) -> TaskRecord:
+        return self._records[task_id]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._records)
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __contains__(self, task_id: object) -> bool:
+        return task_id in self._records
+
+    def get_version(self, task_id: str) -> int:
+        """Version of one task record; 0 when the task is unknown."""
+        return self._versions.get(task_id, 0)
+
+    def snapshot(self) -> Mapping[str, TaskRecord]:
+        """
+        Read-only view of all records as of now. Safe to iterate while the store
+        changes; reused by every caller until the next write.
+        """
+        if self._snapshot is None:
+            self._snapshot = MappingProxyType(dict(self._records))
+        return self._snapshot
+
+    # --- Change notifications ---
+
+    def subscribe(self, listener: TaskListener) -> Callable[[], None]:
+        """Call `listener(task_id, record)` after every change; returns an unsubscribe function."""
+        self._listeners.append(listener)
+
+        def unsubscribe() -> None:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+        return unsubscribe
+
+    def set_notes_loader(self, loader: Optional[NotesLoader]) -> None:
+        """Function used to fetch a task's recent notes the first time they are read."""
+        TaskRecord.notes_loader = loader
+
+    # --- Writes ---
+
+    def load(self, tasks: Iterable[Mapping[str, Any]]) -> None:
+        """Replace the whole cache, e.g. with the tasks read from the database at startup."""
+        new_records = {}
+        for task in tasks:
+            record = normalize_task(task)
+            new_records[record.task_id] = record
+        for task_id in list(self._records):
+            if task_id not in new_records:
+                self._commit(task_id, None)
+        for task_id, record in new_records.items():
+            self._commit(task_id, record)
+
+    def clear(self) -> None:
+        self.load([])
+
+    def put(self, task: Mapping[str, Any]) -> TaskRecord:
+        """Insert or replace a task with a full row/dict; returns the stored record."""
+        record = normalize_task(task)
+        self._commit(record.task_id, record)
+        return record
+
+    def put_many(self, tasks: Iterable[Mapping[str, Any]]) -> List[TaskRecord]:
+        """Insert or replace several tasks written in one transaction; returns the stored records."""
+        records = [normalize_task(task) for task in tasks]
+        for record in records:
+            self._commit(record.task_id, record)
+        return records
+
+    def patch(self, task_id: str, changes: Mapping[str, Any]) -> Optional[TaskRecord]:
+        """Apply field changes to a cached task; returns the new record (None if not cached)."""
+        current = self._records.get(task_id)
+        if current is None:
+            return None
+        record = current.replace(changes)
+        self._commit(task_id, record)
+        return record
+
+    def add_notes(
+        self, task_id: str, notes: List[Dict[str, Any]], **changes: Any
+    ) -> Optional[TaskRecord]:
+        """Append notes (already stored in task_notes) plus optional field changes."""
+        current = self._records.get(task_id)
+        if current is None:
+            return None
+        if notes and current._notes is not None:
+            # Notes not loaded yet will be read from task_notes, new ones included
+            changes = dict(changes, notes=current._notes + tuple(notes))
+        return self.patch(task_id, changes)
+
+    def remove(self, task_id: str) -> Optional[TaskRecord]:
+        record = self._records.get(task_id)
+        if record is not None:
+            self._commit(task_id, None)
+        return record
+
+    def _commit(self, task_id: str, record: Optional[TaskRecord]) -> None:
+        # Row versions come from the store-wide counter, so they never repeat,
+        # even when a task ID is deleted and reused
+        self.version += 1
+        if record is None:
+            self._records.pop(task_id, None)
+            self._versions.pop(task_id, None)
+        else:
+            self._records[task_id] = record
+            self._versions[task_id] = self.version
+        self._snapshot = None
+        for listener in list(self._listeners):
+            try:
+                listener(task_id, record)
+            except Exception as e:
+                logger.error(f"Task store listener failed for task '{task_id}': {e}", exc_info=True)
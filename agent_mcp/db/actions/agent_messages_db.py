@@ -0,0 +1,88 @@
+# Agent-MCP/agent_mcp/db/actions/agent_messages_db.py
+import sqlite3
+from typing import Any, Dict, List, Optional
+
+# Readers that wait for messages (wait_for_messages, the SSE stream) follow an
+# agent's inbox by rowid, exposed as 'seq'. Writes are serialized by SQLite, so
+# rowids grow in commit order and "seq > last seen" never skips a message that
+# was committed late. All helpers take the caller's cursor.
+
+MESSAGE_SELECT = """
+    SELECT rowid AS seq, message_id, sender_id, recipient_id, message_content,
+           message_type, priority, timestamp, delivered, read
+    FROM agent_messages
+"""
+
+
+MESSAGE_INSERT_COLUMNS = (
+    "message_id",
+    "sender_id",
+    "recipient_id",
+    "message_content",
+    "message_type",
+    "priority",
+    "timestamp",
+    "delivered",
+    "read",
+)
+
+
+def insert_agent_messages(cursor: sqlite3.Cursor, messages: List[Dict[str, Any]]) -> None:
+    """Inserts message dicts (keys as MESSAGE_INSERT_COLUMNS) with one executemany."""
+    cursor.executemany(
+        f"INSERT INTO agent_messages ({', '.join(MESSAGE_INSERT_COLUMNS)}) "
+        f"VALUES ({', '.join('?' * len(MESSAGE_INSERT_COLUMNS))})",
+        [tuple(message[column] for column in MESSAGE_INSERT_COLUMNS) for message in messages],
+    )
+
+
+def get_unread_messages(
+    cursor: sqlite3.Cursor,
+    recipient_id: str,
+    limit: int,
+    up_to_seq: Optional[int] = None,
+    after_seq: int = 0,
+) -> List[Dict[str, Any]]:
+    """
+    Oldest `limit` unread messages for the recipient stored after `after_seq`,
+    optionally only up to a seq.
+    """
+    query = MESSAGE_SELECT + " WHERE recipient_id = ? AND read = 0 AND rowid > ?"
+    params: List[Any] = [recipient_id, after_seq]
+    if up_to_seq is not None:
+        query += " AND rowid <= ?"
+        params.append(up_to_seq)
+    cursor.execute(query + " ORDER BY rowid LIMIT ?", params + [limit])
+    return [dict(row) for row in cursor.fetchall()]
+
+
+def get_messages_after(
+    cursor: sqlite3.Cursor, recipient_id: str, after_seq: int, limit: int
+) -> List[Dict[str, Any]]:
+    """Messages for the recipient stored after `after_seq`, oldest first."""
+    cursor.execute(
+        MESSAGE_SELECT + " WHERE recipient_id = ? AND rowid > ? ORDER BY rowid LIMIT ?",
+        (recipient_id, after_seq, limit),
+    )
+    return [dict(row) for row in cursor.fetchall()]
+
+
+def get_latest_message_seq(cursor: sqlite3.Cursor, recipient_id: str) -> int:
+    """Seq of the recipient's newest message, 0 if there is none."""
+    cursor.execute(
+        "SELECT MAX(rowid) AS seq FROM agent_messages WHERE recipient_id = ?",
+        (recipient_id,),
+    )
+    row = cursor.fetchone()
+    return (row["seq"] or 0) if row else 0
+
+
+def mark_messages_read(cursor: sqlite3.Cursor, message_ids: List[str]) -> None:
+    """Marks the given messages as read (the caller commits)."""
+    if not message_ids:
+        return
+    placeholders = ",".join("?" * len(message_ids))
+    cursor.execute(
+        f"UPDATE agent_messages SET read = ? WHERE message_id IN ({placeholders})",
+        [True] + list(message_ids),
+    )
@@ -2,10 +2,12 @@
 import sqlite3
 import json
 import datetime
-from typing import Optional, Dict, List, Any
+from typing import Optional, Dict, List, Any, Iterator
 
 from ...core.config import logger
 from ..connection import get_db_connection
+from ...core.config import TASK_NOTES_RECENT_LIMIT
+from .task_notes_db import append_note_to_tasks, get_recent_notes_for_tasks
 
 # This module provides reusable database operations specifically for the 'tasks' table.
 
@@ -24,10 +26,22 @@ def _parse_task_json_fields(task_data: Dict[str, Any]) -> Dict[str, Any]:
                 parsed_data[field_key] = [] # Default to empty list on parse error
     return parsed_data
 
+def _attach_recent_notes(
+    cursor: sqlite3.Cursor, tasks: List[Dict[str, Any]], all_tasks: bool = False
+) -> None:
+    """Sets 'notes' of each task to its most recent notes from the task_notes table."""
+    if not tasks:
+        return
+    task_ids = None if all_tasks else [task["task_id"] for task in tasks]
+    notes_by_task = get_recent_notes_for_tasks(cursor, task_ids, TASK_NOTES_RECENT_LIMIT)
+    for task in tasks:
+        task["notes"] = notes_by_task.get(task["task_id"], [])
+
 def get_task_by_id(task_id: str) -> Optional[Dict[str, Any]]:
     """
     Fetches a single task's details from the database by task_id.
-    Parses JSON fields (child_tasks, depends_on_tasks, notes) into Python lists.
+    Parses JSON fields (child_tasks, depends_on_tasks) into Python lists and
+    attaches the task's most recent notes.
     Returns None if the task is not found.
     """
     conn = None
@@ -37,7 +51,9 @@ def get_task_by_id(task_id: str) -> Optional[Dict[str, Any]]:
         cursor.execute("SELECT * FROM tasks WHERE task_id = ?", (task_id,))
         row = cursor.fetchone()
         if row:
-            return _parse_task_json_fields(dict(row))
+            task = _parse_task_json_fields(dict(row))
+            _attach_recent_notes(cursor, [task])
+            return task
         return None
     except sqlite3.Error as e:
         logger.error(f"Database error fetching task by ID '{task_id}': {e}", exc_info=True)
@@ -64,6 +80,7 @@ def get_all_tasks_from_db() -> List[Dict[str, Any]]:
         cursor.execute("SELECT * FROM tasks ORDER BY created_at DESC") # Order for consistency
         for row in cursor.fetchall():
             tasks_list.append(_parse_task_json_fields(dict(row)))
+        _attach_recent_notes(cursor, tasks_list, all_tasks=True)
         return tasks_list
     except sqlite3.Error as e:
         logger.error(f"Database error fetching all tasks: {e}", exc_info=True)
@@ -98,6 +115,7 @@ def get_tasks_by_agent_id(agent_id: str, status_filter: Optional[str] = None) ->
         cursor.execute(query, tuple(params))
         for row in cursor.fetchall():
             tasks_list.append(_parse_task_json_fields(dict(row)))
+        _attach_recent_notes(cursor, tasks_list)
         return tasks_list
     except sqlite3.Error as e:
         logger.error(f"Database error fetching tasks for agent '{agent_id}': {e}", exc_info=True)
@@ -116,7 +134,8 @@ def update_task_fields_in_db(task_id: str, fields_to_update: Dict[str, Any]) ->
     """
     Updates specified fields for a task in the database.
     Automatically updates the 'updated_at' timestamp.
-    Handles JSON serialization for complex fields like 'notes', 'child_tasks', 'depends_on_tasks'.
+    Handles JSON serialization for complex fields like 'child_tasks', 'depends_on_tasks'.
+    Notes are not a task field; add them with task_notes_db.append_task_note.
     Returns True on success, False on failure.
     """
     if not task_id or not fields_to_update:
@@ -136,7 +155,7 @@ def update_task_fields_in_db(task_id: str, fields_to_update: Dict[str, Any]) ->
             # This list should match columns in the 'tasks' table.
             valid_fields = [
                 "title", "description", "assigned_to", "status", "priority",
-                "parent_task", "child_tasks", "depends_on_tasks", "notes"
+                "parent_task", "child_tasks", "depends_on_tasks"
             ]
             if field not in valid_fields:
                 logger.warning(f"Attempted to update invalid task field: {field} for task {task_id}. Skipping.")
@@ -151,12 +170,11 @@ def update_task_fields_in_db(task_id: str, fields_to_update: Dict[str, Any]) ->
                 "priority": "priority",
                 "parent_task": "parent_task",
                 "child_tasks": "child_tasks",
-                "depends_on_tasks": "depends_on_tasks",
-                "notes": "notes"
+                "depends_on_tasks": "depends_on_tasks"
             }
             safe_field = safe_field_mapping[field]  # This will raise KeyError if invalid
             update_clauses.append(f"{safe_field} = ?")
-            if field in ["child_tasks", "depends_on_tasks", "notes"]:
+            if field in ["child_tasks", "depends_on_tasks"]:
                 update_values.append(json.dumps(value or [])) # Ensure JSON list for these
             else:
                 update_values.append(value)
@@ -193,4 +211,208 @@ def update_task_fields_in_db(task_id: str, fields_to_update: Dict[str, Any]) ->
         return False
     finally:
         if conn:
-            conn.close()
\ No newline at end of file
+            conn.close()
+
+def advance_tasks_status(
+    cursor: sqlite3.Cursor,
+    task_ids: List[str],
+    from_status: str,
+    to_status: str,
+    note: Dict[str, Any],
+    assigned_to: Optional[str] = None,
+) -> List[str]:
+    """
+    Moves every task in `task_ids` that is still in `from_status` to `to_status`
+    with one UPDATE and appends `note` to each of them in task_notes.
+    With `assigned_to`, only tasks assigned to that agent are touched.
+    Runs in the caller's transaction; returns the IDs that were advanced.
+    """
+    if not task_ids:
+        return []
+    filter_sql = "task_id IN (SELECT value FROM json_each(?)) AND status = ?"
+    filter_params: List[Any] = [json.dumps(list(task_ids)), from_status]
+    if assigned_to is not None:
+        filter_sql += " AND assigned_to = ?"
+        filter_params.append(assigned_to)
+
+    cursor.execute(f"SELECT task_id FROM tasks WHERE {filter_sql}", filter_params)
+    advanced_ids = [row[0] for row in cursor.fetchall()]
+    if not advanced_ids:
+        return []
+
+    cursor.execute(
+        """
+        UPDATE tasks
+        SET status = ?, updated_at = ?
+        WHERE task_id IN (SELECT value FROM json_each(?))
+    """,
+        (to_status, note["timestamp"], json.dumps(advanced_ids)),
+    )
+    append_note_to_tasks(cursor, advanced_ids, note)
+    return advanced_ids
+
+
+# Columns written by insert_tasks, in the order of the tasks table
+TASK_INSERT_COLUMNS = (
+    "task_id", "title", "description", "assigned_to", "created_by", "status", "priority",
+    "created_at", "updated_at", "parent_task", "child_tasks", "depends_on_tasks", "notes",
+)
+
+
+def insert_tasks(cursor: sqlite3.Cursor, task_rows: List[Dict[str, Any]]) -> None:
+    """
+    Inserts task rows (list fields as JSON strings) with one executemany.
+    Runs in the caller's transaction; the task_edges triggers fire per row.
+    """
+    columns = ", ".join(TASK_INSERT_COLUMNS)
+    placeholders = ", ".join(f":{column}" for column in TASK_INSERT_COLUMNS)
+    cursor.executemany(
+        f"INSERT INTO tasks ({columns}) VALUES ({placeholders})",
+        task_rows,
+    )
+
+
+def append_child_tasks(
+    cursor: sqlite3.Cursor, children: Dict[str, List[str]], updated_at: str
+) -> None:
+    """
+    Appends child task IDs ({parent_id: [child_id, ...]}) to the parents'
+    child_tasks JSON with one executemany. Runs in the caller's transaction.
+    """
+    cursor.executemany(
+        """
+        UPDATE tasks
+        SET child_tasks = (
+                SELECT json_group_array(value) FROM (
+                    SELECT value FROM json_each(COALESCE(tasks.child_tasks, '[]'))
+                    UNION ALL
+                    SELECT value FROM json_each(?)
+                )
+            ),
+            updated_at = ?
+        WHERE task_id = ?
+    """,
+        [
+            (json.dumps(child_ids), updated_at, parent_id)
+            for parent_id, child_ids in children.items()
+        ],
+    )
+
+
+# Columns that update_tasks_by_value may set (used by bulk_task_operations)
+BULK_UPDATABLE_TASK_FIELDS = ("status", "priority", "assigned_to")
+
+
+def update_tasks_by_value(
+    cursor: sqlite3.Cursor,
+    changes: Dict[str, Dict[str, Any]],
+    updated_at: str,
+) -> int:
+    """
+    Applies per-task field changes ({task_id: {field: value}}) with set-based
+    statements: one `UPDATE ... WHERE task_id IN (...)` per distinct (field, value),
+    so the statement count depends on how many different values are written,
+    not on how many tasks change. Every task in `changes` gets `updated_at`,
+    including tasks with no field changes (e.g. only a note was added).
+    Runs in the caller's transaction; returns the number of statements executed.
+    """
+    groups: Dict[tuple, List[str]] = {}
+    untouched_ids: List[str] = []
+    for task_id, task_changes in changes.items():
+        if not task_changes:
+            untouched_ids.append(task_id)
+        for field, value in task_changes.items():
+            if field not in BULK_UPDATABLE_TASK_FIELDS:
+                raise ValueError(f"Field '{field}' cannot be bulk updated")
+            groups.setdefault((field, value), []).append(task_id)
+
+    statements = 0
+    for (field, value), task_ids in groups.items():
+        cursor.execute(
+            f"UPDATE tasks SET {field} = ?, updated_at = ? "
+            "WHERE task_id IN (SELECT value FROM json_each(?))",
+            (value, updated_at, json.dumps(task_ids)),
+        )
+        statements += 1
+    if untouched_ids:
+        cursor.execute(
+            "UPDATE tasks SET updated_at = ? WHERE task_id IN (SELECT value FROM json_each(?))",
+            (updated_at, json.dumps(untouched_ids)),
+        )
+        statements += 1
+    return statements
+
+
+# Sort orders supported by view_tasks. All of them list newest/most urgent first.
+TASK_SORT_EXPRESSIONS = {
+    "created_at": "created_at",
+    "updated_at": "updated_at",
+    "priority": "CASE priority WHEN 'high' THEN 3 WHEN 'medium' THEN 2 WHEN 'low' THEN 1 ELSE 2 END",
+    "status": (
+        "CASE status WHEN 'failed' THEN 5 WHEN 'in_progress' THEN 4 WHEN 'pending' THEN 3 "
+        "WHEN 'completed' THEN 2 WHEN 'cancelled' THEN 1 ELSE 3 END"
+    ),
+}
+
+
+def iter_tasks_keyset(
+    conn: sqlite3.Connection,
+    assigned_to: Optional[str] = None,
+    status: Optional[str] = None,
+    priority: Optional[str] = None,
+    parent_task: Optional[str] = None,
+    task_ids: Optional[List[str]] = None,
+    sort_by: str = "created_at",
+    start_after: Optional[str] = None,
+    page_size: int = 100,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Yields tasks matching the filters in `sort_by` order (ties broken by task_id),
+    reading `page_size` rows at a time with keyset pagination.
+    `start_after` resumes after that task's position in the order; stop iterating
+    at any point and no further rows are read. JSON fields are parsed.
+    """
+    where_clauses: List[str] = []
+    where_params: List[Any] = []
+    for column, value in (
+        ("assigned_to", assigned_to),
+        ("status", status),
+        ("priority", priority),
+        ("parent_task", parent_task),
+    ):
+        if value:
+            where_clauses.append(f"{column} = ?")
+            where_params.append(value)
+    if task_ids is not None:
+        where_clauses.append("task_id IN (SELECT value FROM json_each(?))")
+        where_params.append(json.dumps(list(task_ids)))
+
+    sort_expr = TASK_SORT_EXPRESSIONS.get(sort_by, TASK_SORT_EXPRESSIONS["created_at"])
+    cursor = conn.cursor()
+
+    bound: Optional[tuple] = None
+    if start_after:
+        cursor.execute(f"SELECT {sort_expr}, task_id FROM tasks WHERE task_id = ?", (start_after,))
+        row = cursor.fetchone()
+        if row:
+            bound = (row[0], row[1])
+
+    while True:
+        page_clauses = list(where_clauses)
+        page_params = list(where_params)
+        if bound is not None:
+            page_clauses.append(f"({sort_expr}, task_id) < (?, ?)")
+            page_params.extend(bound)
+        where_sql = f"WHERE {' AND '.join(page_clauses)}" if page_clauses else ""
+        cursor.execute(
+            f"SELECT *, {sort_expr} AS _sort_key FROM tasks {where_sql} "
+            f"ORDER BY {sort_expr} DESC, task_id DESC LIMIT ?",
+            page_params + [page_size],
+        )
+        rows = cursor.fetchall()
+        for row in rows:
+            task = dict(row)
+            bound = (task.pop("_sort_key"), task["task_id"])
+            yield _parse_task_json_fields(task)
+        if len(rows) < page_size:
+            return
@@ -0,0 +1,64 @@
+# Agent-MCP/agent_mcp/db/actions/task_edges_db.py
+import sqlite3
+from typing import List
+
+# Lookups over the 'task_edges' table, the normalized form of tasks.depends_on_tasks
+# and tasks.child_tasks (maintained by triggers, see db/schema.py).
+# All helpers take the caller's cursor so they see uncommitted writes of the
+# surrounding transaction.
+
+EDGE_DEPENDS_ON = "depends_on"  # from_task depends on to_task
+EDGE_CHILD = "child"  # to_task is a child of from_task
+
+
+def get_dependent_task_ids(cursor: sqlite3.Cursor, task_id: str) -> List[str]:
+    """Tasks that list `task_id` in their depends_on_tasks."""
+    cursor.execute(
+        "SELECT from_task FROM task_edges WHERE to_task = ? AND kind = ?",
+        (task_id, EDGE_DEPENDS_ON),
+    )
+    return [row[0] for row in cursor.fetchall()]
+
+
+def get_dependency_task_ids(cursor: sqlite3.Cursor, task_id: str) -> List[str]:
+    """Tasks that `task_id` depends on."""
+    cursor.execute(
+        "SELECT to_task FROM task_edges WHERE from_task = ? AND kind = ?",
+        (task_id, EDGE_DEPENDS_ON),
+    )
+    return [row[0] for row in cursor.fetchall()]
+
+
+def get_child_task_ids(cursor: sqlite3.Cursor, task_id: str) -> List[str]:
+    """Tasks listed in the child_tasks of `task_id`."""
+    cursor.execute(
+        "SELECT to_task FROM task_edges WHERE from_task = ? AND kind = ?",
+        (task_id, EDGE_CHILD),
+    )
+    return [row[0] for row in cursor.fetchall()]
+
+
+def get_unblocked_dependent_task_ids(
+    cursor: sqlite3.Cursor, task_id: str, dependent_status: str = "pending"
+) -> List[str]:
+    """
+    Dependents of `task_id` in `dependent_status` whose dependencies are now all
+    completed. A dependency on a task that no longer exists counts as unfinished.
+    """
+    cursor.execute(
+        """
+        SELECT d.from_task
+        FROM task_edges d
+        JOIN tasks t ON t.task_id = d.from_task
+        WHERE d.to_task = ? AND d.kind = ? AND t.status = ?
+          AND NOT EXISTS (
+              SELECT 1
+              FROM task_edges e
+              LEFT JOIN tasks dep ON dep.task_id = e.to_task
+              WHERE e.from_task = d.from_task AND e.kind = ?
+                AND (dep.status IS NULL OR dep.status != 'completed')
+          )
+    """,
+        (task_id, EDGE_DEPENDS_ON, dependent_status, EDGE_DEPENDS_ON),
+    )
+    return [row[0] for row in cursor.fetchall()]
@@ -0,0 +1,82 @@
+# Agent-MCP/agent_mcp/db/actions/task_health_db.py
+import json
+import sqlite3
+from typing import Any, Dict, List, Optional
+
+# Time-bucketed task health history ('task_health_history', see db/schema.py).
+# Each bucket holds the last health snapshot taken within it; the snapshots come
+# from the incrementally maintained aggregates in core/task_health.py, so
+# recording one never scans the tasks table.
+
+
+def save_task_health_snapshot(
+    cursor: sqlite3.Cursor,
+    health: Dict[str, Any],
+    bucket_start: str,
+    recorded_at: str,
+) -> None:
+    """Inserts or overwrites the history row of `bucket_start`."""
+    cursor.execute(
+        """
+        INSERT INTO task_health_history (
+            bucket_start, recorded_at, total, status_distribution,
+            priority_distribution, blocked_tasks, stale_tasks, health_score
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(bucket_start) DO UPDATE SET
+            recorded_at = excluded.recorded_at,
+            total = excluded.total,
+            status_distribution = excluded.status_distribution,
+            priority_distribution = excluded.priority_distribution,
+            blocked_tasks = excluded.blocked_tasks,
+            stale_tasks = excluded.stale_tasks,
+            health_score = excluded.health_score
+    """,
+        (
+            bucket_start,
+            recorded_at,
+            health.get("total", 0),
+            json.dumps(health.get("status_distribution", {})),
+            json.dumps(health.get("priority_distribution", {})),
+            health.get("blocked_tasks", 0),
+            health.get("stale_tasks", 0),
+            # No tasks at all: report 0 rather than leaving a gap in the trend
+            health.get("health_score", 0.0),
+        ),
+    )
+
+
+def prune_task_health_history(cursor: sqlite3.Cursor, before: str) -> int:
+    """Deletes buckets starting before `before`; returns the number removed."""
+    cursor.execute("DELETE FROM task_health_history WHERE bucket_start < ?", (before,))
+    return cursor.rowcount
+
+
+def get_task_health_history(
+    cursor: sqlite3.Cursor, since: Optional[str] = None, limit: int = 168
+) -> List[Dict[str, Any]]:
+    """The most recent `limit` buckets (optionally from `since` on), oldest first."""
+    where_sql = "WHERE bucket_start >= ?" if since else ""
+    params: List[Any] = [since] if since else []
+    cursor.execute(
+        f"""
+        SELECT bucket_start, recorded_at, total, status_distribution,
+               priority_distribution, blocked_tasks, stale_tasks, health_score
+        FROM task_health_history {where_sql}
+        ORDER BY bucket_start DESC
+        LIMIT ?
+    """,
+        params + [limit],
+    )
+    return [
+        {
+            "bucket_start": row[0],
+            "recorded_at": row[1],
+            "total": row[2],
+            "status_distribution": json.loads(row[3] or "{}"),
+            "priority_distribution": json.loads(row[4] or "{}"),
+            "blocked_tasks": row[5],
+            "stale_tasks": row[6],
+            "health_score": row[7],
+        }
+        for row in reversed(cursor.fetchall())
+    ]
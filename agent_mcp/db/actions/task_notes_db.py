@@ -0,0 +1,135 @@
+# Agent-MCP/agent_mcp/db/actions/task_notes_db.py
+import datetime
+import json
+import sqlite3
+from typing import Any, Dict, List, Optional, Tuple
+
+from ...core.config import logger, TASK_NOTES_RECENT_LIMIT
+from ..connection import get_db_connection
+
+# Task notes live in the append-only 'task_notes' table, one row per note with an
+# index on (task_id, timestamp). Adding a note is a single INSERT instead of a
+# rewrite of the task's whole notes JSON. All helpers take the caller's cursor so
+# notes are written in the same transaction as the task change they describe.
+
+
+def make_task_note(
+    author: Optional[str], content: str, timestamp: Optional[str] = None
+) -> Dict[str, Any]:
+    """Note dict in the shape used everywhere notes are displayed."""
+    return {
+        "timestamp": timestamp or datetime.datetime.now().isoformat(),
+        "author": author,
+        "content": content,
+    }
+
+
+def append_task_note(
+    cursor: sqlite3.Cursor,
+    task_id: str,
+    author: Optional[str],
+    content: str,
+    timestamp: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Appends one note to a task and returns it."""
+    note = make_task_note(author, content, timestamp)
+    cursor.execute(
+        "INSERT INTO task_notes (task_id, timestamp, author, content) VALUES (?, ?, ?, ?)",
+        (task_id, note["timestamp"], note["author"], note["content"]),
+    )
+    return note
+
+
+def append_task_notes(
+    cursor: sqlite3.Cursor, task_notes: List[Tuple[str, Dict[str, Any]]]
+) -> None:
+    """Appends (task_id, note) pairs, in order, with one executemany."""
+    cursor.executemany(
+        "INSERT INTO task_notes (task_id, timestamp, author, content) VALUES (?, ?, ?, ?)",
+        [
+            (task_id, note["timestamp"], note["author"], note["content"])
+            for task_id, note in task_notes
+        ],
+    )
+
+
+def append_note_to_tasks(
+    cursor: sqlite3.Cursor, task_ids: List[str], note: Dict[str, Any]
+) -> None:
+    """Appends the same note to every task in `task_ids` with one executemany."""
+    append_task_notes(cursor, [(task_id, note) for task_id in task_ids])
+
+
+def get_recent_task_notes(
+    cursor: sqlite3.Cursor, task_id: str, limit: int
+) -> List[Dict[str, Any]]:
+    """The last `limit` notes of a task, oldest first."""
+    cursor.execute(
+        """
+        SELECT timestamp, author, content FROM task_notes
+        WHERE task_id = ?
+        ORDER BY timestamp DESC, id DESC
+        LIMIT ?
+    """,
+        (task_id, limit),
+    )
+    return [
+        {"timestamp": row[0], "author": row[1], "content": row[2]}
+        for row in reversed(cursor.fetchall())
+    ]
+
+
+def load_recent_task_notes(task_id: str) -> List[Dict[str, Any]]:
+    """
+    The last TASK_NOTES_RECENT_LIMIT notes of a task on a connection of its own;
+    the notes loader of the in-memory task cache.
+    """
+    conn = None
+    try:
+        conn = get_db_connection()
+        return get_recent_task_notes(conn.cursor(), task_id, TASK_NOTES_RECENT_LIMIT)
+    except sqlite3.Error as e:
+        logger.error(f"Database error loading notes of task '{task_id}': {e}", exc_info=True)
+        return []
+    finally:
+        if conn:
+            conn.close()
+
+
+def count_task_notes(cursor: sqlite3.Cursor, task_id: str) -> int:
+    cursor.execute("SELECT COUNT(*) FROM task_notes WHERE task_id = ?", (task_id,))
+    return cursor.fetchone()[0]
+
+
+def get_recent_notes_for_tasks(
+    cursor: sqlite3.Cursor, task_ids: Optional[List[str]], limit: int
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    The last `limit` notes (oldest first) of each task in `task_ids`, or of every
+    task when `task_ids` is None, in one query. Tasks without notes are omitted.
+    """
+    where_sql = ""
+    params: List[Any] = []
+    if task_ids is not None:
+        where_sql = "WHERE task_id IN (SELECT value FROM json_each(?))"
+        params.append(json.dumps(list(task_ids)))
+    cursor.execute(
+        f"""
+        SELECT task_id, timestamp, author, content FROM (
+            SELECT id, task_id, timestamp, author, content,
+                   ROW_NUMBER() OVER (
+                       PARTITION BY task_id ORDER BY timestamp DESC, id DESC
+                   ) AS recency
+            FROM task_notes {where_sql}
+        )
+        WHERE recency <= ?
+        ORDER BY task_id, timestamp, id
+    """,
+        params + [limit],
+    )
+    notes_by_task: Dict[str, List[Dict[str, Any]]] = {}
+    for row in cursor.fetchall():
+        notes_by_task.setdefault(row[0], []).append(
+            {"timestamp": row[1], "author": row[2], "content": row[3]}
+        )
+    return notes_by_task
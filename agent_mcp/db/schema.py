@@ -2,7 +2,9 @@
 import sqlite3
 
 # Imports from our own modules
-from ..core.config import logger, EMBEDDING_DIMENSION  # EMBEDDING_DIMENSION from config
+from typing import Optional
+
+from ..core.config import logger, EMBEDDING_DIMENSION, EMBEDDING_MODEL  # EMBEDDING_DIMENSION from config
 from .connection import get_db_connection, check_vss_loadability, is_vss_loadable
 
 # No direct need for globals here, VSS loadability is checked via connection module functions.
@@ -63,6 +65,98 @@ def check_embedding_dimension_compatibility(conn: sqlite3.Connection) -> bool:
         return False
 
 
+def get_embedding_table_dimension(conn: sqlite3.Connection) -> Optional[int]:
+    """Return the dimension of the existing rag_embeddings table, or None if unknown."""
+    cursor = conn.cursor()
+    cursor.execute(
+        "SELECT sql FROM sqlite_master WHERE type IN ('table', 'virtual') AND name='rag_embeddings'"
+    )
+    result = cursor.fetchone()
+    if result is None:
+        return None
+    import re
+
+    dimension_match = re.search(r"FLOAT\[(\d+)\]", result[0])
+    return int(dimension_match.group(1)) if dimension_match else None
+
+
+def _drop_derived_vector_indexes(cursor: sqlite3.Cursor, drop_prefix_tier: bool) -> None:
+    """
+    Drop the optional structures derived from rag_embeddings so the indexer's
+    maintenance step rebuilds them from the current vectors.
+    """
+    # IVF ANN index (features/rag/ann_index.py)
+    cursor.execute("DROP TABLE IF EXISTS rag_ann_centroids")
+    cursor.execute("DELETE FROM rag_ann_assignments")
+    cursor.execute("DELETE FROM rag_meta WHERE meta_key LIKE 'ann_%'")
+    # Quantized tier (features/rag/quantization.py)
+    cursor.execute("DROP TABLE IF EXISTS rag_embeddings_quantized")
+    cursor.execute("DELETE FROM rag_meta WHERE meta_key LIKE 'quant_%'")
+    # Short prefix tier (features/rag/matryoshka.py)
+    if drop_prefix_tier:
+        cursor.execute("DROP TABLE IF EXISTS rag_embeddings_short")
+        cursor.execute("DELETE FROM rag_meta WHERE meta_key LIKE 'matryoshka_%'")
+    logger.debug("Dropped derived vector indexes (ANN, quantized, prefix tier)")
+
+
+def truncate_embeddings_to_dimension(conn: sqlite3.Connection, current_dim: int) -> bool:
+    """
+    Shrink rag_embeddings to the configured EMBEDDING_DIMENSION without re-embedding.
+
+    text-embedding-3 models are trained so that the first N components of an
+    embedding, re-normalized, equal the embedding requested with `dimensions=N`.
+    Going down in dimension is therefore a pure SQL rewrite; going up still
+    needs a full re-embed (handled by handle_embedding_dimension_change).
+
+    Returns:
+        True if the table was migrated, False if a re-embed is required.
+    """
+    new_dim = int(EMBEDDING_DIMENSION)
+    if new_dim >= current_dim or not EMBEDDING_MODEL.startswith("text-embedding-3"):
+        return False
+
+    cursor = conn.cursor()
+    logger.info(
+        f"🔄 Truncating embeddings from {current_dim}D to {new_dim}D (no re-embedding needed)"
+    )
+    try:
+        cursor.execute("DROP TABLE IF EXISTS rag_embeddings_migration")
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE rag_embeddings_migration USING vec0(embedding FLOAT[{new_dim}])"
+        )
+        cursor.execute(
+            "INSERT INTO rag_embeddings_migration (rowid, embedding) "
+            "SELECT rowid, vec_normalize(vec_slice(embedding, 0, ?)) FROM rag_embeddings",
+            (new_dim,),
+        )
+        cursor.execute("DROP TABLE rag_embeddings")
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE rag_embeddings USING vec0(embedding FLOAT[{new_dim}])"
+        )
+        cursor.execute(
+            "INSERT INTO rag_embeddings (rowid, embedding) "
+            "SELECT rowid, embedding FROM rag_embeddings_migration"
+        )
+        cursor.execute("DROP TABLE rag_embeddings_migration")
+
+        # A shorter prefix tier is still a valid prefix of the truncated vectors
+        cursor.execute(
+            "SELECT meta_value FROM rag_meta WHERE meta_key = 'matryoshka_dimension'"
+        )
+        prefix_row = cursor.fetchone()
+        prefix_dim = int(prefix_row[0]) if prefix_row else 0
+        _drop_derived_vector_indexes(cursor, drop_prefix_tier=prefix_dim > new_dim)
+
+        conn.commit()
+        cursor.execute("SELECT COUNT(*) FROM rag_embeddings")
+        logger.info(f"✅ Truncated {cursor.fetchone()[0]} embeddings to {new_dim}D")
+        return True
+    except sqlite3.Error as e:
+        logger.error(f"❌ Embedding truncation failed, falling back to re-embedding: {e}")
+        conn.rollback()
+        return False
+
+
 def handle_embedding_dimension_change(conn: sqlite3.Connection) -> None:
     """
     Handle embedding dimension changes by dropping and recreating the embeddings table.
@@ -99,6 +193,9 @@ def handle_embedding_dimension_change(conn: sqlite3.Connection) -> None:
         cursor.execute("DROP TABLE IF EXISTS rag_embeddings")
         logger.debug("Dropped old rag_embeddings table")
 
+        # Derived vector indexes were built from the old vectors
+        _drop_derived_vector_indexes(cursor, drop_prefix_tier=True)
+
         # Clear all stored hashes to force re-indexing of all content
         cursor.execute("DELETE FROM rag_meta WHERE meta_key LIKE 'hash_%'")
         hash_count = cursor.rowcount
@@ -193,11 +290,246 @@ def init_database() -> None:
                 parent_task TEXT,         -- Task ID of parent task or None
                 child_tasks TEXT,         -- JSON List of child Task IDs
                 depends_on_tasks TEXT,    -- JSON List of Task IDs this task depends on
-                notes TEXT                -- JSON List of note objects: [{"timestamp": "", "author": "", "content": ""}]
+                notes TEXT                -- Legacy JSON list of notes, superseded by the task_notes table (kept as '[]')
+            )
+        """
+        )
+        # Task listing indexes: view_tasks filters and keyset-paginates in SQL
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_tasks_assignee_status_priority_updated ON tasks (assigned_to, status, priority, updated_at)"
+        )
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_tasks_parent_task ON tasks (parent_task)"
+        )
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_tasks_status_updated ON tasks (status, updated_at)"
+        )
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_tasks_created_at ON tasks (created_at, task_id)"
+        )
+        logger.debug("Tasks table and indexes ensured.")
+
+        # Task notes, one row per note. Appending a note is a single INSERT rather
+        # than a rewrite of a JSON array in the task row; views read only the most
+        # recent notes through the (task_id, timestamp) index.
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type='table' AND name='task_notes'"
+        )
+        task_notes_existed = cursor.fetchone() is not None
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS task_notes (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                task_id TEXT NOT NULL,
+                timestamp TEXT NOT NULL,
+                author TEXT,
+                content TEXT NOT NULL
+            )
+        """
+        )
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_task_notes_task_timestamp ON task_notes (task_id, timestamp)"
+        )
+        cursor.execute(
+            """
+            CREATE TRIGGER IF NOT EXISTS trg_tasks_notes_delete AFTER DELETE ON tasks BEGIN
+                DELETE FROM task_notes WHERE task_id = old.task_id;
+            END
+        """
+        )
+        if not task_notes_existed:
+            # Move notes out of the legacy tasks.notes JSON, keeping their order
+            cursor.execute(
+                """
+                INSERT INTO task_notes (task_id, timestamp, author, content)
+                SELECT t.task_id,
+                       COALESCE(json_extract(n.value, '$.timestamp'), t.updated_at),
+                       json_extract(n.value, '$.author'),
+                       COALESCE(json_extract(n.value, '$.content'), '')
+                FROM tasks t,
+                     json_each(CASE WHEN json_valid(t.notes) THEN t.notes ELSE '[]' END) n
+                WHERE n.type = 'object'
+                ORDER BY t.rowid, n.key
+            """
+            )
+            migrated_notes = cursor.rowcount
+            cursor.execute(
+                "UPDATE tasks SET notes = '[]' WHERE notes IS NULL OR notes != '[]'"
+            )
+            if migrated_notes:
+                logger.info(f"Migrated {migrated_notes} task notes into the task_notes table.")
+        logger.debug("Task_notes table and index ensured.")
+
+        # Full-text indexes for search_tasks. 'tasks_fts' is a standalone FTS5 table
+        # over title and description keyed by tasks.rowid; 'task_notes_fts' is an
+        # external-content index over task_notes keyed by task_notes.id, so adding
+        # a note indexes just that note. Both are maintained by triggers.
+        try:
+            cursor.execute(
+                "SELECT name FROM sqlite_master WHERE type='table' AND name='tasks_fts'"
+            )
+            tasks_fts_existed = cursor.fetchone() is not None
+            cursor.execute(
+                """
+                CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5(
+                    task_id UNINDEXED, title, description
+                )
+            """
+            )
+            cursor.execute(
+                """
+                CREATE TRIGGER IF NOT EXISTS trg_tasks_fts_insert AFTER INSERT ON tasks BEGIN
+                    INSERT INTO tasks_fts (rowid, task_id, title, description)
+                    VALUES (new.rowid, new.task_id, new.title, new.description);
+                END
+            """
+            )
+            cursor.execute(
+                """
+                CREATE TRIGGER IF NOT EXISTS trg_tasks_fts_update AFTER UPDATE OF title, description ON tasks BEGIN
+                    DELETE FROM tasks_fts WHERE rowid = old.rowid;
+                    INSERT INTO tasks_fts (rowid, task_id, title, description)
+                    VALUES (new.rowid, new.task_id, new.title, new.description);
+                END
+            """
+            )
+            cursor.execute(
+                """
+                CREATE TRIGGER IF NOT EXISTS trg_tasks_fts_delete AFTER DELETE ON tasks BEGIN
+                    DELETE FROM tasks_fts WHERE rowid = old.rowid;
+                END
+            """
+            )
+            if not tasks_fts_existed:
+                # Backfill tasks created before the FTS table existed
+                cursor.execute(
+                    """
+                    INSERT INTO tasks_fts (rowid, task_id, title, description)
+                    SELECT rowid, task_id, title, description FROM tasks
+                """
+                )
+
+            cursor.execute(
+                "SELECT name FROM sqlite_master WHERE type='table' AND name='task_notes_fts'"
+            )
+            task_notes_fts_existed = cursor.fetchone() is not None
+            cursor.execute(
+                """
+                CREATE VIRTUAL TABLE IF NOT EXISTS task_notes_fts USING fts5(
+                    content, content='task_notes', content_rowid='id'
+                )
+            """
+            )
+            cursor.execute(
+                """
+                CREATE TRIGGER IF NOT EXISTS trg_task_notes_fts_insert AFTER INSERT ON task_notes BEGIN
+                    INSERT INTO task_notes_fts (rowid, content) VALUES (new.id, new.content);
+                END
+            """
+            )
+            cursor.execute(
+                """
+                CREATE TRIGGER IF NOT EXISTS trg_task_notes_fts_delete AFTER DELETE ON task_notes BEGIN
+                    INSERT INTO task_notes_fts (task_notes_fts, rowid, content)
+                    VALUES ('delete', old.id, old.content);
+                END
+            """
+            )
+            if not task_notes_fts_existed:
+                cursor.execute("INSERT INTO task_notes_fts (task_notes_fts) VALUES ('rebuild')")
+            logger.debug("Tasks_fts and task_notes_fts tables and triggers ensured.")
+        except sqlite3.OperationalError as e_fts:
+            # FTS5 may be missing from some SQLite builds; search_tasks falls back to a scan.
+            logger.warning(
+                f"Could not create FTS5 indexes for tasks: {e_fts}. search_tasks will scan tasks in memory."
+            )
+
+        # Task relationship edges, a normalized copy of tasks.depends_on_tasks and
+        # tasks.child_tasks. Lets dependents/children be looked up by index instead
+        # of scanning and JSON-decoding every task. Triggers on 'tasks' keep it in
+        # step with the JSON columns, whichever code path writes them.
+        #   kind = 'depends_on': from_task depends on to_task
+        #   kind = 'child':      to_task is a child of from_task
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type='table' AND name='task_edges'"
+        )
+        task_edges_existed = cursor.fetchone() is not None
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS task_edges (
+                from_task TEXT NOT NULL,
+                to_task TEXT NOT NULL,
+                kind TEXT NOT NULL,      -- 'depends_on' or 'child'
+                PRIMARY KEY (from_task, to_task, kind)
+            ) WITHOUT ROWID
+        """
+        )
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_task_edges_reverse ON task_edges (to_task, kind)"
+        )
+        # Malformed JSON is treated as an empty list rather than failing the task write
+        for column, kind in (("depends_on_tasks", "depends_on"), ("child_tasks", "child")):
+            edge_rows_sql = f"""
+                SELECT new.task_id, value, '{kind}'
+                FROM json_each(CASE WHEN json_valid(new.{column}) THEN new.{column} ELSE '[]' END)
+                WHERE type = 'text'
+            """
+            cursor.execute(
+                f"""
+                CREATE TRIGGER IF NOT EXISTS trg_tasks_edges_insert_{kind} AFTER INSERT ON tasks BEGIN
+                    INSERT OR IGNORE INTO task_edges (from_task, to_task, kind) {edge_rows_sql};
+                END
+            """
+            )
+            cursor.execute(
+                f"""
+                CREATE TRIGGER IF NOT EXISTS trg_tasks_edges_update_{kind} AFTER UPDATE OF {column} ON tasks BEGIN
+                    DELETE FROM task_edges WHERE from_task = old.task_id AND kind = '{kind}';
+                    INSERT OR IGNORE INTO task_edges (from_task, to_task, kind) {edge_rows_sql};
+                END
+            """
+            )
+        cursor.execute(
+            """
+            CREATE TRIGGER IF NOT EXISTS trg_tasks_edges_delete AFTER DELETE ON tasks BEGIN
+                DELETE FROM task_edges WHERE from_task = old.task_id;
+            END
+        """
+        )
+        if not task_edges_existed:
+            # Backfill edges for tasks created before the table existed
+            for column, kind in (("depends_on_tasks", "depends_on"), ("child_tasks", "child")):
+                cursor.execute(
+                    f"""
+                    INSERT OR IGNORE INTO task_edges (from_task, to_task, kind)
+                    SELECT t.task_id, j.value, '{kind}'
+                    FROM tasks t,
+                         json_each(CASE WHEN json_valid(t.{column}) THEN t.{column} ELSE '[]' END) AS j
+                    WHERE j.type = 'text'
+                """
+                )
+            cursor.execute("SELECT COUNT(*) FROM task_edges")
+            logger.info(f"Backfilled {cursor.fetchone()[0]} task edges from task JSON columns.")
+        logger.debug("Task_edges table, index and triggers ensured.")
+
+        # Task health history: one row per time bucket, written by the background
+        # snapshot loop from the incrementally maintained health aggregates
+        # (core/task_health.py). Rewriting a bucket keeps its latest values.
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS task_health_history (
+                bucket_start TEXT PRIMARY KEY,
+                recorded_at TEXT NOT NULL,
+                total INTEGER NOT NULL,
+                status_distribution TEXT NOT NULL,
+                priority_distribution TEXT NOT NULL,
+                blocked_tasks INTEGER NOT NULL,
+                stale_tasks INTEGER NOT NULL,
+                health_score REAL NOT NULL
             )
         """
         )
-        logger.debug("Tasks table ensured.")
+        logger.debug("Task_health_history table ensured.")
 
         # Agent Actions Table (Original main.py lines 306-317)
         cursor.execute(
@@ -233,7 +565,10 @@ def init_database() -> None:
             )
         """
         )
-        logger.debug("Project_context table ensured.")
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_project_context_last_updated ON project_context (last_updated)"
+        )
+        logger.debug("Project_context table and index ensured.")
 
         # File Metadata Table (Original main.py lines 333-340)
         cursor.execute(
@@ -268,6 +603,82 @@ def init_database() -> None:
         )
         logger.debug("Rag_chunks table and index ensured.")
 
+        # Full-text index over rag_chunks (keyword candidates for RAG re-ranking).
+        # External-content FTS5 table kept in sync by triggers, so the indexer
+        # does not need to know about it.
+        try:
+            cursor.execute(
+                "SELECT name FROM sqlite_master WHERE type='table' AND name='rag_chunks_fts'"
+            )
+            rag_fts_existed = cursor.fetchone() is not None
+            cursor.execute(
+                """
+                CREATE VIRTUAL TABLE IF NOT EXISTS rag_chunks_fts USING fts5(
+                    chunk_text, source_ref,
+                    content='rag_chunks', content_rowid='chunk_id'
+                )
+            """
+            )
+            cursor.execute(
+                """
+                CREATE TRIGGER IF NOT EXISTS trg_rag_chunks_fts_insert AFTER INSERT ON rag_chunks BEGIN
+                    INSERT INTO rag_chunks_fts (rowid, chunk_text, source_ref)
+                    VALUES (new.chunk_id, new.chunk_text, new.source_ref);
+                END
+            """
+            )
+            cursor.execute(
+                """
+                CREATE TRIGGER IF NOT EXISTS trg_rag_chunks_fts_delete AFTER DELETE ON rag_chunks BEGIN
+                    INSERT INTO rag_chunks_fts (rag_chunks_fts, rowid, chunk_text, source_ref)
+                    VALUES ('delete', old.chunk_id, old.chunk_text, old.source_ref);
+                END
+            """
+            )
+            cursor.execute(
+                """
+                CREATE TRIGGER IF NOT EXISTS trg_rag_chunks_fts_update AFTER UPDATE ON rag_chunks BEGIN
+                    INSERT INTO rag_chunks_fts (rag_chunks_fts, rowid, chunk_text, source_ref)
+                    VALUES ('delete', old.chunk_id, old.chunk_text, old.source_ref);
+                    INSERT INTO rag_chunks_fts (rowid, chunk_text, source_ref)
+                    VALUES (new.chunk_id, new.chunk_text, new.source_ref);
+                END
+            """
+            )
+            if not rag_fts_existed:
+                # Backfill chunks indexed before the FTS table existed
+                cursor.execute(
+                    "INSERT INTO rag_chunks_fts (rag_chunks_fts) VALUES ('rebuild')"
+                )
+            logger.debug("Rag_chunks_fts table and triggers ensured.")
+        except sqlite3.OperationalError as e_fts:
+            # FTS5 may be missing from some SQLite builds; keyword candidates are optional.
+            logger.warning(
+                f"Could not create FTS5 index 'rag_chunks_fts': {e_fts}. RAG re-ranking will use vector candidates only."
+            )
+
+        # IVF list assignments for the optional ANN index (features/rag/ann_index.py).
+        # Centroids live in the 'rag_ann_centroids' vec0 table created when the index is built.
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS rag_ann_assignments (
+                chunk_id INTEGER PRIMARY KEY, -- rag_chunks.chunk_id / rag_embeddings.rowid
+                list_id INTEGER NOT NULL      -- rag_ann_centroids.rowid
+            )
+        """
+        )
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_rag_ann_assignments_list ON rag_ann_assignments (list_id)"
+        )
+        cursor.execute(
+            """
+            CREATE TRIGGER IF NOT EXISTS trg_rag_chunks_ann_delete AFTER DELETE ON rag_chunks BEGIN
+                DELETE FROM rag_ann_assignments WHERE chunk_id = old.chunk_id;
+            END
+        """
+        )
+        logger.debug("Rag_ann_assignments table, index and trigger ensured.")
+
         # RAG Meta Table (for tracking indexing progress, hashes, etc.)
         # (Original main.py lines 355-362)
         cursor.execute(
@@ -358,10 +769,14 @@ def init_database() -> None:
         if vss_is_actually_loadable:
             # Check if we need to handle dimension changes
             if not check_embedding_dimension_compatibility(conn):
-                logger.warning(
-                    "Embedding dimension has changed. Recreating embeddings table..."
-                )
-                handle_embedding_dimension_change(conn)
+                current_dim = get_embedding_table_dimension(conn)
+                if current_dim is None or not truncate_embeddings_to_dimension(
+                    conn, current_dim
+                ):
+                    logger.warning(
+                        "Embedding dimension has changed. Recreating embeddings table..."
+                    )
+                    handle_embedding_dimension_change(conn)
 
             try:
                 # Explicitly define the embedding column and its dimensions.
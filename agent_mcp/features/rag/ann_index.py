@@ -0,0 +1,347 @@
+# Agent-MCP/agent_mcp/features/rag/ann_index.py
+"""
+Optional IVF (inverted file) approximate nearest neighbor index over rag_embeddings.
+
+Centroids are sampled from the stored vectors, refined with a few k-means
+passes, and kept in the `rag_ann_centroids` vec0 table. Every chunk is assigned
+to its nearest centroid in `rag_ann_assignments`. A query only scans the
+RAG_ANN_NPROBE closest lists and computes exact distances for those candidates,
+instead of brute-forcing the whole table.
+
+The index lives inside mcp_state.db next to the vectors it covers, so it
+survives restarts and stays consistent with indexer inserts (`add_to_ann_index`)
+and deletes (the `trg_rag_chunks_ann_delete` trigger).
+"""
+import array
+import datetime
+import math
+import random
+import sqlite3
+from typing import List, Dict, Any, Optional, Sequence, Tuple
+
+from ...core.config import (
+    logger,
+    EMBEDDING_DIMENSION,
+    RAG_ANN_ENABLED,
+    RAG_ANN_MIN_VECTORS,
+    RAG_ANN_NLIST,
+    RAG_ANN_NPROBE,
+    RAG_ANN_TRAINING_ITERATIONS,
+    RAG_ANN_REBUILD_GROWTH,
+)
+from ...db.connection import get_db_connection, is_vss_loadable
+
+# rag_meta keys describing the current index
+ANN_META_NLIST = "ann_ivf_nlist"
+ANN_META_VECTOR_COUNT = "ann_ivf_vector_count"
+ANN_META_BUILT_AT = "ann_ivf_built_at"
+
+MIN_NLIST = 16
+MAX_NLIST = 4096
+TRAINING_SAMPLE_PER_LIST = 16  # k-means training vectors per centroid
+ASSIGNMENT_COMMIT_BATCH = 1000  # keep write transactions short while assigning
+
+_NEAREST_LIST_FOR_CHUNK_SQL = """
+    SELECT rowid FROM rag_ann_centroids
+    WHERE embedding MATCH (SELECT embedding FROM rag_embeddings WHERE rowid = ?) AND k = 1
+"""
+
+
+def is_ann_index_ready(cursor: sqlite3.Cursor) -> bool:
+    """True when a trained IVF index exists and may be used for queries."""
+    cursor.execute(
+        "SELECT meta_value FROM rag_meta WHERE meta_key = ?", (ANN_META_NLIST,)
+    )
+    if cursor.fetchone() is None:
+        return False
+    cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE name = 'rag_ann_centroids'"
+    )
+    return cursor.fetchone() is not None
+
+
+def _get_meta_int(cursor: sqlite3.Cursor, key: str) -> Optional[int]:
+    cursor.execute("SELECT meta_value FROM rag_meta WHERE meta_key = ?", (key,))
+    row = cursor.fetchone()
+    try:
+        return int(row[0]) if row else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _write_centroids(cursor: sqlite3.Cursor, centroids: Sequence[array.array]) -> None:
+    cursor.execute("DELETE FROM rag_ann_centroids")
+    cursor.executemany(
+        "INSERT INTO rag_ann_centroids (rowid, embedding) VALUES (?, ?)",
+        [(list_id, centroid.tobytes()) for list_id, centroid in enumerate(centroids, 1)],
+    )
+
+
+def _open_training_connection() -> sqlite3.Connection:
+    """In-memory connection with sqlite-vec for k-means, so training holds no lock on mcp_state.db."""
+    import sqlite_vec  # Importable whenever is_vss_loadable()
+
+    conn = sqlite3.connect(":memory:")
+    conn.enable_load_extension(True)
+    sqlite_vec.load(conn)
+    conn.enable_load_extension(False)
+    conn.execute(
+        f"CREATE VIRTUAL TABLE centroids USING vec0(embedding FLOAT[{int(EMBEDDING_DIMENSION)}])"
+    )
+    return conn
+
+
+def _train_centroids(cursor: sqlite3.Cursor, nlist: int, vector_count: int) -> List[array.array]:
+    """
+    Sample `nlist` centroids and refine them with k-means over a training sample.
+    Only reads from `cursor`; the k-means passes run on an in-memory connection.
+    """
+    sample_size = min(vector_count, nlist * TRAINING_SAMPLE_PER_LIST)
+    cursor.execute(
+        "SELECT embedding FROM rag_embeddings ORDER BY random() LIMIT ?", (sample_size,)
+    )
+    sample: List[array.array] = []
+    for row in cursor.fetchall():
+        vector = array.array("f")
+        vector.frombytes(row[0])
+        sample.append(vector)
+
+    centroids = [array.array("f", vector) for vector in random.sample(sample, nlist)]
+    training_conn = _open_training_connection()
+    try:
+        training_cursor = training_conn.cursor()
+        for iteration in range(RAG_ANN_TRAINING_ITERATIONS):
+            training_cursor.execute("DELETE FROM centroids")
+            training_cursor.executemany(
+                "INSERT INTO centroids (rowid, embedding) VALUES (?, ?)",
+                [(list_id, centroid.tobytes()) for list_id, centroid in enumerate(centroids, 1)],
+            )
+            members: Dict[int, List[array.array]] = {}
+            for vector in sample:
+                training_cursor.execute(
+                    "SELECT rowid FROM centroids WHERE embedding MATCH ? AND k = 1",
+                    (vector.tobytes(),),
+                )
+                members.setdefault(training_cursor.fetchone()[0], []).append(vector)
+
+            # Move each centroid to the mean of its members; empty lists keep their centroid
+            for list_id, assigned in members.items():
+                count = len(assigned)
+                centroids[list_id - 1] = array.array(
+                    "f", (sum(column) / count for column in zip(*assigned))
+                )
+            logger.debug(
+                f"ANN index: k-means pass {iteration + 1}/{RAG_ANN_TRAINING_ITERATIONS} "
+                f"({len(members)}/{nlist} lists populated)"
+            )
+    finally:
+        training_conn.close()
+    return centroids
+
+
+def _assign_chunks(conn: sqlite3.Connection, chunk_ids: Sequence[int]) -> int:
+    """Assign chunks to their nearest list, committing in small batches."""
+    cursor = conn.cursor()
+    pending: List[Tuple[int, int]] = []
+    assigned = 0
+    for chunk_id in chunk_ids:
+        cursor.execute(_NEAREST_LIST_FOR_CHUNK_SQL, (chunk_id,))
+        row = cursor.fetchone()
+        if row is None:
+            continue
+        pending.append((chunk_id, row[0]))
+        if len(pending) >= ASSIGNMENT_COMMIT_BATCH:
+            cursor.executemany(
+                "INSERT OR REPLACE INTO rag_ann_assignments (chunk_id, list_id) VALUES (?, ?)",
+                pending,
+            )
+            conn.commit()
+            assigned += len(pending)
+            pending = []
+    if pending:
+        cursor.executemany(
+            "INSERT OR REPLACE INTO rag_ann_assignments (chunk_id, list_id) VALUES (?, ?)",
+            pending,
+        )
+        conn.commit()
+        assigned += len(pending)
+    return assigned
+
+
+def build_ann_index(conn: sqlite3.Connection, force: bool = False) -> Dict[str, Any]:
+    """
+    (Re)build the IVF index from scratch: train centroids and assign every vector.
+    The index is marked unavailable while building, so queries fall back to exact search.
+
+    Args:
+        conn: Connection with sqlite-vec loaded.
+        force: Build even if the table is smaller than RAG_ANN_MIN_VECTORS.
+
+    Returns:
+        Build statistics.
+    """
+    cursor = conn.cursor()
+    cursor.execute("SELECT COUNT(*) FROM rag_embeddings")
+    vector_count = cursor.fetchone()[0]
+    if vector_count < MIN_NLIST or (not force and vector_count < RAG_ANN_MIN_VECTORS):
+        return {"built": False, "vector_count": vector_count}
+
+    nlist = RAG_ANN_NLIST or int(math.sqrt(vector_count))
+    nlist = max(MIN_NLIST, min(nlist, MAX_NLIST, vector_count))
+    logger.info(f"🧭 Building IVF ANN index: {vector_count} vectors, {nlist} lists")
+    started = datetime.datetime.now()
+
+    # Train with no transaction open; the existing index keeps serving meanwhile
+    centroids = _train_centroids(cursor, nlist, vector_count)
+
+    # Hide the index from queries until it is complete, and store the centroids
+    # in one short transaction
+    cursor.execute(
+        "DELETE FROM rag_meta WHERE meta_key IN (?, ?, ?)",
+        (ANN_META_NLIST, ANN_META_VECTOR_COUNT, ANN_META_BUILT_AT),
+    )
+    cursor.execute("DROP TABLE IF EXISTS rag_ann_centroids")
+    cursor.execute(
+        f"CREATE VIRTUAL TABLE rag_ann_centroids USING vec0(embedding FLOAT[{int(EMBEDDING_DIMENSION)}])"
+    )
+    cursor.execute("DELETE FROM rag_ann_assignments")
+    _write_centroids(cursor, centroids)
+    conn.commit()
+
+    cursor.execute("SELECT rowid FROM rag_embeddings")
+    chunk_ids = [row[0] for row in cursor.fetchall()]
+    assigned = _assign_chunks(conn, chunk_ids)
+
+    cursor.executemany(
+        "INSERT OR REPLACE INTO rag_meta (meta_key, meta_value) VALUES (?, ?)",
+        [
+            (ANN_META_NLIST, str(nlist)),
+            (ANN_META_VECTOR_COUNT, str(vector_count)),
+            (ANN_META_BUILT_AT, datetime.datetime.now().isoformat()),
+        ],
+    )
+    conn.commit()
+
+    elapsed = (datetime.datetime.now() - started).total_seconds()
+    logger.info(
+        f"✅ IVF ANN index built in {elapsed:.1f}s ({assigned} vectors assigned to {nlist} lists)"
+    )
+    return {
+        "built": True,
+        "vector_count": vector_count,
+        "nlist": nlist,
+        "assigned": assigned,
+        "seconds": elapsed,
+    }
+
+
+def add_to_ann_index(cursor: sqlite3.Cursor, chunk_id: int) -> None:
+    """
+    Assign a freshly inserted rag_embeddings row to its IVF list.
+    No-op until an index has been built. Runs inside the caller's transaction.
+    """
+    if not is_ann_index_ready(cursor):
+        return
+    cursor.execute(_NEAREST_LIST_FOR_CHUNK_SQL, (chunk_id,))
+    row = cursor.fetchone()
+    if row is not None:
+        cursor.execute(
+            "INSERT OR REPLACE INTO rag_ann_assignments (chunk_id, list_id) VALUES (?, ?)",
+            (chunk_id, row[0]),
+        )
+
+
+def ann_search(
+    cursor: sqlite3.Cursor, query_embedding: Any, k: int, nprobe: Optional[int] = None
+) -> List[Tuple[int, float]]:
+    """
+    Approximate KNN: scan the `nprobe` closest lists and rank their members exactly.
+
+    Args:
+        query_embedding: Query vector as a JSON string or float32 blob.
+        k: Number of neighbours to return.
+        nprobe: Lists to scan (defaults to RAG_ANN_NPROBE).
+
+    Returns:
+        (chunk_id, L2 distance) pairs ordered by distance, comparable to vec0's `distance`.
+    """
+    cursor.execute(
+        "SELECT rowid FROM rag_ann_centroids WHERE embedding MATCH ? AND k = ?",
+        (query_embedding, nprobe or RAG_ANN_NPROBE),
+    )
+    list_ids = [row[0] for row in cursor.fetchall()]
+    if not list_ids:
+        return []
+
+    placeholders = ",".join("?" * len(list_ids))
+    cursor.execute(
+        f"""
+        SELECT a.chunk_id, vec_distance_l2(e.embedding, ?) AS distance
+        FROM rag_ann_assignments a
+        JOIN rag_embeddings e ON e.rowid = a.chunk_id
+        WHERE a.list_id IN ({placeholders})
+        ORDER BY distance
+        LIMIT ?
+    """,
+        (query_embedding, *list_ids, k),
+    )
+    return [(row[0], row[1]) for row in cursor.fetchall()]
+
+
+def refresh_ann_index() -> None:
+    """
+    Background maintenance for the IVF index, run after each indexing cycle.
+
+    Builds the index once the table reaches RAG_ANN_MIN_VECTORS, retrains it when
+    the table has grown or shrunk by RAG_ANN_REBUILD_GROWTH, and otherwise assigns
+    any vectors that were inserted without an assignment. Opens its own connection,
+    so it can run in a worker thread.
+    """
+    if not RAG_ANN_ENABLED or not is_vss_loadable():
+        return
+
+    conn = None
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type='table' AND name='rag_embeddings'"
+        )
+        if cursor.fetchone() is None:
+            return
+
+        if not is_ann_index_ready(cursor):
+            build_ann_index(conn)
+            return
+
+        cursor.execute("SELECT COUNT(*) FROM rag_embeddings")
+        vector_count = cursor.fetchone()[0]
+        built_count = _get_meta_int(cursor, ANN_META_VECTOR_COUNT) or 0
+        if (
+            vector_count > built_count * RAG_ANN_REBUILD_GROWTH
+            or vector_count * RAG_ANN_REBUILD_GROWTH < built_count
+        ):
+            logger.info(
+                f"ANN index: vector count changed from {built_count} to {vector_count}, retraining centroids"
+            )
+            build_ann_index(conn)
+            return
+
+        cursor.execute(
+            "SELECT rowid FROM rag_embeddings WHERE rowid NOT IN (SELECT chunk_id FROM rag_ann_assignments)"
+        )
+        unassigned = [row[0] for row in cursor.fetchall()]
+        if unassigned:
+            assigned = _assign_chunks(conn, unassigned)
+            logger.info(f"ANN index: assigned {assigned} previously unindexed vectors")
+    except sqlite3.Error as e:
+        logger.error(f"ANN index maintenance failed: {e}", exc_info=True)
+        if conn:
+            conn.rollback()
+    except Exception as e:
+        logger.error(f"Unexpected error during ANN index maintenance: {e}", exc_info=True)
+        if conn:
+            conn.rollback()
+    finally:
+        if conn:
+            conn.close()
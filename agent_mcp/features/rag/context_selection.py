@@ -0,0 +1,204 @@
+# Agent-MCP/agent_mcp/features/rag/context_selection.py
+"""
+Bounded task-analysis context for query_rag_system_with_model.
+
+Instead of every project_context row and every active task, the prompt gets a
+fixed-size, relevance-ranked selection:
+
+1. the focus tasks (proposed parent/dependencies) with their ancestors and a
+   depth-limited subtree, read with recursive CTEs over idx_tasks_parent_task,
+   plus the root task so the single-root rule can be checked
+2. the top-k tasks most similar to the query by vector search
+3. the most recently updated active tasks
+4. the most recently updated project context keys
+
+Every query is LIMITed, so the work per call does not grow with the number of
+tasks, and rendering stops at TASK_CONTEXT_TOKEN_BUDGET.
+"""
+import json
+import sqlite3
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from ...core.config import (
+    logger,
+    TASK_CONTEXT_ANCESTOR_DEPTH,
+    TASK_CONTEXT_SUBTREE_DEPTH,
+    TASK_CONTEXT_SUBTREE_LIMIT,
+    TASK_CONTEXT_RECENT_TASKS,
+    TASK_CONTEXT_RECENT_KEYS,
+)
+
+TASK_COLUMNS = (
+    "task_id, title, description, status, created_by, assigned_to, "
+    "priority, parent_task, depends_on_tasks, created_at, updated_at"
+)
+
+
+def fetch_task_hierarchy(
+    cursor: sqlite3.Cursor, focus_task_ids: Sequence[str]
+) -> List[Dict[str, Any]]:
+    """
+    The focus tasks, their ancestors (nearest first) and descendants up to
+    TASK_CONTEXT_SUBTREE_DEPTH levels (at most TASK_CONTEXT_SUBTREE_LIMIT),
+    each with a 'relation' of focus/ancestor/descendant and its 'depth'.
+    """
+    if not focus_task_ids:
+        return []
+    focus_json = json.dumps(list(focus_task_ids))
+    cursor.execute(
+        f"""
+        WITH RECURSIVE
+        ancestors(task_id, depth) AS (
+            SELECT parent_task, 1 FROM tasks
+            WHERE task_id IN (SELECT value FROM json_each(?)) AND parent_task IS NOT NULL
+            UNION
+            SELECT t.parent_task, a.depth + 1 FROM tasks t JOIN ancestors a ON t.task_id = a.task_id
+            WHERE t.parent_task IS NOT NULL AND a.depth < ?
+        ),
+        subtree(task_id, depth) AS (
+            SELECT value, 0 FROM json_each(?)
+            UNION
+            SELECT t.task_id, s.depth + 1 FROM tasks t JOIN subtree s ON t.parent_task = s.task_id
+            WHERE s.depth < ?
+            LIMIT ?
+        ),
+        related(task_id, relation, depth) AS (
+            SELECT task_id, 'ancestor', MIN(depth) FROM ancestors GROUP BY task_id
+            UNION ALL
+            SELECT task_id, CASE WHEN depth = 0 THEN 'focus' ELSE 'descendant' END, MIN(depth)
+            FROM subtree GROUP BY task_id
+        )
+        SELECT {TASK_COLUMNS}, related.relation, related.depth
+        FROM related JOIN tasks USING (task_id)
+        ORDER BY CASE related.relation WHEN 'focus' THEN 0 WHEN 'ancestor' THEN 1 ELSE 2 END,
+                 related.depth, tasks.updated_at DESC
+    """,
+        (
+            focus_json,
+            TASK_CONTEXT_ANCESTOR_DEPTH,
+            focus_json,
+            TASK_CONTEXT_SUBTREE_DEPTH,
+            len(focus_task_ids) + TASK_CONTEXT_SUBTREE_LIMIT,
+        ),
+    )
+    return [dict(row) for row in cursor.fetchall()]
+
+
+def fetch_root_tasks(cursor: sqlite3.Cursor, limit: int = 3) -> List[Dict[str, Any]]:
+    cursor.execute(
+        f"SELECT {TASK_COLUMNS} FROM tasks WHERE parent_task IS NULL ORDER BY created_at LIMIT ?",
+        (limit,),
+    )
+    return [dict(row, relation="root") for row in cursor.fetchall()]
+
+
+def fetch_tasks_by_id(cursor: sqlite3.Cursor, task_ids: Sequence[str]) -> List[Dict[str, Any]]:
+    """Tasks in the order of `task_ids` (missing ones skipped)."""
+    if not task_ids:
+        return []
+    cursor.execute(
+        f"""
+        SELECT {TASK_COLUMNS} FROM tasks
+        JOIN json_each(?) AS wanted ON wanted.value = tasks.task_id
+        ORDER BY wanted.key
+    """,
+        (json.dumps(list(task_ids)),),
+    )
+    return [dict(row, relation="similar") for row in cursor.fetchall()]
+
+
+def fetch_recent_active_tasks(cursor: sqlite3.Cursor, limit: int) -> List[Dict[str, Any]]:
+    cursor.execute(
+        f"""
+        SELECT {TASK_COLUMNS} FROM tasks
+        WHERE status IN ('pending', 'in_progress')
+        ORDER BY updated_at DESC
+        LIMIT ?
+    """,
+        (limit,),
+    )
+    return [dict(row, relation="recent") for row in cursor.fetchall()]
+
+
+def fetch_recent_context(cursor: sqlite3.Cursor, limit: int) -> List[Dict[str, Any]]:
+    # Served by idx_project_context_last_updated
+    cursor.execute(
+        """
+        SELECT context_key, value, description, last_updated FROM project_context
+        ORDER BY last_updated DESC
+        LIMIT ?
+    """,
+        (limit,),
+    )
+    return [dict(row) for row in cursor.fetchall()]
+
+
+def select_task_context(
+    cursor: sqlite3.Cursor,
+    focus_task_ids: Optional[Sequence[str]] = None,
+    similar_task_ids: Optional[Sequence[str]] = None,
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    (tasks, context_entries) for a task-analysis prompt, most relevant first.
+    Each task appears once, under its most relevant relation.
+    """
+    focus = [task_id for task_id in (focus_task_ids or []) if task_id]
+    candidates = (
+        fetch_task_hierarchy(cursor, focus)
+        + fetch_root_tasks(cursor)
+        + fetch_tasks_by_id(cursor, list(similar_task_ids or []))
+        + fetch_recent_active_tasks(cursor, TASK_CONTEXT_RECENT_TASKS)
+    )
+    tasks: List[Dict[str, Any]] = []
+    seen = set()
+    for task in candidates:
+        if task["task_id"] not in seen:
+            seen.add(task["task_id"])
+            tasks.append(task)
+    context_entries = fetch_recent_context(cursor, TASK_CONTEXT_RECENT_KEYS)
+    logger.debug(
+        f"Task analysis context: {len(tasks)} tasks, {len(context_entries)} context keys selected."
+    )
+    return tasks, context_entries
+
+
+def _format_task(task: Dict[str, Any]) -> str:
+    entry_text = f"Task ID: {task['task_id']} [{task.get('relation', 'related')}]\nTitle: {task['title']}\nDescription: {task['description']}\nStatus: {task['status']}\n"
+    entry_text += f"Priority: {task['priority']}\nAssigned To: {task['assigned_to']}\nCreated By: {task['created_by']}\n"
+    entry_text += f"Parent Task: {task['parent_task']}\nDependencies: {task['depends_on_tasks']}\n"
+    entry_text += f"Created: {task['created_at']}\nUpdated: {task['updated_at']}\n"
+    return entry_text
+
+
+def render_task_context(
+    tasks: List[Dict[str, Any]],
+    context_entries: List[Dict[str, Any]],
+    token_budget: int,
+) -> Tuple[List[str], int]:
+    """Prompt sections for the selection, stopping each at the shared token budget."""
+    context_parts: List[str] = []
+    current_token_count = 0
+
+    if tasks:
+        context_parts.append("=== Relevant Tasks (hierarchy, similar, recent) ===")
+        for task in tasks:
+            entry_text = _format_task(task)
+            chunk_tokens = len(entry_text.split())
+            if current_token_count + chunk_tokens >= token_budget:
+                context_parts.append("--- [Tasks truncated due to token limit] ---")
+                break
+            context_parts.append(entry_text)
+            current_token_count += chunk_tokens
+
+    if context_entries:
+        context_parts.append("\n=== Recent Project Context ===")
+        for item in context_entries:
+            entry_text = f"Key: {item['context_key']}\nDescription: {item['description']}\nValue: {item['value']}\nLast Updated: {item['last_updated']}\n"
+            chunk_tokens = len(entry_text.split())
+            if current_token_count + chunk_tokens >= token_budget:
+                context_parts.append("--- [Project context truncated due to token limit] ---")
+                break
+            context_parts.append(entry_text)
+            current_token_count += chunk_tokens
+
+    return context_parts, current_token_count
@@ -25,6 +25,9 @@ from ...core.config import (
     get_project_dir,
     OPENAI_API_KEY_ENV,  # Also import the API key env variable
     ADVANCED_EMBEDDINGS,  # Import advanced mode flag at module level
+    RAG_ANN_ENABLED,
+    RAG_QUANTIZATION,
+    RAG_MATRYOSHKA_DIMENSION,
 )
 from ...core import globals as g  # For server_running flag
 from ...db.connection import get_db_connection, is_vss_loadable
@@ -45,6 +48,11 @@ from .code_chunking import (
     CODE_EXTENSIONS,
     DOCUMENT_EXTENSIONS,
 )
+from .vectors import (
+    store_chunk_embedding,
+    delete_source_embeddings,
+    maintain_vector_indexes,
+)
 
 # Original location: main.py lines 512 - 826 (run_rag_indexing_periodically function and its logic)
 
@@ -455,10 +463,7 @@ async def run_rag_indexing_periodically(
                         "SELECT name FROM sqlite_master WHERE type='table' AND name='rag_embeddings'"
                     )
                     if cursor.fetchone() is not None:
-                        res_emb = cursor.execute(
-                            "DELETE FROM rag_embeddings WHERE rowid IN (SELECT chunk_id FROM rag_chunks WHERE source_type = ? AND source_ref = ?)",
-                            (source_type, source_ref),
-                        )
+                        delete_source_embeddings(cursor, source_type, source_ref)
                     # Delete from chunks
                     res_chk = cursor.execute(
                         "DELETE FROM rag_chunks WHERE source_type = ? AND source_ref = ?",
@@ -711,9 +716,8 @@ async def run_rag_indexing_periodically(
                                 chunk_rowid = cursor.lastrowid  # This is the chunk_id
 
                                 embedding_json_str = json.dumps(embedding_vector)
-                                cursor.execute(
-                                    "INSERT INTO rag_embeddings (rowid, embedding) VALUES (?, ?)",
-                                    (chunk_rowid, embedding_json_str),
+                                store_chunk_embedding(
+                                    cursor, chunk_rowid, embedding_json_str
                                 )
                                 inserted_count += 1
                                 # Mark this source's hash to be updated in rag_meta
@@ -840,6 +844,11 @@ async def run_rag_indexing_periodically(
             if conn:
                 conn.close()
 
+        # Keep the optional IVF index / prefix / quantized tiers in step with this cycle's
+        # inserts and deletes. Building them can take a while, so use a worker thread.
+        if RAG_ANN_ENABLED or RAG_QUANTIZATION != "none" or RAG_MATRYOSHKA_DIMENSION:
+            await anyio.to_thread.run_sync(maintain_vector_indexes)
+
         elapsed_cycle_time = time.time() - cycle_start_time
         logger.info(
             f"RAG index update cycle finished in {elapsed_cycle_time:.2f} seconds."
@@ -886,11 +895,7 @@ async def index_task_data(task_id: str, task_data: Dict[str, Any]) -> None:
         chunks = simple_chunker(content, chunk_size=2000)
 
         # Delete existing chunks for this task
-        cursor.execute(
-            "DELETE FROM rag_embeddings WHERE rowid IN "
-            "(SELECT chunk_id FROM rag_chunks WHERE source_type = ? AND source_ref = ?)",
-            ("task", task_id),
-        )
+        delete_source_embeddings(cursor, "task", task_id)
         cursor.execute(
             "DELETE FROM rag_chunks WHERE source_type = ? AND source_ref = ?",
             ("task", task_id),
@@ -923,10 +928,7 @@ async def index_task_data(task_id: str, task_data: Dict[str, Any]) -> None:
 
                 # Insert embedding
                 embedding_json_str = json.dumps(embedding_vector)
-                cursor.execute(
-                    "INSERT INTO rag_embeddings (rowid, embedding) VALUES (?, ?)",
-                    (chunk_id, embedding_json_str),
-                )
+                store_chunk_embedding(cursor, chunk_id, embedding_json_str)
 
             except Exception as e:
                 logger.error(f"Error generating embedding for task {task_id}: {e}")
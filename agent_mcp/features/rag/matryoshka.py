@@ -0,0 +1,167 @@
+# Agent-MCP/agent_mcp/features/rag/matryoshka.py
+"""
+Matryoshka prefix tier for rag_embeddings.
+
+text-embedding-3 embeddings keep most of their meaning in the leading
+components: the first N values, re-normalized, are what the API returns for
+`dimensions=N`. With RAG_MATRYOSHKA_DIMENSION set, a short prefix copy of every
+vector is kept in `rag_embeddings_short`. Queries search the short copy for
+k * RAG_MATRYOSHKA_OVERSAMPLE candidates and rerank them with the full vectors.
+
+The prefix is computed in SQL from the stored full vectors
+(vec_normalize(vec_slice(...))), so changing RAG_MATRYOSHKA_DIMENSION only
+rebuilds this table and never calls the embedding API.
+"""
+import json
+import sqlite3
+from typing import Any, Dict, List, Optional, Tuple
+
+from ...core.config import (
+    logger,
+    EMBEDDING_DIMENSION,
+    EMBEDDING_MODEL,
+    RAG_MATRYOSHKA_DIMENSION,
+    RAG_MATRYOSHKA_OVERSAMPLE,
+)
+from ...db.connection import get_db_connection, is_vss_loadable
+
+PREFIX_TABLE = "rag_embeddings_short"
+PREFIX_META_DIMENSION = "matryoshka_dimension"  # rag_meta key; set once backfilled
+BACKFILL_BATCH = 1000
+
+
+def is_prefix_tier_enabled() -> bool:
+    """The tier only makes sense for a shorter prefix of a text-embedding-3 vector."""
+    return (
+        0 < RAG_MATRYOSHKA_DIMENSION < EMBEDDING_DIMENSION
+        and EMBEDDING_MODEL.startswith("text-embedding-3")
+    )
+
+
+def is_prefix_tier_ready(cursor: sqlite3.Cursor) -> bool:
+    """True when rag_embeddings_short holds prefixes of the configured length."""
+    if not is_prefix_tier_enabled():
+        return False
+    cursor.execute(
+        "SELECT meta_value FROM rag_meta WHERE meta_key = ?", (PREFIX_META_DIMENSION,)
+    )
+    row = cursor.fetchone()
+    return row is not None and row[0] == str(RAG_MATRYOSHKA_DIMENSION)
+
+
+def add_prefix_embedding(cursor: sqlite3.Cursor, chunk_id: int, embedding_json: str) -> None:
+    """Mirror a newly stored embedding into the prefix tier (inside the caller's transaction)."""
+    if not is_prefix_tier_ready(cursor):
+        return
+    cursor.execute(
+        f"INSERT INTO {PREFIX_TABLE} (rowid, embedding) VALUES (?, vec_normalize(vec_slice(?, 0, ?)))",
+        (chunk_id, embedding_json, RAG_MATRYOSHKA_DIMENSION),
+    )
+
+
+def _backfill_prefix_table(conn: sqlite3.Connection, missing_only: bool) -> int:
+    cursor = conn.cursor()
+    if missing_only:
+        cursor.execute(
+            f"SELECT rowid FROM rag_embeddings WHERE rowid NOT IN (SELECT rowid FROM {PREFIX_TABLE})"
+        )
+    else:
+        cursor.execute("SELECT rowid FROM rag_embeddings")
+    chunk_ids = [row[0] for row in cursor.fetchall()]
+
+    for start in range(0, len(chunk_ids), BACKFILL_BATCH):
+        cursor.execute(
+            f"INSERT INTO {PREFIX_TABLE} (rowid, embedding) "
+            f"SELECT e.rowid, vec_normalize(vec_slice(e.embedding, 0, ?)) "
+            f"FROM json_each(?) AS pending JOIN rag_embeddings e ON e.rowid = pending.value",
+            (RAG_MATRYOSHKA_DIMENSION, json.dumps(chunk_ids[start : start + BACKFILL_BATCH])),
+        )
+        conn.commit()
+    return len(chunk_ids)
+
+
+def prefix_search(
+    cursor: sqlite3.Cursor,
+    query_embedding: Any,
+    k: int,
+    oversample: Optional[int] = None,
+) -> List[Tuple[int, float]]:
+    """
+    First-pass KNN over the short prefixes, then rerank the candidates by exact
+    L2 distance on the full vectors.
+
+    Returns:
+        (chunk_id, L2 distance) pairs ordered by distance, comparable to vec0's `distance`.
+    """
+    candidate_count = k * (oversample or RAG_MATRYOSHKA_OVERSAMPLE)
+    cursor.execute(
+        f"SELECT rowid FROM {PREFIX_TABLE} "
+        f"WHERE embedding MATCH vec_normalize(vec_slice(?, 0, ?)) AND k = ?",
+        (query_embedding, RAG_MATRYOSHKA_DIMENSION, candidate_count),
+    )
+    candidate_ids = [row[0] for row in cursor.fetchall()]
+    if not candidate_ids:
+        return []
+
+    cursor.execute(
+        """
+        SELECT e.rowid, vec_distance_l2(e.embedding, ?) AS distance
+        FROM json_each(?) AS candidate
+        JOIN rag_embeddings e ON e.rowid = candidate.value
+        ORDER BY distance
+        LIMIT ?
+    """,
+        (query_embedding, json.dumps(candidate_ids), k),
+    )
+    return [(row[0], row[1]) for row in cursor.fetchall()]
+
+
+def ensure_prefix_tier() -> Dict[str, Any]:
+    """
+    Create or resize the prefix tier when RAG_MATRYOSHKA_DIMENSION changes, and top
+    up vectors stored while it was being built. Opens its own connection.
+    """
+    if not is_prefix_tier_enabled() or not is_vss_loadable():
+        return {"ready": False}
+
+    conn = None
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type='table' AND name='rag_embeddings'"
+        )
+        if cursor.fetchone() is None:
+            return {"ready": False}
+
+        if is_prefix_tier_ready(cursor):
+            added = _backfill_prefix_table(conn, missing_only=True)
+            if added:
+                logger.info(f"Prefix tier: added {added} missing vectors")
+            return {"ready": True, "dimension": RAG_MATRYOSHKA_DIMENSION}
+
+        logger.info(
+            f"🪆 Building {RAG_MATRYOSHKA_DIMENSION}D prefix tier from {EMBEDDING_DIMENSION}D embeddings..."
+        )
+        cursor.execute("DELETE FROM rag_meta WHERE meta_key = ?", (PREFIX_META_DIMENSION,))
+        cursor.execute(f"DROP TABLE IF EXISTS {PREFIX_TABLE}")
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE {PREFIX_TABLE} USING vec0(embedding FLOAT[{int(RAG_MATRYOSHKA_DIMENSION)}])"
+        )
+        conn.commit()
+        count = _backfill_prefix_table(conn, missing_only=False)
+        cursor.execute(
+            "INSERT OR REPLACE INTO rag_meta (meta_key, meta_value) VALUES (?, ?)",
+            (PREFIX_META_DIMENSION, str(RAG_MATRYOSHKA_DIMENSION)),
+        )
+        conn.commit()
+        logger.info(f"✅ Prefix tier ready ({count} vectors, {RAG_MATRYOSHKA_DIMENSION}D)")
+        return {"ready": True, "dimension": RAG_MATRYOSHKA_DIMENSION, "vectors": count}
+    except sqlite3.Error as e:
+        logger.error(f"Failed to build prefix embedding tier: {e}", exc_info=True)
+        if conn:
+            conn.rollback()
+        return {"ready": False, "error": str(e)}
+    finally:
+        if conn:
+            conn.close()
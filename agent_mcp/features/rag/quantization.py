@@ -0,0 +1,233 @@
+# Agent-MCP/agent_mcp/features/rag/quantization.py
+"""
+Quantized first-pass tier for rag_embeddings.
+
+With RAG_QUANTIZATION set to "int8" or "binary", a compact copy of every vector
+is kept in the `rag_embeddings_quantized` vec0 table (1 byte or 1 bit per
+dimension instead of 4 bytes). Queries run KNN over the compact copy for
+k * RAG_QUANTIZATION_OVERSAMPLE candidates and rescore only those candidates
+against the full float32 vectors, which stay in rag_embeddings.
+
+- int8:   components are scaled by a fixed clip range derived from the dimension
+          and rounded; distances remain L2 and close to the float32 ordering.
+- binary: sign bits via sqlite-vec's vec_quantize_binary, compared by Hamming
+          distance; 32x smaller but needs more oversampling.
+"""
+import array
+import json
+import math
+import sqlite3
+from typing import Any, Dict, List, Optional, Tuple
+
+from ...core.config import (
+    logger,
+    EMBEDDING_DIMENSION,
+    RAG_QUANTIZATION,
+    RAG_QUANTIZATION_OVERSAMPLE,
+)
+from ...db.connection import get_db_connection, is_vss_loadable
+
+QUANTIZED_TABLE = "rag_embeddings_quantized"
+QUANT_META_MODE = "quant_mode"  # rag_meta key; set once the table is fully backfilled
+SUPPORTED_MODES = ("int8", "binary")
+BACKFILL_BATCH = 1000
+
+# Components of unit-length embeddings rarely exceed ~6 standard deviations
+_INT8_CLIP = min(1.0, 6.0 / math.sqrt(EMBEDDING_DIMENSION))
+
+
+def _column_type(mode: str, dimension: int) -> str:
+    return f"int8[{dimension}]" if mode == "int8" else f"bit[{dimension}]"
+
+
+def _decode_embedding(embedding: Any) -> List[float]:
+    """Accept a JSON string, a float list or a float32 blob and return floats."""
+    if isinstance(embedding, (bytes, bytearray, memoryview)):
+        values = array.array("f")
+        values.frombytes(bytes(embedding))
+        return values.tolist()
+    if isinstance(embedding, str):
+        return json.loads(embedding)
+    return list(embedding)
+
+
+def quantize_int8(embedding: Any) -> bytes:
+    """Scale into [-127, 127] using the fixed clip range and return raw int8 bytes."""
+    scale = 127.0 / _INT8_CLIP
+    return array.array(
+        "b",
+        (max(-127, min(127, int(round(v * scale)))) for v in _decode_embedding(embedding)),
+    ).tobytes()
+
+
+def _quantized_value_sql(mode: str) -> str:
+    """SQL expression turning a bound parameter into the tier's vector type."""
+    return "vec_int8(?)" if mode == "int8" else "vec_quantize_binary(?)"
+
+
+def _quantized_param(mode: str, embedding: Any) -> Any:
+    return quantize_int8(embedding) if mode == "int8" else embedding
+
+
+def create_quantized_table(
+    cursor: sqlite3.Cursor, mode: str, table: str = QUANTIZED_TABLE
+) -> None:
+    """(Re)create an empty quantized vec0 table for `mode`."""
+    cursor.execute(f"DROP TABLE IF EXISTS {table}")
+    cursor.execute(
+        f"CREATE VIRTUAL TABLE {table} USING vec0(embedding {_column_type(mode, int(EMBEDDING_DIMENSION))})"
+    )
+
+
+def backfill_quantized_table(
+    conn: sqlite3.Connection,
+    mode: str,
+    table: str = QUANTIZED_TABLE,
+    missing_only: bool = False,
+) -> int:
+    """
+    Populate a quantized table from the full vectors, no re-embedding needed.
+    With `missing_only`, only vectors without a quantized copy are added.
+    """
+    cursor = conn.cursor()
+    if missing_only:
+        cursor.execute(
+            f"SELECT rowid FROM rag_embeddings WHERE rowid NOT IN (SELECT rowid FROM {table})"
+        )
+    else:
+        cursor.execute("SELECT rowid FROM rag_embeddings")
+    chunk_ids = [row[0] for row in cursor.fetchall()]
+
+    inserted = 0
+    for start in range(0, len(chunk_ids), BACKFILL_BATCH):
+        batch = chunk_ids[start : start + BACKFILL_BATCH]
+        if mode == "binary":
+            # Quantized entirely inside SQLite from the stored float32 blobs
+            cursor.execute(
+                f"INSERT INTO {table} (rowid, embedding) "
+                f"SELECT e.rowid, vec_quantize_binary(e.embedding) "
+                f"FROM json_each(?) AS pending JOIN rag_embeddings e ON e.rowid = pending.value",
+                (json.dumps(batch),),
+            )
+            inserted += len(batch)
+        else:
+            rows: List[Tuple[int, bytes]] = []
+            for chunk_id in batch:
+                cursor.execute(
+                    "SELECT embedding FROM rag_embeddings WHERE rowid = ?", (chunk_id,)
+                )
+                row = cursor.fetchone()
+                if row is not None:
+                    rows.append((chunk_id, quantize_int8(row[0])))
+            cursor.executemany(
+                f"INSERT INTO {table} (rowid, embedding) VALUES (?, vec_int8(?))", rows
+            )
+            inserted += len(rows)
+        conn.commit()
+    return inserted
+
+
+def is_quantized_tier_ready(cursor: sqlite3.Cursor) -> bool:
+    """True when the quantized table matches the configured mode and is backfilled."""
+    if RAG_QUANTIZATION not in SUPPORTED_MODES:
+        return False
+    cursor.execute(
+        "SELECT meta_value FROM rag_meta WHERE meta_key = ?", (QUANT_META_MODE,)
+    )
+    row = cursor.fetchone()
+    return row is not None and row[0] == RAG_QUANTIZATION
+
+
+def add_quantized_embedding(cursor: sqlite3.Cursor, chunk_id: int, embedding_json: str) -> None:
+    """Mirror a newly stored embedding into the quantized tier (inside the caller's transaction)."""
+    if not is_quantized_tier_ready(cursor):
+        return
+    cursor.execute(
+        f"INSERT INTO {QUANTIZED_TABLE} (rowid, embedding) VALUES (?, {_quantized_value_sql(RAG_QUANTIZATION)})",
+        (chunk_id, _quantized_param(RAG_QUANTIZATION, embedding_json)),
+    )
+
+
+def quantized_search(
+    cursor: sqlite3.Cursor,
+    query_embedding: Any,
+    k: int,
+    mode: Optional[str] = None,
+    table: str = QUANTIZED_TABLE,
+    oversample: Optional[int] = None,
+) -> List[Tuple[int, float]]:
+    """
+    First-pass KNN over the quantized copy, then exact L2 rescoring of the
+    candidates against rag_embeddings.
+
+    Returns:
+        (chunk_id, L2 distance) pairs ordered by distance, comparable to vec0's `distance`.
+    """
+    mode = mode or RAG_QUANTIZATION
+    candidate_count = k * (oversample or RAG_QUANTIZATION_OVERSAMPLE)
+    cursor.execute(
+        f"SELECT rowid FROM {table} WHERE embedding MATCH {_quantized_value_sql(mode)} AND k = ?",
+        (_quantized_param(mode, query_embedding), candidate_count),
+    )
+    candidate_ids = [row[0] for row in cursor.fetchall()]
+    if not candidate_ids:
+        return []
+
+    cursor.execute(
+        """
+        SELECT e.rowid, vec_distance_l2(e.embedding, ?) AS distance
+        FROM json_each(?) AS candidate
+        JOIN rag_embeddings e ON e.rowid = candidate.value
+        ORDER BY distance
+        LIMIT ?
+    """,
+        (query_embedding, json.dumps(candidate_ids), k),
+    )
+    return [(row[0], row[1]) for row in cursor.fetchall()]
+
+
+def ensure_quantized_tier() -> Dict[str, Any]:
+    """
+    Create and backfill the quantized tier when RAG_QUANTIZATION changes.
+    Idempotent: once the tier is ready it only tops up missing vectors.
+    Opens its own connection, so it can run in a worker thread.
+    """
+    if RAG_QUANTIZATION not in SUPPORTED_MODES or not is_vss_loadable():
+        return {"ready": False}
+
+    conn = None
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        if is_quantized_tier_ready(cursor):
+            # Catch vectors stored while the tier was being (re)built
+            added = backfill_quantized_table(conn, RAG_QUANTIZATION, missing_only=True)
+            if added:
+                logger.info(f"Quantized tier: added {added} missing vectors")
+            return {"ready": True, "mode": RAG_QUANTIZATION}
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type='table' AND name='rag_embeddings'"
+        )
+        if cursor.fetchone() is None:
+            return {"ready": False}
+
+        logger.info(f"🗜️  Building {RAG_QUANTIZATION} quantized embedding tier...")
+        cursor.execute("DELETE FROM rag_meta WHERE meta_key = ?", (QUANT_META_MODE,))
+        create_quantized_table(cursor, RAG_QUANTIZATION)
+        conn.commit()
+        count = backfill_quantized_table(conn, RAG_QUANTIZATION)
+        cursor.execute(
+            "INSERT OR REPLACE INTO rag_meta (meta_key, meta_value) VALUES (?, ?)",
+            (QUANT_META_MODE, RAG_QUANTIZATION),
+        )
+        conn.commit()
+        logger.info(f"✅ Quantized tier ready ({count} vectors, mode={RAG_QUANTIZATION})")
+        return {"ready": True, "mode": RAG_QUANTIZATION, "vectors": count}
+    except sqlite3.Error as e:
+        logger.error(f"Failed to build quantized embedding tier: {e}", exc_info=True)
+        if conn:
+            conn.rollback()
+        return {"ready": False, "error": str(e)}
+    finally:
+        if conn:
+            conn.close()
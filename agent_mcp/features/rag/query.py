@@ -10,13 +10,261 @@ from ...core.config import (
     EMBEDDING_DIMENSION,
     CHAT_MODEL,
     MAX_CONTEXT_TOKENS,  # From main.py:182
+    RAG_RERANK_ENABLED,
+    RAG_RERANK_CANDIDATES,
+    RAG_RERANK_TOP_K,
+    TASK_CONTEXT_TOKEN_BUDGET,
+    TASK_CONTEXT_SIMILAR_TASKS,
 )
 from ...db.connection import get_db_connection, is_vss_loadable
+from .reranking import extract_query_terms, fetch_keyword_candidates, rerank_chunks
+from .vectors import find_nearest_chunks, find_nearest_sources
+from .context_selection import select_task_context, render_task_context
 from ...external.openai_service import get_openai_client
 
 # For OpenAI exceptions
 import openai
 
+# Number of chunks retrieved when re-ranking is disabled
+DEFAULT_VECTOR_K = 13  # Optimized based on recent RAG research
+
+
+def _search_indexed_knowledge(
+    cursor: sqlite3.Cursor, query_text: str, query_embedding_json: str
+) -> List[Dict[str, Any]]:
+    """
+    Retrieve indexed chunks for an embedded query.
+
+    Without re-ranking this is a plain k=13 nearest-neighbour search (exact vec0,
+    or the IVF index when RAG_ANN_ENABLED and built). With
+    RAG_RERANK_ENABLED, candidates are over-fetched from vec0 and the chunk FTS
+    index and only the RAG_RERANK_TOP_K best (by local re-ranking) are returned.
+    """
+    k_results = RAG_RERANK_CANDIDATES if RAG_RERANK_ENABLED else DEFAULT_VECTOR_K
+    nearest = find_nearest_chunks(cursor, query_embedding_json, k_results)
+    if not nearest:
+        return []
+
+    distances = dict(nearest)
+    placeholders = ",".join("?" * len(distances))
+    cursor.execute(
+        f"""
+        SELECT chunk_id, chunk_text, source_type, source_ref, metadata
+        FROM rag_chunks
+        WHERE chunk_id IN ({placeholders})
+    """,
+        list(distances),
+    )
+
+    results: List[Dict[str, Any]] = []
+    for row in sorted(cursor.fetchall(), key=lambda r: distances[r["chunk_id"]]):
+        result = dict(row)
+        result["distance"] = distances[result["chunk_id"]]
+        # Parse metadata JSON if present
+        if result.get("metadata"):
+            try:
+                result["metadata"] = json.loads(result["metadata"])
+            except json.JSONDecodeError:
+                result["metadata"] = None
+        results.append(result)
+
+    if not RAG_RERANK_ENABLED:
+        return results
+
+    keyword_candidates = fetch_keyword_candidates(
+        cursor, extract_query_terms(query_text), RAG_RERANK_CANDIDATES
+    )
+    return rerank_chunks(query_text, results, keyword_candidates, RAG_RERANK_TOP_K)
+
+
+RAG_SYSTEM_PROMPT = """You are an AI assistant answering questions about a software project. 
+Use the provided context, which may include recently updated live data (like project context keys or tasks) and information retrieved from an indexed knowledge base (like documentation or code summaries), to answer the user's query. 
+Prioritize information from the 'Live' sections if available and relevant for time-sensitive data. 
+Answer using *only* the information given in the context. If the context doesn't contain the answer, state that clearly.
+
+Be VERBOSE and comprehensive in your responses. It's better to give too much context than too little. 
+When answering, please also suggest additional context entries and queries that might be helpful for understanding this topic better.
+For example, suggest related files to examine, related project context keys to check, or follow-up questions that could provide more insight.
+Always err on the side of providing more detailed explanations and comprehensive information rather than brief responses."""
+
+
+def _fetch_live_context(cursor: sqlite3.Cursor) -> List[Dict[str, Any]]:
+    """Project context entries updated since the last indexing run (not yet embedded)."""
+    live_context_results: List[Dict[str, Any]] = []
+    try:
+        cursor.execute(
+            "SELECT meta_value FROM rag_meta WHERE meta_key = ?",
+            ("last_indexed_context",),
+        )
+        last_indexed_context_row = cursor.fetchone()
+        last_indexed_context_time = (
+            last_indexed_context_row["meta_value"]
+            if last_indexed_context_row
+            else "1970-01-01T00:00:00Z"
+        )
+
+        cursor.execute(
+            """
+            SELECT context_key, value, description, last_updated
+            FROM project_context
+            WHERE last_updated > ?
+            ORDER BY last_updated DESC
+            LIMIT 5
+        """,
+            (last_indexed_context_time,),
+        )
+        # Convert rows to dicts for easier processing
+        live_context_results = [dict(row) for row in cursor.fetchall()]
+    except sqlite3.Error as e_live_ctx:
+        logger.warning(
+            f"RAG Query: Failed to fetch live project context: {e_live_ctx}"
+        )
+    except Exception as e_live_ctx_other:  # Catch any other unexpected error
+        logger.warning(
+            f"RAG Query: Unexpected error fetching live project context: {e_live_ctx_other}",
+            exc_info=True,
+        )
+    return live_context_results
+
+
+def _fetch_live_tasks(
+    cursor: sqlite3.Cursor, query_text: str, limit: int = 5
+) -> List[Dict[str, Any]]:
+    """Most recently updated tasks whose title or description mention a query keyword."""
+    live_task_results: List[Dict[str, Any]] = []
+    try:
+        query_keywords = [
+            f"%{word.strip().lower()}%"
+            for word in query_text.split()
+            if len(word.strip()) > 2
+        ]
+        if query_keywords:
+            # Build LIKE clauses for title and description
+            # Ensure each keyword is used for both title and description search
+            conditions = []
+            sql_params_tasks: List[str] = []
+            for kw in query_keywords:
+                conditions.append("LOWER(title) LIKE ?")
+                sql_params_tasks.append(kw)
+                conditions.append("LOWER(description) LIKE ?")
+                sql_params_tasks.append(kw)
+
+            if conditions:
+                # Validate that all conditions are safe (only LIKE patterns)
+                safe_conditions = []
+                for condition in conditions:
+                    if condition not in [
+                        "LOWER(title) LIKE ?",
+                        "LOWER(description) LIKE ?",
+                    ]:
+                        logger.warning(
+                            f"RAG Query: Skipping unsafe condition: {condition}"
+                        )
+                        continue
+                    safe_conditions.append(condition)
+
+                if safe_conditions:
+                    where_clause = " OR ".join(safe_conditions)
+                    task_query_sql = f"""
+                        SELECT task_id, title, status, description, updated_at
+                        FROM tasks
+                        WHERE {where_clause}
+                        ORDER BY updated_at DESC
+                        LIMIT ?
+                    """
+                    cursor.execute(task_query_sql, sql_params_tasks + [limit])
+                live_task_results = [dict(row) for row in cursor.fetchall()]
+    except sqlite3.Error as e_live_task:
+        logger.warning(
+            f"RAG Query: Failed to fetch live tasks based on query keywords: {e_live_task}"
+        )
+    except Exception as e_live_task_other:
+        logger.warning(
+            f"RAG Query: Unexpected error fetching live tasks: {e_live_task_other}",
+            exc_info=True,
+        )
+    return live_task_results
+
+
+def _build_context_parts(
+    live_context_results: List[Dict[str, Any]],
+    live_task_results: List[Dict[str, Any]],
+    vector_search_results: List[Dict[str, Any]],
+) -> Tuple[List[str], int]:
+    """Render live data and retrieved chunks into prompt sections within MAX_CONTEXT_TOKENS."""
+    context_parts: List[str] = []
+    current_token_count: int = 0  # Approximate token count
+
+    # Add Live Context
+    if live_context_results:
+        context_parts.append("--- Recently Updated Project Context (Live) ---")
+        for item in live_context_results:
+            entry_text = f"Key: {item['context_key']}\nValue: {item['value']}\nDescription: {item.get('description', 'N/A')}\n(Updated: {item['last_updated']})\n"
+            entry_tokens = len(entry_text.split())  # Approximation
+            if current_token_count + entry_tokens < MAX_CONTEXT_TOKENS:
+                context_parts.append(entry_text)
+                current_token_count += entry_tokens
+            else:
+                break
+        context_parts.append("---------------------------------------------")
+
+    # Add Live Tasks
+    if live_task_results:
+        context_parts.append("--- Potentially Relevant Tasks (Live) ---")
+        for task in live_task_results:
+            entry_text = f"Task ID: {task['task_id']}\nTitle: {task['title']}\nStatus: {task['status']}\nDescription: {task.get('description', 'N/A')}\n(Updated: {task['updated_at']})\n"
+            entry_tokens = len(entry_text.split())
+            if current_token_count + entry_tokens < MAX_CONTEXT_TOKENS:
+                context_parts.append(entry_text)
+                current_token_count += entry_tokens
+            else:
+                break
+        context_parts.append("---------------------------------------")
+
+    # Add Indexed Knowledge (Vector Search Results)
+    if vector_search_results:
+        context_parts.append(
+            "--- Indexed Project Knowledge (Vector Search Results) ---"
+        )
+        for i, item in enumerate(vector_search_results):
+            chunk_text = item["chunk_text"]
+            source_type = item["source_type"]
+            source_ref = item["source_ref"]
+            metadata = item.get("metadata", {})
+            distance = item.get("distance", "N/A")
+
+            # Enhanced source info with metadata
+            source_info = f"Source Type: {source_type}, Reference: {source_ref}"
+
+            # Add code-specific metadata if available
+            if metadata and source_type in ["code", "code_summary"]:
+                if metadata.get("language"):
+                    source_info += f", Language: {metadata['language']}"
+                if metadata.get("section_type"):
+                    source_info += f", Section: {metadata['section_type']}"
+                if metadata.get("entities"):
+                    entity_names = [e.get("name", "") for e in metadata["entities"]]
+                    if entity_names:
+                        source_info += f", Contains: {', '.join(entity_names[:3])}"
+                        if len(entity_names) > 3:
+                            source_info += f" (+{len(entity_names)-3} more)"
+
+            entry_text = f"Retrieved Chunk {i+1} (Similarity/Distance: {distance}):\n{source_info}\nContent:\n{chunk_text}\n"
+            chunk_tokens = len(entry_text.split())
+            if current_token_count + chunk_tokens < MAX_CONTEXT_TOKENS:
+                context_parts.append(entry_text)
+                current_token_count += chunk_tokens
+            else:
+                context_parts.append(
+                    "--- [Indexed knowledge truncated due to token limit] ---"
+                )
+                break
+        context_parts.append(
+            "-------------------------------------------------------"
+        )
+    return context_parts, current_token_count
+
+
 # Original location: main.py lines 1432 - 1566 (ask_project_rag_tool function body)
 
 
@@ -55,93 +303,11 @@ async def query_rag_system(query_text: str) -> str:
 
         # --- 1. Fetch Live Context (Recently Updated) ---
         # Original main.py: lines 1445 - 1457
-        try:
-            cursor.execute(
-                "SELECT meta_value FROM rag_meta WHERE meta_key = ?",
-                ("last_indexed_context",),
-            )
-            last_indexed_context_row = cursor.fetchone()
-            last_indexed_context_time = (
-                last_indexed_context_row["meta_value"]
-                if last_indexed_context_row
-                else "1970-01-01T00:00:00Z"
-            )
-
-            cursor.execute(
-                """
-                SELECT context_key, value, description, last_updated
-                FROM project_context
-                WHERE last_updated > ?
-                ORDER BY last_updated DESC
-                LIMIT 5
-            """,
-                (last_indexed_context_time,),
-            )
-            # Convert rows to dicts for easier processing
-            live_context_results = [dict(row) for row in cursor.fetchall()]
-        except sqlite3.Error as e_live_ctx:
-            logger.warning(
-                f"RAG Query: Failed to fetch live project context: {e_live_ctx}"
-            )
-        except Exception as e_live_ctx_other:  # Catch any other unexpected error
-            logger.warning(
-                f"RAG Query: Unexpected error fetching live project context: {e_live_ctx_other}",
-                exc_info=True,
-            )
+        live_context_results = _fetch_live_context(cursor)
 
         # --- 2. Fetch Live Tasks (Keyword Search) ---
         # Original main.py: lines 1459 - 1477
-        try:
-            query_keywords = [
-                f"%{word.strip().lower()}%"
-                for word in query_text.split()
-                if len(word.strip()) > 2
-            ]
-            if query_keywords:
-                # Build LIKE clauses for title and description
-                # Ensure each keyword is used for both title and description search
-                conditions = []
-                sql_params_tasks: List[str] = []
-                for kw in query_keywords:
-                    conditions.append("LOWER(title) LIKE ?")
-                    sql_params_tasks.append(kw)
-                    conditions.append("LOWER(description) LIKE ?")
-                    sql_params_tasks.append(kw)
-
-                if conditions:
-                    # Validate that all conditions are safe (only LIKE patterns)
-                    safe_conditions = []
-                    for condition in conditions:
-                        if condition not in [
-                            "LOWER(title) LIKE ?",
-                            "LOWER(description) LIKE ?",
-                        ]:
-                            logger.warning(
-                                f"RAG Query: Skipping unsafe condition: {condition}"
-                            )
-                            continue
-                        safe_conditions.append(condition)
-
-                    if safe_conditions:
-                        where_clause = " OR ".join(safe_conditions)
-                        task_query_sql = f"""
-                            SELECT task_id, title, status, description, updated_at
-                            FROM tasks
-                            WHERE {where_clause}
-                            ORDER BY updated_at DESC
-                            LIMIT 5
-                        """
-                        cursor.execute(task_query_sql, sql_params_tasks)
-                    live_task_results = [dict(row) for row in cursor.fetchall()]
-        except sqlite3.Error as e_live_task:
-            logger.warning(
-                f"RAG Query: Failed to fetch live tasks based on query keywords: {e_live_task}"
-            )
-        except Exception as e_live_task_other:
-            logger.warning(
-                f"RAG Query: Unexpected error fetching live tasks: {e_live_task_other}",
-                exc_info=True,
-            )
+        live_task_results = _fetch_live_tasks(cursor, query_text)
 
         # --- 3. Perform Vector Search (Indexed Knowledge) ---
         # Original main.py: lines 1479 - 1506
@@ -161,28 +327,10 @@ async def query_rag_system(query_text: str) -> str:
                     query_embedding = response.data[0].embedding
                     query_embedding_json = json.dumps(query_embedding)
 
-                    # Search Vector Table with metadata
-                    k_results = 13  # Optimized based on recent RAG research
-                    sql_vector_search = """
-                        SELECT c.chunk_text, c.source_type, c.source_ref, c.metadata, r.distance
-                        FROM rag_embeddings r
-                        JOIN rag_chunks c ON r.rowid = c.chunk_id
-                        WHERE r.embedding MATCH ? AND k = ?
-                        ORDER BY r.distance
-                    """
-                    cursor.execute(sql_vector_search, (query_embedding_json, k_results))
-                    raw_results = cursor.fetchall()
-
-                    # Process results to parse metadata
-                    for row in raw_results:
-                        result = dict(row)
-                        # Parse metadata JSON if present
-                        if result.get("metadata"):
-                            try:
-                                result["metadata"] = json.loads(result["metadata"])
-                            except json.JSONDecodeError:
-                                result["metadata"] = None
-                        vector_search_results.append(result)
+                    # Search Vector Table with metadata (optionally re-ranked)
+                    vector_search_results = _search_indexed_knowledge(
+                        cursor, query_text, query_embedding_json
+                    )
                 else:
                     logger.warning(
                         "RAG Query: 'rag_embeddings' table not found. Skipping vector search."
@@ -209,76 +357,9 @@ async def query_rag_system(query_text: str) -> str:
 
         # --- 4. Combine Contexts for LLM ---
         # Original main.py: lines 1509 - 1548
-        context_parts: List[str] = []
-        current_token_count: int = 0  # Approximate token count
-
-        # Add Live Context
-        if live_context_results:
-            context_parts.append("--- Recently Updated Project Context (Live) ---")
-            for item in live_context_results:
-                entry_text = f"Key: {item['context_key']}\nValue: {item['value']}\nDescription: {item.get('description', 'N/A')}\n(Updated: {item['last_updated']})\n"
-                entry_tokens = len(entry_text.split())  # Approximation
-                if current_token_count + entry_tokens < MAX_CONTEXT_TOKENS:
-                    context_parts.append(entry_text)
-                    current_token_count += entry_tokens
-                else:
-                    break
-            context_parts.append("---------------------------------------------")
-
-        # Add Live Tasks
-        if live_task_results:
-            context_parts.append("--- Potentially Relevant Tasks (Live) ---")
-            for task in live_task_results:
-                entry_text = f"Task ID: {task['task_id']}\nTitle: {task['title']}\nStatus: {task['status']}\nDescription: {task.get('description', 'N/A')}\n(Updated: {task['updated_at']})\n"
-                entry_tokens = len(entry_text.split())
-                if current_token_count + entry_tokens < MAX_CONTEXT_TOKENS:
-                    context_parts.append(entry_text)
-                    current_token_count += entry_tokens
-                else:
-                    break
-            context_parts.append("---------------------------------------")
-
-        # Add Indexed Knowledge (Vector Search Results)
-        if vector_search_results:
-            context_parts.append(
-                "--- Indexed Project Knowledge (Vector Search Results) ---"
-            )
-            for i, item in enumerate(vector_search_results):
-                chunk_text = item["chunk_text"]
-                source_type = item["source_type"]
-                source_ref = item["source_ref"]
-                metadata = item.get("metadata", {})
-                distance = item.get("distance", "N/A")
-
-                # Enhanced source info with metadata
-                source_info = f"Source Type: {source_type}, Reference: {source_ref}"
-
-                # Add code-specific metadata if available
-                if metadata and source_type in ["code", "code_summary"]:
-                    if metadata.get("language"):
-                        source_info += f", Language: {metadata['language']}"
-                    if metadata.get("section_type"):
-                        source_info += f", Section: {metadata['section_type']}"
-                    if metadata.get("entities"):
-                        entity_names = [e.get("name", "") for e in metadata["entities"]]
-                        if entity_names:
-                            source_info += f", Contains: {', '.join(entity_names[:3])}"
-                            if len(entity_names) > 3:
-                                source_info += f" (+{len(entity_names)-3} more)"
-
-                entry_text = f"Retrieved Chunk {i+1} (Similarity/Distance: {distance}):\n{source_info}\nContent:\n{chunk_text}\n"
-                chunk_tokens = len(entry_text.split())
-                if current_token_count + chunk_tokens < MAX_CONTEXT_TOKENS:
-                    context_parts.append(entry_text)
-                    current_token_count += chunk_tokens
-                else:
-                    context_parts.append(
-                        "--- [Indexed knowledge truncated due to token limit] ---"
-                    )
-                    break
-            context_parts.append(
-                "-------------------------------------------------------"
-            )
+        context_parts, current_token_count = _build_context_parts(
+            live_context_results, live_task_results, vector_search_results
+        )
 
         if not context_parts:
             logger.info(
@@ -290,15 +371,7 @@ async def query_rag_system(query_text: str) -> str:
 
             # --- 5. Call Chat Completion API ---
             # Original main.py: lines 1550 - 1562
-            system_prompt_for_llm = """You are an AI assistant answering questions about a software project. 
-Use the provided context, which may include recently updated live data (like project context keys or tasks) and information retrieved from an indexed knowledge base (like documentation or code summaries), to answer the user's query. 
-Prioritize information from the 'Live' sections if available and relevant for time-sensitive data. 
-Answer using *only* the information given in the context. If the context doesn't contain the answer, state that clearly.
-
-Be VERBOSE and comprehensive in your responses. It's better to give too much context than too little. 
-When answering, please also suggest additional context entries and queries that might be helpful for understanding this topic better.
-For example, suggest related files to examine, related project context keys to check, or follow-up questions that could provide more insight.
-Always err on the side of providing more detailed explanations and comprehensive information rather than brief responses."""
+            system_prompt_for_llm = RAG_SYSTEM_PROMPT
 
             user_message_for_llm = f"CONTEXT:\n{combined_context_str}\n\nQUERY:\n{query_text}\n\nBased *only* on the CONTEXT provided above, please answer the QUERY."
 
@@ -337,8 +410,177 @@ Always err on the side of providing more detailed explanations and comprehensive
     return answer
 
 
+def _interleave_unique_chunks(
+    per_query_results: List[List[Dict[str, Any]]],
+) -> List[Dict[str, Any]]:
+    """Round-robin merge of several result lists, keeping the first copy of each chunk."""
+    merged: List[Dict[str, Any]] = []
+    seen_chunk_ids = set()
+    for rank in range(max((len(r) for r in per_query_results), default=0)):
+        for results in per_query_results:
+            if rank < len(results) and results[rank]["chunk_id"] not in seen_chunk_ids:
+                seen_chunk_ids.add(results[rank]["chunk_id"])
+                merged.append(results[rank])
+    return merged
+
+
+async def query_rag_system_batch(
+    queries: List[str], synthesize_together: bool = False
+) -> List[str]:
+    """
+    Answers several related questions with shared retrieval work.
+
+    All queries are embedded in a single embeddings call, live project context
+    and keyword-matched tasks are fetched once for the whole batch, and the
+    vector lookups run on one connection. With `synthesize_together`, one chat
+    completion answers every query from the merged context; otherwise each
+    query gets its own completion over the shared live data plus its own
+    retrieved chunks.
+
+    Args:
+        queries: The natural language questions.
+        synthesize_together: Answer all queries in a single completion.
+
+    Returns:
+        One answer per query, or a single combined answer when
+        `synthesize_together` is set. Errors are returned as answer text,
+        as in query_rag_system.
+    """
+    openai_client = get_openai_client()
+    if not openai_client:
+        logger.error("RAG Batch Query: OpenAI client is not available. Cannot process queries.")
+        error = "RAG Error: OpenAI client not available. Please check server configuration and OpenAI API key."
+        return [error] if synthesize_together else [error] * len(queries)
+
+    conn = None
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+
+        # --- 1. Shared live data for the whole batch ---
+        live_context_results = _fetch_live_context(cursor)
+        batch_keywords = " ".join(
+            dict.fromkeys(word for query in queries for word in query.split())
+        )
+        live_task_results = _fetch_live_tasks(
+            cursor, batch_keywords, limit=min(5 * len(queries), 20)
+        )
+
+        # --- 2. One embeddings call, then a KNN lookup per query ---
+        per_query_results: List[List[Dict[str, Any]]] = [[] for _ in queries]
+        if is_vss_loadable():
+            try:
+                cursor.execute(
+                    "SELECT name FROM sqlite_master WHERE type='table' AND name='rag_embeddings'"
+                )
+                if cursor.fetchone() is not None:
+                    response = openai_client.embeddings.create(
+                        input=queries,
+                        model=EMBEDDING_MODEL,
+                        dimensions=EMBEDDING_DIMENSION,
+                    )
+                    for item in response.data:
+                        per_query_results[item.index] = _search_indexed_knowledge(
+                            cursor, queries[item.index], json.dumps(item.embedding)
+                        )
+                else:
+                    logger.warning(
+                        "RAG Batch Query: 'rag_embeddings' table not found. Skipping vector search."
+                    )
+            except sqlite3.Error as e_vec_sql:
+                logger.error(
+                    f"RAG Batch Query: Database error during vector search: {e_vec_sql}"
+                )
+            except openai.APIError as e_openai_emb:
+                logger.error(
+                    f"RAG Batch Query: OpenAI API error during query embedding: {e_openai_emb}"
+                )
+        else:
+            logger.warning(
+                "RAG Batch Query: Vector search (sqlite-vec) is not available. Skipping vector search."
+            )
+
+        # --- 3. Chat completion(s) ---
+        if synthesize_together:
+            context_parts, current_token_count = _build_context_parts(
+                live_context_results,
+                live_task_results,
+                _interleave_unique_chunks(per_query_results),
+            )
+            if not context_parts:
+                return [
+                    "No relevant information found in the project knowledge base or live data for these queries."
+                ]
+            numbered_queries = "\n".join(
+                f"{i + 1}. {query}" for i, query in enumerate(queries)
+            )
+            combined_context_str = "\n\n".join(context_parts)
+            user_message_for_llm = (
+                f"CONTEXT:\n{combined_context_str}\n\nQUERIES:\n{numbered_queries}\n\n"
+                "Based *only* on the CONTEXT provided above, answer each QUERY in order. "
+                "Start each answer with a heading of the form '### Query <number>: <query>'."
+            )
+            logger.debug(
+                f"RAG Batch Query: {len(queries)} queries, combined context approx tokens: {current_token_count}"
+            )
+            chat_response = openai_client.chat.completions.create(
+                model=CHAT_MODEL,
+                messages=[
+                    {"role": "system", "content": RAG_SYSTEM_PROMPT},
+                    {"role": "user", "content": user_message_for_llm},
+                ],
+                temperature=0.4,
+            )
+            return [chat_response.choices[0].message.content]
+
+        answers: List[str] = []
+        for query_text, vector_search_results in zip(queries, per_query_results):
+            context_parts, _ = _build_context_parts(
+                live_context_results, live_task_results, vector_search_results
+            )
+            if not context_parts:
+                answers.append(
+                    "No relevant information found in the project knowledge base or live data for your query."
+                )
+                continue
+            combined_context_str = "\n\n".join(context_parts)
+            user_message_for_llm = f"CONTEXT:\n{combined_context_str}\n\nQUERY:\n{query_text}\n\nBased *only* on the CONTEXT provided above, please answer the QUERY."
+            try:
+                chat_response = openai_client.chat.completions.create(
+                    model=CHAT_MODEL,
+                    messages=[
+                        {"role": "system", "content": RAG_SYSTEM_PROMPT},
+                        {"role": "user", "content": user_message_for_llm},
+                    ],
+                    temperature=0.4,
+                )
+                answers.append(chat_response.choices[0].message.content)
+            except openai.APIError as e_openai:
+                logger.error(f"RAG Batch Query: OpenAI API error: {e_openai}")
+                answers.append(f"Error communicating with OpenAI: {e_openai}")
+        return answers
+
+    except openai.APIError as e_openai:
+        logger.error(f"RAG Batch Query: OpenAI API error: {e_openai}", exc_info=True)
+        error = f"Error communicating with OpenAI: {e_openai}"
+    except sqlite3.Error as e_sql:
+        logger.error(f"RAG Batch Query: Database error: {e_sql}", exc_info=True)
+        error = f"Error querying RAG database: {e_sql}"
+    except Exception as e_unexpected:
+        logger.error(f"RAG Batch Query: Unexpected error: {e_unexpected}", exc_info=True)
+        error = f"An unexpected error occurred during the RAG batch query: {str(e_unexpected)}"
+    finally:
+        if conn:
+            conn.close()
+
+    return [error] if synthesize_together else [error] * len(queries)
+
+
 async def query_rag_system_with_model(
-    query_text: str, model_name: str, max_tokens: int = None
+    query_text: str,
+    model_name: str,
+    max_tokens: int = None,
+    focus_task_ids: Optional[List[str]] = None,
 ) -> str:
     """
     Processes a query using the RAG system with a specific OpenAI model.
@@ -349,6 +591,8 @@ async def query_rag_system_with_model(
         query_text: The natural language question from the user.
         model_name: The OpenAI model name to use (e.g., 'gpt-3.5-turbo-16k')
         max_tokens: The maximum context tokens for this model
+        focus_task_ids: Tasks the query is about (e.g. proposed parent and
+            dependencies); their ancestors and subtree are put in the context
 
     Returns:
         A string containing the answer or an error message.
@@ -359,8 +603,9 @@ async def query_rag_system_with_model(
         logger.error("RAG Query: OpenAI client is not available. Cannot process query.")
         return "RAG Error: OpenAI client not available. Please check server configuration and OpenAI API key."
 
-    # Use provided max_tokens or default to the configured value
-    context_limit = max_tokens if max_tokens else MAX_CONTEXT_TOKENS
+    # Context is a bounded selection (features/rag/context_selection.py), so its
+    # size no longer tracks the number of tasks and context keys
+    context_limit = min(max_tokens or MAX_CONTEXT_TOKENS, TASK_CONTEXT_TOKEN_BUDGET)
 
     conn = None
     answer = "An unexpected error occurred during the RAG query."
@@ -369,28 +614,9 @@ async def query_rag_system_with_model(
         conn = get_db_connection()
         cursor = conn.cursor()
 
-        live_context_results: List[Dict[str, Any]] = []
-        live_task_results: List[Dict[str, Any]] = []
+        similar_task_ids: List[str] = []
         vector_search_results: List[Dict[str, Any]] = []
 
-        # Get live context (same as regular RAG)
-        cursor.execute(
-            "SELECT context_key, value, description, last_updated FROM project_context ORDER BY last_updated DESC"
-        )
-        live_context_results = [dict(row) for row in cursor.fetchall()]
-
-        # Get live tasks (same as regular RAG)
-        cursor.execute(
-            """
-            SELECT task_id, title, description, status, created_by, assigned_to, 
-                   priority, parent_task, depends_on_tasks, created_at, updated_at 
-            FROM tasks 
-            WHERE status IN ('pending', 'in_progress') 
-            ORDER BY updated_at DESC
-        """
-        )
-        live_task_results = [dict(row) for row in cursor.fetchall()]
-
         # Get vector search results if VSS is available
         if is_vss_loadable():
             try:
@@ -408,28 +634,22 @@ async def query_rag_system_with_model(
                     query_embedding = query_embedding_response.data[0].embedding
                     query_embedding_json = json.dumps(query_embedding)
 
-                    # Perform vector search using sqlite-vec (matching working implementation)
-                    k_results = 13  # Optimized based on recent RAG research
-                    vector_search_sql = """
-                        SELECT c.chunk_text, c.source_type, c.source_ref, c.metadata, r.distance
-                        FROM rag_embeddings r
-                        JOIN rag_chunks c ON r.rowid = c.chunk_id
-                        WHERE r.embedding MATCH ? AND k = ?
-                        ORDER BY r.distance
-                    """
-                    cursor.execute(vector_search_sql, (query_embedding_json, k_results))
-                    raw_results = cursor.fetchall()
-
-                    # Process results to parse metadata
-                    for row in raw_results:
-                        result = dict(row)
-                        # Parse metadata JSON if present
-                        if result.get("metadata"):
-                            try:
-                                result["metadata"] = json.loads(result["metadata"])
-                            except json.JSONDecodeError:
-                                result["metadata"] = None
-                        vector_search_results.append(result)
+                    # Tasks most similar to the query go in the task section
+                    similar_task_ids = [
+                        task_id
+                        for task_id, _distance in find_nearest_sources(
+                            cursor, query_embedding_json, "task", TASK_CONTEXT_SIMILAR_TASKS
+                        )
+                    ]
+
+                    # Perform vector search using sqlite-vec (optionally re-ranked)
+                    vector_search_results = [
+                        item
+                        for item in _search_indexed_knowledge(
+                            cursor, query_text, query_embedding_json
+                        )
+                        if item["source_type"] != "task"
+                    ]
                 else:
                     logger.warning(
                         "RAG Query: 'rag_embeddings' table not found. Skipping vector search."
@@ -448,44 +668,13 @@ async def query_rag_system_with_model(
                     exc_info=True,
                 )
 
-        # Build context (same structure as regular RAG)
-        context_parts = []
-        current_token_count = 0
-
-        # Include live context
-        if live_context_results:
-            context_parts.append("=== Live Project Context ===")
-            for item in live_context_results:
-                entry_text = f"Key: {item['context_key']}\nDescription: {item['description']}\nValue: {item['value']}\nLast Updated: {item['last_updated']}\n"
-                chunk_tokens = len(entry_text.split())
-                if current_token_count + chunk_tokens < context_limit:
-                    context_parts.append(entry_text)
-                    current_token_count += chunk_tokens
-                else:
-                    context_parts.append(
-                        "--- [Live context truncated due to token limit] ---"
-                    )
-                    break
-
-        # Include live tasks
-        if live_task_results:
-            context_parts.append("\n=== Live Task Information ===")
-            for item in live_task_results:
-                entry_text = f"Task ID: {item['task_id']}\nTitle: {item['title']}\nDescription: {item['description']}\nStatus: {item['status']}\n"
-                entry_text += f"Priority: {item['priority']}\nAssigned To: {item['assigned_to']}\nCreated By: {item['created_by']}\n"
-                entry_text += f"Parent Task: {item['parent_task']}\nDependencies: {item['depends_on_tasks']}\n"
-                entry_text += (
-                    f"Created: {item['created_at']}\nUpdated: {item['updated_at']}\n"
-                )
-                chunk_tokens = len(entry_text.split())
-                if current_token_count + chunk_tokens < context_limit:
-                    context_parts.append(entry_text)
-                    current_token_count += chunk_tokens
-                else:
-                    context_parts.append(
-                        "--- [Live tasks truncated due to token limit] ---"
-                    )
-                    break
+        # Related, similar and recent tasks plus recent context keys, within budget
+        selected_tasks, context_entries = select_task_context(
+            cursor, focus_task_ids, similar_task_ids
+        )
+        context_parts, current_token_count = render_task_context(
+            selected_tasks, context_entries, context_limit
+        )
 
         # Include vector search results
         if vector_search_results:
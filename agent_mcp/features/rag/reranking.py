@@ -0,0 +1,193 @@
+# Agent-MCP/agent_mcp/features/rag/reranking.py
+"""
+Lightweight re-ranking stage for RAG retrieval.
+
+Candidates are over-fetched from the vec0 KNN search and the `rag_chunks_fts`
+keyword index, then scored locally with a cheap heuristic that blends vector
+distance, BM25 rank, query-term coverage and matches against the entity names
+stored in each chunk's metadata. Only the top few chunks reach the LLM prompt.
+"""
+import json
+import re
+import sqlite3
+from typing import List, Dict, Any, Optional
+
+from ...core.config import logger
+
+# Relative weight of each signal in the final score (sums to 1.0)
+_SCORE_WEIGHTS: Dict[str, float] = {
+    "vector": 0.45,
+    "keyword": 0.20,
+    "coverage": 0.20,
+    "entity": 0.15,
+}
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+_CAMEL_BOUNDARY = re.compile(r"(?<=[a-z0-9])(?=[A-Z])")
+
+_STOPWORDS = frozenset(
+    {
+        "the", "and", "for", "are", "but", "not", "you", "all", "any", "can",
+        "had", "her", "was", "one", "our", "out", "has", "have", "how", "what",
+        "when", "where", "which", "who", "why", "with", "this", "that", "from",
+        "into", "does", "did", "there", "their", "about", "should", "would",
+        "could", "them", "then", "than", "its", "use", "used", "using",
+    }
+)
+
+
+def _tokenize(text: str) -> List[str]:
+    """Lowercase word tokens, splitting camelCase and snake_case identifiers."""
+    if not text:
+        return []
+    return _TOKEN_PATTERN.findall(_CAMEL_BOUNDARY.sub(" ", text).lower())
+
+
+def extract_query_terms(query_text: str) -> List[str]:
+    """Return the distinct, meaningful terms of a query in their original order."""
+    terms: List[str] = []
+    for token in _tokenize(query_text):
+        if len(token) > 2 and token not in _STOPWORDS and token not in terms:
+            terms.append(token)
+    return terms
+
+
+def fetch_keyword_candidates(
+    cursor: sqlite3.Cursor, query_terms: List[str], limit: int
+) -> List[Dict[str, Any]]:
+    """
+    Fetch keyword candidates from the rag_chunks FTS5 index, ordered by BM25.
+    Returns an empty list if the FTS table is unavailable.
+    """
+    if not query_terms or limit <= 0:
+        return []
+
+    # Each term is quoted so FTS5 treats it as a literal token, OR-ed together
+    match_expression = " OR ".join(f'"{term}"' for term in query_terms)
+    try:
+        cursor.execute(
+            """
+            SELECT c.chunk_id, c.chunk_text, c.source_type, c.source_ref, c.metadata,
+                   bm25(rag_chunks_fts) AS bm25_score
+            FROM rag_chunks_fts
+            JOIN rag_chunks c ON c.chunk_id = rag_chunks_fts.rowid
+            WHERE rag_chunks_fts MATCH ?
+            ORDER BY bm25_score
+            LIMIT ?
+        """,
+            (match_expression, limit),
+        )
+        rows = cursor.fetchall()
+    except sqlite3.OperationalError as e:
+        logger.debug(f"RAG Re-rank: keyword candidate search unavailable: {e}")
+        return []
+
+    candidates = []
+    for row in rows:
+        candidate = dict(row)
+        if candidate.get("metadata"):
+            try:
+                candidate["metadata"] = json.loads(candidate["metadata"])
+            except json.JSONDecodeError:
+                candidate["metadata"] = None
+        candidates.append(candidate)
+    return candidates
+
+
+def _normalize(values: Dict[int, float], lower_is_better: bool) -> Dict[int, float]:
+    """Min-max normalize raw scores into [0, 1] where 1 is the best candidate."""
+    if not values:
+        return {}
+    low, high = min(values.values()), max(values.values())
+    if high == low:
+        return {key: 1.0 for key in values}
+    span = high - low
+    if lower_is_better:
+        return {key: (high - value) / span for key, value in values.items()}
+    return {key: (value - low) / span for key, value in values.items()}
+
+
+def _entity_score(metadata: Optional[Dict[str, Any]], query_terms: List[str], query_lower: str) -> float:
+    """Score how well the entities recorded in chunk metadata match the query."""
+    if not metadata or not query_terms:
+        return 0.0
+    entities = metadata.get("entities") or []
+    if not isinstance(entities, list):
+        return 0.0
+
+    best = 0.0
+    term_set = set(query_terms)
+    for entity in entities:
+        name = entity.get("name", "") if isinstance(entity, dict) else str(entity)
+        if not name:
+            continue
+        # An entity mentioned verbatim in the query is the strongest signal
+        if name.lower() in query_lower:
+            return 1.0
+        name_tokens = set(_tokenize(name))
+        if name_tokens:
+            best = max(best, len(name_tokens & term_set) / len(name_tokens))
+    return best
+
+
+def rerank_chunks(
+    query_text: str,
+    vector_candidates: List[Dict[str, Any]],
+    keyword_candidates: List[Dict[str, Any]],
+    top_k: int,
+) -> List[Dict[str, Any]]:
+    """
+    Merge vector and keyword candidates and return the `top_k` best chunks.
+
+    Each candidate dict must carry `chunk_id`, `chunk_text`, `source_ref` and an
+    already-parsed `metadata`. Vector candidates carry `distance`, keyword
+    candidates carry `bm25_score`. The returned dicts gain a `rerank_score`.
+    """
+    merged: Dict[int, Dict[str, Any]] = {}
+    for candidate in vector_candidates:
+        merged[candidate["chunk_id"]] = dict(candidate)
+    for candidate in keyword_candidates:
+        existing = merged.get(candidate["chunk_id"])
+        if existing is None:
+            merged[candidate["chunk_id"]] = dict(candidate)
+        else:
+            existing["bm25_score"] = candidate.get("bm25_score")
+
+    if not merged:
+        return []
+
+    query_terms = extract_query_terms(query_text)
+    query_lower = query_text.lower()
+
+    vector_scores = _normalize(
+        {cid: c["distance"] for cid, c in merged.items() if c.get("distance") is not None},
+        lower_is_better=True,
+    )
+    # bm25() returns more negative values for better matches
+    keyword_scores = _normalize(
+        {cid: c["bm25_score"] for cid, c in merged.items() if c.get("bm25_score") is not None},
+        lower_is_better=True,
+    )
+
+    for chunk_id, candidate in merged.items():
+        coverage = 0.0
+        if query_terms:
+            chunk_tokens = set(_tokenize(candidate.get("chunk_text", "")))
+            chunk_tokens.update(_tokenize(candidate.get("source_ref", "")))
+            coverage = sum(1 for term in query_terms if term in chunk_tokens) / len(query_terms)
+
+        candidate["rerank_score"] = round(
+            _SCORE_WEIGHTS["vector"] * vector_scores.get(chunk_id, 0.0)
+            + _SCORE_WEIGHTS["keyword"] * keyword_scores.get(chunk_id, 0.0)
+            + _SCORE_WEIGHTS["coverage"] * coverage
+            + _SCORE_WEIGHTS["entity"]
+            * _entity_score(candidate.get("metadata"), query_terms, query_lower),
+            4,
+        )
+
+    ranked = sorted(merged.values(), key=lambda c: c["rerank_score"], reverse=True)
+    logger.debug(
+        f"RAG Re-rank: scored {len(ranked)} candidates "
+        f"({len(vector_candidates)} vector, {len(keyword_candidates)} keyword), keeping {top_k}"
+    )
+    return ranked[:top_k]
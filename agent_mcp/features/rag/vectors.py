@@ -0,0 +1,141 @@
+# Agent-MCP/agent_mcp/features/rag/vectors.py
+"""
+Vector storage and nearest-neighbour lookup for rag_embeddings.
+
+Indexing code stores and deletes embeddings through this module and query code
+searches through `find_nearest_chunks`, so the optional acceleration structures
+(the IVF index in ann_index.py, the Matryoshka prefix tier in matryoshka.py and
+the quantized tier in quantization.py) are kept up to date and used without the
+callers knowing about them.
+"""
+import sqlite3
+from typing import Any, Dict, List, Tuple
+
+from ...core.config import logger, RAG_ANN_ENABLED, RAG_QUANTIZATION
+from .ann_index import add_to_ann_index, ann_search, is_ann_index_ready, refresh_ann_index
+from .matryoshka import (
+    PREFIX_TABLE,
+    add_prefix_embedding,
+    ensure_prefix_tier,
+    is_prefix_tier_enabled,
+    is_prefix_tier_ready,
+    prefix_search,
+)
+from .quantization import (
+    QUANTIZED_TABLE,
+    SUPPORTED_MODES as QUANTIZATION_MODES,
+    add_quantized_embedding,
+    ensure_quantized_tier,
+    is_quantized_tier_ready,
+    quantized_search,
+)
+
+
+def store_chunk_embedding(cursor: sqlite3.Cursor, chunk_id: int, embedding_json: str) -> None:
+    """Insert the embedding for a rag_chunks row (rowid = chunk_id) and update derived indexes."""
+    cursor.execute(
+        "INSERT INTO rag_embeddings (rowid, embedding) VALUES (?, ?)",
+        (chunk_id, embedding_json),
+    )
+    if RAG_ANN_ENABLED:
+        add_to_ann_index(cursor, chunk_id)
+    if is_prefix_tier_enabled():
+        add_prefix_embedding(cursor, chunk_id, embedding_json)
+    if RAG_QUANTIZATION in QUANTIZATION_MODES:
+        add_quantized_embedding(cursor, chunk_id, embedding_json)
+
+
+def delete_source_embeddings(cursor: sqlite3.Cursor, source_type: str, source_ref: str) -> None:
+    """
+    Delete the embeddings (and prefix/quantized copies) of every chunk of a source.
+    Call before deleting the rag_chunks rows; IVF assignments are removed by trigger.
+    """
+    chunk_subquery = "SELECT chunk_id FROM rag_chunks WHERE source_type = ? AND source_ref = ?"
+    cursor.execute(
+        f"DELETE FROM rag_embeddings WHERE rowid IN ({chunk_subquery})",
+        (source_type, source_ref),
+    )
+    for derived_table in (PREFIX_TABLE, QUANTIZED_TABLE):
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE name = ?", (derived_table,))
+        if cursor.fetchone() is not None:
+            cursor.execute(
+                f"DELETE FROM {derived_table} WHERE rowid IN ({chunk_subquery})",
+                (source_type, source_ref),
+            )
+
+
+def exact_nearest_chunks(
+    cursor: sqlite3.Cursor, query_embedding: Any, k: int
+) -> List[Tuple[int, float]]:
+    """Brute-force vec0 KNN. Returns (chunk_id, distance) pairs ordered by distance."""
+    cursor.execute(
+        """
+        SELECT rowid, distance FROM rag_embeddings
+        WHERE embedding MATCH ? AND k = ?
+        ORDER BY distance
+    """,
+        (query_embedding, k),
+    )
+    return [(row[0], row[1]) for row in cursor.fetchall()]
+
+
+def find_nearest_chunks(
+    cursor: sqlite3.Cursor, query_embedding: Any, k: int
+) -> List[Tuple[int, float]]:
+    """
+    Return the `k` nearest chunks to a query embedding (JSON string or float32 blob)
+    as (chunk_id, distance) pairs. Uses, in order of preference, the IVF index,
+    the prefix tier or the quantized tier when enabled and built, and falls back
+    to exact vec0 search otherwise.
+    """
+    try:
+        if RAG_ANN_ENABLED and is_ann_index_ready(cursor):
+            return ann_search(cursor, query_embedding, k)
+        if is_prefix_tier_ready(cursor):
+            return prefix_search(cursor, query_embedding, k)
+        if RAG_QUANTIZATION in QUANTIZATION_MODES and is_quantized_tier_ready(cursor):
+            return quantized_search(cursor, query_embedding, k)
+    except sqlite3.Error as e:
+        logger.warning(f"Accelerated vector search failed, falling back to exact vec0 search: {e}")
+    return exact_nearest_chunks(cursor, query_embedding, k)
+
+
+def find_nearest_sources(
+    cursor: sqlite3.Cursor, query_embedding: Any, source_type: str, k: int, overfetch: int = 8
+) -> List[Tuple[str, float]]:
+    """
+    The `k` sources of one type (e.g. 'task') nearest to a query embedding, as
+    (source_ref, distance) pairs with each source's closest chunk. Sources share
+    rag_embeddings, so `k * overfetch` chunks are searched and filtered by type.
+    """
+    nearest = find_nearest_chunks(cursor, query_embedding, k * overfetch)
+    if not nearest:
+        return []
+    distances = dict(nearest)
+    placeholders = ",".join("?" * len(distances))
+    cursor.execute(
+        f"""
+        SELECT chunk_id, source_ref FROM rag_chunks
+        WHERE source_type = ? AND chunk_id IN ({placeholders})
+    """,
+        [source_type] + list(distances),
+    )
+    best: Dict[str, float] = {}
+    for chunk_id, source_ref in cursor.fetchall():
+        distance = distances[chunk_id]
+        if source_ref not in best or distance < best[source_ref]:
+            best[source_ref] = distance
+    return sorted(best.items(), key=lambda item: item[1])[:k]
+
+
+def maintain_vector_indexes() -> None:
+    """
+    Bring the optional vector structures in line with rag_embeddings.
+    Blocking; run in a worker thread after each indexing cycle.
+    """
+    if is_prefix_tier_enabled():
+        ensure_prefix_tier()
+    if RAG_QUANTIZATION in QUANTIZATION_MODES:
+        ensure_quantized_tier()
+    if RAG_ANN_ENABLED:
+        refresh_ann_index()
@@ -0,0 +1,76 @@
+# Agent-MCP/agent_mcp/features/task_health_history.py
+import datetime
+import sqlite3
+from typing import NoReturn
+
+import anyio
+
+from ..core.config import (
+    logger,
+    TASK_HEALTH_BUCKET_SECONDS,
+    TASK_HEALTH_HISTORY_RETENTION_DAYS,
+)
+from ..core import globals as g
+from ..db.connection import get_db_connection, execute_db_write
+from ..db.actions.task_health_db import (
+    save_task_health_snapshot,
+    prune_task_health_history,
+)
+
+
+def task_health_bucket_start(now: datetime.datetime) -> str:
+    """Start of the TASK_HEALTH_BUCKET_SECONDS bucket containing `now` (local ISO time)."""
+    bucket = max(1, TASK_HEALTH_BUCKET_SECONDS)
+    timestamp = int(now.timestamp()) // bucket * bucket
+    return datetime.datetime.fromtimestamp(timestamp).isoformat()
+
+
+async def record_task_health_snapshot() -> None:
+    """Writes the current g.task_health snapshot into its history bucket."""
+    now = datetime.datetime.now()
+    health = g.task_health.snapshot(now=now)
+    retention_start = now - datetime.timedelta(days=TASK_HEALTH_HISTORY_RETENTION_DAYS)
+
+    async def write_operation():
+        conn = None
+        try:
+            conn = get_db_connection()
+            cursor = conn.cursor()
+            save_task_health_snapshot(
+                cursor, health, task_health_bucket_start(now), now.isoformat()
+            )
+            pruned = prune_task_health_history(
+                cursor, task_health_bucket_start(retention_start)
+            )
+            conn.commit()
+            if pruned:
+                logger.debug(f"Pruned {pruned} task health history buckets.")
+        except sqlite3.Error as e:
+            if conn:
+                conn.rollback()
+            logger.error(f"Database error recording task health snapshot: {e}")
+        finally:
+            if conn:
+                conn.close()
+
+    await execute_db_write(write_operation)
+
+
+async def run_task_health_snapshots_periodically(
+    interval_seconds: int = 300, *, task_status=anyio.TASK_STATUS_IGNORED
+) -> NoReturn:
+    """
+    Periodically records the incrementally maintained task health into
+    task_health_history, one row per bucket (the latest snapshot in it wins).
+    """
+    logger.info("Task health history recorder starting...")
+    task_status.started()
+
+    while g.server_running:
+        try:
+            await record_task_health_snapshot()
+        except Exception as e:
+            logger.error(f"Task health snapshot cycle failed: {e}", exc_info=True)
+        await anyio.sleep(interval_seconds)
+
+    logger.info("Task health history recorder stopped.")
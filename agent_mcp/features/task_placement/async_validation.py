@@ -0,0 +1,250 @@
+# Agent-MCP/agent_mcp/features/task_placement/async_validation.py
+"""
+Cached and background task placement validation.
+
+Verdicts of validate_task_placement are cached (LRU) under a hash of the
+title, description, parent, dependency set and g.task_graph.version. The graph
+version changes whenever a task is added or removed or a status/dependency
+changes, so a cached verdict is only reused while the task graph it was given
+for is unchanged: retried and repeated creations skip the LLM entirely.
+
+With async validation a task is created straight away in the
+'pending_validation' status and validated by a bounded pool of background
+workers. The verdict is appended as a task note, and the task moves to
+'pending' (or 'cancelled' when denied and ALLOW_RAG_OVERRIDE is off). Suggested
+changes are reported in the note, not applied, since the task already exists.
+"""
+import asyncio
+import datetime
+import hashlib
+import json
+import sqlite3
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Set
+
+from ...core.config import (
+    logger,
+    ALLOW_RAG_OVERRIDE,
+    TASK_PLACEMENT_WORKERS,
+    TASK_PLACEMENT_CACHE_SIZE,
+)
+from ...core import globals as g
+from ...db.connection import get_db_connection, execute_db_write
+from ...db.actions.task_notes_db import append_task_note
+from .suggestions import format_suggestions_for_agent
+
+PENDING_VALIDATION_STATUS = "pending_validation"
+
+_verdict_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_worker_slots: Optional[asyncio.Semaphore] = None
+# Keeps running validations referenced until they finish
+_background_validations: Set["asyncio.Task[None]"] = set()
+
+
+def placement_cache_key(
+    title: str,
+    description: str,
+    parent_task_id: Optional[str],
+    depends_on_tasks: Optional[List[str]],
+) -> str:
+    """Verdict cache key for a proposed placement against the current task graph."""
+    payload = json.dumps(
+        [
+            title,
+            description,
+            parent_task_id,
+            sorted(set(depends_on_tasks or [])),
+            g.task_graph.version,
+        ]
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def get_cached_verdict(cache_key: str) -> Optional[Dict[str, Any]]:
+    verdict = _verdict_cache.get(cache_key)
+    if verdict is None:
+        return None
+    _verdict_cache.move_to_end(cache_key)
+    return dict(verdict, cached=True)
+
+
+def cache_verdict(cache_key: str, verdict: Dict[str, Any]) -> None:
+    # Fallback approvals (LLM unavailable, parse errors) are not real verdicts
+    if verdict.get("fallback"):
+        return
+    _verdict_cache[cache_key] = verdict
+    _verdict_cache.move_to_end(cache_key)
+    while len(_verdict_cache) > TASK_PLACEMENT_CACHE_SIZE:
+        _verdict_cache.popitem(last=False)
+
+
+async def validate_task_placement_cached(
+    title: str,
+    description: str,
+    parent_task_id: Optional[str],
+    depends_on_tasks: Optional[List[str]],
+    created_by: str,
+    auth_token: str,
+    cache_key: Optional[str] = None,
+    task_id: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    validate_task_placement through the verdict cache. `cache_key` defaults to
+    the key for the graph as it is now; pass the key taken before the task was
+    inserted when validating an already created task (`task_id`).
+    """
+    cache_key = cache_key or placement_cache_key(
+        title, description, parent_task_id, depends_on_tasks
+    )
+    cached = get_cached_verdict(cache_key)
+    if cached is not None:
+        logger.info(f"Task placement verdict served from cache: {cached['status']}")
+        return cached
+    # Imported here: the validator pulls in tools, whose task_tools imports this module
+    from .validator import validate_task_placement
+
+    verdict = await validate_task_placement(
+        title=title,
+        description=description,
+        parent_task_id=parent_task_id,
+        depends_on_tasks=depends_on_tasks,
+        created_by=created_by,
+        auth_token=auth_token,
+        task_id=task_id,
+    )
+    cache_verdict(cache_key, verdict)
+    return verdict
+
+
+def schedule_placement_validation(
+    task_id: str,
+    title: str,
+    description: str,
+    parent_task_id: Optional[str],
+    depends_on_tasks: Optional[List[str]],
+    created_by: str,
+    auth_token: str,
+    cache_key: Optional[str] = None,
+) -> None:
+    """Validate a task created in 'pending_validation' in the background."""
+    validation = asyncio.create_task(
+        _run_background_validation(
+            task_id,
+            title,
+            description,
+            parent_task_id,
+            list(depends_on_tasks or []),
+            created_by,
+            auth_token,
+            cache_key,
+        )
+    )
+    _background_validations.add(validation)
+    validation.add_done_callback(_background_validations.discard)
+
+
+async def _run_background_validation(
+    task_id: str,
+    title: str,
+    description: str,
+    parent_task_id: Optional[str],
+    depends_on_tasks: List[str],
+    created_by: str,
+    auth_token: str,
+    cache_key: Optional[str],
+) -> None:
+    global _worker_slots
+    if _worker_slots is None:
+        _worker_slots = asyncio.Semaphore(max(1, TASK_PLACEMENT_WORKERS))
+    try:
+        async with _worker_slots:
+            verdict = await validate_task_placement_cached(
+                title,
+                description,
+                parent_task_id,
+                depends_on_tasks,
+                created_by,
+                auth_token,
+                cache_key=cache_key,
+                task_id=task_id,
+            )
+        await _deliver_verdict(task_id, verdict, parent_task_id, depends_on_tasks)
+    except Exception as e:
+        logger.error(f"Background placement validation of task {task_id} failed: {e}", exc_info=True)
+
+
+async def _deliver_verdict(
+    task_id: str,
+    verdict: Dict[str, Any],
+    parent_task_id: Optional[str],
+    depends_on_tasks: List[str],
+) -> None:
+    """Appends the verdict as a task note and releases the task from validation."""
+    blocked = verdict["status"] == "denied" and not ALLOW_RAG_OVERRIDE
+    new_status = "cancelled" if blocked else "pending"
+    content = (
+        f"🧭 Placement validation ({verdict['status']}):\n"
+        + format_suggestions_for_agent(verdict, parent_task_id, depends_on_tasks)
+    )
+
+    async def write_operation():
+        conn = None
+        try:
+            conn = get_db_connection()
+            cursor = conn.cursor()
+            updated_at = datetime.datetime.now().isoformat()
+            # Only release tasks still waiting; an agent may have moved it on meanwhile
+            cursor.execute(
+                "UPDATE tasks SET status = ?, updated_at = ? WHERE task_id = ? AND status = ?",
+                (new_status, updated_at, task_id, PENDING_VALIDATION_STATUS),
+            )
+            released = cursor.rowcount > 0
+            cursor.execute("SELECT 1 FROM tasks WHERE task_id = ?", (task_id,))
+            if cursor.fetchone() is None:
+                return None
+            note = append_task_note(
+                cursor, task_id, "placement_validator", content, updated_at
+            )
+            conn.commit()
+            return note, released, updated_at
+        except sqlite3.Error as e:
+            if conn:
+                conn.rollback()
+            logger.error(f"Database error delivering placement verdict for task {task_id}: {e}")
+            return None
+        finally:
+            if conn:
+                conn.close()
+
+    outcome = await execute_db_write(write_operation)
+    if outcome is None:
+        return
+    note, released, updated_at = outcome
+    if released:
+        g.tasks.add_notes(task_id, [note], status=new_status, updated_at=updated_at)
+    else:
+        g.tasks.add_notes(task_id, [note])
+    logger.info(
+        f"Placement verdict for task {task_id}: {verdict['status']}"
+        + (f", task now {new_status}" if released else "")
+    )
+
+
+def resume_pending_validations() -> int:
+    """Re-queues tasks left in 'pending_validation' (e.g. by a restart)."""
+    waiting = [
+        task
+        for task in g.tasks.snapshot().values()
+        if task["status"] == PENDING_VALIDATION_STATUS
+    ]
+    for task in waiting:
+        schedule_placement_validation(
+            task["task_id"],
+            task["title"],
+            task["description"],
+            task["parent_task"],
+            list(task["depends_on_tasks"]),
+            task["created_by"],
+            g.admin_token,
+        )
+    return len(waiting)
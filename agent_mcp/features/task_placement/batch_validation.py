@@ -0,0 +1,345 @@
+# Agent-MCP/agent_mcp/features/task_placement/batch_validation.py
+"""
+Placement validation for a batch of new tasks.
+
+A batch is a proposed subtree: each item names an existing parent
+(`parent_task_id`) or an earlier item of the batch (`parent_task_index`), and
+may depend on existing tasks (`depends_on_tasks`) or earlier items
+(`depends_on_indexes`). Inside the analysis prompt and its suggestions batch
+items are referred to as "#<index>".
+
+The single-root rule is checked locally; everything else is judged by one
+query_rag_system_with_model call for the whole batch, with the union of the
+existing parents and dependencies as focus tasks. The per-item analyses use
+the validate_task_placement JSON format and are mapped with the same code, so
+format_suggestions_for_agent works on them unchanged. Batch verdicts share the
+async_validation verdict cache.
+"""
+import hashlib
+import json
+from typing import Any, Dict, List, Optional
+
+from ...core.config import logger, TASK_ANALYSIS_MODEL, TASK_ANALYSIS_MAX_TOKENS
+from ...core import globals as g
+from ...db.connection import get_db_connection
+from .async_validation import cache_verdict, get_cached_verdict
+from .precheck import root_task_ids
+from .suggestions import format_suggestions_for_agent
+
+
+def batch_ref(index: int) -> str:
+    return f"#{index}"
+
+
+def _parse_batch_ref(ref: Any) -> Optional[int]:
+    if isinstance(ref, str) and ref.startswith("#") and ref[1:].isdigit():
+        return int(ref[1:])
+    return None
+
+
+def _parent_ref(task: Dict[str, Any]) -> Optional[str]:
+    if task.get("parent_task_index") is not None:
+        return batch_ref(task["parent_task_index"])
+    return task.get("parent_task_id")
+
+
+def _dependency_refs(task: Dict[str, Any]) -> List[str]:
+    return list(task.get("depends_on_tasks") or []) + [
+        batch_ref(index) for index in task.get("depends_on_indexes") or []
+    ]
+
+
+def check_batch_references(tasks: List[Dict[str, Any]]) -> Optional[str]:
+    """
+    Error message for the first invalid reference in the batch, or None.
+    Batch references must point to earlier items, so the subtree is acyclic.
+    """
+    for i, task in enumerate(tasks):
+        label = f"Task {i + 1} ('{task.get('title')}')"
+        parent_index = task.get("parent_task_index")
+        if parent_index is not None:
+            if task.get("parent_task_id"):
+                return f"Error: {label} has both parent_task_id and parent_task_index."
+            if not 0 <= parent_index < i:
+                return f"Error: {label} parent_task_index must refer to an earlier task in the batch."
+        elif task.get("parent_task_id") and task["parent_task_id"] not in g.tasks:
+            return f"Error: {label} parent task '{task['parent_task_id']}' not found."
+        for index in task.get("depends_on_indexes") or []:
+            if not 0 <= index < i:
+                return f"Error: {label} depends_on_indexes must refer to earlier tasks in the batch."
+        for dep_id in task.get("depends_on_tasks") or []:
+            if dep_id not in g.tasks:
+                return f"Error: {label} dependency '{dep_id}' not found."
+    return None
+
+
+def batch_cache_key(tasks: List[Dict[str, Any]]) -> str:
+    """Verdict cache key for a proposed batch against the current task graph."""
+    payload = json.dumps(
+        [
+            [
+                [
+                    task["title"],
+                    task["description"],
+                    _parent_ref(task),
+                    sorted(set(_dependency_refs(task))),
+                ]
+                for task in tasks
+            ],
+            g.task_graph.version,
+        ]
+    )
+    return hashlib.sha256(("batch:" + payload).encode("utf-8")).hexdigest()
+
+
+def _approved(parent: Optional[str], dependencies: List[str], message: str, **extra: Any) -> Dict[str, Any]:
+    return dict(
+        {
+            "status": "approved",
+            "suggestions": {"parent_task": parent, "dependencies": dependencies, "reasoning": None},
+            "duplicates": [],
+            "message": message,
+        },
+        **extra,
+    )
+
+
+def _root_denial(suggested_parent: str, root_id: str) -> Dict[str, Any]:
+    return {
+        "status": "denied",
+        "suggestions": {
+            "parent_task": suggested_parent,
+            "dependencies": [],
+            "reasoning": f"Parent: a root task ({root_id}) already exists.",
+        },
+        "duplicates": [],
+        "message": "Only one root task is allowed; this task must have a parent.",
+        "hierarchy_analysis": {
+            "root_task_exists": True,
+            "current_root_task_id": root_id,
+            "proposed_is_root": True,
+            "hierarchy_violation": True,
+        },
+        "validated_by": "local_precheck",
+    }
+
+
+def _check_roots(tasks: List[Dict[str, Any]]) -> Dict[int, Dict[str, Any]]:
+    """Local verdicts for batch items that would be a second root task."""
+    root_indexes = [i for i, task in enumerate(tasks) if _parent_ref(task) is None]
+    if not root_indexes:
+        return {}
+    conn = None
+    try:
+        conn = get_db_connection()
+        existing_roots = root_task_ids(conn.cursor())
+    finally:
+        if conn:
+            conn.close()
+    if existing_roots:
+        return {i: _root_denial(existing_roots[0], existing_roots[0]) for i in root_indexes}
+    # No root yet: the first root item of the batch becomes it
+    first = batch_ref(root_indexes[0])
+    return {i: _root_denial(first, first) for i in root_indexes[1:]}
+
+
+def _build_batch_query(tasks: List[Dict[str, Any]], indexes: List[int], created_by: str) -> str:
+    proposed = "\n".join(
+        f"""
+        {batch_ref(i)}:
+          Title: {tasks[i]['title']}
+          Description: {tasks[i]['description']}
+          Proposed Parent Task: {_parent_ref(tasks[i]) or 'None (ROOT TASK)'}
+          Proposed Dependencies: {json.dumps(_dependency_refs(tasks[i]))}"""
+        for i in range(len(tasks))
+    )
+    return f"""
+        CRITICAL THINKING REQUIRED: Analyze the placement of a batch of new tasks, created together
+        as one subtree by {created_by}, against the ENTIRE existing task hierarchy.
+        Tasks of the batch are referred to as #<index>; "#0" is the first task of the batch.
+        Existing tasks are referred to by their task ID.
+
+        Proposed tasks:
+        {proposed}
+
+        Assess tasks {", ".join(batch_ref(i) for i in indexes)}. For each one, evaluate:
+        1. HIERARCHY RULES: only ONE root task (no parent) may exist in the entire system
+        2. LOGICAL PLACEMENT: the most logical parent (an existing task or an earlier task of the batch)
+        3. DEPENDENCIES: the tasks it should depend on; remove redundant or incorrect ones
+        4. DUPLICATION: existing tasks, or other tasks of the batch, doing the same work
+
+        Please respond in the following JSON format:
+        {{
+            "tasks": [
+                {{
+                    "index": 0,
+                    "hierarchy_analysis": {{
+                        "root_task_exists": true | false,
+                        "proposed_is_root": true | false,
+                        "hierarchy_violation": true | false
+                    }},
+                    "parent_suggestion": {{
+                        "recommended_parent": "task_id, #index or null",
+                        "reasoning": "why this parent"
+                    }},
+                    "dependency_suggestions": {{
+                        "add_dependencies": ["task_id or #index"],
+                        "remove_dependencies": ["task_id or #index"],
+                        "reasoning": "why these changes"
+                    }},
+                    "duplication_check": {{
+                        "similar_tasks": [
+                            {{"task_id": "task_id", "title": "title", "similarity": 0.0-1.0}}
+                        ]
+                    }},
+                    "overall_recommendation": "proceed" | "modify" | "reconsider" | "deny",
+                    "message": "Human-readable explanation of the assessment"
+                }}
+            ]
+        }}
+        """
+
+
+async def validate_batch_placement(
+    tasks: List[Dict[str, Any]],
+    created_by: str,
+    auth_token: str,
+) -> List[Dict[str, Any]]:
+    """
+    One validate_task_placement-shaped verdict per batch item, in order, from
+    the local root check and a single analysis call for the rest. Suggested
+    parents and dependencies may be batch references ("#<index>").
+    """
+    cache_key = batch_cache_key(tasks)
+    cached = get_cached_verdict(cache_key)
+    if cached is not None:
+        logger.info(f"Batch placement verdicts for {len(tasks)} tasks served from cache")
+        return [dict(verdict, cached=True) for verdict in cached["verdicts"]]
+
+    verdicts: Dict[int, Dict[str, Any]] = {}
+    fallback = False
+    try:
+        verdicts.update(_check_roots(tasks))
+        pending = [i for i in range(len(tasks)) if i not in verdicts]
+        analyses: Dict[int, Dict[str, Any]] = {}
+        if pending:
+            from ..rag.query import query_rag_system_with_model
+            from .validator import analysis_to_verdict, extract_json_object
+
+            focus_task_ids = list(
+                dict.fromkeys(
+                    ref
+                    for task in tasks
+                    for ref in [task.get("parent_task_id")] + list(task.get("depends_on_tasks") or [])
+                    if ref
+                )
+            )
+            response_text = await query_rag_system_with_model(
+                query_text=_build_batch_query(tasks, pending, created_by),
+                model_name=TASK_ANALYSIS_MODEL,
+                max_tokens=TASK_ANALYSIS_MAX_TOKENS,
+                focus_task_ids=focus_task_ids,
+            )
+            rag_data = extract_json_object(response_text)
+            for entry in (rag_data or {}).get("tasks") or []:
+                if isinstance(entry, dict) and isinstance(entry.get("index"), int):
+                    analyses[entry["index"]] = entry
+            logger.info(
+                f"Batch placement analysis returned {len(analyses)} of {len(pending)} task assessments"
+            )
+        for i in pending:
+            parent, dependencies = _parent_ref(tasks[i]), _dependency_refs(tasks[i])
+            if i in analyses:
+                verdicts[i] = analysis_to_verdict(analyses[i], parent, dependencies)
+            else:
+                fallback = True
+                verdicts[i] = _approved(
+                    parent,
+                    dependencies,
+                    "Not covered by the batch placement analysis, proceeding with original placement",
+                    fallback=True,
+                )
+    except Exception as e:
+        logger.error(f"Error validating batch task placement: {e}", exc_info=True)
+        fallback = True
+        for i, task in enumerate(tasks):
+            if i not in verdicts:
+                verdicts[i] = _approved(
+                    _parent_ref(task),
+                    _dependency_refs(task),
+                    f"Validation error: {str(e)}. Proceeding with original placement.",
+                    fallback=True,
+                )
+
+    ordered = [verdicts[i] for i in range(len(tasks))]
+    cache_verdict(cache_key, {"verdicts": ordered, "fallback": fallback})
+    return ordered
+
+
+def resolve_batch_placement(
+    tasks: List[Dict[str, Any]],
+    verdicts: Optional[List[Dict[str, Any]]],
+    task_ids: List[str],
+    allow_override: bool,
+) -> List[Dict[str, Any]]:
+    """
+    Final placement of each batch item with suggestions applied, as dicts with
+    'parent_task', 'depends_on_tasks' (task IDs), 'blocked' and 'validation'
+    (the message for the task note, None when approved as proposed). Without
+    `verdicts` (validation disabled) every item is placed as proposed.
+
+    Denied items are blocked unless `allow_override`; so are items whose batch
+    parent is blocked. Dependencies on blocked items are dropped, as are
+    suggestions that name unknown tasks or a later item of the batch.
+    """
+    resolved: List[Dict[str, Any]] = []
+
+    def resolve_ref(ref: Any, index: int) -> Optional[str]:
+        ref_index = _parse_batch_ref(ref)
+        if ref_index is not None:
+            if ref_index < index and not resolved[ref_index]["blocked"]:
+                return task_ids[ref_index]
+            return None
+        return ref if ref in g.tasks else None
+
+    for i, task in enumerate(tasks):
+        verdict = verdicts[i] if verdicts else {"status": "approved"}
+        parent_ref, dependency_refs = _parent_ref(task), _dependency_refs(task)
+        blocked = verdict["status"] == "denied" and not allow_override
+        validation = None
+        if verdict["status"] != "approved":
+            validation = (
+                f"🧭 Placement validation ({verdict['status']}):\n"
+                + format_suggestions_for_agent(verdict, parent_ref, dependency_refs)
+            )
+            suggestions = verdict.get("suggestions") or {}
+            if suggestions.get("parent_task") is not None:
+                parent_ref = suggestions["parent_task"]
+            if suggestions.get("dependencies"):
+                dependency_refs = suggestions["dependencies"]
+
+        parent_task = resolve_ref(parent_ref, i) if parent_ref is not None else None
+        if parent_ref is not None and parent_task is None:
+            # Unusable suggestion: keep the proposed parent, if it is not blocked
+            proposed_parent = _parent_ref(task)
+            if proposed_parent is not None:
+                parent_task = resolve_ref(proposed_parent, i)
+                if parent_task is None and not blocked:
+                    blocked = True
+                    validation = f"Parent {proposed_parent} was blocked by placement validation."
+        depends_on_tasks = list(
+            dict.fromkeys(
+                dep for dep in (resolve_ref(ref, i) for ref in dependency_refs) if dep
+            )
+        )
+        resolved.append(
+            {
+                "task_id": task_ids[i],
+                "parent_task": parent_task,
+                "depends_on_tasks": depends_on_tasks,
+                "status": verdict["status"],
+                "blocked": blocked,
+                "validation": validation,
+            }
+        )
+    return resolved
@@ -0,0 +1,241 @@
+# Agent-MCP/agent_mcp/features/task_placement/precheck.py
+"""
+Local task placement pre-check.
+
+Decides the clear-cut cases of task placement without the LLM validator:
+
+- hierarchy rules: a second root task is denied, with the parent of the most
+  similar existing task (or the current root) as the suggested parent
+- duplicates: the proposed task is embedded the way tasks are indexed and
+  compared with the nearest 'task' chunks in rag_embeddings; a cosine
+  similarity of TASK_DUPLICATION_THRESHOLD or more is reported as a duplicate
+- clearly new work: when nothing scores above TASK_PRECHECK_APPROVE_BELOW and
+  the proposed parent and dependencies exist, the placement is approved
+
+Everything else (ambiguous similarity, unknown parent, no task embeddings yet)
+is escalated to the LLM, with the similar tasks found here as a hint.
+"""
+import json
+import sqlite3
+from typing import Any, Dict, List, Optional, Tuple
+
+from ...core.config import (
+    logger,
+    EMBEDDING_MODEL,
+    EMBEDDING_DIMENSION,
+    TASK_DUPLICATION_THRESHOLD,
+    TASK_PRECHECK_APPROVE_BELOW,
+    TASK_PRECHECK_CANDIDATES,
+)
+from ...core import globals as g
+from ...db.connection import get_db_connection, is_vss_loadable
+from ...external.openai_service import get_openai_client
+from ..rag.indexing import format_task_for_embedding
+from ..rag.vectors import find_nearest_sources
+
+# Tasks in these states are not live duplicates of new work
+INACTIVE_STATUSES = ("cancelled", "failed")
+
+
+def distance_to_similarity(distance: float) -> float:
+    """Cosine similarity of two unit vectors from their L2 distance."""
+    return max(0.0, min(1.0, 1.0 - (distance * distance) / 2.0))
+
+
+def find_similar_tasks(
+    cursor: sqlite3.Cursor, query_embedding_json: str, limit: int
+) -> List[Dict[str, Any]]:
+    """Up to `limit` indexed tasks nearest to the embedding, most similar first."""
+    similar: List[Dict[str, Any]] = []
+    for task_id, distance in find_nearest_sources(cursor, query_embedding_json, "task", limit):
+        task = g.tasks.get(task_id)
+        if task is None:
+            # Deleted since it was indexed
+            continue
+        similar.append(
+            {
+                "task_id": task_id,
+                "title": task["title"],
+                "status": task["status"],
+                "parent_task": task["parent_task"],
+                "similarity": round(distance_to_similarity(distance), 3),
+            }
+        )
+    return similar
+
+
+def root_task_ids(cursor: sqlite3.Cursor) -> List[str]:
+    # Served by idx_tasks_parent_task
+    cursor.execute(
+        "SELECT task_id FROM tasks WHERE parent_task IS NULL ORDER BY created_at LIMIT 2"
+    )
+    return [row[0] for row in cursor.fetchall()]
+
+
+def _embed_proposed_task(
+    title: str, description: str, parent_task_id: Optional[str], created_by: str
+) -> Optional[str]:
+    client = get_openai_client()
+    if not client:
+        return None
+    # Same text layout as indexed tasks, so similarities are comparable
+    content = format_task_for_embedding(
+        {
+            "task_id": "new",
+            "title": title,
+            "description": description,
+            "status": "pending",
+            "created_by": created_by,
+            "parent_task": parent_task_id,
+        }
+    )
+    response = client.embeddings.create(
+        input=[content], model=EMBEDDING_MODEL, dimensions=EMBEDDING_DIMENSION
+    )
+    return json.dumps(response.data[0].embedding)
+
+
+def _result(
+    status: str,
+    parent_task: Optional[str],
+    dependencies: List[str],
+    reasoning: Optional[str],
+    duplicates: List[Dict[str, Any]],
+    message: str,
+    hierarchy_analysis: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    result = {
+        "status": status,
+        "suggestions": {
+            "parent_task": parent_task,
+            "dependencies": dependencies,
+            "reasoning": reasoning,
+        },
+        "duplicates": duplicates,
+        "message": message,
+        "validated_by": "local_precheck",
+    }
+    if hierarchy_analysis is not None:
+        result["hierarchy_analysis"] = hierarchy_analysis
+    return result
+
+
+def precheck_task_placement(
+    title: str,
+    description: str,
+    parent_task_id: Optional[str],
+    depends_on_tasks: Optional[List[str]],
+    created_by: str,
+    task_id: Optional[str] = None,
+) -> Tuple[Optional[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Returns (result, similar_tasks). `result` has the validate_task_placement
+    shape when the placement could be decided locally and is None when it
+    should be escalated to the LLM. `task_id` is the task itself when it was
+    already created; it is left out of the similar tasks.
+    """
+    dependencies = list(depends_on_tasks or [])
+    conn = None
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+
+        similar_tasks: List[Dict[str, Any]] = []
+        if is_vss_loadable():
+            cursor.execute(
+                "SELECT 1 FROM rag_chunks WHERE source_type = 'task' LIMIT 1"
+            )
+            if cursor.fetchone() is not None:
+                embedding_json = _embed_proposed_task(
+                    title, description, parent_task_id, created_by
+                )
+                if embedding_json:
+                    similar_tasks = [
+                        t
+                        for t in find_similar_tasks(
+                            cursor, embedding_json, TASK_PRECHECK_CANDIDATES + 1
+                        )
+                        if t["task_id"] != task_id
+                    ][:TASK_PRECHECK_CANDIDATES]
+
+        root_ids = [
+            root_id
+            for root_id in (root_task_ids(cursor) if parent_task_id is None else [])
+            if root_id != task_id
+        ]
+
+        # Hierarchy rule: only one root task
+        if root_ids:
+            suggested_parent = next(
+                (t["parent_task"] for t in similar_tasks if t["parent_task"]), root_ids[0]
+            )
+            return (
+                _result(
+                    "denied",
+                    suggested_parent,
+                    dependencies,
+                    f"Parent: a root task ({root_ids[0]}) already exists; "
+                    f"{suggested_parent} is the parent of the most similar existing task.",
+                    [],
+                    "Only one root task is allowed; this task must have a parent.",
+                    {
+                        "root_task_exists": True,
+                        "current_root_task_id": root_ids[0],
+                        "proposed_is_root": True,
+                        "hierarchy_violation": True,
+                    },
+                ),
+                similar_tasks,
+            )
+
+        # Placement the LLM has to judge: unknown parent or dependencies, no embeddings
+        unknown_refs = [
+            ref for ref in ([parent_task_id] if parent_task_id else []) + dependencies
+            if ref not in g.tasks
+        ]
+        if unknown_refs or not similar_tasks:
+            return None, similar_tasks
+
+        live_matches = [t for t in similar_tasks if t["status"] not in INACTIVE_STATUSES]
+        best = live_matches[0] if live_matches else None
+
+        if best and best["similarity"] >= TASK_DUPLICATION_THRESHOLD:
+            duplicates = [
+                {"task_id": t["task_id"], "similarity": t["similarity"], "title": t["title"]}
+                for t in live_matches
+                if t["similarity"] >= TASK_DUPLICATION_THRESHOLD
+            ]
+            return (
+                _result(
+                    "warning",
+                    parent_task_id,
+                    dependencies,
+                    f"Duplicate: '{best['title']}' ({best['task_id']}) has similarity {best['similarity']}.",
+                    duplicates,
+                    f"Likely duplicate of existing task {best['task_id']} ('{best['title']}', {best['status']}).",
+                ),
+                similar_tasks,
+            )
+
+        if best is None or best["similarity"] < TASK_PRECHECK_APPROVE_BELOW:
+            return (
+                _result(
+                    "approved",
+                    parent_task_id,
+                    dependencies,
+                    None,
+                    [],
+                    "No similar tasks found; placement approved by local pre-check.",
+                ),
+                similar_tasks,
+            )
+
+        return None, similar_tasks
+
+    except Exception as e:
+        # Any failure here just means the LLM validator decides
+        logger.warning(f"Local task placement pre-check failed, escalating: {e}")
+        return None, []
+    finally:
+        if conn:
+            conn.close()
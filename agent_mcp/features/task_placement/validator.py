@@ -3,8 +3,109 @@ import json
 from typing import Optional, List, Dict, Any
 from ...tools.rag_tools import ask_project_rag_tool_impl
 import mcp.types as mcp_types
-from ...core.config import logger, TASK_ANALYSIS_MODEL, TASK_ANALYSIS_MAX_TOKENS
+from ...core.config import logger, TASK_ANALYSIS_MODEL, TASK_ANALYSIS_MAX_TOKENS, TASK_PRECHECK_ENABLED
 from ...external.openai_service import get_openai_client
+from .precheck import precheck_task_placement
+
+# Map RAG recommendations to our status codes
+RECOMMENDATION_STATUS = {
+    "proceed": "approved",
+    "modify": "suggest_changes",
+    "reconsider": "warning",
+    "deny": "denied"
+}
+
+
+def extract_json_object(response_text: str) -> Optional[Dict[str, Any]]:
+    """The JSON object in an LLM response (it might be wrapped in other text), or None."""
+    try:
+        json_start = response_text.find('{')
+        json_end = response_text.rfind('}') + 1
+        if json_start >= 0 and json_end > json_start:
+            return json.loads(response_text[json_start:json_end])
+        # Fallback if no JSON found
+        return None
+    except json.JSONDecodeError:
+        logger.warning(f"Could not parse JSON from RAG response: {response_text[:200]}...")
+        return None
+
+
+def analysis_to_verdict(
+    rag_data: Dict[str, Any],
+    parent_task_id: Optional[str],
+    depends_on_tasks: Optional[List[str]]
+) -> Dict[str, Any]:
+    """Turns one placement analysis in the prompt's JSON format into a validation result."""
+    # Check for hierarchy violations first
+    hierarchy_analysis = rag_data.get("hierarchy_analysis") or {}
+    hierarchy_violation = hierarchy_analysis.get("hierarchy_violation", False)
+
+    base_status = RECOMMENDATION_STATUS.get(
+        rag_data.get("overall_recommendation", "proceed"),
+        "approved"
+    )
+
+    # Override status if hierarchy violation detected
+    if hierarchy_violation and parent_task_id is None:
+        status = "denied"
+        logger.warning(f"Task creation denied due to hierarchy violation (attempting to create second root task)")
+    else:
+        status = base_status
+
+    # Extract suggestions
+    parent_suggestion = rag_data.get("parent_suggestion") or {}
+    dependency_suggestions = rag_data.get("dependency_suggestions") or {}
+
+    suggestions = {
+        "parent_task": parent_suggestion.get("recommended_parent"),
+        "dependencies": list(depends_on_tasks or [])
+    }
+
+    # Apply dependency modifications
+    if dependency_suggestions.get("add_dependencies"):
+        suggestions["dependencies"].extend(
+            dependency_suggestions["add_dependencies"]
+        )
+    if dependency_suggestions.get("remove_dependencies"):
+        suggestions["dependencies"] = [
+            d for d in suggestions["dependencies"]
+            if d not in dependency_suggestions["remove_dependencies"]
+        ]
+
+    # Remove duplicates and None values from dependencies
+    suggestions["dependencies"] = list(filter(None, set(suggestions["dependencies"])))
+
+    # Add reasoning
+    reasoning_parts = []
+    if parent_suggestion.get("reasoning"):
+        reasoning_parts.append(f"Parent: {parent_suggestion['reasoning']}")
+    if dependency_suggestions.get("reasoning"):
+        reasoning_parts.append(f"Dependencies: {dependency_suggestions['reasoning']}")
+
+    suggestions["reasoning"] = " | ".join(reasoning_parts) if reasoning_parts else None
+
+    # Extract duplicate information
+    duplication_info = rag_data.get("duplication_check") or {}
+    duplicates = []
+    for similar_task in duplication_info.get("similar_tasks", []):
+        duplicates.append({
+            "task_id": similar_task.get("task_id"),
+            "similarity": similar_task.get("similarity", 0.0),
+            "title": similar_task.get("title", "Unknown")
+        })
+
+    # Include critical thinking summary in message
+    critical_thinking = rag_data.get("critical_thinking_summary", "")
+    base_message = rag_data.get("message", "Task placement validated via RAG")
+    full_message = f"{base_message}\n\nCritical Analysis: {critical_thinking}" if critical_thinking else base_message
+
+    return {
+        "status": status,
+        "suggestions": suggestions,
+        "duplicates": duplicates,
+        "message": full_message,
+        "hierarchy_analysis": hierarchy_analysis  # Include for additional context
+    }
 
 async def validate_task_placement(
     title: str,
@@ -12,7 +113,8 @@ async def validate_task_placement(
     parent_task_id: Optional[str],
     depends_on_tasks: Optional[List[str]],
     created_by: str,
-    auth_token: str
+    auth_token: str,
+    task_id: Optional[str] = None
 ) -> Dict[str, Any]:
     """
     Validate task placement using RAG system.
@@ -24,6 +126,8 @@ async def validate_task_placement(
         depends_on_tasks: List of proposed dependency task IDs
         created_by: Agent ID creating the task
         auth_token: Authentication token for RAG query
+        task_id: ID of the task when it already exists (background validation);
+            it is not reported as a duplicate of itself
         
     Returns:
         Dictionary with validation results:
@@ -43,6 +147,22 @@ async def validate_task_placement(
         }
     """
     try:
+        # Clear-cut cases (second root, near-duplicate, clearly new work) are
+        # decided locally in milliseconds; only ambiguous ones reach the LLM
+        similar_tasks_hint = ""
+        if TASK_PRECHECK_ENABLED:
+            local_result, similar_tasks = precheck_task_placement(
+                title, description, parent_task_id, depends_on_tasks, created_by, task_id
+            )
+            if local_result is not None:
+                logger.info(f"Task placement decided by local pre-check: {local_result['status']}")
+                return local_result
+            if similar_tasks:
+                similar_tasks_hint = "Most similar existing tasks (local embedding search):\n" + "\n".join(
+                    f"- {t['task_id']} ({t['status']}, parent {t['parent_task']}): {t['title']} [similarity {t['similarity']}]"
+                    for t in similar_tasks
+                )
+
         # Check if trying to create a root task (no parent)
         from ...db.connection import get_db_connection
         root_task_check = ""
@@ -50,7 +170,10 @@ async def validate_task_placement(
             # Check if a root task already exists
             conn = get_db_connection()
             cursor = conn.cursor()
-            cursor.execute("SELECT COUNT(*) as count FROM tasks WHERE parent_task IS NULL")
+            cursor.execute(
+                "SELECT COUNT(*) as count FROM tasks WHERE parent_task IS NULL AND task_id IS NOT ?",
+                (task_id,),
+            )
             root_count = cursor.fetchone()['count']
             conn.close()
             
@@ -71,6 +194,9 @@ async def validate_task_placement(
         Proposed Parent Task: {parent_task_id or 'None (ATTEMPTING TO CREATE ROOT TASK)'}
         Proposed Dependencies: {json.dumps(depends_on_tasks or [])}
         Created By: {created_by}
+        {f"Already created as {task_id} (pending validation); do not report it as a duplicate of itself." if task_id else ""}
+        
+        {similar_tasks_hint}
         
         YOU MUST CRITICALLY EVALUATE:
         
@@ -147,7 +273,8 @@ async def validate_task_placement(
             response_text = await query_rag_system_with_model(
                 query_text=query,
                 model_name=TASK_ANALYSIS_MODEL,
-                max_tokens=TASK_ANALYSIS_MAX_TOKENS
+                max_tokens=TASK_ANALYSIS_MAX_TOKENS,
+                focus_task_ids=([parent_task_id] if parent_task_id else []) + list(depends_on_tasks or []),
             )
             rag_response = [mcp_types.TextContent(type="text", text=response_text)]
         
@@ -168,101 +295,11 @@ async def validate_task_placement(
                 "message": "No existing task knowledge found. Recommend creating as root task and adding project context/MCD."
             }
         
-        # Try to parse JSON from the response
-        try:
-            # Look for JSON in the response (it might be wrapped in other text)
-            json_start = response_text.find('{')
-            json_end = response_text.rfind('}') + 1
-            if json_start >= 0 and json_end > json_start:
-                json_str = response_text[json_start:json_end]
-                rag_data = json.loads(json_str)
-            else:
-                # Fallback if no JSON found
-                rag_data = None
-        except json.JSONDecodeError:
-            logger.warning(f"Could not parse JSON from RAG response: {response_text[:200]}...")
-            rag_data = None
+        rag_data = extract_json_object(response_text)
         
         # Process the RAG response into our format
         if rag_data:
-            # Check for hierarchy violations first
-            hierarchy_analysis = rag_data.get("hierarchy_analysis", {})
-            hierarchy_violation = hierarchy_analysis.get("hierarchy_violation", False)
-            
-            # Map RAG recommendations to our status codes
-            status_map = {
-                "proceed": "approved",
-                "modify": "suggest_changes",
-                "reconsider": "warning",
-                "deny": "denied"
-            }
-            
-            base_status = status_map.get(
-                rag_data.get("overall_recommendation", "proceed"),
-                "approved"
-            )
-            
-            # Override status if hierarchy violation detected
-            if hierarchy_violation and parent_task_id is None:
-                status = "denied"
-                logger.warning(f"Task creation denied due to hierarchy violation (attempting to create second root task)")
-            else:
-                status = base_status
-            
-            # Extract suggestions
-            parent_suggestion = rag_data.get("parent_suggestion", {})
-            dependency_suggestions = rag_data.get("dependency_suggestions", {})
-            
-            suggestions = {
-                "parent_task": parent_suggestion.get("recommended_parent"),
-                "dependencies": depends_on_tasks or []
-            }
-            
-            # Apply dependency modifications
-            if dependency_suggestions.get("add_dependencies"):
-                suggestions["dependencies"].extend(
-                    dependency_suggestions["add_dependencies"]
-                )
-            if dependency_suggestions.get("remove_dependencies"):
-                suggestions["dependencies"] = [
-                    d for d in suggestions["dependencies"]
-                    if d not in dependency_suggestions["remove_dependencies"]
-                ]
-            
-            # Remove duplicates and None values from dependencies
-            suggestions["dependencies"] = list(filter(None, set(suggestions["dependencies"])))
-            
-            # Add reasoning
-            reasoning_parts = []
-            if parent_suggestion.get("reasoning"):
-                reasoning_parts.append(f"Parent: {parent_suggestion['reasoning']}")
-            if dependency_suggestions.get("reasoning"):
-                reasoning_parts.append(f"Dependencies: {dependency_suggestions['reasoning']}")
-            
-            suggestions["reasoning"] = " | ".join(reasoning_parts) if reasoning_parts else None
-            
-            # Extract duplicate information
-            duplication_info = rag_data.get("duplication_check", {})
-            duplicates = []
-            for similar_task in duplication_info.get("similar_tasks", []):
-                duplicates.append({
-                    "task_id": similar_task.get("task_id"),
-                    "similarity": similar_task.get("similarity", 0.0),
-                    "title": similar_task.get("title", "Unknown")
-                })
-            
-            # Include critical thinking summary in message
-            critical_thinking = rag_data.get("critical_thinking_summary", "")
-            base_message = rag_data.get("message", "Task placement validated via RAG")
-            full_message = f"{base_message}\n\nCritical Analysis: {critical_thinking}" if critical_thinking else base_message
-            
-            return {
-                "status": status,
-                "suggestions": suggestions,
-                "duplicates": duplicates,
-                "message": full_message,
-                "hierarchy_analysis": hierarchy_analysis  # Include for additional context
-            }
+            return analysis_to_verdict(rag_data, parent_task_id, depends_on_tasks)
         else:
             # Fallback response if RAG parsing failed
             logger.warning("RAG response parsing failed, using fallback approval")
@@ -274,7 +311,8 @@ async def validate_task_placement(
                     "reasoning": None
                 },
                 "duplicates": [],
-                "message": "RAG validation unavailable, proceeding with original placement"
+                "message": "RAG validation unavailable, proceeding with original placement",
+                "fallback": True
             }
             
     except Exception as e:
@@ -288,5 +326,6 @@ async def validate_task_placement(
                 "reasoning": None
             },
             "duplicates": [],
-            "message": f"Validation error: {str(e)}. Proceeding with original placement."
+            "message": f"Validation error: {str(e)}. Proceeding with original placement.",
+            "fallback": True
         }
\ No newline at end of file
@@ -1,4 +1,5 @@
 # Agent-MCP/mcp_template/mcp_server_src/tools/admin_tools.py
+import asyncio
 import json
 import datetime
 import subprocess  # For launching Cursor (will be commented out)
@@ -17,17 +18,17 @@ from ..core.auth import (
 )  # For create_agent, terminate_agent
 from ..utils.audit_utils import log_audit
 from ..utils.project_utils import generate_system_prompt  # For create_agent
-from ..utils.tmux_utils import (
-    is_tmux_available,
-    create_tmux_session,
-    kill_tmux_session,
-    session_exists,
-    sanitize_session_name,
-    list_tmux_sessions,
-    send_prompt_async,
-    send_command_to_session,
+from ..utils.tmux_utils import sanitize_session_name
+from ..utils.tmux_async import (
+    is_tmux_available_async,
+    kill_tmux_session_async,
+    session_exists_async,
+    list_tmux_sessions_async,
+    send_command_to_session_async,
 )
+from ..utils.tmux_delivery import prompt_delivery
 from ..utils.prompt_templates import build_agent_prompt
+from ..utils.agent_launch import AgentLaunchSpec, launch_agent_session
 from ..db.connection import get_db_connection, execute_db_write
 from ..db.actions.agent_actions_db import log_agent_action_to_db  # For DB logging
 
@@ -255,6 +256,7 @@ async def create_agent_tool_impl(
 
         # Assign tasks to the agent atomically
         assigned_tasks = []
+        uncached_task_rows: Dict[str, Dict[str, Any]] = {}
         for task_id in task_ids:
             # Update task assignment
             cursor.execute(
@@ -270,23 +272,12 @@ async def create_agent_tool_impl(
 
             assigned_tasks.append(task_id)
 
-            # Update the in-memory global cache (g.tasks) to reflect the assignment
-            if task_id in g.tasks:
-                g.tasks[task_id]["assigned_to"] = agent_id
-                g.tasks[task_id]["status"] = "pending"
-                g.tasks[task_id]["updated_at"] = created_at_iso
-            else:
-                # If task not in cache, fetch from database and add to cache
+            # Tasks missing from the in-memory cache are read back for it
+            if task_id not in g.tasks:
                 cursor.execute("SELECT * FROM tasks WHERE task_id = ?", (task_id,))
                 task_row = cursor.fetchone()
                 if task_row:
-                    task_data = dict(task_row)
-                    task_data["assigned_to"] = (
-                        agent_id  # Ensure assignment is reflected
-                    )
-                    task_data["status"] = "pending"
-                    task_data["updated_at"] = created_at_iso
-                    g.tasks[task_id] = task_data
+                    uncached_task_rows[task_id] = dict(task_row)
 
             # Log task assignment action
             log_agent_action_to_db(
@@ -310,6 +301,16 @@ async def create_agent_tool_impl(
         # Commit the transaction (agent creation + task assignments)
         conn.commit()
 
+        # Update the in-memory global cache (g.tasks) to reflect the assignments
+        for task_id in assigned_tasks:
+            if task_id in uncached_task_rows:
+                g.tasks.put(uncached_task_rows[task_id])
+            else:
+                g.tasks.patch(
+                    task_id,
+                    {"assigned_to": agent_id, "status": "pending", "updated_at": created_at_iso},
+                )
+
         # Update in-memory state (main.py:1126-1133)
         g.active_agents[new_agent_token] = {
             "agent_id": agent_id,
@@ -346,7 +347,7 @@ async def create_agent_tool_impl(
         launch_status = "tmux session launching disabled - tmux not available."
         tmux_session_name = None
 
-        if is_tmux_available():
+        if await is_tmux_available_async():
             try:
                 # Create sanitized session name
                 tmux_session_name = create_agent_session_name(agent_id, token)
@@ -366,157 +367,64 @@ async def create_agent_tool_impl(
                 ):
                     env_vars["MCP_ADMIN_TOKEN"] = g.admin_token
 
-                # Create the tmux session (without immediate command)
-                if create_tmux_session(
-                    session_name=tmux_session_name,
-                    working_dir=agent_working_dir_abs,
-                    command=None,  # Don't start Claude immediately
-                    env_vars=env_vars,
-                ):
-                    # Track the tmux session in globals
-                    g.agent_tmux_sessions[agent_id] = tmux_session_name
-
-                    # Initial setup commands for visibility in tmux session
-                    welcome_message = (
-                        f"echo '=== Agent {agent_id} initialization starting ==='"
-                    )
-                    if send_command_to_session(tmux_session_name, welcome_message):
-                        logger.info(f"✅ Sent welcome message to agent '{agent_id}'")
-                    else:
-                        logger.error(
-                            f"❌ Failed to send welcome message to agent '{agent_id}'"
+                # Build the prompt using the template system
+                agent_prompt = None
+                prompt_status = ""
+                if send_prompt:
+                    try:
+                        agent_prompt = build_agent_prompt(
+                            agent_id=agent_id,
+                            agent_token=new_agent_token,
+                            admin_token=g.admin_token,
+                            template_name=prompt_template,
+                            custom_prompt=custom_prompt,
                         )
-
-                    # Add setup delay to ensure commands execute properly
-                    import time
-
-                    def wait_for_command_completion(
-                        session_name: str, delay: float = 1.0
-                    ):
-                        """Smart delay system - wait for command completion or timeout"""
-                        time.sleep(delay)
-                        # Could add tmux pane monitoring here in future for true completion detection
-
-                    setup_delay = 1.0  # 1 second delay between setup commands
-                    wait_for_command_completion(tmux_session_name, setup_delay)
-
-                    # Verify we're in the correct working directory
-                    verify_command = f"echo 'Working directory:' && pwd"
-                    if send_command_to_session(tmux_session_name, verify_command):
-                        logger.info(
-                            f"✅ Sent directory verification to agent '{agent_id}'"
+                        if not agent_prompt:
+                            prompt_status = f" ❌ Failed to build prompt using template '{prompt_template}'."
+                            logger.error(
+                                f"Failed to build prompt for agent '{agent_id}' using template '{prompt_template}'"
+                            )
+                    except Exception as e_prompt:
+                        prompt_status = (
+                            f" ❌ Error setting up prompt: {str(e_prompt)}"
                         )
-                    else:
                         logger.error(
-                            f"❌ Failed to send directory verification to agent '{agent_id}'"
+                            f"Error setting up prompt for agent '{agent_id}': {e_prompt}"
                         )
 
-                    wait_for_command_completion(tmux_session_name, setup_delay)
-
-                    # Get server port for MCP registration
-                    server_port = os.environ.get("PORT", "8080")
-                    mcp_server_url = f"http://localhost:{server_port}/sse"
-
-                    # Log MCP server info
-                    mcp_info_command = f"echo 'MCP Server URL: {mcp_server_url}'"
-                    send_command_to_session(tmux_session_name, mcp_info_command)
-
-                    wait_for_command_completion(tmux_session_name, setup_delay)
-
-                    # Register MCP server connection
-                    mcp_add_command = f"claude mcp add -t sse AgentMCP {mcp_server_url}"
-                    logger.info(
-                        f"Registering MCP server for agent '{agent_id}': {mcp_add_command}"
+                # Get server port for MCP registration
+                server_port = os.environ.get("PORT", "8080")
+
+                # Create the session, register MCP and start Claude; every
+                # step waits for its output in the pane, not a fixed delay
+                launch = await launch_agent_session(
+                    AgentLaunchSpec(
+                        agent_id=agent_id,
+                        session_name=tmux_session_name,
+                        working_dir=agent_working_dir_abs,
+                        mcp_server_url=f"http://localhost:{server_port}/sse",
+                        env_vars=env_vars,
+                        prompt=agent_prompt,
+                        prompt_delay=prompt_delay,
                     )
+                )
+                if launch.stage != "create_session":
+                    # Track the tmux session in globals
+                    g.agent_tmux_sessions[agent_id] = tmux_session_name
 
-                    if not send_command_to_session(tmux_session_name, mcp_add_command):
-                        logger.error(
-                            f"Failed to register MCP server for agent '{agent_id}'"
-                        )
-                        base_status = (
-                            f"❌ Failed to register MCP server for agent '{agent_id}'."
-                        )
-                    else:
-                        # Add delay to ensure MCP registration completes
-                        wait_for_command_completion(tmux_session_name, setup_delay)
-
-                        # Verify MCP registration
-                        verify_mcp_command = "claude mcp list"
-                        logger.info(
-                            f"Verifying MCP registration for agent '{agent_id}'"
-                        )
-                        send_command_to_session(tmux_session_name, verify_mcp_command)
-                        wait_for_command_completion(tmux_session_name, setup_delay)
-
-                        # Start Claude
-                        start_claude_message = "echo '--- Starting Claude with MCP ---'"
-                        send_command_to_session(tmux_session_name, start_claude_message)
-                        wait_for_command_completion(tmux_session_name, setup_delay)
-
-                        claude_command = "claude --dangerously-skip-permissions"
+                    base_status = launch.message
+                    if launch.prompt_task is not None:
+                        prompt_status = f" Prompt will be sent once Claude is ready using '{prompt_template}' template."
                         logger.info(
-                            f"Starting Claude for agent '{agent_id}': {claude_command}"
+                            f"Scheduled prompt delivery for agent '{agent_id}' using template '{prompt_template}'"
                         )
 
-                        if not send_command_to_session(
-                            tmux_session_name, claude_command
-                        ):
-                            logger.error(
-                                f"Failed to start Claude for agent '{agent_id}'"
-                            )
-                            base_status = f"❌ Failed to start Claude for agent '{agent_id}' after MCP registration."
-                        else:
-                            base_status = f"✅ tmux session '{tmux_session_name}' created for agent '{agent_id}' with MCP registration and Claude."
-
-                            # Log completion message to tmux session (will appear before Claude starts)
-                            completion_message = f"echo '=== Agent {agent_id} setup complete - Claude starting ==='"
-                            send_command_to_session(
-                                tmux_session_name, completion_message
-                            )
-
-                    # Send prompt if requested
-                    prompt_status = ""
-                    if send_prompt:
-                        try:
-                            # Build the prompt using the template system
-                            agent_prompt = build_agent_prompt(
-                                agent_id=agent_id,
-                                agent_token=new_agent_token,
-                                admin_token=g.admin_token,
-                                template_name=prompt_template,
-                                custom_prompt=custom_prompt,
-                            )
-
-                            if agent_prompt:
-                                # Send prompt asynchronously
-                                send_prompt_async(
-                                    tmux_session_name, agent_prompt, prompt_delay
-                                )
-                                prompt_status = f" Prompt will be sent in {prompt_delay} seconds using '{prompt_template}' template."
-                                logger.info(
-                                    f"Scheduled prompt delivery for agent '{agent_id}' using template '{prompt_template}'"
-                                )
-                            else:
-                                prompt_status = f" ❌ Failed to build prompt using template '{prompt_template}'."
-                                logger.error(
-                                    f"Failed to build prompt for agent '{agent_id}' using template '{prompt_template}'"
-                                )
-                        except Exception as e_prompt:
-                            prompt_status = (
-                                f" ❌ Error setting up prompt: {str(e_prompt)}"
-                            )
-                            logger.error(
-                                f"Error setting up prompt for agent '{agent_id}': {e_prompt}"
-                            )
-
                     launch_status = base_status + prompt_status
                     logger.info(
                         f"tmux session '{tmux_session_name}' launched for agent '{agent_id}'"
                     )
                 else:
-                    launch_status = (
-                        f"❌ Failed to create tmux session for agent '{agent_id}'."
-                    )
+                    launch_status = launch.message
                     logger.error(launch_status)
 
             except Exception as e_launch:
@@ -587,6 +495,70 @@ async def create_agent_tool_impl(
             conn.close()
 
 
+# --- create_agents tool ---
+async def create_agents_tool_impl(
+    arguments: Dict[str, Any],
+) -> List[mcp_types.TextContent]:
+    """Creates several agents with create_agent; their tmux launches run concurrently."""
+    token = arguments.get("token")
+    agents = arguments.get("agents")
+
+    if not verify_token(token, "admin"):
+        return [
+            mcp_types.TextContent(
+                type="text", text="Unauthorized: Admin token required"
+            )
+        ]
+
+    if not isinstance(agents, list) or not agents:
+        return [
+            mcp_types.TextContent(
+                type="text",
+                text="Error: agents is required and must be a non-empty list.",
+            )
+        ]
+
+    agent_ids = [spec.get("agent_id") if isinstance(spec, dict) else None for spec in agents]
+    if not all(isinstance(agent_id, str) and agent_id for agent_id in agent_ids):
+        return [
+            mcp_types.TextContent(
+                type="text",
+                text="Error: every entry in agents must be an object with a string agent_id.",
+            )
+        ]
+    duplicates = sorted({agent_id for agent_id in agent_ids if agent_ids.count(agent_id) > 1})
+    if duplicates:
+        return [
+            mcp_types.TextContent(
+                type="text",
+                text=f"Error: duplicate agent_id(s) in agents: {', '.join(duplicates)}",
+            )
+        ]
+
+    # Each create_agent does its database work before its first await, so the
+    # concurrent part is the tmux launch: N agents take about as long as one
+    outcomes = await asyncio.gather(
+        *(create_agent_tool_impl({**spec, "token": token}) for spec in agents),
+        return_exceptions=True,
+    )
+
+    sections = []
+    for agent_id, outcome in zip(agent_ids, outcomes):
+        if isinstance(outcome, BaseException):
+            logger.error(f"Error creating agent {agent_id}: {outcome}", exc_info=outcome)
+            text = f"Unexpected error creating agent: {outcome}"
+        else:
+            text = "\n".join(item.text for item in outcome)
+        sections.append(f"=== {agent_id} ===\n{text}")
+
+    return [
+        mcp_types.TextContent(
+            type="text",
+            text=f"Processed {len(agents)} agent(s).\n\n" + "\n\n".join(sections),
+        )
+    ]
+
+
 # --- view_status tool ---
 # Original logic from main.py: lines 1242-1268 (view_status_tool function)
 async def view_status_tool_impl(
@@ -633,14 +605,15 @@ async def view_status_tool_impl(
 
     # Get tmux session information
     tmux_info = {
-        "tmux_available": is_tmux_available(),
+        "tmux_available": await is_tmux_available_async(),
         "tracked_sessions": len(g.agent_tmux_sessions),
         "active_sessions": [],
         "session_details": {},
+        "prompt_delivery": prompt_delivery.metrics(),
     }
 
-    if is_tmux_available():
-        tmux_sessions = list_tmux_sessions()
+    if await is_tmux_available_async():
+        tmux_sessions = await list_tmux_sessions_async()
         tmux_info["active_sessions"] = [s["name"] for s in tmux_sessions]
         tmux_info["session_details"] = {s["name"]: s for s in tmux_sessions}
 
@@ -793,7 +766,7 @@ async def terminate_agent_tool_impl(
         tmux_kill_status = ""
         if agent_id_to_terminate in g.agent_tmux_sessions:
             session_name = g.agent_tmux_sessions[agent_id_to_terminate]
-            if kill_tmux_session(session_name):
+            if await kill_tmux_session_async(session_name):
                 tmux_kill_status = f" Killed tmux session '{session_name}'."
                 logger.info(
                     f"Killed tmux session '{session_name}' for agent '{agent_id_to_terminate}'"
@@ -809,8 +782,8 @@ async def terminate_agent_tool_impl(
         else:
             # Try to kill session by agent_id in case tracking is out of sync
             sanitized_name = sanitize_session_name(agent_id_to_terminate)
-            if session_exists(sanitized_name):
-                if kill_tmux_session(sanitized_name):
+            if await session_exists_async(sanitized_name):
+                if await kill_tmux_session_async(sanitized_name):
                     tmux_kill_status = (
                         f" Killed orphaned tmux session '{sanitized_name}'."
                     )
@@ -1214,7 +1187,7 @@ async def relaunch_agent_tool_impl(
             ]
 
         session_name = g.agent_tmux_sessions[agent_id]
-        if not session_exists(session_name):
+        if not await session_exists_async(session_name):
             # Clean up the dead session reference
             del g.agent_tmux_sessions[agent_id]
             return [
@@ -1225,7 +1198,7 @@ async def relaunch_agent_tool_impl(
             ]
 
         # Send /clear command to reset the session
-        clear_success = send_command_to_session(session_name, "/clear")
+        clear_success = await send_command_to_session_async(session_name, "/clear")
         if not clear_success:
             return [
                 mcp_types.TextContent(
@@ -1258,7 +1231,7 @@ async def relaunch_agent_tool_impl(
                 prompt_to_send = build_agent_prompt(prompt_template, admin_token)
 
             # Send the new prompt to restart the agent
-            send_prompt_async(session_name, prompt_to_send, delay_seconds=2)
+            prompt_delivery.submit(session_name, prompt_to_send, delay_seconds=2)
 
         except Exception as e_prompt:
             logger.error(f"Failed to build or send prompt for relaunch: {e_prompt}")
@@ -1407,7 +1380,7 @@ def register_admin_tools():
                 },
                 "prompt_delay": {
                     "type": "integer",
-                    "description": "Seconds to wait before sending prompt (allows Claude to start up)",
+                    "description": "Seconds to wait before sending prompt when Claude readiness detection (AGENT_READY_PATTERN) is disabled; otherwise the prompt is sent as soon as Claude is ready",
                     "default": 5,
                     "minimum": 1,
                     "maximum": 30,
@@ -1419,6 +1392,62 @@ def register_admin_tools():
         implementation=create_agent_tool_impl,
     )
 
+    register_tool(
+        name="create_agents",
+        description="Create several agents at once. Each entry takes the same fields as create_agent (except token); the agents' tmux sessions are launched in parallel, so a swarm starts in about the time of a single launch.",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "token": {
+                    "type": "string",
+                    "description": "Admin authentication token",
+                },
+                "agents": {
+                    "type": "array",
+                    "description": "Agents to create",
+                    "minItems": 1,
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "agent_id": {"type": "string"},
+                            "task_ids": {
+                                "type": "array",
+                                "items": {"type": "string"},
+                                "minItems": 1,
+                            },
+                            "capabilities": {
+                                "type": "array",
+                                "items": {"type": "string"},
+                            },
+                            "prompt_template": {
+                                "type": "string",
+                                "enum": [
+                                    "worker_with_rag",
+                                    "basic_worker",
+                                    "frontend_worker",
+                                    "admin_agent",
+                                    "custom",
+                                ],
+                            },
+                            "custom_prompt": {"type": "string"},
+                            "send_prompt": {"type": "boolean"},
+                            "prompt_delay": {
+                                "type": "integer",
+                                "minimum": 1,
+                                "maximum": 30,
+                            },
+                        },
+                        "required": ["agent_id", "task_ids"],
+                        "additionalProperties": False,
+                    },
+                },
+            },
+            "required": ["token", "agents"],
+            "additionalProperties": False,
+        },
+        implementation=create_agents_tool_impl,
+    )
+
     register_tool(
         name="view_status",
         description="View the status of all agents, connections, and the MCP server.",
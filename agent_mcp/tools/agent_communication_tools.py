@@ -1,4 +1,5 @@
 # Agent-MCP/agent_mcp/tools/agent_communication_tools.py
+import asyncio
 import json
 import datetime
 import secrets
@@ -10,13 +11,19 @@ import os
 import mcp.types as mcp_types
 
 from .registry import register_tool
-from ..core.config import logger
+from ..core.config import logger, AGENT_INTERRUPTED_PATTERN, MESSAGE_WAIT_MAX_SECONDS
 from ..core import globals as g
 from ..core.auth import verify_token, get_agent_id
 from ..utils.audit_utils import log_audit
-from ..db.connection import get_db_connection
+from ..db.connection import get_db_connection, execute_db_write
 from ..db.actions.agent_actions_db import log_agent_action_to_db
-from ..utils.tmux_utils import send_prompt_async, session_exists, sanitize_session_name, send_command_to_session
+from ..db.actions.agent_messages_db import (
+    get_unread_messages,
+    insert_agent_messages,
+    mark_messages_read,
+)
+from ..utils.tmux_async import send_escape_async, session_exists_async
+from ..utils.tmux_delivery import prompt_delivery
 
 
 def _generate_message_id() -> str:
@@ -60,6 +67,25 @@ def _can_agents_communicate(sender_id: str, recipient_id: str, is_admin: bool) -
     return False, "Communication not permitted between these agents"
 
 
+def _format_message_lines(agent_id: str, msg: Dict[str, Any]) -> List[str]:
+    """Display lines of one message as seen by `agent_id`."""
+    direction = "➡️" if msg["sender_id"] == agent_id else "⬅️"
+    other_agent = msg["recipient_id"] if msg["sender_id"] == agent_id else msg["sender_id"]
+    read_status = "📖" if msg["read"] else "📩"
+    priority_icon = {"low": "🔵", "normal": "⚪", "high": "🟡", "urgent": "🔴"}.get(msg["priority"], "⚪")
+    return [
+        f"{direction} {read_status} {priority_icon} [{msg['message_type']}] {other_agent}",
+        f"   {msg['timestamp']}",
+        f"   {msg['message_content']}",
+        "",
+    ]
+
+
+def _format_tmux_message(sender_id: str, priority: str, message_content: str) -> str:
+    """Text typed into the recipient's tmux session for a message."""
+    return f"\n💬 Message from {sender_id} ({priority}): {message_content}\n"
+
+
 async def send_agent_message_tool_impl(arguments: Dict[str, Any]) -> List[mcp_types.TextContent]:
     """
     Send a message from one agent to another with permission checks.
@@ -116,68 +142,49 @@ async def send_agent_message_tool_impl(arguments: Dict[str, Any]) -> List[mcp_ty
         conn = get_db_connection()
         cursor = conn.cursor()
         
-        # Store message in database
-        cursor.execute("""
-            INSERT INTO agent_messages (message_id, sender_id, recipient_id, message_content, 
-                                      message_type, priority, timestamp, delivered, read)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (message_id, sender_id, recipient_id, message_content, message_type, 
-              priority, timestamp, False, False))
+        # Store message in database and commit before any delivery, so the
+        # write lock is not held while awaiting tmux
+        insert_agent_messages(cursor, [message_data])
+        conn.commit()
+        
+        # Wake the recipient if it is waiting on its inbox
+        g.message_broker.publish([recipient_id])
         
         # Attempt delivery based on method
         delivery_status = "stored"
+        delivered = False
         
         if deliver_method in ["tmux", "both"]:
             # Try to deliver to recipient's tmux session
             if recipient_id in g.agent_tmux_sessions:
                 session_name = g.agent_tmux_sessions[recipient_id]
-                if session_exists(session_name):
+                if await session_exists_async(session_name):
                     # Handle stop commands differently
                     if message_type == "stop_command":
                         # Send control sequence to interrupt the agent
                         try:
-                            import subprocess
-                            clean_session_name = sanitize_session_name(session_name)
+                            # Up to 4 Escapes, 1 second apart, until Claude shows it was interrupted
+                            delivered = await send_escape_async(session_name, until=AGENT_INTERRUPTED_PATTERN)
                             
-                            # Send Escape 4 times with 1 second intervals to stop current operation
-                            import time
-                            success = True
-                            for i in range(4):
-                                result = subprocess.run(['tmux', 'send-keys', '-t', clean_session_name, 'Escape'], 
-                                                      capture_output=True, text=True, timeout=5)
-                                if result.returncode != 0:
-                                    success = False
-                                    break
-                                logger.debug(f"Sent Escape {i+1}/4 to agent {recipient_id}")
-                                if i < 3:  # Don't sleep after the last one
-                                    time.sleep(1)
-                            
-                            if success:
+                            if delivered:
                                 delivery_status = "delivered_stop_command"
                                 logger.info(f"Stop command (4x Escape) sent to agent {recipient_id} in session {session_name}")
                             else:
                                 delivery_status = "stop_command_failed"
-                                logger.error(f"Failed to send stop command: {result.stderr}")
-                            
-                            # Mark as delivered in database
-                            cursor.execute("UPDATE agent_messages SET delivered = ? WHERE message_id = ?", 
-                                         (success, message_id))
+                                logger.error(f"Failed to send stop command to agent {recipient_id}")
                                          
                         except Exception as e:
                             logger.error(f"Failed to send stop command to tmux session '{session_name}': {e}")
                             delivery_status = "stop_command_failed"
                     else:
                         # Format regular message for delivery
-                        formatted_message = f"\n💬 Message from {sender_id} ({priority}): {message_content}\n"
+                        formatted_message = _format_tmux_message(sender_id, priority, message_content)
                         
                         # Send message to tmux session
                         try:
-                            send_prompt_async(session_name, formatted_message, delay_seconds=1)
+                            prompt_delivery.submit(session_name, formatted_message, delay_seconds=1)
                             delivery_status = "delivered_tmux"
-                            
-                            # Mark as delivered in database
-                            cursor.execute("UPDATE agent_messages SET delivered = ? WHERE message_id = ?", 
-                                         (True, message_id))
+                            delivered = True
                             
                         except Exception as e:
                             logger.error(f"Failed to deliver message to tmux session '{session_name}': {e}")
@@ -187,7 +194,10 @@ async def send_agent_message_tool_impl(arguments: Dict[str, Any]) -> List[mcp_ty
             else:
                 delivery_status = "no_session"
         
-        # Log the communication
+        # Mark as delivered and log the communication in a second short transaction
+        if delivered:
+            cursor.execute("UPDATE agent_messages SET delivered = ? WHERE message_id = ?", 
+                         (True, message_id))
         log_agent_action_to_db(cursor, sender_id, "send_message", 
                                details={
                                    "recipient": recipient_id,
@@ -312,9 +322,7 @@ async def get_agent_messages_tool_impl(arguments: Dict[str, Any]) -> List[mcp_ty
             message_ids_to_mark = [msg["message_id"] for msg in messages 
                                  if msg["recipient_id"] == agent_id and not msg["read"]]
             if message_ids_to_mark:
-                placeholders = ",".join("?" * len(message_ids_to_mark))
-                cursor.execute(f"UPDATE agent_messages SET read = ? WHERE message_id IN ({placeholders})", 
-                             [True] + message_ids_to_mark)
+                mark_messages_read(cursor, message_ids_to_mark)
                 conn.commit()
         
         # Format response
@@ -325,15 +333,7 @@ async def get_agent_messages_tool_impl(arguments: Dict[str, Any]) -> List[mcp_ty
         response_lines.append("")
         
         for msg in messages:
-            direction = "➡️" if msg["sender_id"] == agent_id else "⬅️"
-            other_agent = msg["recipient_id"] if msg["sender_id"] == agent_id else msg["sender_id"]
-            read_status = "📖" if msg["read"] else "📩"
-            priority_icon = {"low": "🔵", "normal": "⚪", "high": "🟡", "urgent": "🔴"}.get(msg["priority"], "⚪")
-            
-            response_lines.append(f"{direction} {read_status} {priority_icon} [{msg['message_type']}] {other_agent}")
-            response_lines.append(f"   {msg['timestamp']}")
-            response_lines.append(f"   {msg['message_content']}")
-            response_lines.append("")
+            response_lines.extend(_format_message_lines(agent_id, msg))
         
         log_audit(agent_id, "get_agent_messages", {
             "messages_retrieved": len(messages),
@@ -354,6 +354,89 @@ async def get_agent_messages_tool_impl(arguments: Dict[str, Any]) -> List[mcp_ty
             conn.close()
 
 
+def _read_unread_messages(agent_id: str, limit: int, mark_as_read: bool) -> List[Dict[str, Any]]:
+    conn = None
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        messages = get_unread_messages(cursor, agent_id, limit)
+        if messages and mark_as_read:
+            mark_messages_read(cursor, [msg["message_id"] for msg in messages])
+            conn.commit()
+        return messages
+    except sqlite3.Error:
+        if conn:
+            conn.rollback()
+        raise
+    finally:
+        if conn:
+            conn.close()
+
+
+async def wait_for_messages_tool_impl(arguments: Dict[str, Any]) -> List[mcp_types.TextContent]:
+    """
+    Long-poll for the calling agent's unread messages: returns at once if there
+    are any, otherwise waits until one is stored for this agent or the timeout
+    passes. Only this agent's waiters are woken (g.message_broker).
+    """
+    agent_token = arguments.get("token")
+    timeout_seconds = arguments.get("timeout_seconds", 60)
+    mark_as_read = arguments.get("mark_as_read", True)
+    limit = arguments.get("limit", 20)
+    
+    # Authentication
+    agent_id = get_agent_id(agent_token)
+    if not agent_id:
+        return [mcp_types.TextContent(type="text", text="Unauthorized: Valid token required")]
+    
+    # Validation
+    try:
+        timeout_seconds = min(max(float(timeout_seconds), 0.0), MESSAGE_WAIT_MAX_SECONDS)
+    except (ValueError, TypeError):
+        timeout_seconds = 60.0
+    try:
+        limit = int(limit)
+        if not (1 <= limit <= 100):
+            limit = 20
+    except (ValueError, TypeError):
+        limit = 20
+    
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout_seconds
+    try:
+        with g.message_broker.subscribe(agent_id) as wakeup:
+            while True:
+                # Cleared before reading, so a message stored meanwhile still wakes us
+                wakeup.clear()
+                messages = _read_unread_messages(agent_id, limit, mark_as_read)
+                if messages:
+                    break
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    return [mcp_types.TextContent(
+                        type="text",
+                        text=f"No new messages for {agent_id} within {timeout_seconds:g}s"
+                    )]
+                try:
+                    await asyncio.wait_for(wakeup.wait(), remaining)
+                except asyncio.TimeoutError:
+                    pass
+    except sqlite3.Error as e:
+        logger.error(f"Database error waiting for messages: {e}", exc_info=True)
+        return [mcp_types.TextContent(type="text", text=f"Database error waiting for messages: {e}")]
+    except Exception as e:
+        logger.error(f"Unexpected error waiting for messages: {e}", exc_info=True)
+        return [mcp_types.TextContent(type="text", text=f"Unexpected error waiting for messages: {e}")]
+    
+    response_lines = [f"New messages for {agent_id} ({len(messages)}):", ""]
+    for msg in messages:
+        response_lines.extend(_format_message_lines(agent_id, msg))
+    
+    log_audit(agent_id, "wait_for_messages", {"messages_retrieved": len(messages)})
+    
+    return [mcp_types.TextContent(type="text", text="\n".join(response_lines))]
+
+
 async def broadcast_admin_message_tool_impl(arguments: Dict[str, Any]) -> List[mcp_types.TextContent]:
     """
     Admin-only tool to broadcast a message to all active agents.
@@ -370,45 +453,102 @@ async def broadcast_admin_message_tool_impl(arguments: Dict[str, Any]) -> List[m
     if not message_content:
         return [mcp_types.TextContent(type="text", text="Error: message is required")]
     
-    # Get all active agents
-    active_agents = list(g.active_agents.keys())
-    if not active_agents:
+    if len(message_content) > 4000:  # Same limit as send_agent_message
+        return [mcp_types.TextContent(type="text", text="Error: Message too long (max 4000 characters)")]
+    
+    sender_id = get_agent_id(admin_token) or "admin"
+    
+    # Get all active agents (one entry per agent, admin itself excluded)
+    recipient_ids = list(dict.fromkeys(
+        agent_data.get("agent_id")
+        for agent_data in g.active_agents.values()
+        if agent_data.get("agent_id") and agent_data.get("agent_id") != "admin"
+    ))
+    if not recipient_ids:
         return [mcp_types.TextContent(type="text", text="No active agents to broadcast to")]
     
-    # Send to each agent
-    sent_count = 0
-    failed_count = 0
+    # Sessions to type the message into (registry lookups while tmux control is connected)
+    tracked = {
+        recipient_id: g.agent_tmux_sessions[recipient_id]
+        for recipient_id in recipient_ids
+        if recipient_id in g.agent_tmux_sessions
+    }
+    exists = await asyncio.gather(*(session_exists_async(name) for name in tracked.values()))
+    sessions = {
+        recipient_id: session_name
+        for (recipient_id, session_name), found in zip(tracked.items(), exists)
+        if found
+    }
     
-    for agent_token in active_agents:
-        agent_data = g.active_agents[agent_token]
-        recipient_id = agent_data.get("agent_id")
-        
-        if recipient_id and recipient_id != "admin":  # Don't send to admin itself
-            try:
-                # Use the send message function
-                result = await send_agent_message_tool_impl({
-                    "token": admin_token,
-                    "recipient_id": recipient_id,
-                    "message": message_content,
-                    "message_type": message_type,
-                    "priority": priority,
-                    "deliver_method": "both"
-                })
-                sent_count += 1
-            except Exception as e:
-                logger.error(f"Failed to send broadcast to {recipient_id}: {e}")
-                failed_count += 1
+    timestamp = datetime.datetime.now().isoformat()
+    messages = [
+        {
+            "message_id": _generate_message_id(),
+            "sender_id": sender_id,
+            "recipient_id": recipient_id,
+            "message_content": message_content,
+            "message_type": message_type,
+            "priority": priority,
+            "timestamp": timestamp,
+            # Delivered = handed to the recipient's tmux session, as for send_agent_message
+            "delivered": recipient_id in sessions,
+            "read": False,
+        }
+        for recipient_id in recipient_ids
+    ]
+    
+    # One transaction for all recipients
+    async def write_operation():
+        conn = None
+        try:
+            conn = get_db_connection()
+            cursor = conn.cursor()
+            insert_agent_messages(cursor, messages)
+            log_agent_action_to_db(cursor, sender_id, "broadcast_message",
+                                   details={
+                                       "recipients": len(recipient_ids),
+                                       "tmux_deliveries": len(sessions),
+                                       "message_type": message_type,
+                                       "priority": priority
+                                   })
+            conn.commit()
+        except Exception:
+            if conn:
+                conn.rollback()
+            raise
+        finally:
+            if conn:
+                conn.close()
+    
+    try:
+        await execute_db_write(write_operation)
+    except sqlite3.Error as e:
+        logger.error(f"Database error broadcasting message: {e}", exc_info=True)
+        return [mcp_types.TextContent(type="text", text=f"Database error broadcasting message: {e}")]
+    except Exception as e:
+        logger.error(f"Unexpected error broadcasting message: {e}", exc_info=True)
+        return [mcp_types.TextContent(type="text", text=f"Unexpected error broadcasting message: {e}")]
+    
+    # Wake waiting inboxes, then queue the tmux deliveries; the delivery
+    # executor writes to different sessions in parallel, bounded by its workers
+    g.message_broker.publish(recipient_ids)
+    formatted_message = _format_tmux_message(sender_id, priority, message_content)
+    for session_name in sessions.values():
+        prompt_delivery.submit(session_name, formatted_message, delay_seconds=1)
     
     log_audit("admin", "broadcast_message", {
         "message_type": message_type,
         "priority": priority,
-        "sent_count": sent_count,
-        "failed_count": failed_count
+        "sent_count": len(recipient_ids),
+        "tmux_deliveries": len(sessions),
+        "recipients": recipient_ids
     })
     
     return [mcp_types.TextContent(
         type="text", 
-        text=f"Broadcast sent to {sent_count} agents. {failed_count} failed."
+        text=f"Broadcast sent to {len(recipient_ids)} agents "
+             f"({len(sessions)} delivered to tmux sessions, "
+             f"{len(recipient_ids) - len(sessions)} stored only)."
     )]
 
 
@@ -507,6 +647,42 @@ def register_agent_communication_tools():
         implementation=get_agent_messages_tool_impl
     )
     
+    register_tool(
+        name="wait_for_messages",
+        description="Wait for new messages for the current agent. Returns unread messages immediately if there are any, otherwise blocks until a message arrives or the timeout passes. Use instead of polling get_agent_messages.",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "token": {
+                    "type": "string",
+                    "description": "Agent's authentication token"
+                },
+                "timeout_seconds": {
+                    "type": "number",
+                    "description": "Maximum seconds to wait for a message",
+                    "default": 60,
+                    "minimum": 0,
+                    "maximum": MESSAGE_WAIT_MAX_SECONDS
+                },
+                "mark_as_read": {
+                    "type": "boolean",
+                    "description": "Mark returned messages as read",
+                    "default": True
+                },
+                "limit": {
+                    "type": "integer",
+                    "description": "Maximum number of messages to return",
+                    "default": 20,
+                    "minimum": 1,
+                    "maximum": 100
+                }
+            },
+            "required": ["token"],
+            "additionalProperties": False
+        },
+        implementation=wait_for_messages_tool_impl
+    )
+    
     register_tool(
         name="broadcast_admin_message",
         description="Admin-only tool to broadcast a message to all active agents.",
@@ -9,7 +9,10 @@ from ..core.config import logger
 from ..core.auth import get_agent_id # Corrected
 from ..utils.audit_utils import log_audit # Corrected
 # Import the core RAG querying logic
-from ..features.rag.query import query_rag_system # Corrected
+from ..features.rag.query import query_rag_system, query_rag_system_batch # Corrected
+
+# Upper bound on questions per ask_project_rag_batch call
+MAX_BATCH_QUERIES = 20
 
 # --- ask_project_rag tool ---
 # Original logic for the tool part from main.py: lines 1572-1578 (ask_project_rag_tool function shell)
@@ -45,6 +48,46 @@ async def ask_project_rag_tool_impl(arguments: Dict[str, Any]) -> List[mcp_types
         return [mcp_types.TextContent(type="text", text=f"An unexpected error occurred while processing your RAG query: {str(e)}")]
 
 
+# --- ask_project_rag_batch tool ---
+# Several related questions share one embeddings call, one live-data fetch and
+# (optionally) one chat completion. See query_rag_system_batch.
+async def ask_project_rag_batch_tool_impl(arguments: Dict[str, Any]) -> List[mcp_types.TextContent]:
+    agent_auth_token = arguments.get("token")
+    queries = arguments.get("queries")
+    combine_answers = arguments.get("combine_answers", False)
+
+    requesting_agent_id = get_agent_id(agent_auth_token)
+    if not requesting_agent_id:
+        return [mcp_types.TextContent(type="text", text="Unauthorized: Valid agent token required")]
+
+    if not isinstance(queries, list) or not queries or not all(isinstance(q, str) and q.strip() for q in queries):
+        return [mcp_types.TextContent(type="text", text="Error: queries must be a non-empty list of non-empty strings.")]
+    if len(queries) > MAX_BATCH_QUERIES:
+        return [mcp_types.TextContent(type="text", text=f"Error: at most {MAX_BATCH_QUERIES} queries per batch (got {len(queries)}).")]
+    if not isinstance(combine_answers, bool):
+        return [mcp_types.TextContent(type="text", text="Error: combine_answers must be a boolean.")]
+
+    log_audit(requesting_agent_id, "ask_project_rag_batch", {"queries": queries, "combine_answers": combine_answers})
+
+    logger.info(f"Agent '{requesting_agent_id}' is asking project RAG a batch of {len(queries)} queries")
+
+    try:
+        answers = await query_rag_system_batch(queries, synthesize_together=combine_answers)
+
+        if combine_answers:
+            return [mcp_types.TextContent(type="text", text=answers[0])]
+
+        response_parts = [
+            f"### Query {i + 1}: {query}\n\n{answer}"
+            for i, (query, answer) in enumerate(zip(queries, answers))
+        ]
+        return [mcp_types.TextContent(type="text", text="\n\n".join(response_parts))]
+
+    except Exception as e:
+        logger.error(f"Unexpected error in ask_project_rag_batch_tool_impl for agent '{requesting_agent_id}': {e}", exc_info=True)
+        return [mcp_types.TextContent(type="text", text=f"An unexpected error occurred while processing your RAG batch query: {str(e)}")]
+
+
 # --- Register RAG tools ---
 def register_rag_tools():
     register_tool(
@@ -62,5 +105,31 @@ def register_rag_tools():
         implementation=ask_project_rag_tool_impl
     )
 
+    register_tool(
+        name="ask_project_rag_batch",
+        description="Ask several related natural language questions about the project in one call. All questions are embedded together and share the live context/task lookups; set combine_answers to get a single synthesized answer instead of one answer per question.",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "token": {"type": "string", "description": "Authentication token for the agent making the query."},
+                "queries": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "minItems": 1,
+                    "maxItems": MAX_BATCH_QUERIES,
+                    "description": "The natural language questions to ask about the project."
+                },
+                "combine_answers": {
+                    "type": "boolean",
+                    "description": "Synthesize all answers in a single completion (default: false, one answer per query).",
+                    "default": False
+                }
+            },
+            "required": ["token", "queries"],
+            "additionalProperties": False
+        },
+        implementation=ask_project_rag_batch_tool_impl
+    )
+
 # Call registration when this module is imported
 register_rag_tools()
\ No newline at end of file
@@ -1,22 +1,60 @@
 # Agent-MCP/mcp_template/mcp_server_src/tools/task_tools.py
+import asyncio
 import json
 import datetime
 import secrets  # For task_id generation
 import os  # For request_assistance (notifications path)
 import sqlite3  # For database operations
 from pathlib import Path  # For request_assistance
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 
 import mcp.types as mcp_types
 
 from .registry import register_tool
-from ..core.config import logger, ENABLE_TASK_PLACEMENT_RAG, ALLOW_RAG_OVERRIDE
+from ..core.config import (
+    logger,
+    ENABLE_TASK_PLACEMENT_RAG,
+    ALLOW_RAG_OVERRIDE,
+    TASK_NOTES_RECENT_LIMIT,
+    TASK_PLACEMENT_ASYNC,
+)
 from ..core import globals as g
 from ..core.auth import verify_token, get_agent_id
+from ..core.task_health import (
+    parse_task_timestamp,
+    stale_cutoff,
+    summarize_task_health,
+)
 from ..utils.audit_utils import log_audit
 from ..db.connection import get_db_connection, execute_db_write
 from ..db.actions.agent_actions_db import log_agent_action_to_db
-from ..features.task_placement.validator import validate_task_placement
+from ..db.actions.task_db import (
+    advance_tasks_status,
+    append_child_tasks,
+    insert_tasks,
+    iter_tasks_keyset,
+    update_tasks_by_value,
+)
+from ..db.actions.task_edges_db import EDGE_DEPENDS_ON
+from ..db.actions.task_notes_db import (
+    append_task_note,
+    append_task_notes,
+    count_task_notes,
+    get_recent_task_notes,
+    make_task_note,
+)
+from ..features.task_placement.async_validation import (
+    PENDING_VALIDATION_STATUS,
+    get_cached_verdict,
+    placement_cache_key,
+    schedule_placement_validation,
+    validate_task_placement_cached,
+)
+from ..features.task_placement.batch_validation import (
+    check_batch_references,
+    resolve_batch_placement,
+    validate_batch_placement,
+)
 from ..features.task_placement.suggestions import (
     format_suggestions_for_agent,
     format_override_reason,
@@ -30,14 +68,11 @@ from .agent_communication_tools import send_agent_message_tool_impl
 
 # For testing agent auto-launch
 from ..core.auth import generate_token
-from ..core.config import AGENT_COLORS
-from ..utils.tmux_utils import (
-    create_tmux_session,
-    send_prompt_async,
-    send_command_to_session,
-    sanitize_session_name,
-)
+from ..core.config import AGENT_COLORS, AGENT_INTERRUPTED_PATTERN
+from ..utils.tmux_utils import sanitize_session_name
+from ..utils.tmux_async import kill_tmux_session_async, send_escape_async
 from ..utils.prompt_templates import build_agent_prompt
+from ..utils.agent_launch import AgentLaunchSpec, launch_agent_session
 
 
 def estimate_tokens(text: str) -> int:
@@ -74,27 +109,10 @@ async def _send_escape_to_agent(agent_id: str) -> bool:
                 f"Sending escape sequences to pause agent {agent_id} in session {session_name}"
             )
 
-            # Send 4 escape sequences with 1 second intervals to stop current operation
-            import subprocess
-            import time
-
-            clean_session_name = sanitize_session_name(session_name)
-
-            for i in range(4):
-                result = subprocess.run(
-                    ["tmux", "send-keys", "-t", clean_session_name, "Escape"],
-                    capture_output=True,
-                    text=True,
-                    timeout=5,
-                )
-                if result.returncode != 0:
-                    logger.error(
-                        f"Failed to send Escape {i+1}/4 to agent {agent_id}: {result.stderr}"
-                    )
-                    return False
-                logger.debug(f"Sent Escape {i+1}/4 to agent {agent_id}")
-                if i < 3:  # Don't sleep after the last one
-                    time.sleep(1)
+            # Up to 4 Escapes, 1 second apart, until Claude shows it was interrupted
+            if not await send_escape_async(session_name, until=AGENT_INTERRUPTED_PATTERN):
+                logger.error(f"Failed to send Escape sequence to agent {agent_id}")
+                return False
 
             logger.info(f"Successfully paused agent {agent_id}")
             return True
@@ -107,36 +125,85 @@ async def _send_escape_to_agent(agent_id: str) -> bool:
 
 
 async def _launch_testing_agent_for_completed_task(
-    cursor, completed_task_id: str, completed_by_agent: str
+    completed_task_id: str, completed_by_agent: str
 ) -> bool:
-    """Launch testing agent when task completes."""
+    """
+    Launch testing agent when task completes. Call after the completion is
+    committed: the launch awaits tmux for a while, so its own database writes
+    are short transactions that never span an await.
+    """
     try:
         # 1. Send Escape sequences to pause completing agent
         await _send_escape_to_agent(completed_by_agent)
 
-        # 2. Get task details for context
-        cursor.execute("SELECT * FROM tasks WHERE task_id = ?", (completed_task_id,))
-        task_row = cursor.fetchone()
-        if not task_row:
-            logger.error(f"Cannot find completed task {completed_task_id} for testing")
-            return False
+        # 2. Generate testing agent ID, token and color
+        testing_agent_id = f"test-{completed_task_id[-6:]}"
+        testing_token = generate_token()
+        created_at_iso = datetime.datetime.now().isoformat()
 
-        task_data = dict(task_row)
+        # Get project directory
+        project_dir_env = os.environ.get("MCP_PROJECT_DIR")
+        if not project_dir_env:
+            logger.error("MCP_PROJECT_DIR not set, cannot launch testing agent")
+            return False
 
-        # 3. Generate testing agent ID
-        testing_agent_id = f"test-{completed_task_id[-6:]}"
+        # Assign a color for the testing agent
+        agent_color = AGENT_COLORS[g.agent_color_index % len(AGENT_COLORS)]
+        g.agent_color_index += 1
 
-        # 4. Kill existing testing agent if it exists (task re-completed after fixes)
-        from ..utils.tmux_utils import kill_tmux_session
+        # 3. Get task details for context and (re)create the testing agent's
+        # database entry in one transaction; an existing testing agent is
+        # replaced (task re-completed after fixes)
+        async def write_operation():
+            conn = None
+            try:
+                conn = get_db_connection()
+                cursor = conn.cursor()
+                cursor.execute(
+                    "SELECT * FROM tasks WHERE task_id = ?", (completed_task_id,)
+                )
+                task_row = cursor.fetchone()
+                if not task_row:
+                    return None, False
 
-        # Check if testing agent already exists
-        existing_agent = None
-        cursor.execute(
-            "SELECT agent_id FROM agents WHERE agent_id = ?", (testing_agent_id,)
-        )
-        existing_agent = cursor.fetchone()
+                cursor.execute(
+                    "DELETE FROM agents WHERE agent_id = ?", (testing_agent_id,)
+                )
+                replaced = cursor.rowcount > 0
+                cursor.execute(
+                    """
+                    INSERT INTO agents (token, agent_id, capabilities, created_at, status, 
+                                      current_task, working_directory, color)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                    (
+                        testing_token,
+                        testing_agent_id,
+                        json.dumps(["testing", "validation", "criticism"]),
+                        created_at_iso,
+                        "created",
+                        completed_task_id,  # Set the completed task as current task
+                        project_dir_env,
+                        agent_color,
+                    ),
+                )
+                conn.commit()
+                return dict(task_row), replaced
+            except Exception:
+                if conn:
+                    conn.rollback()
+                raise
+            finally:
+                if conn:
+                    conn.close()
+
+        task_data, replaced = await execute_db_write(write_operation)
+        if task_data is None:
+            logger.error(f"Cannot find completed task {completed_task_id} for testing")
+            return False
 
-        if existing_agent or testing_agent_id in g.agent_working_dirs:
+        # 4. Kill existing testing agent if it exists
+        if replaced or testing_agent_id in g.agent_working_dirs:
             logger.info(
                 f"Task {completed_task_id} re-completed - killing existing testing agent {testing_agent_id} to launch fresh one"
             )
@@ -144,7 +211,7 @@ async def _launch_testing_agent_for_completed_task(
             # Kill tmux session if it exists
             if testing_agent_id in g.agent_tmux_sessions:
                 session_name = g.agent_tmux_sessions[testing_agent_id]
-                kill_tmux_session(session_name)
+                await kill_tmux_session_async(session_name)
                 del g.agent_tmux_sessions[testing_agent_id]
 
             # Clean up global tracking
@@ -153,44 +220,9 @@ async def _launch_testing_agent_for_completed_task(
             if testing_agent_id in g.active_agents:
                 del g.active_agents[testing_agent_id]
 
-            # Remove from database
-            cursor.execute("DELETE FROM agents WHERE agent_id = ?", (testing_agent_id,))
             logger.info(f"Cleaned up existing testing agent {testing_agent_id}")
 
-        # 5. Create testing agent token and database entry
-        testing_token = generate_token()
-        created_at_iso = datetime.datetime.now().isoformat()
-
-        # Assign a color for the testing agent
-        agent_color = AGENT_COLORS[g.agent_color_index % len(AGENT_COLORS)]
-        g.agent_color_index += 1
-
-        # Get project directory
-        project_dir_env = os.environ.get("MCP_PROJECT_DIR")
-        if not project_dir_env:
-            logger.error("MCP_PROJECT_DIR not set, cannot launch testing agent")
-            return False
-
-        # Insert testing agent into database
-        cursor.execute(
-            """
-            INSERT INTO agents (token, agent_id, capabilities, created_at, status, 
-                              current_task, working_directory, color)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        """,
-            (
-                testing_token,
-                testing_agent_id,
-                json.dumps(["testing", "validation", "criticism"]),
-                created_at_iso,
-                "created",
-                completed_task_id,  # Set the completed task as current task
-                project_dir_env,
-                agent_color,
-            ),
-        )
-
-        # 6. Build enriched prompt for testing agent
+        # 5. Build enriched prompt for testing agent
         prompt = build_agent_prompt(
             agent_id=testing_agent_id,
             agent_token=testing_token,
@@ -206,7 +238,7 @@ async def _launch_testing_agent_for_completed_task(
             logger.error(f"Failed to build prompt for testing agent {testing_agent_id}")
             return False
 
-        # 7. Create tmux session for testing agent
+        # 6. Create tmux session for testing agent
         def get_admin_token_suffix(admin_token: str) -> str:
             """Extract last 4 chars from admin token for session naming."""
             if not admin_token or len(admin_token) < 4:
@@ -225,20 +257,27 @@ async def _launch_testing_agent_for_completed_task(
             "MCP_WORKING_DIR": project_dir_env,
         }
 
-        # Create tmux session with environment variables
-        success = create_tmux_session(
-            session_name=session_name,
-            working_dir=project_dir_env,
-            command=None,  # Don't start Claude immediately
-            env_vars=env_vars,
+        # Create the session, register MCP, start Claude and send the enriched
+        # prompt once Claude is ready; every step waits for its output in the pane
+        server_port = os.environ.get("PORT", "8080")
+        launch = await launch_agent_session(
+            AgentLaunchSpec(
+                agent_id=testing_agent_id,
+                session_name=session_name,
+                working_dir=project_dir_env,
+                mcp_server_url=f"http://localhost:{server_port}/sse",
+                env_vars=env_vars,
+                prompt=prompt,
+                label="Testing Agent",
+            )
         )
-        if not success:
+        if launch.stage == "create_session":
             logger.error(
                 f"Failed to create tmux session for testing agent {testing_agent_id}"
             )
             return False
 
-        # 8. Store session mapping and update in-memory state
+        # 7. Store session mapping and update in-memory state
         g.agent_tmux_sessions[testing_agent_id] = session_name
         g.agent_working_dirs[testing_agent_id] = project_dir_env
         g.active_agents[testing_token] = {
@@ -247,119 +286,49 @@ async def _launch_testing_agent_for_completed_task(
             "last_activity": created_at_iso,
         }
 
-        # 9. Follow proper agent setup procedure
-        try:
-            import time
-
-            def wait_for_command_completion(delay: float = 1.0):
-                """Smart delay system - wait for command completion or timeout"""
-                time.sleep(delay)
-
-            setup_delay = 1.0  # 1 second delay between setup commands
-
-            # Welcome message
-            welcome_message = f"echo '=== Testing Agent {testing_agent_id} initialization starting ==='"
-            if send_command_to_session(session_name, welcome_message):
-                logger.info(
-                    f"✅ Sent welcome message to testing agent '{testing_agent_id}'"
-                )
-            else:
-                logger.error(
-                    f"❌ Failed to send welcome message to testing agent '{testing_agent_id}'"
-                )
-
-            wait_for_command_completion(setup_delay)
-
-            # Verify working directory
-            verify_command = f"echo 'Working directory:' && pwd"
-            if send_command_to_session(session_name, verify_command):
-                logger.info(
-                    f"✅ Sent directory verification to testing agent '{testing_agent_id}'"
-                )
-
-            wait_for_command_completion(setup_delay)
-
-            # Get server port for MCP registration
-            server_port = os.environ.get("PORT", "8080")
-            mcp_server_url = f"http://localhost:{server_port}/sse"
-
-            # Log MCP server info
-            mcp_info_command = f"echo 'MCP Server URL: {mcp_server_url}'"
-            send_command_to_session(session_name, mcp_info_command)
-            wait_for_command_completion(setup_delay)
-
-            # Register MCP server connection
-            mcp_add_command = f"claude mcp add -t sse AgentMCP {mcp_server_url}"
-            logger.info(
-                f"Registering MCP server for testing agent '{testing_agent_id}': {mcp_add_command}"
-            )
+        if not launch.ok:
+            logger.error(launch.message)
+            return False
+        logger.info(
+            f"Testing agent {testing_agent_id} launched successfully for task {completed_task_id}"
+        )
 
-            if not send_command_to_session(session_name, mcp_add_command):
-                logger.error(
-                    f"Failed to register MCP server for testing agent '{testing_agent_id}'"
+        # 8. Log the testing agent creation
+        async def log_operation():
+            conn = None
+            try:
+                conn = get_db_connection()
+                log_agent_action_to_db(
+                    conn.cursor(),
+                    "admin",
+                    "create_testing_agent",
+                    details={
+                        "testing_agent_id": testing_agent_id,
+                        "completed_task_id": completed_task_id,
+                        "completed_by_agent": completed_by_agent,
+                    },
                 )
-                return False
+                conn.commit()
+            finally:
+                if conn:
+                    conn.close()
 
-            # Add delay to ensure MCP registration completes
-            wait_for_command_completion(setup_delay)
-
-            # Verify MCP registration
-            verify_mcp_command = "claude mcp list"
-            logger.info(
-                f"Verifying MCP registration for testing agent '{testing_agent_id}'"
-            )
-            send_command_to_session(session_name, verify_mcp_command)
-            wait_for_command_completion(setup_delay)
-
-            # Start Claude
-            start_claude_message = "echo '--- Starting Claude with MCP ---'"
-            send_command_to_session(session_name, start_claude_message)
-            wait_for_command_completion(setup_delay)
-
-            claude_command = "claude --dangerously-skip-permissions"
-            logger.info(
-                f"Starting Claude for testing agent '{testing_agent_id}': {claude_command}"
-            )
-
-            if not send_command_to_session(session_name, claude_command):
-                logger.error(
-                    f"Failed to start Claude for testing agent '{testing_agent_id}'"
-                )
-                return False
+        await execute_db_write(log_operation)
 
-            # Log completion message
-            completion_message = f"echo '=== Testing Agent {testing_agent_id} setup complete - Claude starting ==='"
-            send_command_to_session(session_name, completion_message)
+        return True
 
-            # Send enriched prompt with delay
-            send_prompt_async(session_name, prompt, delay_seconds=5)
-            logger.info(
-                f"Testing agent {testing_agent_id} launched successfully for task {completed_task_id}"
-            )
+    except Exception as e:
+        logger.error(f"Error launching testing agent for task {completed_task_id}: {e}")
+        return False
 
-            # Log the testing agent creation
-            log_agent_action_to_db(
-                cursor,
-                "admin",
-                "create_testing_agent",
-                details={
-                    "testing_agent_id": testing_agent_id,
-                    "completed_task_id": completed_task_id,
-                    "completed_by_agent": completed_by_agent,
-                },
-            )
 
-            return True
+TaskCacheUpdate = Tuple[str, List[Dict[str, Any]], Dict[str, Any]]
 
-        except Exception as e:
-            logger.error(
-                f"Failed to send prompt to testing agent {testing_agent_id}: {e}"
-            )
-            return False
 
-    except Exception as e:
-        logger.error(f"Error launching testing agent for task {completed_task_id}: {e}")
-        return False
+def _apply_task_cache_updates(cache_updates: List[TaskCacheUpdate]) -> None:
+    """Applies (task_id, new notes, field changes) to g.tasks, in order; call after commit."""
+    for task_id, notes, changes in cache_updates:
+        g.tasks.add_notes(task_id, notes, **changes)
 
 
 async def _update_single_task(
@@ -368,6 +337,7 @@ async def _update_single_task(
     new_status: str,
     requesting_agent_id: str,
     is_admin_request: bool,
+    cache_updates: List[TaskCacheUpdate],
     notes_content: Optional[str] = None,
     new_title: Optional[str] = None,
     new_description: Optional[str] = None,
@@ -375,7 +345,11 @@ async def _update_single_task(
     new_assigned_to: Optional[str] = None,
     new_depends_on_tasks: Optional[List[str]] = None,
 ) -> Dict[str, Any]:
-    """Helper function to update a single task with smart features"""
+    """
+    Helper function to update a single task with smart features. The matching
+    g.tasks changes are appended to `cache_updates` for the caller to apply
+    once the transaction is committed.
+    """
 
     # Fetch task current data
     cursor.execute("SELECT * FROM tasks WHERE task_id = ?", (task_id,))
@@ -401,18 +375,12 @@ async def _update_single_task(
     update_fields_sql = ["status = ?", "updated_at = ?"]
     update_params = [new_status, updated_at_iso]
 
-    # Handle notes
-    current_notes_list = json.loads(task_current_data.get("notes") or "[]")
+    # Handle notes (appended to task_notes, the task row is not rewritten for them)
+    new_note = None
     if notes_content:
-        current_notes_list.append(
-            {
-                "timestamp": updated_at_iso,
-                "author": requesting_agent_id,
-                "content": notes_content,
-            }
+        new_note = append_task_note(
+            cursor, task_id, requesting_agent_id, notes_content, updated_at_iso
         )
-    update_fields_sql.append("notes = ?")
-    update_params.append(json.dumps(current_notes_list))
 
     # Admin-only field updates
     if is_admin_request:
@@ -440,7 +408,6 @@ async def _update_single_task(
         allowed_field_patterns = [
             "status = ?",
             "updated_at = ?",
-            "notes = ?",
             "title = ?",
             "description = ?",
             "priority = ?",
@@ -462,46 +429,40 @@ async def _update_single_task(
             update_sql = f"UPDATE tasks SET {set_clause} WHERE task_id = ?"
             cursor.execute(update_sql, tuple(update_params))
 
-    # Update in-memory cache
-    if task_id in g.tasks:
-        g.tasks[task_id]["status"] = new_status
-        g.tasks[task_id]["updated_at"] = updated_at_iso
-        g.tasks[task_id]["notes"] = current_notes_list
-        if is_admin_request:
-            if new_title is not None:
-                g.tasks[task_id]["title"] = new_title
-            if new_description is not None:
-                g.tasks[task_id]["description"] = new_description
-            if new_priority is not None:
-                g.tasks[task_id]["priority"] = new_priority
-            if new_assigned_to is not None:
-                g.tasks[task_id]["assigned_to"] = new_assigned_to
-            if new_depends_on_tasks is not None:
-                g.tasks[task_id]["depends_on_tasks"] = new_depends_on_tasks
+    # In-memory cache changes, applied by the caller after commit
+    cache_changes: Dict[str, Any] = {"status": new_status, "updated_at": updated_at_iso}
+    if is_admin_request:
+        for field_key, value in (
+            ("title", new_title),
+            ("description", new_description),
+            ("priority", new_priority),
+            ("assigned_to", new_assigned_to),
+            ("depends_on_tasks", new_depends_on_tasks),
+        ):
+            if value is not None:
+                cache_changes[field_key] = value
+    cache_updates.append((task_id, [new_note] if new_note else [], cache_changes))
 
     # Handle parent task notifications
     if new_status in ["completed", "cancelled", "failed"] and task_current_data.get(
         "parent_task"
     ):
         parent_task_id = task_current_data["parent_task"]
-        cursor.execute("SELECT notes FROM tasks WHERE task_id = ?", (parent_task_id,))
-        parent_row = cursor.fetchone()
-        if parent_row:
-            parent_notes_list = json.loads(parent_row["notes"] or "[]")
-            parent_notes_list.append(
-                {
-                    "timestamp": updated_at_iso,
-                    "author": "system",
-                    "content": f"Subtask '{task_id}' ({task_current_data.get('title', '')}) status changed to: {new_status}",
-                }
+        cursor.execute(
+            "UPDATE tasks SET updated_at = ? WHERE task_id = ?",
+            (updated_at_iso, parent_task_id),
+        )
+        if cursor.rowcount:
+            parent_note = append_task_note(
+                cursor,
+                parent_task_id,
+                "system",
+                f"Subtask '{task_id}' ({task_current_data.get('title', '')}) status changed to: {new_status}",
+                updated_at_iso,
             )
-            cursor.execute(
-                "UPDATE tasks SET notes = ?, updated_at = ? WHERE task_id = ?",
-                (json.dumps(parent_notes_list), updated_at_iso, parent_task_id),
+            cache_updates.append(
+                (parent_task_id, [parent_note], {"updated_at": updated_at_iso})
             )
-            if parent_task_id in g.tasks:
-                g.tasks[parent_task_id]["notes"] = parent_notes_list
-                g.tasks[parent_task_id]["updated_at"] = updated_at_iso
 
     return {
         "success": True,
@@ -515,160 +476,253 @@ async def _update_single_task(
     }
 
 
-def _analyze_task_dependencies(
-    task: Dict[str, Any], all_tasks: Dict[str, Dict[str, Any]]
-) -> Dict[str, Any]:
-    """Analyze task dependencies and blocking conditions"""
-    task_id = task.get("task_id")
-    status = task.get("status")
-    depends_on = task.get("depends_on_tasks", [])
-
-    if isinstance(depends_on, str):
-        try:
-            depends_on = json.loads(depends_on)
-        except:
-            depends_on = []
-
-    analysis = {
-        "is_blocked": False,
-        "blocking_dependencies": [],
-        "completed_dependencies": [],
-        "missing_dependencies": [],
-        "can_start": True,
-        "blocks_tasks": [],
-        "dependency_health": "healthy",
+def _auto_advance_dependents(
+    cursor: sqlite3.Cursor,
+    completed_task_ids: List[str],
+    requesting_agent_id: str,
+    is_admin_request: bool,
+    cache_updates: List[TaskCacheUpdate],
+) -> List[Dict[str, Any]]:
+    """
+    Move pending dependents of newly completed tasks to in_progress once all of
+    their dependencies are completed.
+
+    The completions are not committed yet, so g.task_graph does not have them:
+    a pending dependent is a candidate when each of its dependencies is either
+    completed in the graph or one of `completed_task_ids`, which costs
+    O(degree) per dependent. Candidates are advanced with a single UPDATE
+    (which re-checks their status in the database). Non-admin agents only
+    advance tasks assigned to them, as with any other status update. The cache
+    changes are appended to `cache_updates`, as in _update_single_task.
+    """
+    completed = set(completed_task_ids)
+    graph = g.task_graph
+    candidates = {
+        dependent_id
+        for task_id in completed
+        for dependent_id in graph.get_dependents(task_id)
+        if graph.status.get(dependent_id) == "pending"
+        and all(
+            dep_id in completed or graph.status.get(dep_id) == "completed"
+            for dep_id in graph.depends_on.get(dependent_id, ())
+        )
     }
+    if not candidates:
+        return []
 
-    # Check dependencies
-    for dep_id in depends_on:
-        if dep_id in all_tasks:
-            dep_task = all_tasks[dep_id]
-            dep_status = dep_task.get("status")
-
-            if dep_status == "completed":
-                analysis["completed_dependencies"].append(dep_id)
-            elif dep_status in ["failed", "cancelled"]:
-                analysis["blocking_dependencies"].append(dep_id)
-                analysis["is_blocked"] = True
-                analysis["can_start"] = False
-            elif dep_status in ["pending", "in_progress"]:
-                analysis["blocking_dependencies"].append(dep_id)
-                if status == "pending":
-                    analysis["can_start"] = False
-        else:
-            analysis["missing_dependencies"].append(dep_id)
-            analysis["is_blocked"] = True
-            analysis["can_start"] = False
-
-    # Find tasks that depend on this one
-    for other_id, other_task in all_tasks.items():
-        other_deps = other_task.get("depends_on_tasks", [])
-        if isinstance(other_deps, str):
-            try:
-                other_deps = json.loads(other_deps)
-            except:
-                other_deps = []
-
-        if task_id in other_deps:
-            analysis["blocks_tasks"].append(other_id)
+    updated_at_iso = datetime.datetime.now().isoformat()
+    note = {
+        "timestamp": updated_at_iso,
+        "author": requesting_agent_id,
+        "content": "Auto-advanced: all dependencies completed",
+    }
+    advanced_ids = advance_tasks_status(
+        cursor,
+        sorted(candidates),
+        "pending",
+        "in_progress",
+        note,
+        assigned_to=None if is_admin_request else requesting_agent_id,
+    )
 
-    # Determine health
-    if analysis["missing_dependencies"]:
-        analysis["dependency_health"] = "critical"
-    elif analysis["is_blocked"] and status == "in_progress":
-        analysis["dependency_health"] = "warning"
-    elif not analysis["can_start"] and status == "pending":
-        analysis["dependency_health"] = "waiting"
+    for task_id in advanced_ids:
+        cache_updates.append(
+            (task_id, [note], {"status": "in_progress", "updated_at": updated_at_iso})
+        )
 
-    return analysis
+    return [
+        {
+            "success": True,
+            "task_id": task_id,
+            "old_status": "pending",
+            "new_status": "in_progress",
+        }
+        for task_id in advanced_ids
+    ]
 
 
 def _calculate_task_health_metrics(tasks: List[Dict[str, Any]]) -> Dict[str, Any]:
-    """Calculate overall task health metrics"""
-    if not tasks:
-        return {"total": 0, "status": "no_data"}
-
-    total = len(tasks)
-    status_counts = {}
-    priority_counts = {}
+    """
+    Task health metrics over an arbitrary list of tasks. Views over all tasks or
+    one agent's tasks use the incrementally maintained g.task_health instead.
+    """
+    status_counts: Dict[str, int] = {}
+    priority_counts: Dict[str, int] = {}
     blocked_count = 0
-    overdue_count = 0
     stale_count = 0
-
-    current_time = datetime.datetime.now()
+    cutoff = stale_cutoff()
 
     for task in tasks:
-        # Status distribution
         status = task.get("status", "unknown")
         status_counts[status] = status_counts.get(status, 0) + 1
-
-        # Priority distribution
         priority = task.get("priority", "medium")
         priority_counts[priority] = priority_counts.get(priority, 0) + 1
 
-        # Check for blocked tasks (has dependencies but can't proceed)
-        deps = task.get("depends_on_tasks", [])
-        if isinstance(deps, str):
-            try:
-                deps = json.loads(deps)
-            except:
-                deps = []
-
-        if deps and status == "pending":
+        # Blocked: pending with dependencies (JSON fields arrive parsed)
+        if status == "pending" and task.get("depends_on_tasks"):
             blocked_count += 1
 
-        # Check for stale tasks (no updates in 7+ days)
-        updated_at = task.get("updated_at")
-        if updated_at:
-            try:
-                updated_time = datetime.datetime.fromisoformat(
-                    updated_at.replace("Z", "+00:00").replace("+00:00", "")
-                )
-                days_since_update = (current_time - updated_time).days
-                if days_since_update > 7 and status in ["in_progress", "pending"]:
-                    stale_count += 1
-            except:
-                pass
+        # Stale: active and not updated for TASK_HEALTH_STALE_DAYS
+        if status in ("in_progress", "pending"):
+            updated_time = parse_task_timestamp(task.get("updated_at"))
+            if updated_time is not None and updated_time <= cutoff:
+                stale_count += 1
 
-    # Calculate health score (0-100)
-    completed_ratio = status_counts.get("completed", 0) / total
-    active_ratio = (
-        status_counts.get("in_progress", 0) + status_counts.get("pending", 0)
-    ) / total
-    blocked_ratio = blocked_count / total if total > 0 else 0
-    stale_ratio = stale_count / total if total > 0 else 0
-
-    health_score = max(
-        0,
-        min(
-            100,
-            completed_ratio * 30  # 30% weight for completion
-            + active_ratio * 40  # 40% weight for active work
-            + (1 - blocked_ratio) * 20  # 20% penalty for blocked tasks
-            + (1 - stale_ratio) * 10,  # 10% penalty for stale tasks
-        ),
+    return summarize_task_health(
+        len(tasks), status_counts, priority_counts, blocked_count, stale_count
     )
 
-    return {
-        "total": total,
-        "status_distribution": status_counts,
-        "priority_distribution": priority_counts,
-        "blocked_tasks": blocked_count,
-        "stale_tasks": stale_count,
-        "health_score": round(health_score, 1),
-        "health_status": (
-            "excellent"
-            if health_score >= 80
-            else (
-                "good"
-                if health_score >= 60
-                else "needs_attention" if health_score >= 40 else "critical"
+
+# --- Helper functions for assign_task modes ---
+
+
+async def _plan_task_batch(
+    tasks: List[Dict[str, Any]],
+    assigned_to: Optional[str],
+    status: str,
+    auth_token: str,
+) -> Dict[str, Any]:
+    """
+    Places a batch of new tasks (a proposed subtree, see batch_validation) with
+    one placement analysis for the whole batch. Returns the plan written by
+    _write_task_batch: 'rows' (in-memory form), 'notes' as (task_id, note),
+    'existing_children' for parents that already exist, and the 'blocked'
+    items. Raises ValueError for references to unknown tasks.
+    """
+    reference_error = check_batch_references(tasks)
+    if reference_error:
+        raise ValueError(reference_error)
+
+    now = datetime.datetime.now()
+    created_at = now.isoformat()
+    task_ids = [f"task_{int(now.timestamp() * 1000)}_{i}" for i in range(len(tasks))]
+
+    verdicts = None
+    if ENABLE_TASK_PLACEMENT_RAG:
+        verdicts = await validate_batch_placement(tasks, "admin", auth_token)
+    placements = resolve_batch_placement(tasks, verdicts, task_ids, ALLOW_RAG_OVERRIDE)
+
+    rows: Dict[str, Dict[str, Any]] = {}
+    notes: List[Tuple[str, Dict[str, Any]]] = []
+    children: Dict[str, List[str]] = {}
+    blocked: List[Dict[str, Any]] = []
+    for task, placement in zip(tasks, placements):
+        if placement["blocked"]:
+            blocked.append({"title": task["title"], "validation": placement["validation"]})
+            continue
+        task_id = placement["task_id"]
+        task_notes = []
+        if placement["validation"]:
+            task_notes.append(
+                make_task_note("placement_validator", placement["validation"], created_at)
             )
-        ),
+            notes.append((task_id, task_notes[-1]))
+        rows[task_id] = {
+            "task_id": task_id,
+            "title": task["title"],
+            "description": task["description"],
+            "assigned_to": assigned_to,
+            "created_by": "admin",
+            "status": status,
+            "priority": task.get("priority", "medium"),
+            "created_at": created_at,
+            "updated_at": created_at,
+            "parent_task": placement["parent_task"],
+            "child_tasks": [],
+            "depends_on_tasks": placement["depends_on_tasks"],
+            "notes": task_notes,
+            "placement_status": placement["status"],
+        }
+        if placement["parent_task"]:
+            children.setdefault(placement["parent_task"], []).append(task_id)
+
+    for parent_id, child_ids in children.items():
+        if parent_id in rows:
+            rows[parent_id]["child_tasks"] = child_ids
+    return {
+        "created_at": created_at,
+        "rows": list(rows.values()),
+        "notes": notes,
+        "existing_children": {
+            parent_id: child_ids
+            for parent_id, child_ids in children.items()
+            if parent_id not in rows
+        },
+        "blocked": blocked,
+        "validated": verdicts is not None,
     }
 
 
-# --- Helper functions for assign_task modes ---
+def _write_task_batch(cursor: sqlite3.Cursor, plan: Dict[str, Any]) -> None:
+    """Inserts a planned batch (tasks, child links, notes) in the caller's transaction."""
+    insert_tasks(
+        cursor,
+        [
+            {
+                "task_id": row["task_id"],
+                "title": row["title"],
+                "description": row["description"],
+                "assigned_to": row["assigned_to"],
+                "created_by": row["created_by"],
+                "status": row["status"],
+                "priority": row["priority"],
+                "created_at": row["created_at"],
+                "updated_at": row["updated_at"],
+                "parent_task": row["parent_task"],
+                "child_tasks": json.dumps(row["child_tasks"]),
+                "depends_on_tasks": json.dumps(row["depends_on_tasks"]),
+                "notes": json.dumps([]),  # Notes live in task_notes
+            }
+            for row in plan["rows"]
+        ],
+    )
+    if plan["existing_children"]:
+        append_child_tasks(cursor, plan["existing_children"], plan["created_at"])
+    if plan["notes"]:
+        append_task_notes(cursor, plan["notes"])
+
+
+def _cache_task_batch(plan: Dict[str, Any]) -> None:
+    """Puts a committed batch, and its updated existing parents, into g.tasks in one go."""
+    records = [
+        {key: value for key, value in row.items() if key != "placement_status"}
+        for row in plan["rows"]
+    ]
+    for parent_id, child_ids in plan["existing_children"].items():
+        parent = g.tasks.get(parent_id)
+        if parent is not None:
+            records.append(
+                parent.replace(
+                    {
+                        "child_tasks": parent["child_tasks"] + tuple(child_ids),
+                        "updated_at": plan["created_at"],
+                    }
+                )
+            )
+    g.tasks.put_many(records)
+
+
+def _format_task_batch_report(plan: Dict[str, Any]) -> List[str]:
+    """Response lines for the created and blocked tasks of a batch."""
+    lines = []
+    for i, row in enumerate(plan["rows"], 1):
+        placement = ""
+        if row["placement_status"] != "approved":
+            placement = f" [placement {row['placement_status']}, see task notes]"
+        lines.append(
+            f"   {i}. {row['task_id']}: {row['title']} (Priority: {row['priority']}, "
+            f"Parent: {row['parent_task'] or 'none'}){placement}"
+        )
+    if plan["blocked"]:
+        lines.append("")
+        lines.append(f"⛔ **Blocked by placement validation:** {len(plan['blocked'])}")
+        for item in plan["blocked"]:
+            lines.append(f"   - {item['title']}")
+            if item["validation"]:
+                lines.append(f"     {item['validation']}".replace("\n", "\n     "))
+    if plan["validated"]:
+        lines.append("\n🧭 Placement validated with one analysis for the whole batch")
+    return lines
 
 
 async def _create_unassigned_tasks(
@@ -681,6 +735,16 @@ async def _create_unassigned_tasks(
     priority = arguments.get("priority", "medium")
     parent_task_id_arg = arguments.get("parent_task_id")
 
+    # Multiple tasks are placed as one batch before anything is written
+    plan = None
+    if tasks:
+        try:
+            plan = await _plan_task_batch(
+                tasks, None, "unassigned", arguments.get("token")
+            )
+        except ValueError as e:
+            return [mcp_types.TextContent(type="text", text=str(e))]
+
     # Define the write operation as an async function
     async def write_operation():
         conn = None
@@ -690,58 +754,20 @@ async def _create_unassigned_tasks(
             created_tasks = []
             created_at = datetime.datetime.now().isoformat()
 
-            if tasks:
-                # Multiple unassigned task creation
-                for i, task in enumerate(tasks):
-                    task_id = (
-                        f"task_{int(datetime.datetime.now().timestamp() * 1000)}_{i}"
-                    )
-                    title = task["title"]
-                    description = task["description"]
-                    task_priority = task.get("priority", "medium")
-                    parent_task = task.get("parent_task_id")
-
-                    # Create unassigned task
-                    task_data = {
-                        "task_id": task_id,
-                        "title": title,
-                        "description": description,
-                        "assigned_to": None,  # UNASSIGNED
-                        "created_by": "admin",
-                        "status": "unassigned",
-                        "priority": task_priority,
-                        "created_at": created_at,
-                        "updated_at": created_at,
-                        "parent_task": parent_task,
-                        "child_tasks": json.dumps([]),
-                        "depends_on_tasks": json.dumps([]),
-                        "notes": json.dumps([]),
-                    }
-
-                    cursor.execute(
-                        """
-                        INSERT INTO tasks (task_id, title, description, assigned_to, created_by, status, priority, 
-                                           created_at, updated_at, parent_task, child_tasks, depends_on_tasks, notes)
-                        VALUES (:task_id, :title, :description, :assigned_to, :created_by, :status, :priority, 
-                                :created_at, :updated_at, :parent_task, :child_tasks, :depends_on_tasks, :notes)
-                    """,
-                        task_data,
-                    )
-
+            if plan is not None:
+                # Multiple unassigned task creation, in this one transaction
+                _write_task_batch(cursor, plan)
+                for row in plan["rows"]:
                     log_agent_action_to_db(
                         cursor,
                         "admin",
                         "created_unassigned_task",
-                        task_id=task_id,
-                        details={"title": title, "mode": "unassigned_multiple"},
-                    )
-
-                    # Add to global cache
-                    g.tasks[task_id] = task_data
-
-                    created_tasks.append(
-                        {"task_id": task_id, "title": title, "priority": task_priority}
+                        task_id=row["task_id"],
+                        details={"title": row["title"], "mode": "unassigned_multiple"},
                     )
+                conn.commit()
+                _cache_task_batch(plan)
+                return plan["rows"]
 
             elif task_title and task_description:
                 # Single unassigned task creation
@@ -781,9 +807,6 @@ async def _create_unassigned_tasks(
                     details={"title": task_title, "mode": "unassigned_single"},
                 )
 
-                # Add to global cache
-                g.tasks[task_id] = task_data
-
                 created_tasks.append(
                     {"task_id": task_id, "title": task_title, "priority": priority}
                 )
@@ -794,6 +817,9 @@ async def _create_unassigned_tasks(
                 )
 
             conn.commit()
+
+            # Add to global cache once committed
+            g.tasks.put(task_data)
             return created_tasks
 
         except Exception as e:
@@ -817,10 +843,13 @@ async def _create_unassigned_tasks(
             "",
         ]
 
-        for i, task in enumerate(created_tasks, 1):
-            response_parts.append(
-                f"   {i}. {task['task_id']}: {task['title']} (Priority: {task['priority']})"
-            )
+        if plan is not None:
+            response_parts.extend(_format_task_batch_report(plan))
+        else:
+            for i, task in enumerate(created_tasks, 1):
+                response_parts.append(
+                    f"   {i}. {task['task_id']}: {task['title']} (Priority: {task['priority']})"
+                )
 
         response_parts.append(
             "\n💡 Use assign_task with task_ids parameter to assign these tasks to agents."
@@ -929,6 +958,10 @@ async def _assign_to_existing_tasks(
 
         conn.commit()
 
+        # Update in-memory cache
+        for task_id in task_ids:
+            g.tasks.patch(task_id, {"assigned_to": target_agent_id, "updated_at": updated_at})
+
         # Build response
         task_titles = [task["title"] for task in found_tasks]
         response_parts = [
@@ -980,75 +1013,70 @@ async def _create_and_assign_multiple_tasks(
                     type="text", text=f"Error: Agent '{target_agent_id}' not found."
                 )
             ]
+    finally:
+        if conn:
+            conn.close()
 
-        created_tasks = []
-        created_at = datetime.datetime.now().isoformat()
-
-        # Create each task
-        for i, task in enumerate(tasks):
-            task_id = f"task_{int(datetime.datetime.now().timestamp() * 1000)}_{i}"
-            title = task["title"]
-            description = task["description"]
-            priority = task.get("priority", "medium")
-            parent_task = task.get("parent_task_id")
-
-            # Create task data
-            task_data = {
-                "task_id": task_id,
-                "title": title,
-                "description": description,
-                "assigned_to": target_agent_id,
-                "created_by": "admin",
-                "status": "pending",
-                "priority": priority,
-                "created_at": created_at,
-                "updated_at": created_at,
-                "parent_task": parent_task,
-                "child_tasks": json.dumps([]),
-                "depends_on_tasks": json.dumps([]),
-                "notes": json.dumps([]),
-            }
-
-            # Insert task
-            cursor.execute(
-                """
-                INSERT INTO tasks (task_id, title, description, assigned_to, created_by, status, priority, 
-                                   created_at, updated_at, parent_task, child_tasks, depends_on_tasks, notes)
-                VALUES (:task_id, :title, :description, :assigned_to, :created_by, :status, :priority, 
-                        :created_at, :updated_at, :parent_task, :child_tasks, :depends_on_tasks, :notes)
-            """,
-                task_data,
-            )
+    # Place the whole batch with one analysis before anything is written
+    try:
+        plan = await _plan_task_batch(
+            tasks, target_agent_id, "pending", arguments.get("token")
+        )
+    except ValueError as e:
+        return [mcp_types.TextContent(type="text", text=str(e))]
 
-            # Log the creation
-            log_agent_action_to_db(
-                cursor,
-                "admin",
-                "assigned_task",
-                task_id=task_id,
-                details={
-                    "agent_id": target_agent_id,
-                    "title": title,
-                    "mode": "multiple_task_creation",
-                },
-            )
+    async def write_operation():
+        conn = None
+        try:
+            conn = get_db_connection()
+            cursor = conn.cursor()
 
-            created_tasks.append(
-                {"task_id": task_id, "title": title, "priority": priority}
-            )
+            _write_task_batch(cursor, plan)
+            for row in plan["rows"]:
+                # Log the creation
+                log_agent_action_to_db(
+                    cursor,
+                    "admin",
+                    "assigned_task",
+                    task_id=row["task_id"],
+                    details={
+                        "agent_id": target_agent_id,
+                        "title": row["title"],
+                        "mode": "multiple_task_creation",
+                    },
+                )
 
-        # Update agent's current task if they don't have one (use first task)
-        cursor.execute(
-            "SELECT current_task FROM agents WHERE agent_id = ?", (target_agent_id,)
-        )
-        agent_row = cursor.fetchone()
-        if agent_row and agent_row["current_task"] is None and created_tasks:
+            # Update agent's current task if they don't have one (use first task)
+            current_task = None
             cursor.execute(
-                "UPDATE agents SET current_task = ?, updated_at = ? WHERE agent_id = ?",
-                (created_tasks[0]["task_id"], created_at, target_agent_id),
+                "SELECT current_task FROM agents WHERE agent_id = ?", (target_agent_id,)
             )
+            agent_row = cursor.fetchone()
+            if agent_row and agent_row["current_task"] is None and plan["rows"]:
+                current_task = plan["rows"][0]["task_id"]
+                cursor.execute(
+                    "UPDATE agents SET current_task = ?, updated_at = ? WHERE agent_id = ?",
+                    (current_task, plan["created_at"], target_agent_id),
+                )
 
-        conn.commit()
+            conn.commit()
+            _cache_task_batch(plan)
+            if current_task:
+                for agent_data in g.active_agents.values():
+                    if agent_data.get("agent_id") == target_agent_id:
+                        agent_data["current_task"] = current_task
+            return plan["rows"]
+        except Exception as e:
+            if conn:
+                conn.rollback()
+            logger.error(f"Error creating multiple tasks: {e}", exc_info=True)
+            raise e
+        finally:
+            if conn:
+                conn.close()
+
+    try:
+        created_tasks = await execute_db_write(write_operation)
 
         # Build response
         response_parts = [
@@ -1057,11 +1085,7 @@ async def _create_and_assign_multiple_tasks(
             f"   Tasks Created: {len(created_tasks)}",
             "",
         ]
-
-        for i, task in enumerate(created_tasks, 1):
-            response_parts.append(
-                f"   {i}. {task['task_id']}: {task['title']} (Priority: {task['priority']})"
-            )
+        response_parts.extend(_format_task_batch_report(plan))
 
         if coordination_notes:
             response_parts.append(f"\n📋 **Coordination Notes:** {coordination_notes}")
@@ -1069,17 +1093,11 @@ async def _create_and_assign_multiple_tasks(
         return [mcp_types.TextContent(type="text", text="\n".join(response_parts))]
 
     except Exception as e:
-        if conn:
-            conn.rollback()
-        logger.error(f"Error creating multiple tasks: {e}", exc_info=True)
         return [
             mcp_types.TextContent(
                 type="text", text=f"Error creating multiple tasks: {e}"
             )
         ]
-    finally:
-        if conn:
-            conn.close()
 
 
 # --- assign_task tool ---
@@ -1117,6 +1135,9 @@ async def assign_task_tool_impl(
         "coordination_notes"
     )  # Optional coordination context
     estimated_hours = arguments.get("estimated_hours")  # Optional workload estimation
+    async_validation = arguments.get(
+        "async_validation", TASK_PLACEMENT_ASYNC
+    )  # Create now, validate placement in the background
 
     if not verify_token(admin_auth_token, "admin"):  # main.py:1326
         return [
@@ -1409,15 +1430,31 @@ async def assign_task_tool_impl(
         validation_performed = False
         validation_message = ""
 
+        placement_key = None
+        defer_validation = False
         if ENABLE_TASK_PLACEMENT_RAG:
+            placement_key = placement_cache_key(
+                task_title, task_description, parent_task_id_arg, depends_on_tasks_list
+            )
+            # A cached verdict costs nothing; only defer when the validator would run
+            defer_validation = (
+                async_validation and get_cached_verdict(placement_key) is None
+            )
+
+        if defer_validation:
             validation_performed = True
-            validation_result = await validate_task_placement(
+            status = PENDING_VALIDATION_STATUS
+            validation_message = "\n⏳ Placement validation running in the background; the verdict will be added as a task note\n"
+        elif ENABLE_TASK_PLACEMENT_RAG:
+            validation_performed = True
+            validation_result = await validate_task_placement_cached(
                 title=task_title,
                 description=task_description,
                 parent_task_id=parent_task_id_arg,
                 depends_on_tasks=depends_on_tasks_list,
                 created_by="admin",
                 auth_token=admin_auth_token,
+                cache_key=placement_key,
             )
 
             suggestion_message = format_suggestions_for_agent(
@@ -1510,7 +1547,7 @@ async def assign_task_tool_impl(
             "depends_on_tasks": json.dumps(
                 final_depends_on_tasks or []
             ),  # Use validated value
-            "notes": json.dumps(initial_notes),
+            "notes": json.dumps([]),  # Notes live in task_notes
         }
 
         # Save task to database (main.py:1370-1373)
@@ -1523,6 +1560,10 @@ async def assign_task_tool_impl(
         """,
             task_data_for_db,
         )
+        for note in initial_notes:
+            append_task_note(
+                cursor, new_task_id, note["author"], note["content"], note["timestamp"]
+            )
 
         # Update agent's current task in DB if they don't have one (main.py:1376-1387)
         should_update_agent_current_task = False
@@ -1570,18 +1611,28 @@ async def assign_task_tool_impl(
         task_data_for_memory["depends_on_tasks"] = (
             final_depends_on_tasks or []
         )  # Use validated value
-        task_data_for_memory["notes"] = []
-        g.tasks[new_task_id] = task_data_for_memory
+        task_data_for_memory["notes"] = initial_notes
+        g.tasks.put(task_data_for_memory)
 
         # System 8: Index the new task for RAG
         # Convert database format to the format expected by indexing
         index_data = task_data_for_memory.copy()
         index_data["depends_on_tasks"] = final_depends_on_tasks or []
         # Start indexing asynchronously (fire and forget)
-        import asyncio
-
         asyncio.create_task(index_task_data(new_task_id, index_data))
 
+        if defer_validation:
+            schedule_placement_validation(
+                new_task_id,
+                task_title,
+                task_description,
+                final_parent_task_id,
+                final_depends_on_tasks,
+                "admin",
+                admin_auth_token,
+                cache_key=placement_key,
+            )
+
         log_audit(
             "admin",
             "assign_task",
@@ -1688,6 +1739,7 @@ async def create_self_task_tool_impl(
     priority = arguments.get("priority", "medium")
     depends_on_tasks_list = arguments.get("depends_on_tasks")
     parent_task_id_arg = arguments.get("parent_task_id")
+    async_validation = arguments.get("async_validation", TASK_PLACEMENT_ASYNC)
 
     requesting_agent_id = get_agent_id(agent_auth_token)  # main.py:1415
     if not requesting_agent_id:
@@ -1772,14 +1824,28 @@ async def create_self_task_tool_impl(
         final_depends_on_tasks = depends_on_tasks_list
         validation_message = ""
 
+        placement_key = None
+        defer_validation = False
         if ENABLE_TASK_PLACEMENT_RAG:
-            validation_result = await validate_task_placement(
+            placement_key = placement_cache_key(
+                task_title, task_description, actual_parent_task_id, depends_on_tasks_list
+            )
+            defer_validation = (
+                async_validation and get_cached_verdict(placement_key) is None
+            )
+
+        if defer_validation:
+            status = PENDING_VALIDATION_STATUS
+            validation_message = "\n⏳ Placement validation running in the background; the verdict will be added as a task note\n"
+        elif ENABLE_TASK_PLACEMENT_RAG:
+            validation_result = await validate_task_placement_cached(
                 title=task_title,
                 description=task_description,
                 parent_task_id=actual_parent_task_id,
                 depends_on_tasks=depends_on_tasks_list,
                 created_by=requesting_agent_id,
                 auth_token=agent_auth_token,
+                cache_key=placement_key,
             )
 
             suggestion_message = format_suggestions_for_agent(
@@ -1894,17 +1960,27 @@ async def create_self_task_tool_impl(
             final_depends_on_tasks or []
         )  # Use validated value
         task_data_for_memory["notes"] = []
-        g.tasks[new_task_id] = task_data_for_memory
+        g.tasks.put(task_data_for_memory)
 
         # System 8: Index the new task for RAG
         # Convert database format to the format expected by indexing
         index_data = task_data_for_memory.copy()
         # No need to override depends_on_tasks again, it's already the validated value
         # Start indexing asynchronously (fire and forget)
-        import asyncio
-
         asyncio.create_task(index_task_data(new_task_id, index_data))
 
+        if defer_validation:
+            schedule_placement_validation(
+                new_task_id,
+                task_title,
+                task_description,
+                final_parent_task_id,
+                final_depends_on_tasks,
+                requesting_agent_id,
+                agent_auth_token,
+                cache_key=placement_key,
+            )
+
         log_audit(
             requesting_agent_id,
             "create_self_task",
@@ -2025,6 +2101,7 @@ async def update_task_status_tool_impl(
         # Process tasks (bulk or single)
         results = []
         tasks_to_cascade = []
+        cache_updates: List[TaskCacheUpdate] = []
 
         # Phase 1: Update primary tasks
         for task_id in task_ids_to_process:
@@ -2034,6 +2111,7 @@ async def update_task_status_tool_impl(
                 new_status,
                 requesting_agent_id,
                 is_admin_request,
+                cache_updates,
                 notes_content,
                 new_title,
                 new_description,
@@ -2071,6 +2149,7 @@ async def update_task_status_tool_impl(
                         new_status,
                         requesting_agent_id,
                         is_admin_request,
+                        cache_updates,
                         f"Auto-cascaded from parent task status change",
                         None,
                         None,
@@ -2082,64 +2161,24 @@ async def update_task_status_tool_impl(
 
         # Phase 3: Smart dependency updates if requested
         dependency_updates = []
-        if auto_update_dependencies:
-            for result in results:
-                if result["success"] and new_status == "completed":
-                    # Find tasks that depend on this completed task
-                    cursor.execute("SELECT task_id, depends_on_tasks FROM tasks")
-                    all_tasks = cursor.fetchall()
-
-                    for task_row in all_tasks:
-                        task_deps = json.loads(task_row["depends_on_tasks"] or "[]")
-                        if result["task_id"] in task_deps:
-                            # Check if all dependencies are now completed
-                            all_deps_completed = True
-                            for dep_id in task_deps:
-                                if (
-                                    dep_id != result["task_id"]
-                                ):  # Skip the one we just completed
-                                    cursor.execute(
-                                        "SELECT status FROM tasks WHERE task_id = ?",
-                                        (dep_id,),
-                                    )
-                                    dep_row = cursor.fetchone()
-                                    if not dep_row or dep_row["status"] != "completed":
-                                        all_deps_completed = False
-                                        break
-
-                            if all_deps_completed:
-                                # Auto-update dependent task to in_progress if it's pending
-                                cursor.execute(
-                                    "SELECT status FROM tasks WHERE task_id = ?",
-                                    (task_row["task_id"],),
-                                )
-                                dependent_task = cursor.fetchone()
-                                if (
-                                    dependent_task
-                                    and dependent_task["status"] == "pending"
-                                ):
-                                    dep_result = await _update_single_task(
-                                        cursor,
-                                        task_row["task_id"],
-                                        "in_progress",
-                                        requesting_agent_id,
-                                        is_admin_request,
-                                        f"Auto-advanced: all dependencies completed",
-                                        None,
-                                        None,
-                                        None,
-                                        None,
-                                        None,
-                                    )
-                                    dependency_updates.append(dep_result)
-
-        # Phase 3.5: Auto-launch testing agents for completed tasks
+        if auto_update_dependencies and new_status == "completed":
+            completed_ids = [r["task_id"] for r in results if r["success"]]
+            dependency_updates = _auto_advance_dependents(
+                cursor, completed_ids, requesting_agent_id, is_admin_request, cache_updates
+            )
+
+        # Commit all changes, then bring the in-memory cache in line with them
+        conn.commit()
+        _apply_task_cache_updates(cache_updates)
+
+        # Phase 3.5: Auto-launch testing agents for completed tasks. Runs after
+        # the commit: launches await tmux and write in their own transactions
         testing_agent_launches = []
         for result in results:
             if result["success"] and new_status == "completed":
                 try:
                     testing_success = await _launch_testing_agent_for_completed_task(
-                        cursor, result["task_id"], requesting_agent_id
+                        result["task_id"], requesting_agent_id
                     )
                     testing_agent_launches.append(
                         {
@@ -2162,12 +2201,7 @@ async def update_task_status_tool_impl(
                         }
                     )
 
-        # Commit all changes
-        conn.commit()
-
         # Phase 4: Re-index updated tasks
-        import asyncio
-
         for result in results + cascade_results + dependency_updates:
             if result.get("success"):
                 task_id = result["task_id"]
@@ -2313,102 +2347,28 @@ async def view_tasks_tool_impl(
                     type="text",
                     text="Unauthorized: Non-admin agents can only view their own tasks or all tasks assigned to them if no agent_id filter is specified.",
                 )
-            ]
-
-    # Advanced filtering with dependency analysis
-    tasks_to_display: List[Dict[str, Any]] = []
-
-    # Pre-analyze all tasks for dependency checking
-    all_tasks_dict = dict(g.tasks)
-
-    for task_id, task_data in g.tasks.items():
-        # Basic permission filtering
-        matches_agent = True
-        if (
-            target_agent_id_for_filter
-            and task_data.get("assigned_to") != target_agent_id_for_filter
-        ):
-            matches_agent = False
-
-        # Status filtering
-        matches_status = True
-        if filter_status and task_data.get("status") != filter_status:
-            matches_status = False
-
-        # Priority filtering
-        matches_priority = True
-        if filter_priority and task_data.get("priority") != filter_priority:
-            matches_priority = False
-
-        # Parent task filtering
-        matches_parent = True
-        if filter_parent_task and task_data.get("parent_task") != filter_parent_task:
-            matches_parent = False
-
-        # Blocked tasks filtering
-        matches_blocked = True
-        if show_blocked_tasks:
-            dependency_analysis = _analyze_task_dependencies(task_data, all_tasks_dict)
-            matches_blocked = (
-                dependency_analysis["is_blocked"]
-                or not dependency_analysis["can_start"]
-            )
-
-        if (
-            matches_agent
-            and matches_status
-            and matches_priority
-            and matches_parent
-            and matches_blocked
-        ):
-            # Add dependency analysis if requested
-            if show_dependencies:
-                task_data_copy = task_data.copy()
-                task_data_copy["_dependency_analysis"] = _analyze_task_dependencies(
-                    task_data, all_tasks_dict
-                )
-                tasks_to_display.append(task_data_copy)
-            else:
-                tasks_to_display.append(task_data)
-
-    # Smart sorting
-    def get_sort_key(task):
-        if sort_by == "priority":
-            priority_order = {"high": 3, "medium": 2, "low": 1}
-            return priority_order.get(task.get("priority", "medium"), 2)
-        elif sort_by == "status":
-            status_order = {
-                "failed": 5,
-                "in_progress": 4,
-                "pending": 3,
-                "completed": 2,
-                "cancelled": 1,
-            }
-            return status_order.get(task.get("status", "pending"), 3)
-        elif sort_by == "updated_at":
-            return task.get("updated_at", "")
-        else:  # created_at (default)
-            return task.get("created_at", "")
-
-    reverse_sort = sort_by in ["created_at", "updated_at", "priority", "status"]
-    tasks_to_display.sort(key=get_sort_key, reverse=reverse_sort)
-
-    # Handle pagination with start_after
-    if start_after:
-        start_index = 0
-        for i, task in enumerate(tasks_to_display):
-            if task.get("task_id") == start_after:
-                start_index = i + 1
-                break
-        tasks_to_display = tasks_to_display[start_index:]
+            ]
 
-    if not tasks_to_display:
-        response_text = "No tasks found matching the criteria."
-    else:
-        # Generate health analysis if requested
-        health_analysis = None
-        if show_health_analysis:
-            health_analysis = _calculate_task_health_metrics(tasks_to_display)
+    # Filtering, sorting and pagination run in SQL (see the task indexes in
+    # db/schema.py); rows are read a page at a time and reading stops once the
+    # token budget is used, so a call costs roughly one page, not the whole table.
+    listing_filters = {
+        "assigned_to": target_agent_id_for_filter,
+        "status": filter_status,
+        "priority": filter_priority,
+        "parent_task": filter_parent_task,
+        # Blocked/waiting sets are maintained by the in-memory dependency graph
+        "task_ids": (
+            sorted(g.task_graph.blocked | g.task_graph.waiting)
+            if show_blocked_tasks
+            else None
+        ),
+        "sort_by": sort_by,
+    }
+
+    conn = None
+    try:
+        conn = get_db_connection()
 
         # Build response with smart headers
         filter_info = []
@@ -2423,47 +2383,71 @@ async def view_tasks_tool_impl(
         if show_blocked_tasks:
             filter_info.append("blocked_only=true")
 
-        header = f"Tasks ({len(tasks_to_display)} found"
-        if filter_info:
-            header += f", filtered by: {', '.join(filter_info)}"
-        header += f", sorted by: {sort_by})"
-
-        response_parts = [header + "\n"]
+        response_parts: List[str] = []
 
-        # Add health analysis at the top if requested
-        if health_analysis:
-            health_status = health_analysis["health_status"]
-            health_score = health_analysis["health_score"]
-
-            health_icon = (
-                "🟢"
-                if health_status == "excellent"
-                else (
-                    "🟡"
-                    if health_status == "good"
-                    else "🟠" if health_status == "needs_attention" else "🔴"
-                )
+        if show_health_analysis:
+            narrowed = (
+                filter_status
+                or filter_priority
+                or filter_parent_task
+                or show_blocked_tasks
+                or start_after
             )
+            if not narrowed:
+                # All tasks or one agent's: maintained incrementally, O(log n) to read
+                health_analysis = g.task_health.snapshot(target_agent_id_for_filter)
+            else:
+                # Other filters cover an arbitrary subset; read every matching task
+                health_analysis = _calculate_task_health_metrics(
+                    list(iter_tasks_keyset(conn, start_after=start_after, **listing_filters))
+                )
+            if health_analysis.get("total"):
+                health_status = health_analysis["health_status"]
+                health_score = health_analysis["health_score"]
+
+                health_icon = (
+                    "🟢"
+                    if health_status == "excellent"
+                    else (
+                        "🟡"
+                        if health_status == "good"
+                        else "🟠" if health_status == "needs_attention" else "🔴"
+                    )
+                )
 
-            response_parts.append(
-                f"📊 **Health Analysis:** {health_icon} {health_status.title()} ({health_score}/100)"
-            )
-            response_parts.append(
-                f"   Status: {health_analysis['status_distribution']}"
-            )
-            response_parts.append(
-                f"   Issues: {health_analysis['blocked_tasks']} blocked, {health_analysis['stale_tasks']} stale"
-            )
-            response_parts.append("")
+                response_parts.append(
+                    f"📊 **Health Analysis:** {health_icon} {health_status.title()} ({health_score}/100)"
+                )
+                response_parts.append(
+                    f"   Status: {health_analysis['status_distribution']}"
+                )
+                response_parts.append(
+                    f"   Issues: {health_analysis['blocked_tasks']} blocked, {health_analysis['stale_tasks']} stale"
+                )
+                response_parts.append("")
 
         current_tokens = estimate_tokens("\n".join(response_parts))
-        tasks_included = 0
+        task_parts: List[str] = []
+        shown_task_ids: List[str] = []
         last_task_id = None
         truncated = False
 
-        for task in tasks_to_display:
+        notes_cursor = conn.cursor()
+        for task in iter_tasks_keyset(conn, start_after=start_after, **listing_filters):
+            if not summary_mode or show_dependencies:
+                # Detailed views show the latest notes; load just those
+                task["notes"] = get_recent_task_notes(
+                    notes_cursor, task["task_id"], TASK_NOTES_RECENT_LIMIT
+                )
+                task["_notes_total"] = (
+                    count_task_notes(notes_cursor, task["task_id"])
+                    if len(task["notes"]) == TASK_NOTES_RECENT_LIMIT
+                    else len(task["notes"])
+                )
+
             # Format task with dependency info if requested
-            if show_dependencies and "_dependency_analysis" in task:
+            if show_dependencies:
+                task["_dependency_analysis"] = g.task_graph.analyze(task["task_id"])
                 task_text = _format_task_with_dependencies(task)
             elif summary_mode:
                 task_text = _format_task_summary(task)
@@ -2476,24 +2460,57 @@ async def view_tasks_tool_impl(
             safety_buffer = 1000
             if (
                 current_tokens + task_tokens > (max_tokens - safety_buffer)
-                and tasks_included > 0
+                and shown_task_ids
             ):
                 truncated = True
                 break
 
-            response_parts.append(f"{task_text}\n")
+            task_parts.append(f"{task_text}\n")
             current_tokens += task_tokens
-            tasks_included += 1
-            last_task_id = task.get("task_id")
+            shown_task_ids.append(task["task_id"])
+            last_task_id = task["task_id"]
+    except sqlite3.Error as e_sql:
+        logger.error(f"Database error listing tasks: {e_sql}", exc_info=True)
+        return [
+            mcp_types.TextContent(
+                type="text", text=f"Database error listing tasks: {e_sql}"
+            )
+        ]
+    finally:
+        if conn:
+            conn.close()
+
+    tasks_included = len(shown_task_ids)
+    if not tasks_included:
+        response_text = "No tasks found matching the criteria."
+    else:
+        if truncated:
+            header = f"Tasks ({tasks_included} shown, more available"
+        else:
+            header = f"Tasks ({tasks_included} found"
+        if filter_info:
+            header += f", filtered by: {', '.join(filter_info)}"
+        header += f", sorted by: {sort_by})"
+        response_parts.insert(0, header + "\n")
+
+        # Longest chain of unfinished dependencies among the listed tasks
+        if show_dependencies:
+            critical_path = g.task_graph.critical_path(shown_task_ids)
+            if len(critical_path) > 1:
+                response_parts.append(
+                    f"🧭 **Critical Path** ({len(critical_path)} tasks): {' → '.join(critical_path)}"
+                )
+                response_parts.append("")
+
+        response_parts.extend(task_parts)
 
         # Add smart pagination and usage tips
         if truncated:
-            remaining_count = len(tasks_to_display) - tasks_included
             response_parts.append(
                 f"--- Response truncated to stay under {max_tokens} tokens ---"
             )
             response_parts.append(
-                f"Showing {tasks_included} of {len(tasks_to_display)} tasks ({remaining_count} remaining)"
+                f"Showing {tasks_included} tasks; more tasks match these filters"
             )
             response_parts.append(
                 f"Continue: view_tasks(start_after='{last_task_id}', max_tokens={max_tokens})"
@@ -2583,7 +2600,9 @@ def _format_task_detailed(task: Dict[str, Any]) -> str:
     if notes_val:
         parts.append("Notes:")
         # Limit notes to prevent token explosion
-        recent_notes = notes_val[-5:] if len(notes_val) > 5 else notes_val
+        recent_notes = notes_val[-TASK_NOTES_RECENT_LIMIT:]
+        # _notes_total is set when only the recent notes were loaded from task_notes
+        notes_total = task.get("_notes_total", len(notes_val))
         for note in recent_notes:
             if isinstance(note, dict):
                 ts = note.get("timestamp", "Unknown time")
@@ -2592,8 +2611,8 @@ def _format_task_detailed(task: Dict[str, Any]) -> str:
                 parts.append(f"  - [{ts}] {auth}: {cont}")
             else:
                 parts.append(f"  - [Invalid Note Format: {str(note)}]")
-        if len(notes_val) > 5:
-            parts.append(f"  ... and {len(notes_val) - 5} more notes")
+        if notes_total > len(recent_notes):
+            parts.append(f"  ... and {notes_total - len(recent_notes)} more notes")
 
     return "\n".join(parts)
 
@@ -2952,30 +2971,27 @@ async def request_assistance_tool_impl(
             child_task_db_data,
         )
 
-        # Update parent task's child_tasks field and notes (main.py:1737-1764)
+        # Update parent task's child_tasks field and add a note (main.py:1737-1764)
         parent_child_tasks_list = json.loads(
             parent_task_current_data.get("child_tasks") or "[]"
         )
         parent_child_tasks_list.append(child_task_id)
 
-        parent_notes_list = json.loads(parent_task_current_data.get("notes") or "[]")
-        parent_notes_list.append(
-            {
-                "timestamp": timestamp_iso,
-                "author": requesting_agent_id,
-                "content": f"Requested assistance: {assistance_description}. Assistance task created: {child_task_id}",
-            }
-        )
-
         cursor.execute(
-            "UPDATE tasks SET child_tasks = ?, notes = ?, updated_at = ? WHERE task_id = ?",
+            "UPDATE tasks SET child_tasks = ?, updated_at = ? WHERE task_id = ?",
             (
                 json.dumps(parent_child_tasks_list),
-                json.dumps(parent_notes_list),
                 timestamp_iso,
                 parent_task_id,
             ),
         )
+        parent_note = append_task_note(
+            cursor,
+            parent_task_id,
+            requesting_agent_id,
+            f"Requested assistance: {assistance_description}. Assistance task created: {child_task_id}",
+            timestamp_iso,
+        )
 
         log_agent_action_to_db(
             cursor,
@@ -2991,16 +3007,14 @@ async def request_assistance_tool_impl(
 
         # Update in-memory caches (g.tasks)
         # Parent task
-        if parent_task_id in g.tasks:
-            g.tasks[parent_task_id]["child_tasks"] = parent_child_tasks_list
-            g.tasks[parent_task_id]["notes"] = parent_notes_list
-            g.tasks[parent_task_id]["updated_at"] = timestamp_iso
-        # New child task
-        child_task_mem_data = child_task_db_data.copy()
-        child_task_mem_data["depends_on_tasks"] = []  # from json.dumps([])
-        child_task_mem_data["child_tasks"] = []
-        child_task_mem_data["notes"] = []
-        g.tasks[child_task_id] = child_task_mem_data
+        g.tasks.add_notes(
+            parent_task_id,
+            [parent_note],
+            child_tasks=parent_child_tasks_list,
+            updated_at=timestamp_iso,
+        )
+        # New child task (JSON fields are parsed by the store)
+        g.tasks.put(child_task_db_data)
 
         # Send direct message to admin via new communication system
         try:
@@ -3111,234 +3125,120 @@ async def bulk_task_operations_tool_impl(
 
     is_admin_request = verify_token(agent_auth_token, "admin")
 
-    # Process operations in a single transaction
-    conn = None
-    try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
-        results = []
-        updated_at_iso = datetime.datetime.now().isoformat()
-
-        for i, op in enumerate(operations):
-            if not isinstance(op, dict):
-                results.append(
-                    f"Operation {i+1}: Invalid operation format (must be object)"
-                )
-                continue
-
-            operation_type = op.get("type")
-            task_id = op.get("task_id")
+    # Validate operations up front; the valid ones are applied together below
+    valid_statuses = ["pending", "in_progress", "completed", "cancelled", "failed"]
+    results: List[Optional[str]] = [None] * len(operations)
+    valid_ops: List[tuple] = []  # (index, operation_type, task_id, op)
+    for i, op in enumerate(operations):
+        if not isinstance(op, dict):
+            results[i] = f"Operation {i+1}: Invalid operation format (must be object)"
+            continue
 
-            if not task_id or not operation_type:
-                results.append(
-                    f"Operation {i+1}: Missing required fields 'type' and 'task_id'"
-                )
-                continue
+        operation_type = op.get("type")
+        task_id = op.get("task_id")
+
+        if not task_id or not operation_type:
+            results[i] = f"Operation {i+1}: Missing required fields 'type' and 'task_id'"
+        elif operation_type == "update_status":
+            new_status = op.get("status")
+            if not new_status:
+                results[i] = f"Operation {i+1}: Missing 'status' for update_status operation"
+            elif new_status not in valid_statuses:
+                results[i] = f"Operation {i+1}: Invalid status '{new_status}'"
+        elif operation_type == "update_priority":
+            new_priority = op.get("priority")
+            if not new_priority or new_priority not in ["low", "medium", "high"]:
+                results[i] = f"Operation {i+1}: Invalid priority '{new_priority}'"
+        elif operation_type == "add_note":
+            if not op.get("content"):
+                results[i] = f"Operation {i+1}: Missing 'content' for add_note operation"
+        elif operation_type == "reassign":
+            if not is_admin_request:
+                results[i] = f"Operation {i+1}: Reassign operation requires admin privileges"
+            elif not op.get("assigned_to"):
+                results[i] = f"Operation {i+1}: Missing 'assigned_to' for reassign operation"
+        else:
+            results[i] = f"Operation {i+1}: Unknown operation type '{operation_type}'"
 
-            # Verify task exists and permissions
-            cursor.execute("SELECT * FROM tasks WHERE task_id = ?", (task_id,))
-            task_row = cursor.fetchone()
-            if not task_row:
-                results.append(f"Operation {i+1}: Task '{task_id}' not found")
-                continue
+        if results[i] is None:
+            valid_ops.append((i, operation_type, task_id, op))
 
-            task_data = dict(task_row)
+    updated_at_iso = datetime.datetime.now().isoformat()
 
-            # Permission check
-            if (
-                task_data.get("assigned_to") != requesting_agent_id
-                and not is_admin_request
-            ):
-                results.append(
-                    f"Operation {i+1}: Unauthorized - can only modify own tasks"
-                )
-                continue
+    # All operations run in one write-queue transaction: one SELECT for existence
+    # and permissions, one UPDATE per distinct new value and one batched note insert.
+    # Operations apply in order, so the last value written to a field wins.
+    async def write_operation():
+        conn = None
+        try:
+            conn = get_db_connection()
+            cursor = conn.cursor()
 
-            try:
+            requested_ids = sorted({task_id for _, _, task_id, _ in valid_ops})
+            cursor.execute(
+                "SELECT task_id, assigned_to FROM tasks WHERE task_id IN (SELECT value FROM json_each(?))",
+                (json.dumps(requested_ids),),
+            )
+            assignees = {row["task_id"]: row["assigned_to"] for row in cursor.fetchall()}
+
+            changes: Dict[str, Dict[str, Any]] = {}
+            new_notes: List[tuple] = []  # (task_id, note)
+            applied_count = 0
+            for i, operation_type, task_id, op in valid_ops:
+                if task_id not in assignees:
+                    results[i] = f"Operation {i+1}: Task '{task_id}' not found"
+                    continue
+                if assignees[task_id] != requesting_agent_id and not is_admin_request:
+                    results[i] = f"Operation {i+1}: Unauthorized - can only modify own tasks"
+                    continue
+
+                applied_count += 1
+                task_changes = changes.setdefault(task_id, {})
                 if operation_type == "update_status":
-                    new_status = op.get("status")
-                    notes_content = op.get("notes")
-
-                    if not new_status:
-                        results.append(
-                            f"Operation {i+1}: Missing 'status' for update_status operation"
-                        )
-                        continue
-
-                    valid_statuses = [
-                        "pending",
-                        "in_progress",
-                        "completed",
-                        "cancelled",
-                        "failed",
-                    ]
-                    if new_status not in valid_statuses:
-                        results.append(
-                            f"Operation {i+1}: Invalid status '{new_status}'"
-                        )
-                        continue
-
-                    # Update status
-                    update_fields = ["status = ?", "updated_at = ?"]
-                    update_params = [new_status, updated_at_iso]
-
-                    # Handle notes
-                    current_notes = json.loads(task_data.get("notes") or "[]")
-                    if notes_content:
-                        current_notes.append(
-                            {
-                                "timestamp": updated_at_iso,
-                                "author": requesting_agent_id,
-                                "content": notes_content,
-                            }
-                        )
-                    update_fields.append("notes = ?")
-                    update_params.append(json.dumps(current_notes))
-
-                    update_params.append(task_id)
-
-                    # Validate field assignments for security
-                    allowed_bulk_fields = ["status = ?", "updated_at = ?", "notes = ?"]
-                    safe_fields = [
-                        field for field in update_fields if field in allowed_bulk_fields
-                    ]
-
-                    if safe_fields:
-                        set_clause = ", ".join(safe_fields)
-                        bulk_update_sql = (
-                            f"UPDATE tasks SET {set_clause} WHERE task_id = ?"
+                    task_changes["status"] = op["status"]
+                    if op.get("notes"):
+                        new_notes.append(
+                            (task_id, make_task_note(requesting_agent_id, op["notes"], updated_at_iso))
                         )
-                        cursor.execute(bulk_update_sql, tuple(update_params))
-
-                    # Update in-memory cache
-                    if task_id in g.tasks:
-                        g.tasks[task_id]["status"] = new_status
-                        g.tasks[task_id]["updated_at"] = updated_at_iso
-                        g.tasks[task_id]["notes"] = current_notes
-
-                    results.append(
-                        f"Operation {i+1}: Task '{task_id}' status updated to '{new_status}'"
-                    )
-
+                    results[i] = f"Operation {i+1}: Task '{task_id}' status updated to '{op['status']}'"
                 elif operation_type == "update_priority":
-                    new_priority = op.get("priority")
-
-                    if not new_priority or new_priority not in [
-                        "low",
-                        "medium",
-                        "high",
-                    ]:
-                        results.append(
-                            f"Operation {i+1}: Invalid priority '{new_priority}'"
-                        )
-                        continue
-
-                    cursor.execute(
-                        "UPDATE tasks SET priority = ?, updated_at = ? WHERE task_id = ?",
-                        (new_priority, updated_at_iso, task_id),
-                    )
-
-                    if task_id in g.tasks:
-                        g.tasks[task_id]["priority"] = new_priority
-                        g.tasks[task_id]["updated_at"] = updated_at_iso
-
-                    results.append(
-                        f"Operation {i+1}: Task '{task_id}' priority updated to '{new_priority}'"
-                    )
-
+                    task_changes["priority"] = op["priority"]
+                    results[i] = f"Operation {i+1}: Task '{task_id}' priority updated to '{op['priority']}'"
                 elif operation_type == "add_note":
-                    note_content = op.get("content")
-
-                    if not note_content:
-                        results.append(
-                            f"Operation {i+1}: Missing 'content' for add_note operation"
-                        )
-                        continue
-
-                    current_notes = json.loads(task_data.get("notes") or "[]")
-                    current_notes.append(
-                        {
-                            "timestamp": updated_at_iso,
-                            "author": requesting_agent_id,
-                            "content": note_content,
-                        }
-                    )
-
-                    cursor.execute(
-                        "UPDATE tasks SET notes = ?, updated_at = ? WHERE task_id = ?",
-                        (json.dumps(current_notes), updated_at_iso, task_id),
-                    )
-
-                    if task_id in g.tasks:
-                        g.tasks[task_id]["notes"] = current_notes
-                        g.tasks[task_id]["updated_at"] = updated_at_iso
-
-                    results.append(f"Operation {i+1}: Note added to task '{task_id}'")
-
-                elif operation_type == "reassign" and is_admin_request:
-                    new_assigned_to = op.get("assigned_to")
-
-                    if not new_assigned_to:
-                        results.append(
-                            f"Operation {i+1}: Missing 'assigned_to' for reassign operation"
-                        )
-                        continue
-
-                    cursor.execute(
-                        "UPDATE tasks SET assigned_to = ?, updated_at = ? WHERE task_id = ?",
-                        (new_assigned_to, updated_at_iso, task_id),
-                    )
-
-                    if task_id in g.tasks:
-                        g.tasks[task_id]["assigned_to"] = new_assigned_to
-                        g.tasks[task_id]["updated_at"] = updated_at_iso
-
-                    results.append(
-                        f"Operation {i+1}: Task '{task_id}' reassigned to '{new_assigned_to}'"
+                    new_notes.append(
+                        (task_id, make_task_note(requesting_agent_id, op["content"], updated_at_iso))
                     )
+                    results[i] = f"Operation {i+1}: Note added to task '{task_id}'"
+                elif operation_type == "reassign":
+                    task_changes["assigned_to"] = op["assigned_to"]
+                    results[i] = f"Operation {i+1}: Task '{task_id}' reassigned to '{op['assigned_to']}'"
 
-                else:
-                    if operation_type == "reassign" and not is_admin_request:
-                        results.append(
-                            f"Operation {i+1}: Reassign operation requires admin privileges"
-                        )
-                    else:
-                        results.append(
-                            f"Operation {i+1}: Unknown operation type '{operation_type}'"
-                        )
-
-            except Exception as e:
-                results.append(f"Operation {i+1}: Error processing - {str(e)}")
-                logger.error(f"Error in bulk operation {i+1}: {e}", exc_info=True)
-
-        # Log the bulk operation
-        log_agent_action_to_db(
-            cursor,
-            requesting_agent_id,
-            "bulk_task_operations",
-            details={
-                "operations_count": len(operations),
-                "success_count": len([r for r in results if "Error" not in r]),
-            },
-        )
-        conn.commit()
-
-        response_text = (
-            f"Bulk Task Operations Results ({len(operations)} operations):\n\n"
-            + "\n".join(results)
-        )
+            update_tasks_by_value(cursor, changes, updated_at_iso)
+            append_task_notes(cursor, new_notes)
 
-        log_audit(
-            requesting_agent_id,
-            "bulk_task_operations",
-            {"operations_count": len(operations)},
-        )
-        return [mcp_types.TextContent(type="text", text=response_text)]
+            log_agent_action_to_db(
+                cursor,
+                requesting_agent_id,
+                "bulk_task_operations",
+                details={
+                    "operations_count": len(operations),
+                    "success_count": applied_count,
+                    "tasks_updated": len(changes),
+                },
+            )
+            conn.commit()
+            return changes, new_notes
+        except Exception:
+            if conn:
+                conn.rollback()
+            raise
+        finally:
+            if conn:
+                conn.close()
 
+    try:
+        changes, new_notes = await execute_db_write(write_operation)
     except sqlite3.Error as e_sql:
-        if conn:
-            conn.rollback()
         logger.error(f"Database error in bulk task operations: {e_sql}", exc_info=True)
         return [
             mcp_types.TextContent(
@@ -3346,20 +3246,178 @@ async def bulk_task_operations_tool_impl(
             )
         ]
     except Exception as e:
-        if conn:
-            conn.rollback()
         logger.error(f"Unexpected error in bulk task operations: {e}", exc_info=True)
         return [
             mcp_types.TextContent(
                 type="text", text=f"Unexpected error in bulk operations: {e}"
             )
         ]
+
+    # Refresh the in-memory cache in one pass over the changed tasks
+    notes_by_task: Dict[str, List[Dict[str, Any]]] = {}
+    for task_id, note in new_notes:
+        notes_by_task.setdefault(task_id, []).append(note)
+    for task_id, task_changes in changes.items():
+        g.tasks.add_notes(
+            task_id, notes_by_task.get(task_id, []), updated_at=updated_at_iso, **task_changes
+        )
+
+    response_text = (
+        f"Bulk Task Operations Results ({len(operations)} operations):\n\n"
+        + "\n".join(results)
+    )
+
+    log_audit(
+        requesting_agent_id,
+        "bulk_task_operations",
+        {"operations_count": len(operations)},
+    )
+    return [mcp_types.TextContent(type="text", text=response_text)]
+
+
+# --- search_tasks tool ---
+def _score_task_match(
+    task: Dict[str, Any],
+    search_terms: List[str],
+    search_query: str,
+    include_notes: bool,
+    notes_text: Optional[str] = None,
+) -> tuple:
+    """
+    Field-weighted term score of a task: title 3, description 2, notes 1, exact phrase +2.
+    `notes_text` replaces the task's cached notes when given (e.g. notes matched in SQL).
+    """
+    score = 0.0
+    matched_fields = []
+
+    # Search in title (highest weight)
+    title = (task.get("title") or "").lower()
+    title_matches = sum(1 for term in search_terms if term in title)
+    if title_matches > 0:
+        score += title_matches * 3.0
+        matched_fields.append(f"title ({title_matches} terms)")
+
+    # Search in description (medium weight)
+    description = (task.get("description") or "").lower()
+    desc_matches = sum(1 for term in search_terms if term in description)
+    if desc_matches > 0:
+        score += desc_matches * 2.0
+        matched_fields.append(f"description ({desc_matches} terms)")
+
+    # Search in notes (lower weight)
+    if include_notes:
+        if notes_text is None:
+            notes = task.get("notes", [])
+            if isinstance(notes, str):
+                try:
+                    notes = json.loads(notes)
+                except:
+                    notes = []
+            notes_text = " ".join(
+                [note.get("content", "") for note in notes if isinstance(note, dict)]
+            )
+
+        notes_content = notes_text.lower()
+        notes_matches = sum(1 for term in search_terms if term in notes_content)
+        if notes_matches > 0:
+            score += notes_matches * 1.0
+            matched_fields.append(f"notes ({notes_matches} terms)")
+
+    # Exact phrase bonus
+    full_text = f"{title} {description}".lower()
+    if search_query.lower() in full_text:
+        score += 2.0
+        matched_fields.append("exact phrase")
+
+    return score, matched_fields
+
+
+def _search_tasks_fts(
+    search_terms: List[str],
+    search_query: str,
+    include_notes: bool,
+    status_filter: Optional[str],
+    assigned_to: Optional[str],
+    candidate_limit: int,
+) -> Optional[List[tuple]]:
+    """
+    Candidate retrieval from the full-text indexes (prefix match on every term):
+    tasks_fts for title/description (BM25 weights 3/2) and, with include_notes,
+    task_notes_fts for the notes, whose BM25 scores are added per task. The
+    candidates are then scored with _score_task_match against the matching
+    notes, BM25 breaking ties.
+
+    Returns None when the FTS indexes are unavailable so the caller can fall back.
+    """
+    terms_expr = (
+        "(" + " OR ".join('"' + term.replace('"', '""') + '"*' for term in search_terms) + ")"
+    )
+    params: List[Any] = ["{title description}: " + terms_expr]
+    notes_sql = ""
+    if include_notes:
+        notes_sql = """
+            UNION ALL
+            SELECT t.rowid, bm25(task_notes_fts), n.content
+            FROM task_notes_fts
+            JOIN task_notes n ON n.id = task_notes_fts.rowid
+            JOIN tasks t ON t.task_id = n.task_id
+            WHERE task_notes_fts MATCH ?
+        """
+        params.append(terms_expr)
+    filters = []
+    if assigned_to is not None:
+        filters.append("t.assigned_to = ?")
+        params.append(assigned_to)
+    if status_filter:
+        filters.append("t.status = ?")
+        params.append(status_filter)
+    where_sql = f"WHERE {' AND '.join(filters)}" if filters else ""
+    sql = f"""
+        WITH matches AS (
+            SELECT rowid AS task_rowid, bm25(tasks_fts, 0.0, 3.0, 2.0) AS rank, NULL AS note_text
+            FROM tasks_fts
+            WHERE tasks_fts MATCH ?
+            {notes_sql}
+        ), ranked AS (
+            SELECT task_rowid, SUM(rank) AS fts_rank, group_concat(note_text, ' ') AS matched_notes
+            FROM matches
+            GROUP BY task_rowid
+        )
+        SELECT t.*, ranked.fts_rank, ranked.matched_notes
+        FROM ranked
+        JOIN tasks t ON t.rowid = ranked.task_rowid
+        {where_sql}
+        ORDER BY fts_rank
+        LIMIT ?
+    """
+    params.append(candidate_limit)
+
+    conn = None
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        cursor.execute(sql, params)
+        rows = [dict(row) for row in cursor.fetchall()]
+    except sqlite3.OperationalError as e:
+        logger.warning(f"Task full-text search unavailable, scanning tasks instead: {e}")
+        return None
     finally:
         if conn:
             conn.close()
 
+    scored_results = []
+    for task in rows:
+        fts_rank = task.pop("fts_rank")
+        matched_notes = task.pop("matched_notes") or ""
+        score, matched_fields = _score_task_match(
+            task, search_terms, search_query, include_notes, notes_text=matched_notes
+        )
+        if score > 0:
+            # bm25() is negative, lower is better; a small share of it breaks score ties
+            scored_results.append((task, score - fts_rank * 1e-3, matched_fields))
+    return scored_results
+
 
-# --- search_tasks tool ---
 async def search_tasks_tool_impl(
     arguments: Dict[str, Any],
 ) -> List[mcp_types.TextContent]:
@@ -3398,71 +3456,31 @@ async def search_tasks_tool_impl(
             )
         ]
 
-    # Get tasks user can see
-    candidate_tasks = []
-    for task_id, task_data in g.tasks.items():
-        # Permission check
-        if not is_admin_request and task_data.get("assigned_to") != requesting_agent_id:
-            continue
-
-        # Status filter
-        if status_filter and task_data.get("status") != status_filter:
-            continue
+    # Ranked full-text search over tasks_fts; in-memory scan if FTS5 is unavailable
+    scored_results = _search_tasks_fts(
+        search_terms,
+        search_query,
+        include_notes,
+        status_filter,
+        None if is_admin_request else requesting_agent_id,
+        candidate_limit=max(max_results * 5, 100),
+    )
+    if scored_results is None:
+        scored_results = []
+        for task_data in g.tasks.snapshot().values():
+            # Permission check
+            if not is_admin_request and task_data.get("assigned_to") != requesting_agent_id:
+                continue
 
-        candidate_tasks.append(task_data)
+            # Status filter
+            if status_filter and task_data.get("status") != status_filter:
+                continue
 
-    if not candidate_tasks:
-        return [
-            mcp_types.TextContent(
-                type="text", text="No tasks found matching the criteria."
+            score, matched_fields = _score_task_match(
+                task_data, search_terms, search_query, include_notes
             )
-        ]
-
-    # Score tasks by relevance
-    scored_results = []
-    for task in candidate_tasks:
-        score = 0.0
-        matched_fields = []
-
-        # Search in title (highest weight)
-        title = (task.get("title") or "").lower()
-        title_matches = sum(1 for term in search_terms if term in title)
-        if title_matches > 0:
-            score += title_matches * 3.0
-            matched_fields.append(f"title ({title_matches} terms)")
-
-        # Search in description (medium weight)
-        description = (task.get("description") or "").lower()
-        desc_matches = sum(1 for term in search_terms if term in description)
-        if desc_matches > 0:
-            score += desc_matches * 2.0
-            matched_fields.append(f"description ({desc_matches} terms)")
-
-        # Search in notes (lower weight)
-        if include_notes:
-            notes = task.get("notes", [])
-            if isinstance(notes, str):
-                try:
-                    notes = json.loads(notes)
-                except:
-                    notes = []
-
-            notes_content = " ".join(
-                [note.get("content", "") for note in notes if isinstance(note, dict)]
-            ).lower()
-            notes_matches = sum(1 for term in search_terms if term in notes_content)
-            if notes_matches > 0:
-                score += notes_matches * 1.0
-                matched_fields.append(f"notes ({notes_matches} terms)")
-
-        # Exact phrase bonus
-        full_text = f"{title} {description}".lower()
-        if search_query.lower() in full_text:
-            score += 2.0
-            matched_fields.append("exact phrase")
-
-        if score > 0:
-            scored_results.append((task, score, matched_fields))
+            if score > 0:
+                scored_results.append((task_data, score, matched_fields))
 
     if not scored_results:
         return [
@@ -3577,7 +3595,7 @@ def register_task_tools():
                 # Mode 2: Multiple task creation
                 "tasks": {
                     "type": "array",
-                    "description": "Array of tasks to create and assign (Mode 2: multiple task creation)",
+                    "description": "Array of tasks to create and assign (Mode 2: multiple task creation). The batch is placement-validated with one analysis and written in one transaction",
                     "items": {
                         "type": "object",
                         "properties": {
@@ -3596,6 +3614,20 @@ def register_task_tools():
                                 "type": "string",
                                 "description": "Parent task ID for this task",
                             },
+                            "parent_task_index": {
+                                "type": "integer",
+                                "description": "Index (0-based) of an earlier task in this array to use as parent, for creating a subtree",
+                            },
+                            "depends_on_tasks": {
+                                "type": "array",
+                                "description": "Existing task IDs this task depends on",
+                                "items": {"type": "string"},
+                            },
+                            "depends_on_indexes": {
+                                "type": "array",
+                                "description": "Indexes (0-based) of earlier tasks in this array this task depends on",
+                                "items": {"type": "integer"},
+                            },
                         },
                         "required": ["title", "description"],
                         "additionalProperties": False,
@@ -3641,6 +3673,10 @@ def register_task_tools():
                     "type": "string",
                     "description": "Reason for overriding RAG validation (required if override_rag is true)",
                 },
+                "async_validation": {
+                    "type": "boolean",
+                    "description": "Create the task immediately as 'pending_validation' and validate its placement in the background; the verdict is added as a task note (defaults to TASK_PLACEMENT_ASYNC)",
+                },
             },
             "required": ["token"],
             "additionalProperties": False,
@@ -3678,6 +3714,10 @@ def register_task_tools():
                     "type": "string",
                     "description": "ID of the parent task (defaults to agent's current task if not specified, but MUST have a parent)",
                 },
+                "async_validation": {
+                    "type": "boolean",
+                    "description": "Create the task immediately as 'pending_validation' and validate its placement in the background; the verdict is added as a task note",
+                },
             },
             "required": ["token", "task_title", "task_description"],
             "additionalProperties": False,
@@ -4055,8 +4095,12 @@ async def delete_task_tool_impl(
 
         # Check for tasks that depend on this one
         cursor.execute(
-            "SELECT task_id, title FROM tasks WHERE json_extract(depends_on_tasks, '$') LIKE ?",
-            (f'%"{task_id}"%',),
+            """
+            SELECT t.task_id, t.title
+            FROM task_edges e JOIN tasks t ON t.task_id = e.from_task
+            WHERE e.to_task = ? AND e.kind = ?
+        """,
+            (task_id, EDGE_DEPENDS_ON),
         )
         dependent_tasks = cursor.fetchall()
 
@@ -4157,6 +4201,29 @@ async def delete_task_tool_impl(
 
         conn.commit()
 
+        # Keep the in-memory cache and dependency graph in step with the deletion
+        removed_task_ids = [task_id] + (child_tasks if force_delete else [])
+        for removed_id in removed_task_ids:
+            g.tasks.remove(removed_id)
+        if dependent_tasks and force_delete:
+            for dep_row in dependent_tasks:
+                dependent_task = g.tasks.get(dep_row["task_id"])
+                if dependent_task is not None:
+                    g.tasks.patch(
+                        dep_row["task_id"],
+                        {
+                            "depends_on_tasks": [
+                                d for d in dependent_task["depends_on_tasks"] if d != task_id
+                            ]
+                        },
+                    )
+        parent_task = g.tasks.get(task_data.get("parent_task") or "")
+        if parent_task is not None:
+            g.tasks.patch(
+                parent_task["task_id"],
+                {"child_tasks": [c for c in parent_task["child_tasks"] if c != task_id]},
+            )
+
         # Prepare response
         response_parts = [
             f"Task '{task_id}' ({task_data.get('title', 'Untitled')}) deleted successfully."
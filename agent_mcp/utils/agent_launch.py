@@ -0,0 +1,183 @@
+# Agent-MCP/agent_mcp/utils/agent_launch.py
+"""
+Async launch pipeline for agent tmux sessions.
+
+A launch goes through fixed stages: create the session, run the setup commands
+(banner, working directory, MCP registration), start Claude, then deliver the
+prompt. Every setup command is followed by an `echo` of a per-step marker with
+the command's exit status, and the next stage starts as soon as that marker is
+on the pane instead of after a fixed sleep. The prompt is sent once Claude's
+input box (AGENT_READY_PATTERN) is visible; that wait runs in the background so
+the tool call returns as soon as Claude has been started.
+
+Launches only await tmux and the pane, so several can run concurrently (the
+create_agents tool): starting a swarm takes about as long as starting one agent.
+"""
+import asyncio
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Set
+
+from ..core.config import (
+    logger,
+    AGENT_LAUNCH_STEP_TIMEOUT,
+    AGENT_READY_PATTERN,
+    AGENT_READY_TIMEOUT,
+)
+from .tmux_async import (
+    create_tmux_session_async,
+    send_keys_async,
+    session_exists_async,
+    wait_for_pane_async,
+)
+from .tmux_delivery import prompt_delivery
+
+# Keeps background prompt deliveries referenced until they finish
+_prompt_deliveries: Set["asyncio.Task[bool]"] = set()
+
+
+@dataclass
+class AgentLaunchSpec:
+    """What to launch: one agent's tmux session and the prompt it starts with."""
+    agent_id: str
+    session_name: str
+    working_dir: str
+    mcp_server_url: str
+    env_vars: Dict[str, str] = field(default_factory=dict)
+    prompt: Optional[str] = None
+    # Fixed wait before the prompt, only used when AGENT_READY_PATTERN is empty
+    prompt_delay: float = 5
+    label: str = "Agent"
+
+
+@dataclass
+class AgentLaunchResult:
+    """Outcome of a launch; `stage` is the last stage reached."""
+    agent_id: str
+    session_name: str
+    ok: bool = False
+    stage: str = "pending"
+    message: str = ""
+    prompt_task: Optional["asyncio.Task[bool]"] = None
+
+
+async def run_setup_step(
+    session_name: str, command: str, step: int, timeout: float = AGENT_LAUNCH_STEP_TIMEOUT
+) -> Optional[int]:
+    """
+    Types `command` into the session's shell and waits for it to finish.
+    Returns its exit status, or None if it could not be sent or did not finish
+    within `timeout`.
+    """
+    # The quotes split the marker on the typed line, so only the echo's output matches
+    if not await send_keys_async(
+        session_name, f"{command}; echo mcp-step-''{step}:$?", "Enter"
+    ):
+        return None
+    match = await wait_for_pane_async(
+        session_name, re.compile(rf"mcp-step-{step}:(\d+)"), timeout
+    )
+    return int(match.group(1)) if match else None
+
+
+async def wait_for_agent_ready(session_name: str, timeout: float = AGENT_READY_TIMEOUT) -> bool:
+    """Waits until Claude's input box is visible in the session."""
+    match = await wait_for_pane_async(
+        session_name, re.compile(AGENT_READY_PATTERN, re.IGNORECASE), timeout, history=0
+    )
+    return match is not None
+
+
+async def _deliver_prompt_when_ready(spec: AgentLaunchSpec) -> bool:
+    if not AGENT_READY_PATTERN:
+        return await prompt_delivery.submit(spec.session_name, spec.prompt, spec.prompt_delay)
+    if await wait_for_agent_ready(spec.session_name):
+        logger.info(f"Claude is ready in session '{spec.session_name}', sending prompt")
+    elif not await session_exists_async(spec.session_name):
+        logger.warning(f"Session '{spec.session_name}' closed before Claude was ready; prompt not sent")
+        return False
+    else:
+        logger.warning(
+            f"Claude not detected as ready in session '{spec.session_name}' after "
+            f"{AGENT_READY_TIMEOUT}s; sending prompt anyway"
+        )
+    return await prompt_delivery.submit(spec.session_name, spec.prompt)
+
+
+async def launch_agent_session(spec: AgentLaunchSpec) -> AgentLaunchResult:
+    """
+    Creates the agent's tmux session, registers the MCP server and starts
+    Claude. When the spec has a prompt, its delivery is scheduled as
+    `result.prompt_task`. Returns once Claude has been started.
+    """
+    result = AgentLaunchResult(agent_id=spec.agent_id, session_name=spec.session_name)
+    label = f"{spec.label.lower()} '{spec.agent_id}'"
+
+    result.stage = "create_session"
+    if not await create_tmux_session_async(
+        session_name=spec.session_name,
+        working_dir=spec.working_dir,
+        command=None,  # Claude is started after setup
+        env_vars=spec.env_vars,
+    ):
+        result.message = f"❌ Failed to create tmux session for {label}."
+        return result
+
+    # Setup commands, each awaited until its marker shows up
+    result.stage = "setup"
+    setup_commands = [
+        f"echo '=== {spec.label} {spec.agent_id} initialization starting ==='",
+        "echo 'Working directory:' && pwd",
+        f"echo 'MCP Server URL: {spec.mcp_server_url}'",
+    ]
+    step = 0
+    for command in setup_commands:
+        step += 1
+        if await run_setup_step(spec.session_name, command, step) is None:
+            logger.warning(f"Setup step {step} for {label} did not complete: {command}")
+
+    result.stage = "register_mcp"
+    step += 1
+    mcp_add_command = f"claude mcp add -t sse AgentMCP {spec.mcp_server_url}"
+    logger.info(f"Registering MCP server for {label}: {mcp_add_command}")
+    exit_status = await run_setup_step(spec.session_name, mcp_add_command, step)
+    if exit_status is None:
+        if not await session_exists_async(spec.session_name):
+            result.message = f"❌ Failed to register MCP server for {label}."
+            return result
+        logger.warning(f"MCP registration for {label} did not finish within {AGENT_LAUNCH_STEP_TIMEOUT}s")
+    elif exit_status != 0:
+        # Non-zero also when AgentMCP is already registered for this directory
+        logger.warning(f"'claude mcp add' exited with {exit_status} for {label}")
+
+    step += 1
+    await run_setup_step(spec.session_name, "claude mcp list", step)
+
+    result.stage = "start_claude"
+    step += 1
+    await run_setup_step(
+        spec.session_name,
+        f"echo '=== {spec.label} {spec.agent_id} setup complete - starting Claude with MCP ==='",
+        step,
+    )
+    claude_command = "claude --dangerously-skip-permissions"
+    logger.info(f"Starting Claude for {label}: {claude_command}")
+    if not await send_keys_async(spec.session_name, claude_command, "Enter"):
+        result.message = f"❌ Failed to start Claude for {label} after MCP registration."
+        return result
+
+    result.ok = True
+    result.message = (
+        f"✅ tmux session '{spec.session_name}' created for {label} with MCP registration and Claude."
+    )
+
+    if spec.prompt:
+        result.stage = "prompt"
+        task = asyncio.create_task(_deliver_prompt_when_ready(spec))
+        _prompt_deliveries.add(task)
+        task.add_done_callback(_prompt_deliveries.discard)
+        result.prompt_task = task
+    else:
+        result.stage = "started"
+    return result
+
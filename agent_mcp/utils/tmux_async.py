@@ -0,0 +1,293 @@
+# Agent-MCP/agent_mcp/utils/tmux_async.py
+"""
+Non-blocking tmux client for async code.
+
+Mirrors the tmux_utils functions, but every tmux invocation is an
+asyncio.create_subprocess_exec child awaited with a timeout and every delay is
+an asyncio.sleep, so tool handlers await tmux without freezing the event loop
+for other agents. Session existence checks and listings are answered by the
+tmux control-mode registry (tmux_control) while it is connected, without a
+process at all. wait_for_pane_async polls a pane's content so callers can wait
+for what the session shows instead of sleeping a fixed time. The synchronous
+tmux_utils functions stay for synchronous callers (CLI commands, startup code).
+"""
+import asyncio
+import os
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Pattern, Tuple, Union
+
+from ..core.config import logger, TMUX_PANE_POLL_INTERVAL
+from .tmux_control import tmux_control
+from .tmux_utils import (
+    SESSION_LIST_FORMAT,
+    SESSION_STATUS_FORMAT,
+    parse_session_list,
+    parse_session_status,
+    sanitize_session_name,
+)
+
+# tmux -V result; whether tmux is installed does not change while we run
+_tmux_available: Optional[bool] = None
+
+
+async def run_tmux(
+    *args: str, timeout: float = 5.0, env: Optional[Dict[str, str]] = None
+) -> Tuple[int, str, str]:
+    """
+    Runs `tmux <args>` and returns (returncode, stdout, stderr). A timeout kills
+    the process and returns -1; a missing tmux binary returns 127.
+    """
+    try:
+        process = await asyncio.create_subprocess_exec(
+            "tmux",
+            *args,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            env=env,
+        )
+    except FileNotFoundError:
+        return 127, "", "tmux not found"
+    try:
+        stdout, stderr = await asyncio.wait_for(process.communicate(), timeout)
+    except asyncio.TimeoutError:
+        process.kill()
+        await process.wait()
+        return -1, "", f"tmux {args[0] if args else ''} timed out after {timeout}s"
+    return (
+        process.returncode,
+        stdout.decode("utf-8", errors="replace"),
+        stderr.decode("utf-8", errors="replace"),
+    )
+
+
+async def is_tmux_available_async() -> bool:
+    """Check if tmux is installed and available (checked once per process)."""
+    global _tmux_available
+    if tmux_control.connected:
+        return True
+    if _tmux_available is None:
+        returncode, _, _ = await run_tmux("-V")
+        _tmux_available = returncode == 0
+    return _tmux_available
+
+
+async def _sync_session_registry() -> None:
+    # Our own create/kill is visible to the next lookup, not only after tmux's notification
+    if tmux_control.connected:
+        try:
+            await tmux_control.refresh()
+        except (ConnectionError, asyncio.TimeoutError) as e:
+            logger.warning(f"tmux control: session refresh failed: {e}")
+
+
+async def session_exists_async(session_name: str) -> bool:
+    """
+    Check if a tmux session with the given name exists; answered from the
+    tmux control registry when it is connected.
+    """
+    clean_session_name = sanitize_session_name(session_name)
+    known = await tmux_control.has_session(clean_session_name)
+    if known is not None:
+        return known
+    if not await is_tmux_available_async():
+        return False
+    returncode, _, _ = await run_tmux("has-session", "-t", clean_session_name)
+    return returncode == 0
+
+
+async def create_tmux_session_async(
+    session_name: str,
+    working_dir: str,
+    command: Optional[str] = None,
+    env_vars: Optional[Dict[str, str]] = None,
+) -> bool:
+    """Async create_tmux_session: new detached session in `working_dir`."""
+    if not await is_tmux_available_async():
+        logger.error("tmux is not available on this system")
+        return False
+
+    clean_session_name = sanitize_session_name(session_name)
+    if await session_exists_async(clean_session_name):
+        logger.warning(f"tmux session '{clean_session_name}' already exists")
+        return False
+
+    try:
+        Path(working_dir).mkdir(parents=True, exist_ok=True)
+    except OSError as e:
+        logger.error(f"Failed to create working directory {working_dir}: {e}")
+        return False
+
+    env = None
+    if env_vars:
+        env = os.environ.copy()
+        env.update(env_vars)
+    tmux_args = ["new-session", "-d", "-s", clean_session_name, "-c", working_dir]
+    if command:
+        tmux_args.append(command)
+
+    returncode, _, stderr = await run_tmux(*tmux_args, timeout=10, env=env)
+    if returncode == 0:
+        logger.info(f"Created tmux session '{clean_session_name}' in {working_dir}")
+        await _sync_session_registry()
+        return True
+    logger.error(f"Failed to create tmux session '{clean_session_name}': {stderr}")
+    return False
+
+
+async def list_tmux_sessions_async() -> List[Dict[str, Any]]:
+    """Async list_tmux_sessions: all sessions with name/created/attached/windows."""
+    sessions = tmux_control.list_sessions()
+    if sessions is not None:
+        return sessions
+    if not await is_tmux_available_async():
+        return []
+    returncode, stdout, stderr = await run_tmux(
+        "list-sessions", "-F", SESSION_LIST_FORMAT, timeout=10
+    )
+    if returncode != 0:
+        if "no server running" not in stderr:
+            logger.warning(f"Failed to list tmux sessions: {stderr}")
+        return []
+    return parse_session_list(stdout)
+
+
+async def get_session_status_async(session_name: str) -> Optional[Dict[str, Any]]:
+    """Async get_session_status; None when the session does not exist."""
+    if not await is_tmux_available_async():
+        return None
+    returncode, stdout, _ = await run_tmux(
+        "display-message", "-t", sanitize_session_name(session_name), "-p", SESSION_STATUS_FORMAT
+    )
+    return parse_session_status(stdout) if returncode == 0 else None
+
+
+async def kill_tmux_session_async(session_name: str) -> bool:
+    """Async kill_tmux_session; a session that does not exist counts as killed."""
+    if not await is_tmux_available_async():
+        logger.error("tmux is not available on this system")
+        return False
+
+    clean_session_name = sanitize_session_name(session_name)
+    if not await session_exists_async(clean_session_name):
+        logger.warning(f"tmux session '{clean_session_name}' does not exist")
+        return True
+
+    returncode, _, stderr = await run_tmux("kill-session", "-t", clean_session_name, timeout=10)
+    if returncode == 0:
+        logger.info(f"Killed tmux session '{clean_session_name}'")
+        await _sync_session_registry()
+        return True
+    logger.error(f"Failed to kill tmux session '{clean_session_name}': {stderr}")
+    return False
+
+
+async def send_keys_async(session_name: str, *keys: str, timeout: float = 5.0) -> bool:
+    """`tmux send-keys` to a session (no existence check)."""
+    returncode, _, stderr = await run_tmux(
+        "send-keys", "-t", sanitize_session_name(session_name), *keys, timeout=timeout
+    )
+    if returncode != 0:
+        logger.error(f"Failed to send keys to tmux session '{session_name}': {stderr}")
+    return returncode == 0
+
+
+async def send_command_to_session_async(session_name: str, command: str) -> bool:
+    """Async send_command_to_session: types `command` followed by Enter."""
+    if not await session_exists_async(session_name):
+        logger.warning(f"tmux session '{sanitize_session_name(session_name)}' does not exist")
+        return False
+    return await send_keys_async(session_name, command, "Enter")
+
+
+async def capture_pane_async(session_name: str, history: int = 200) -> Optional[str]:
+    """
+    Text of the session's active pane plus `history` lines of scrollback,
+    wrapped lines joined; None when the session does not exist.
+    """
+    returncode, stdout, _ = await run_tmux(
+        "capture-pane", "-p", "-J", "-S", f"-{history}", "-t", sanitize_session_name(session_name)
+    )
+    return stdout if returncode == 0 else None
+
+
+async def wait_for_pane_async(
+    session_name: str,
+    pattern: Union[str, Pattern[str]],
+    timeout: float,
+    min_count: int = 1,
+    history: int = 200,
+) -> Optional["re.Match[str]"]:
+    """
+    Polls the pane every TMUX_PANE_POLL_INTERVAL seconds until `pattern` occurs
+    at least `min_count` times and returns its last match; None on timeout or
+    when the session is gone.
+    """
+    regex = re.compile(pattern) if isinstance(pattern, str) else pattern
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while True:
+        content = await capture_pane_async(session_name, history)
+        if content is None:
+            return None
+        matches = list(regex.finditer(content))
+        if len(matches) >= min_count:
+            return matches[-1]
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            return None
+        await asyncio.sleep(min(TMUX_PANE_POLL_INTERVAL, remaining))
+
+
+async def send_escape_async(
+    session_name: str,
+    count: int = 4,
+    interval: float = 1.0,
+    until: Optional[Union[str, Pattern[str]]] = None,
+) -> bool:
+    """
+    Sends Escape up to `count` times, `interval` seconds apart, to interrupt the
+    agent. With `until`, stops as soon as a new occurrence of that pattern shows
+    up in the pane (e.g. Claude's "Interrupted" notice).
+    """
+    regex = (re.compile(until) if until else None) if isinstance(until, str) else until
+    seen = 0
+    if regex is not None:
+        content = await capture_pane_async(session_name)
+        seen = len(regex.findall(content)) if content else 0
+
+    for i in range(count):
+        if not await send_keys_async(session_name, "Escape"):
+            return False
+        logger.debug(f"Sent Escape {i+1}/{count} to session '{session_name}'")
+        if regex is not None:
+            if await wait_for_pane_async(session_name, regex, interval, min_count=seen + 1):
+                logger.debug(f"Session '{session_name}' interrupted after {i+1} Escape(s)")
+                return True
+        elif i < count - 1:  # Don't sleep after the last one
+            await asyncio.sleep(interval)
+    return True
+
+
+async def send_prompt_to_session_async(
+    session_name: str, prompt: str, delay_seconds: float = 3
+) -> bool:
+    """
+    Async send_prompt_to_session: waits `delay_seconds`, types the prompt, then
+    sends Enter as a separate command.
+    """
+    clean_session_name = sanitize_session_name(session_name)
+    if not await session_exists_async(clean_session_name):
+        logger.warning(f"tmux session '{clean_session_name}' does not exist")
+        return False
+
+    await asyncio.sleep(delay_seconds)
+    if not await send_keys_async(clean_session_name, prompt, timeout=10):
+        return False
+    # Small delay between typing and pressing Enter
+    await asyncio.sleep(0.5)
+    if not await send_keys_async(clean_session_name, "Enter"):
+        return False
+    logger.info(f"Successfully sent prompt to tmux session '{clean_session_name}'")
+    return True
+
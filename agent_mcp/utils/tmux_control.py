@@ -0,0 +1,240 @@
+# Agent-MCP/agent_mcp/utils/tmux_control.py
+"""
+Persistent tmux control-mode connection and session registry.
+
+A single `tmux -C new-session -A -s TMUX_CONTROL_SESSION` client stays attached
+for the lifetime of the server. tmux notifies control clients of changes
+(%sessions-changed, %window-add, %unlinked-window-close, ...); on each burst of
+notifications the registry is reloaded with one `list-sessions` sent over the
+same connection. Session existence checks and listings are then answered from
+memory, without spawning a tmux process.
+
+Commands are written to the client's stdin one per line and tmux answers them
+in order, each wrapped in %begin/%end (or %error) with flags 1; blocks with
+flags 0 are tmux's own and are skipped.
+
+If the connection drops it is re-established every
+TMUX_CONTROL_RECONNECT_SECONDS; while it is down, has_session() returns None
+and callers fall back to running tmux themselves.
+"""
+import asyncio
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+import anyio
+
+from ..core.config import (
+    logger,
+    TMUX_CONTROL_SESSION,
+    TMUX_CONTROL_RECONNECT_SECONDS,
+)
+from .tmux_utils import SESSION_LIST_FORMAT, is_tmux_available, parse_session_list
+
+# Longest line read from the connection (list-sessions output, notifications)
+CONTROL_LINE_LIMIT = 1024 * 1024
+
+# Notifications after which the session registry is reloaded
+REFRESH_NOTIFICATIONS = (
+    "%sessions-changed",
+    "%session-renamed",
+    "%window-add",
+    "%window-close",
+    "%unlinked-window-add",
+    "%unlinked-window-close",
+)
+
+
+class TmuxControlClient:
+    """One `tmux -C` connection plus the session registry it keeps current."""
+
+    def __init__(self, control_session: str = TMUX_CONTROL_SESSION) -> None:
+        self.control_session = control_session
+        # session name -> list_tmux_sessions() entry; the control session is left out
+        self.sessions: Dict[str, Dict[str, Any]] = {}
+        self.connected = False
+        self.stats = {"commands": 0, "notifications": 0, "refreshes": 0, "connects": 0}
+        self._process: Optional[asyncio.subprocess.Process] = None
+        # Futures of sent commands, answered in order
+        self._replies: Deque["asyncio.Future[Tuple[bool, List[str]]]"] = deque()
+        self._reply_lines: Optional[List[str]] = None
+        self._reply_ours = False
+        self._write_lock: Optional[asyncio.Lock] = None
+        self._refresh_task: Optional["asyncio.Task[None]"] = None
+        self._refresh_again = False
+        self._stopping = False
+
+    # --- Lookups ---
+
+    async def has_session(self, session_name: str) -> Optional[bool]:
+        """Whether the session exists; None when not connected (ask tmux directly)."""
+        if not self.connected:
+            return None
+        if session_name not in self.sessions and self._refresh_task is not None:
+            # A change is being loaded; it may be this session
+            await asyncio.shield(self._refresh_task)
+        return session_name in self.sessions
+
+    def list_sessions(self) -> Optional[List[Dict[str, Any]]]:
+        """Copies of the registry entries; None when not connected."""
+        if not self.connected:
+            return None
+        return [dict(session) for session in self.sessions.values()]
+
+    # --- Commands ---
+
+    async def command(self, command: str, timeout: float = 5.0) -> Tuple[bool, List[str]]:
+        """
+        Sends one tmux command line over the control connection and returns
+        (succeeded, output lines). The command must not contain newlines.
+        """
+        if self._process is None or self._process.stdin is None:
+            raise ConnectionError("tmux control connection is not open")
+        if self._write_lock is None:
+            self._write_lock = asyncio.Lock()
+        reply: "asyncio.Future[Tuple[bool, List[str]]]" = (
+            asyncio.get_running_loop().create_future()
+        )
+        # Queue position and write order must match, tmux answers in order
+        async with self._write_lock:
+            self._replies.append(reply)
+            self._process.stdin.write(command.encode("utf-8") + b"\n")
+            await self._process.stdin.drain()
+        self.stats["commands"] += 1
+        return await asyncio.wait_for(asyncio.shield(reply), timeout)
+
+    async def refresh(self) -> None:
+        """Reloads the session registry with one list-sessions over the connection."""
+        ok, lines = await self.command(f"list-sessions -F '{SESSION_LIST_FORMAT}'")
+        if not ok:
+            logger.warning(f"tmux control: list-sessions failed: {' '.join(lines)}")
+            return
+        self.sessions = {
+            session["name"]: session
+            for session in parse_session_list("\n".join(lines))
+            if session["name"] != self.control_session
+        }
+        self.stats["refreshes"] += 1
+        if not self.connected:
+            self.connected = True
+            logger.info(f"tmux control connection open: {len(self.sessions)} sessions tracked")
+
+    def _schedule_refresh(self) -> None:
+        # Notifications come in bursts; one refresh runs at a time and at most
+        # one more follows it
+        if self._refresh_task is not None:
+            self._refresh_again = True
+            return
+        self._refresh_task = asyncio.create_task(self._run_refresh())
+
+    async def _run_refresh(self) -> None:
+        try:
+            while True:
+                self._refresh_again = False
+                try:
+                    await self.refresh()
+                except (ConnectionError, asyncio.TimeoutError) as e:
+                    if not self._stopping:
+                        logger.warning(f"tmux control: session refresh failed: {e}")
+                    return
+                if not self._refresh_again:
+                    return
+        finally:
+            self._refresh_task = None
+
+    # --- Connection ---
+
+    async def run(self) -> None:
+        """Keeps the control connection open until stop() is called."""
+        self._stopping = False
+        while not self._stopping:
+            try:
+                await self._connect_and_read()
+            except Exception as e:
+                logger.error(f"tmux control connection failed: {e}", exc_info=True)
+            finally:
+                self._disconnect()
+            if self._stopping:
+                break
+            await asyncio.sleep(TMUX_CONTROL_RECONNECT_SECONDS)
+
+    async def stop(self) -> None:
+        """Detaches and removes the control session."""
+        self._stopping = True
+        if self._process is not None and self._process.returncode is None:
+            try:
+                await self.command(f"kill-session -t '{self.control_session}'", timeout=2)
+            except (ConnectionError, asyncio.TimeoutError):
+                pass
+            if self._process is not None and self._process.returncode is None:
+                self._process.terminate()
+
+    async def _connect_and_read(self) -> None:
+        # `cat` keeps the control session's pane silent; -A reuses the session
+        # left by an earlier server
+        self._process = await asyncio.create_subprocess_exec(
+            "tmux", "-C", "new-session", "-A", "-s", self.control_session, "cat",
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+            limit=CONTROL_LINE_LIMIT,
+        )
+        self.stats["connects"] += 1
+        # The registry is loaded (and lookups enabled) by the first reply, read
+        # by the loop below
+        self._schedule_refresh()
+
+        assert self._process.stdout is not None
+        while True:
+            raw = await self._process.stdout.readline()
+            if not raw:
+                break
+            self._handle_line(raw.decode("utf-8", errors="replace").rstrip("\n"))
+        logger.info("tmux control connection closed")
+
+    def _handle_line(self, line: str) -> None:
+        if self._reply_lines is not None:
+            if line.startswith(("%end ", "%error ")):
+                lines, self._reply_lines = self._reply_lines, None
+                if self._reply_ours and self._replies:
+                    reply = self._replies.popleft()
+                    if not reply.done():
+                        reply.set_result((line.startswith("%end "), lines))
+            else:
+                self._reply_lines.append(line)
+            return
+
+        if line.startswith("%begin "):
+            # %begin <time> <command number> <flags>; flags 1 = sent by us
+            self._reply_lines = []
+            self._reply_ours = line.rsplit(" ", 1)[-1] == "1"
+        elif line.startswith(REFRESH_NOTIFICATIONS):
+            self.stats["notifications"] += 1
+            self._schedule_refresh()
+        elif line.startswith("%exit"):
+            logger.info(f"tmux control client exited: {line}")
+
+    def _disconnect(self) -> None:
+        self.connected = False
+        self.sessions = {}
+        self._reply_lines = None
+        while self._replies:
+            reply = self._replies.popleft()
+            if not reply.done():
+                reply.set_exception(ConnectionError("tmux control connection closed"))
+        if self._process is not None and self._process.returncode is None:
+            self._process.kill()
+        self._process = None
+
+
+tmux_control = TmuxControlClient()
+
+
+async def run_tmux_control(*, task_status=anyio.TASK_STATUS_IGNORED) -> None:
+    """Background task holding the tmux control connection."""
+    with anyio.CancelScope() as scope:
+        task_status.started(scope)
+        if not is_tmux_available():
+            logger.info("tmux not available; tmux control connection not started.")
+            return
+        logger.info(f"tmux control connection starting (session '{tmux_control.control_session}')...")
+        await tmux_control.run()
@@ -0,0 +1,175 @@
+# Agent-MCP/agent_mcp/utils/tmux_delivery.py
+"""
+Bounded, per-session ordered delivery of prompts to agent tmux sessions.
+
+Every prompt typed into an agent's session (messages, relaunch prompts) is
+submitted to one PromptDeliveryExecutor instead of getting a thread or task of
+its own. Each session has a FIFO queue; a session is served by at most one
+worker at a time, so an agent receives its prompts in the order they were sent,
+while up to TMUX_DELIVERY_WORKERS different sessions are written to in
+parallel. A prompt's delay is a "not before" time: the session waits on a
+timer, not on a worker, until its next prompt is due.
+
+metrics() reports queue depth per session and queue-wait/send latencies of
+recent deliveries (shown by view_status).
+"""
+import asyncio
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, Optional, Set
+
+from ..core.config import logger, TMUX_DELIVERY_WORKERS, TMUX_DELIVERY_MAX_BACKLOG
+from .tmux_async import send_prompt_to_session_async
+from .tmux_utils import sanitize_session_name
+
+# Deliveries kept for latency percentiles
+LATENCY_WINDOW = 500
+
+
+@dataclass
+class PromptDelivery:
+    """One queued prompt; `done` resolves to whether it was delivered."""
+    session_name: str
+    prompt: str
+    due: float  # loop time after which it may be sent
+    done: "asyncio.Future[bool]" = field(repr=False)
+
+
+def _percentile(values: list, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class PromptDeliveryExecutor:
+    """Per-session FIFO queues served by a bounded number of worker tasks."""
+
+    def __init__(
+        self,
+        max_workers: int = TMUX_DELIVERY_WORKERS,
+        max_backlog: int = TMUX_DELIVERY_MAX_BACKLOG,
+    ) -> None:
+        self.max_workers = max(1, max_workers)
+        self.max_backlog = max_backlog
+        self._queues: Dict[str, Deque[PromptDelivery]] = {}
+        # A session is in at most one of these: due and waiting for a worker,
+        # waiting on its head's delay timer, or being served by a worker
+        self._ready: Deque[str] = deque()
+        self._timers: Dict[str, asyncio.TimerHandle] = {}
+        self._active: Set[str] = set()
+        self._workers: Set["asyncio.Task[None]"] = set()
+        # Counted down by the worker itself as it exits, so a session scheduled
+        # right after never waits for a worker that is already gone
+        self._worker_count = 0
+        self.stats = {"submitted": 0, "delivered": 0, "failed": 0, "rejected": 0}
+        # (queue wait, send time) in seconds of recent deliveries
+        self._latencies: Deque[tuple] = deque(maxlen=LATENCY_WINDOW)
+
+    def submit(
+        self, session_name: str, prompt: str, delay_seconds: float = 0
+    ) -> "asyncio.Future[bool]":
+        """
+        Queues `prompt` for `session_name`, to be sent no earlier than
+        `delay_seconds` from now and after every prompt queued for the session
+        before it. Returns a future resolving to whether it was delivered.
+        """
+        loop = asyncio.get_running_loop()
+        session_name = sanitize_session_name(session_name)
+        done: "asyncio.Future[bool]" = loop.create_future()
+        queue = self._queues.setdefault(session_name, deque())
+        if len(queue) >= self.max_backlog:
+            self.stats["rejected"] += 1
+            logger.warning(
+                f"Prompt for tmux session '{session_name}' rejected: {len(queue)} prompts already queued"
+            )
+            done.set_result(False)
+            return done
+
+        now = loop.time()
+        # A later prompt is never due before an earlier one, which keeps the order
+        due = max(now + delay_seconds, queue[-1].due if queue else now)
+        queue.append(PromptDelivery(session_name, prompt, due, done))
+        self.stats["submitted"] += 1
+        self._schedule(session_name)
+        return done
+
+    def _schedule(self, session_name: str) -> None:
+        if (
+            session_name in self._active
+            or session_name in self._timers
+            or session_name in self._ready
+        ):
+            return
+        queue = self._queues.get(session_name)
+        if not queue:
+            self._queues.pop(session_name, None)
+            return
+        loop = asyncio.get_running_loop()
+        wait = queue[0].due - loop.time()
+        if wait > 0:
+            self._timers[session_name] = loop.call_later(wait, self._on_due, session_name)
+            return
+        self._ready.append(session_name)
+        if self._worker_count < self.max_workers:
+            self._worker_count += 1
+            worker = asyncio.create_task(self._work())
+            self._workers.add(worker)
+            worker.add_done_callback(self._workers.discard)
+
+    def _on_due(self, session_name: str) -> None:
+        self._timers.pop(session_name, None)
+        self._schedule(session_name)
+
+    async def _work(self) -> None:
+        try:
+            while self._ready:
+                await self._deliver_next(self._ready.popleft())
+        finally:
+            self._worker_count -= 1
+
+    async def _deliver_next(self, session_name: str) -> None:
+        queue = self._queues.get(session_name)
+        if not queue:
+            return
+        loop = asyncio.get_running_loop()
+        self._active.add(session_name)
+        delivery = queue.popleft()
+        started = loop.time()
+        try:
+            delivered = await send_prompt_to_session_async(
+                session_name, delivery.prompt, delay_seconds=0
+            )
+        except Exception as e:
+            logger.error(f"Error delivering prompt to tmux session '{session_name}': {e}")
+            delivered = False
+        finally:
+            self._active.discard(session_name)
+        self._latencies.append((started - delivery.due, loop.time() - started))
+        self.stats["delivered" if delivered else "failed"] += 1
+        if not delivery.done.done():
+            delivery.done.set_result(delivered)
+        # One prompt per turn; the session goes to the back of the line
+        self._schedule(session_name)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Counters, backlog and latencies (milliseconds) of recent deliveries."""
+        backlog = {name: len(queue) for name, queue in self._queues.items() if queue}
+        waits = [wait for wait, _ in self._latencies]
+        sends = [send for _, send in self._latencies]
+        latency: Dict[str, Optional[float]] = {}
+        for name, values in (("queue_wait", waits), ("send", sends)):
+            latency[f"{name}_avg_ms"] = round(1000 * sum(values) / len(values), 1) if values else None
+            latency[f"{name}_p95_ms"] = round(1000 * _percentile(values, 0.95), 1) if values else None
+            latency[f"{name}_max_ms"] = round(1000 * max(values), 1) if values else None
+        return {
+            **self.stats,
+            "workers_busy": len(self._active),
+            "max_workers": self.max_workers,
+            "backlog_total": sum(backlog.values()),
+            "backlog_by_session": backlog,
+            "sessions_waiting_on_delay": len(self._timers),
+            "latency_samples": len(self._latencies),
+            **latency,
+        }
+
+
+prompt_delivery = PromptDeliveryExecutor()
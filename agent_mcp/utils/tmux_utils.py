@@ -8,6 +8,42 @@ from pathlib import Path
 from ..core.config import logger
 
 
+# Output formats shared with the async client (tmux_async)
+SESSION_LIST_FORMAT = '#{session_name}|#{session_created}|#{session_attached}|#{session_windows}'
+SESSION_STATUS_FORMAT = '#{session_name}|#{session_created}|#{session_attached}|#{session_windows}|#{session_id}'
+
+
+def parse_session_list(output: str) -> List[Dict[str, Any]]:
+    """Parse `tmux list-sessions -F SESSION_LIST_FORMAT` output."""
+    sessions = []
+    for line in output.strip().split('\n'):
+        if line:
+            parts = line.split('|')
+            if len(parts) >= 4:
+                sessions.append({
+                    'name': parts[0],
+                    'created': parts[1],
+                    'attached': parts[2] == '1',
+                    'windows': int(parts[3])
+                })
+    return sessions
+
+
+def parse_session_status(output: str) -> Optional[Dict[str, Any]]:
+    """Parse `tmux display-message -p SESSION_STATUS_FORMAT` output."""
+    parts = output.strip().split('|')
+    if len(parts) >= 5:
+        return {
+            'name': parts[0],
+            'created': parts[1],
+            'attached': parts[2] == '1',
+            'windows': int(parts[3]),
+            'session_id': parts[4],
+            'exists': True
+        }
+    return None
+
+
 def is_tmux_available() -> bool:
     """Check if tmux is installed and available."""
     try:
@@ -137,8 +173,7 @@ def list_tmux_sessions() -> List[Dict[str, Any]]:
     
     try:
         # Use tmux list-sessions with a specific format
-        result = subprocess.run(['tmux', 'list-sessions', '-F', 
-                               '#{session_name}|#{session_created}|#{session_attached}|#{session_windows}'], 
+        result = subprocess.run(['tmux', 'list-sessions', '-F', SESSION_LIST_FORMAT], 
                               capture_output=True, 
                               text=True, 
                               timeout=10)
@@ -149,19 +184,7 @@ def list_tmux_sessions() -> List[Dict[str, Any]]:
             logger.warning(f"Failed to list tmux sessions: {result.stderr}")
             return []
         
-        sessions = []
-        for line in result.stdout.strip().split('\n'):
-            if line:
-                parts = line.split('|')
-                if len(parts) >= 4:
-                    sessions.append({
-                        'name': parts[0],
-                        'created': parts[1],
-                        'attached': parts[2] == '1',
-                        'windows': int(parts[3])
-                    })
-        
-        return sessions
+        return parse_session_list(result.stdout)
         
     except subprocess.TimeoutExpired:
         logger.error("Timeout listing tmux sessions")
@@ -233,22 +256,13 @@ def get_session_status(session_name: str) -> Optional[Dict[str, Any]]:
     try:
         # Get detailed session information
         result = subprocess.run(['tmux', 'display-message', '-t', clean_session_name, '-p',
-                               '#{session_name}|#{session_created}|#{session_attached}|#{session_windows}|#{session_id}'], 
+                               SESSION_STATUS_FORMAT], 
                               capture_output=True, 
                               text=True, 
                               timeout=5)
         
         if result.returncode == 0:
-            parts = result.stdout.strip().split('|')
-            if len(parts) >= 5:
-                return {
-                    'name': parts[0],
-                    'created': parts[1],
-                    'attached': parts[2] == '1',
-                    'windows': int(parts[3]),
-                    'session_id': parts[4],
-                    'exists': True
-                }
+            return parse_session_status(result.stdout)
         
         return None
         
@@ -364,14 +378,26 @@ def send_prompt_to_session(session_name: str, prompt: str, delay_seconds: int =
 
 def send_prompt_async(session_name: str, prompt: str, delay_seconds: int = 3) -> None:
     """
-    Send a prompt to a tmux session asynchronously in a background thread.
+    Send a prompt to a tmux session without waiting for it. Called from the
+    server's event loop, the prompt is queued on the bounded delivery executor
+    (tmux_delivery.prompt_delivery); elsewhere it is sent from a background thread.
     
     Args:
         session_name: Name of the target session
         prompt: Prompt text to send
         delay_seconds: Seconds to wait before sending prompt
     """
+    import asyncio
     import threading
+
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        pass
+    else:
+        from .tmux_delivery import prompt_delivery
+        prompt_delivery.submit(session_name, prompt, delay_seconds)
+        return
     
     def _send_prompt():
         send_prompt_to_session(session_name, prompt, delay_seconds)